@@ -1,5 +1,6 @@
 # your_trading_bot/api/delta_client.py
 import requests
+import re
 import hmac
 import hashlib
 import json
@@ -8,19 +9,35 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from datetime import datetime, timezone
+from time import perf_counter_ns
 from urllib.parse import urlencode
 # sys.path.append('/Users/princemalani/Desktop/sem 5/my_bot')
 import config
+from utils.metrics import METRICS
+from utils.profiler import PROFILER
 # print("Using config from:", config.API_KEY)  # Debugging line to check which config is being used
 
+_ID_IN_PATH = re.compile(r"/\d+")
+
 class DeltaAPIClient:
-    def __init__(self, api_key, api_secret, base_url):
+    def __init__(self, api_key, api_secret, base_url, pool_size=10, rate_limiter=None):
+        """
+        pool_size:    keep-alive connections kept per host by the shared requests.Session
+        rate_limiter: optional utils.rate_limiter.TokenBucket; every request takes one token,
+                      so several strategies/symbols sharing this client share one REST budget
+        """
         self.api_key = api_key
         self.api_secret = api_secret
         self.base_url = base_url
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.rate_limiter = rate_limiter
         self.product_id_cache = {}
         self.product_details_cache = {}
         self.LOT_SIZE_BTC = config.LOT_SIZE_BTC  # Use the constant from the imported config module
+        self._endpoint_metrics = {}
         # Use the constant from the imported config module
        
 
@@ -44,6 +61,20 @@ class DeltaAPIClient:
         signature = hmac.new(self.api_secret.encode('utf-8'), prehash_string.encode('utf-8'), hashlib.sha256).hexdigest()
         return signature
 
+    def _metrics_for(self, method, path):
+        """(latency histogram, error counters by kind, None-response counter) for one endpoint; ids collapsed to :id."""
+        key = (method, path)
+        m = self._endpoint_metrics.get(key)
+        if m is None:
+            endpoint = f"{method} {_ID_IN_PATH.sub('/:id', path)}"
+            m = self._endpoint_metrics[key] = (
+                METRICS.histogram("rest_request", "REST round trip incl. JSON decode", endpoint=endpoint),
+                {kind: METRICS.counter("rest_errors", "REST requests that raised", endpoint=endpoint, kind=kind)
+                 for kind in ("http", "request", "other")},
+                METRICS.counter("rest_none_responses", "REST calls that returned None", endpoint=endpoint),
+            )
+        return m
+
 
     def _send_request(self, method, path, params=None, data=None):
         """Helper to send signed requests to Delta Exchange API."""
@@ -92,34 +123,52 @@ class DeltaAPIClient:
         print(f"Body : {data}")
         print(f"Prehash String components: Method='{method}', Timestamp='{timestamp_str}', Path='{path}', Query='{query_string_for_signature}', Body='{json.dumps(data, separators=(',', ':')) if data else ''}'")
         # Conditional Content-Type header
-        if method.upper() in ['POST', 'PUT'] or (method.upper() == 'DELETE' and body is not None):
+        if method.upper() in ['POST', 'PUT'] or (method.upper() == 'DELETE' and data is not None):
             req_headers['Content-Type'] = 'application/json'
 
-        try:
-            if method == 'GET':
-                # Pass params dict directly; requests will URL-encode it for the actual request
-                response = requests.get(request_url, params=params, headers=req_headers, timeout=(3, 27))
-            elif method == 'POST':
-                response = requests.post(request_url, json=data, headers=req_headers, timeout=(3, 27))
-            elif method == 'PUT':
-                response = requests.put(request_url, json=data, headers=req_headers, timeout=(3, 27))
-            elif method == 'DELETE':
-                response = requests.delete(request_url,json=data, headers=req_headers, timeout=(3, 27))
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            response.raise_for_status()
-            return response.json()
-
-        except requests.exceptions.HTTPError as e:
-            print(f"HTTP Error: {e.response.status_code} - {e.response.text}")
-            return None
-        except requests.exceptions.RequestException as e:
-            print(f"Request Error: {e}")
-            return None
-        except Exception as e:
-            print(f"An unexpected error occurred: {e}")
-            return None
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        latency, errors, none_responses = self._metrics_for(method, path)
+        t0 = perf_counter_ns()
+        # The scope encloses the whole try, so every exit path (errors included) closes it
+        with PROFILER.scope("rest"):
+            try:
+                if method == 'GET':
+                    # Pass params dict directly; requests will URL-encode it for the actual request
+                    response = self.session.get(request_url, params=params, headers=req_headers, timeout=(3, 27))
+                elif method == 'POST':
+                    response = self.session.post(request_url, json=data, headers=req_headers, timeout=(3, 27))
+                elif method == 'PUT':
+                    response = self.session.put(request_url, json=data, headers=req_headers, timeout=(3, 27))
+                elif method == 'DELETE':
+                    response = self.session.delete(request_url,json=data, headers=req_headers, timeout=(3, 27))
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+
+                response.raise_for_status()
+                result = response.json()
+                if result is None:
+                    none_responses.inc()
+                return result
+
+            except requests.exceptions.HTTPError as e:
+                errors["http"].inc()
+                none_responses.inc()
+                print(f"HTTP Error: {e.response.status_code} - {e.response.text}")
+                return None
+            except requests.exceptions.RequestException as e:
+                errors["request"].inc()
+                none_responses.inc()
+                print(f"Request Error: {e}")
+                return None
+            except Exception as e:
+                errors["other"].inc()
+                none_responses.inc()
+                print(f"An unexpected error occurred: {e}")
+                return None
+            finally:
+                latency.record(perf_counter_ns() - t0)
 
     # def get_candles(self, symbol, resolution, start, end):
     #     url = f"{self.base_url}/v2/history/candles"
@@ -133,59 +182,6 @@ class DeltaAPIClient:
     #         print(f"❌ Request error: {e}")
     #         return {"success": False, "error": {"message": str(e)}}
 
-    def get_candles(self, symbol, resolution, start_timestamp, end_timestamp):
-        """Fetches historical candles from Delta Exchange.
-           Delta's history endpoint expects timestamps in seconds for start/end params.
-           The 'time' field in the response might be in seconds or milliseconds, verify.
-        """
-        path = '/v2/history/candles'
-        params = {
-            'resolution': resolution,
-            'symbol': symbol,
-            'start': start_timestamp,
-            'end': end_timestamp
-        }
-        print(f"Attempting to fetch candles from {self.base_url}{path} with params: {params}")
-
-        json_data = self._send_request('GET', path, params=params)
-
-        if json_data and 'result' in json_data and isinstance(json_data['result'], list):
-            print(f"\nSuccessfully fetched {len(json_data['result'])} candle data points.")
-        else:
-            print("\nFailed to fetch candle data or unexpected format.")
-        return json_data
-
-    # --- Orders ---
-    def get_open_orders(self, symbol=None):
-        path = '/v2/orders/open'
-        params = {'symbol': symbol} if symbol else {}
-        return self._send_request('GET', path, params=params)
-
-    def place_order(self, symbol, side, quantity_in_btc, order_type='market', price=None, stop_price=None, reduce_only=False):
-        product_id = self.get_product_id(symbol)
-        size_in_lots = int(quantity_in_btc / self.LOT_SIZE_BTC)
-
-        data = {
-            'product_id': product_id,
-            'side': side,
-            'size': size_in_lots,
-            'reduce_only': reduce_only
-        }
-
-        if order_type == 'market':
-            data['order_type'] = 'market_order'
-        elif order_type == 'limit':
-            data['order_type'] = 'limit_order'
-            data['limit_price'] = float(price)
-        elif order_type == 'stop':
-            data.update({'order_type': 'market_order', 'stop_price': float(stop_price), 'stop_order_type': 'stop_loss_order'})
-        elif order_type == 'stop_limit':
-            data.update({'order_type': 'limit_order', 'limit_price': float(price), 'stop_price': float(stop_price), 'stop_order_type': 'stop_loss_order'})
-        else:
-            return {"success": False, "error": {"message": f"Unsupported order_type {order_type}"}}
-
-        return self._send_request('POST', '/v2/orders', data=data)
-    
     # --- Candles ---
     def get_candles(self, symbol, resolution, start, end):
         path = '/v2/history/candles'
@@ -216,25 +212,32 @@ class DeltaAPIClient:
             return self.product_details_cache[symbol]
         response = self._send_request('GET', '/v2/products')
         if response and response.get('success'):
+            # Cache every product: multi-symbol runs then need a single /v2/products call
             for product in response['result']:
-                if product['symbol'] == symbol:
-                    self.product_details_cache[symbol] = product
-                    return product
+                self.product_details_cache[product['symbol']] = product
+            if symbol in self.product_details_cache:
+                return self.product_details_cache[symbol]
         raise ValueError(f"Product not found: {symbol}")
 
     def get_product_id(self, symbol):
         return self.get_product_details(symbol)['id']
 
     # --- Position ---
-    def get_position(self, symbol):
-        product_id = self.get_product_id(symbol)
+    def get_position(self, symbol, raise_on_error=False, product_id=None):
+        """Returns the open position dict, or None when flat.
+        With raise_on_error=True a failed request raises instead of looking flat.
+        Passing a known product_id skips the product lookup."""
+        if product_id is None:
+            product_id = self.get_product_id(symbol)
         response = self._send_request('GET', '/v2/positions', params={'product_id': product_id})
+        if raise_on_error and not (response and response.get('success')):
+            raise RuntimeError(f"Could not fetch position for {symbol}: {response}")
         if response and response.get('success') and response['result'].get('size', 0) != 0:
             return response['result']
         return None
 
     # --- Place order ---
-    def place_order(self, symbol, side, quantity_in_btc, order_type='market', price=None, stop_price=None, reduce_only=False):
+    def place_order(self, symbol, side, quantity_in_btc, order_type='market', price=None, stop_price=None, reduce_only=False, time_in_force=None, client_order_id=None):
         product_id = self.get_product_id(symbol)
         size_in_lots = int(quantity_in_btc / self.LOT_SIZE_BTC)
 
@@ -244,6 +247,10 @@ class DeltaAPIClient:
             'size': size_in_lots,
             'reduce_only': reduce_only
         }
+        if time_in_force:
+            data['time_in_force'] = time_in_force  # 'gtc' | 'ioc' | 'fok'
+        if client_order_id:
+            data['client_order_id'] = client_order_id  # echoed back on REST and WS order updates
 
         if order_type == 'market':
             data['order_type'] = 'market_order'
@@ -0,0 +1,213 @@
+# your_trading_bot/api/paper_client.py
+
+import itertools
+import json
+import queue
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils.matching_engine import CANCELLED, FILLED, MatchingEngine, SimOrder, missing_price
+
+_ORDER_TYPES = {"market": "market_order", "limit": "limit_order", "stop": "market_order", "stop_limit": "limit_order"}
+
+
+class PaperTradingClient:
+    """
+    Paper-trading stand-in for DeltaAPIClient: same methods and response shapes, but orders
+    go to a local MatchingEngine driven by the live candle/tick feed instead of the exchange.
+    Order and position changes are pushed to the OrderWebSocketRouter as synthetic
+    user.orders / user.positions frames, from a separate thread like the private WS.
+
+    market_data:  DeltaAPIClient used for candles and product details (public endpoints)
+    latency_ms:   delay before an order reaches the matcher, so fills see the price move
+    fee_per_trade, slippage_pct: charged on every fill / applied to market and stop fills
+    book_for(symbol): optional L2 book (utils.order_book) whose VWAP prices market orders
+    """
+
+    def __init__(self, market_data=None, router=None, latency_ms=None, fee_per_trade=None, slippage_pct=None,
+                 book_for=None):
+        self.market_data = market_data
+        self.router = router
+        self.book_for = book_for
+        self.latency = (config.PAPER_LATENCY_MS if latency_ms is None else latency_ms) / 1000
+        self.LOT_SIZE_BTC = config.LOT_SIZE_BTC
+        self.engine = MatchingEngine(
+            contract_size=config.LOT_SIZE_BTC,
+            fee_per_fill=config.FIXED_FEE_PER_TRADE if fee_per_trade is None else fee_per_trade,
+            slippage_pct=config.PAPER_SLIPPAGE_PCT if slippage_pct is None else slippage_pct,
+        )
+        self.product_id_cache = {}
+        self.product_details_cache = {}
+        self._lock = threading.RLock()
+        self._ids = itertools.count(int(time.time()))
+        self._bar_marks = {}       # symbol -> (candle_start_time, high, low) already fed to the matcher
+        self._frames = queue.Queue()
+        threading.Thread(target=self._dispatch, name="paper-ws", daemon=True).start()
+
+    def attach_router(self, router) -> None:
+        self.router = router
+
+    # --- Market data (delegated) ---
+    def get_candles(self, symbol, resolution, start, end):
+        if self.market_data is None:
+            return {"success": False, "error": {"message": "No market data client configured"}}
+        return self.market_data.get_candles(symbol, resolution, start, end)
+
+    def get_product_details(self, symbol):
+        if symbol in self.product_details_cache:
+            return self.product_details_cache[symbol]
+        if self.market_data is not None:
+            details = self.market_data.get_product_details(symbol)
+        else:
+            product_id = config.PRODUCT_ID if symbol == config.SYMBOL else 100000 + len(self.product_details_cache)
+            details = {"id": product_id, "symbol": symbol, "tick_size": "0.5"}
+        self.product_details_cache[symbol] = details
+        return details
+
+    def get_product_id(self, symbol):
+        return self.get_product_details(symbol)['id']
+
+    # --- Live feed taps ---
+    def on_price(self, symbol, price):
+        """Feeds one trade/mark price to the matcher."""
+        with self._lock:
+            self._publish(self.engine.on_price(symbol, float(price)))
+
+    def on_candle(self, symbol, candle):
+        """
+        WebSocketCandleClient on_update hook. Each in-progress update feeds the matcher the
+        new extremes it reveals (the one farther from the close first) and then the close.
+        """
+        start = candle.get('candle_start_time')
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        with self._lock:
+            mark = self._bar_marks.get(symbol)
+            if mark is None or mark[0] != start:
+                path = [float(candle['open'])]
+                extremes = [high, low]
+            else:
+                path = []
+                extremes = [p for p, new in ((high, high > mark[1]), (low, low < mark[2])) if new]
+            extremes.sort(key=lambda p: -abs(p - close))
+            path += extremes + [close]
+            self._bar_marks[symbol] = (start, high, low)
+            changed = []
+            for price in path:
+                changed += self.engine.on_price(symbol, price)
+            self._publish(changed)
+
+    # --- Orders ---
+    def place_order(self, symbol, side, quantity_in_btc, order_type='market', price=None, stop_price=None, reduce_only=False, time_in_force=None, client_order_id=None):
+        if order_type not in _ORDER_TYPES:
+            return {"success": False, "error": {"message": f"Unsupported order_type {order_type}"}}
+        missing = missing_price(order_type, price, stop_price)
+        if missing:
+            return {"success": False, "error": {"message": f"{order_type} order requires {missing}"}}
+        product_id = self.get_product_id(symbol)
+        size_in_lots = int(quantity_in_btc / self.LOT_SIZE_BTC)
+        if self.latency:
+            time.sleep(self.latency)   # request in flight; the feed keeps moving meanwhile
+
+        order = SimOrder(
+            id=next(self._ids), symbol=symbol, product_id=product_id, side=side, size=size_in_lots,
+            kind=order_type,
+            limit_price=float(price) if price is not None else None,
+            stop_price=float(stop_price) if stop_price is not None else None,
+            reduce_only=bool(reduce_only), time_in_force=time_in_force, client_order_id=client_order_id,
+        )
+        market_price = self._book_price(symbol, side, size_in_lots) if order_type == 'market' else None
+        with self._lock:
+            changed = self.engine.submit(order, market_price)
+            self._publish(changed)
+            return {"success": True, "result": self._order_result(order)}
+
+    def get_open_orders(self, symbol=None):
+        with self._lock:
+            return {"success": True, "result": [self._order_result(o) for o in self.engine.open_orders(symbol)]}
+
+    def cancel_order(self, order_id):
+        if not order_id:
+            return {"success": False, "error": {"message": "Invalid order_id"}}
+        with self._lock:
+            order = self.engine.cancel(int(order_id))
+            if order is None:
+                return {"success": False, "error": {"code": "open_order_not_found"}}
+            self._publish([order])
+            return {"success": True, "result": self._order_result(order)}
+
+    def cancel_all_orders(self, product_id=None):
+        with self._lock:
+            orders = [o for o in self.engine.open_orders() if product_id in (None, o.product_id)]
+            cancelled = [self.engine.cancel(o.id) for o in orders]
+            self._publish(cancelled)
+            return {"success": True, "result": [self._order_result(o) for o in cancelled]}
+
+    # --- Position ---
+    def get_position(self, symbol, raise_on_error=False, product_id=None):
+        """Open position in the exchange's shape (signed contracts), or None when flat."""
+        with self._lock:
+            pos = self.engine.position(symbol)
+            if pos.size == 0:
+                return None
+            return {"product_id": product_id or self.get_product_id(symbol), "product_symbol": symbol,
+                    "size": pos.size, "entry_price": str(pos.entry_price), "realized_pnl": str(pos.realised_pnl)}
+
+    # --- Internals ---
+    def _book_price(self, symbol, side, size):
+        book = self.book_for(symbol) if self.book_for else None
+        if book is None or not book.is_fresh(config.ORDER_BOOK_MAX_AGE_SECONDS):
+            return None
+        vwap, filled, _ = book.expected_fill(side, size)
+        return vwap if vwap is not None and filled >= size else None
+
+    @staticmethod
+    def _order_result(order):
+        """REST order shape (as returned by POST /v2/orders and GET /v2/orders/open)."""
+        if order.state == FILLED:
+            state = "closed"
+        elif order.state == CANCELLED:
+            state = "cancelled"
+        else:
+            state = "pending" if order.kind in ("stop", "stop_limit") and not order.triggered else "open"
+        return {
+            "id": order.id, "client_order_id": order.client_order_id, "product_id": order.product_id,
+            "product_symbol": order.symbol, "side": order.side, "size": order.size,
+            "unfilled_size": order.remaining, "state": state,
+            "order_type": _ORDER_TYPES[order.kind], "limit_price": order.limit_price, "stop_price": order.stop_price,
+            "stop_order_type": "stop_loss_order" if order.stop_price is not None else None,
+            "reduce_only": order.reduce_only, "time_in_force": order.time_in_force,
+            "average_fill_price": str(order.avg_fill_price) if order.avg_fill_price is not None else None,
+            "paid_commission": order.fee,
+        }
+
+    def _publish(self, changed):
+        """Queues user.orders frames for `changed` and a user.positions frame per symbol that traded."""
+        traded = {}
+        for order in changed:
+            self._frames.put({"channel": "user.orders", "data": {
+                "id": order.id, "client_order_id": order.client_order_id, "status": order.state, "side": order.side,
+                "type": "stop" if order.kind in ("stop", "stop_limit") else order.kind,
+                "reduce_only": order.reduce_only, "price": order.limit_price, "stop_price": order.stop_price,
+                "avg_fill_price": order.avg_fill_price, "filled_size": order.filled,
+                "remaining_size": order.remaining, "commission": order.fee,
+                "product_id": order.product_id, "product_symbol": order.symbol,
+            }})
+            if order.state == FILLED:
+                traded[order.symbol] = order.product_id
+        for symbol, product_id in traded.items():
+            pos = self.engine.position(symbol)
+            self._frames.put({"channel": "user.positions", "data": {
+                "size": pos.size, "entry_price": pos.entry_price, "realised_pnl": pos.realised_pnl,
+                "product_id": product_id, "product_symbol": symbol,
+            }})
+
+    def _dispatch(self):
+        while True:
+            frame = self._frames.get()
+            router = self.router
+            if router is not None:
+                router.handle_raw_message(json.dumps(frame))
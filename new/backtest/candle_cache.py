@@ -0,0 +1,148 @@
+# your_trading_bot/backtest/candle_cache.py
+
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config
+from utils.helpers import get_resolution_seconds, to_microseconds
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+_DF_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+_US = 1_000_000
+MAX_CANDLES_PER_REQUEST = 2000    # /v2/history/candles page size
+
+
+def _utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _month_bounds_us(year: int, month: int) -> Tuple[int, int]:
+    start = pd.Timestamp(year=year, month=month, day=1, tz="UTC")
+    return start.value // 1000, (start + pd.offsets.MonthBegin(1)).value // 1000
+
+
+class CandleCache:
+    """
+    Local OHLCV store for backtests: one .npz per (symbol, resolution, UTC month) under `root`,
+    filled from /v2/history/candles on first use. Months are loaded lazily and the most
+    recent `max_months` stay in memory, so a 1m drill-down only touches the months it needs.
+    Months that were still in progress when fetched are re-fetched on the next load.
+    """
+
+    def __init__(self, root: str = None, client=None, max_months: int = 36):
+        self.root = root or config.CANDLE_CACHE_DIR
+        self.client = client            # DeltaAPIClient (or anything with get_candles); None = offline
+        self.max_months = max_months
+        self._months: "OrderedDict[tuple, Dict[str, np.ndarray]]" = OrderedDict()
+        self.fetches = 0
+
+    # ------------------------------------------------------------------ paths
+    def month_path(self, symbol: str, resolution: str, year: int, month: int) -> str:
+        return os.path.join(self.root, symbol, resolution, f"{year:04d}-{month:02d}.npz")
+
+    # ------------------------------------------------------------------ reads
+    def month(self, symbol: str, resolution: str, year: int, month: int) -> Dict[str, np.ndarray]:
+        """Arrays time_us / open / high / low / close / volume for one month (empty if unavailable)."""
+        key = (symbol, resolution, year, month)
+        cached = self._months.get(key)
+        if cached is not None:
+            self._months.move_to_end(key)
+            return cached
+        path = self.month_path(symbol, resolution, year, month)
+        arrays = None
+        if os.path.exists(path):
+            with np.load(path) as npz:
+                if bool(npz["complete"]) or self.client is None:
+                    arrays = {k: npz[k] for k in ("time_us",) + COLUMNS}
+        if arrays is None:
+            arrays = self._fetch_month(symbol, resolution, year, month)
+        self._months[key] = arrays
+        if len(self._months) > self.max_months:
+            self._months.popitem(last=False)
+        return arrays
+
+    def arrays(self, symbol: str, resolution: str, start, end) -> Dict[str, np.ndarray]:
+        """Bars with start time in [start, end) as arrays; start/end are anything pd.Timestamp accepts."""
+        start, end = _utc(start), _utc(end)
+        start_us, end_us = start.value // 1000, end.value // 1000
+        parts = []
+        for period in pd.period_range(start.tz_localize(None), (end - pd.Timedelta(1, "us")).tz_localize(None), freq="M"):
+            parts.append(self.month(symbol, resolution, period.year, period.month))
+        if not parts:
+            return {k: np.empty(0, np.int64 if k == "time_us" else float) for k in ("time_us",) + COLUMNS}
+        out = {k: np.concatenate([p[k] for p in parts]) for k in ("time_us",) + COLUMNS}
+        lo, hi = np.searchsorted(out["time_us"], [start_us, end_us])
+        return {k: v[lo:hi] for k, v in out.items()}
+
+    def load(self, symbol: str, resolution: str, start, end) -> pd.DataFrame:
+        """Same bars as a DataFrame in the bot's shape (UTC DatetimeIndex, Open..Volume)."""
+        a = self.arrays(symbol, resolution, start, end)
+        index = pd.to_datetime(a["time_us"], unit="us", utc=True)
+        return pd.DataFrame({_DF_COLUMNS[k]: a[k] for k in COLUMNS}, index=index)
+
+    # ------------------------------------------------------------------ writes
+    def store_month(self, symbol: str, resolution: str, year: int, month: int,
+                    arrays: Dict[str, np.ndarray], complete: bool) -> None:
+        path = self.month_path(symbol, resolution, year, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, complete=np.array(complete), **arrays)
+        os.replace(tmp, path)
+
+    def store(self, symbol: str, resolution: str, df: pd.DataFrame) -> int:
+        """Writes OHLCV bars (bot-shaped DataFrame) into the month files, e.g. to import data offline."""
+        t = df.index.as_unit("us").asi8
+        months = df.index.tz_convert("UTC").tz_localize(None).to_period("M")
+        for period in months.unique():
+            mask = np.asarray(months == period)
+            arrays = {"time_us": t[mask]}
+            arrays.update({k: df[_DF_COLUMNS[k]].to_numpy(dtype=float)[mask] for k in COLUMNS})
+            self.store_month(symbol, resolution, period.year, period.month, arrays, complete=True)
+            self._months.pop((symbol, resolution, period.year, period.month), None)
+        return len(months.unique())
+
+    def _fetch_month(self, symbol: str, resolution: str, year: int, month: int) -> Dict[str, np.ndarray]:
+        empty = {k: np.empty(0, np.int64 if k == "time_us" else float) for k in ("time_us",) + COLUMNS}
+        if self.client is None:
+            return empty
+        step = get_resolution_seconds(resolution)
+        start_us, end_us = _month_bounds_us(year, month)
+        now_s = int(time.time())
+        if start_us // _US > now_s:
+            return empty
+        rows = []
+        page_start = start_us // _US
+        month_end = min(end_us // _US, now_s)
+        while page_start < month_end:
+            page_end = min(page_start + MAX_CANDLES_PER_REQUEST * step, month_end)
+            resp = self.client.get_candles(symbol, resolution, page_start, page_end)
+            self.fetches += 1
+            if not resp or not isinstance(resp.get("result"), list):
+                print(f"⚠️ Candle cache: fetch failed for {symbol} {resolution} {year}-{month:02d}: {resp}")
+                return empty
+            rows.extend(resp["result"])
+            page_start = page_end
+        if rows:
+            df = pd.DataFrame(rows)
+            t = to_microseconds(df["time"].to_numpy())
+            order = np.argsort(t, kind="stable")
+            t = t[order]
+            keep = np.concatenate(([True], t[1:] != t[:-1])) & (t >= start_us) & (t < end_us)
+            arrays = {"time_us": t[keep]}
+            for k in COLUMNS:
+                col = df[k] if k in df else pd.Series(0.0, index=df.index)   # MARK: symbols have no volume
+                arrays[k] = pd.to_numeric(col, errors="coerce").to_numpy(dtype=float)[order][keep]
+        else:
+            arrays = empty
+        # The month is final once its last bar has closed
+        complete = end_us // _US <= now_s - step
+        self.store_month(symbol, resolution, year, month, arrays, complete)
+        return arrays
@@ -0,0 +1,239 @@
+# your_trading_bot/backtest/engine.py
+"""
+Bar-by-bar backtester for Strategy plugins on cached history.
+
+    cd new && python -m backtest.engine --symbol BTCUSD --start 2024-01-01 --end 2024-07-01
+
+Signals come from the strategy's own signal_batch() over the whole history at once; the
+position loop then fills entries at the signal bar's close and exits at the SL/TP level on
+the first later bar that touches it (same conventions as strategy/shadow.py). A bar that
+touches both levels is settled from its 1m candles instead of assuming the SL.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config
+import strategy.ema_rsi_strategy  # noqa: F401  registers the built-in plugins
+from backtest.candle_cache import CandleCache
+from strategy.base import BarBatch, Strategy, build_strategy
+from utils import kernels
+from utils.helpers import get_resolution_seconds
+from utils.indicators import compute_indicator
+from utils.trade_analytics import TradeArrays, compute_metrics, print_report
+
+EXIT_SL, EXIT_TP, EXIT_END = "SL", "TP", "END"
+# Indexed by kernels.REASON_*; bars touching both levels stay "SL" unless a resolver settles them
+_REASONS = (EXIT_SL, EXIT_TP, EXIT_SL, EXIT_END)
+
+
+def signal_array(strategy: Strategy, close: np.ndarray, values: Dict[str, np.ndarray], symbol: str = "") -> np.ndarray:
+    """
+    FLAT / LONG / SHORT per bar: the strategy's signal_batch with one row per bar, fed
+    precomputed indicator arrays ({role: values aligned with close}).
+    """
+    n = len(close)
+    if n < 2:
+        return np.zeros(n, np.int8)
+    batch = BarBatch(
+        symbols=[symbol] * (n - 1),
+        strategies=[strategy] * (n - 1),
+        close=close[1:],
+        prev_close=close[:-1],
+        last={role: v[1:] for role, v in values.items()},
+        prev={role: v[:-1] for role, v in values.items()},
+    )
+    return np.concatenate(([0], type(strategy).signal_batch(batch))).astype(np.int8)
+
+
+class IntrabarResolver:
+    """
+    Settles bars on which both the SL and the TP were touched by replaying that bar's
+    lower-timeframe candles from the CandleCache. A month of sub-bars is loaded only when an
+    ambiguous bar falls in it, and gets a bar start -> (first, end) sub-bar index on load,
+    so each lookup is one dict hit plus a scan of the bar's own sub-bars.
+    """
+
+    def __init__(self, cache: CandleCache, symbol: str, bar_resolution: str,
+                 sub_resolution: str = None):
+        self.cache = cache
+        self.symbol = symbol
+        self.sub_resolution = sub_resolution or config.BACKTEST_INTRABAR_RESOLUTION
+        self.step_us = get_resolution_seconds(bar_resolution) * 1_000_000
+        self._months: Dict[Tuple[int, int], Tuple[Dict[int, Tuple[int, int]], np.ndarray, np.ndarray]] = {}
+        self.stats = Counter()
+
+    def _month(self, bar_start_us: int):
+        ts = pd.Timestamp(bar_start_us, unit="us", tz="UTC")
+        key = (ts.year, ts.month)
+        entry = self._months.get(key)
+        if entry is None:
+            a = self.cache.month(self.symbol, self.sub_resolution, ts.year, ts.month)
+            t = a["time_us"]
+            bar = t - t % self.step_us
+            starts, first = np.unique(bar, return_index=True)
+            end = np.append(first[1:], len(t))
+            entry = (dict(zip(starts.tolist(), zip(first.tolist(), end.tolist()))), a["high"], a["low"])
+            self._months[key] = entry
+        return entry
+
+    def resolve(self, bar_start_us: int, side: int, sl: float, tp: float) -> Tuple[str, float]:
+        """Which level the bar hit first: (EXIT_SL | EXIT_TP, price). Falls back to the SL when undecidable."""
+        self.stats["ambiguous"] += 1
+        index, high, low = self._month(bar_start_us)
+        span = index.get(bar_start_us)
+        if span is None:
+            self.stats["no_data"] += 1
+            return EXIT_SL, sl
+        h, lo = high[span[0]:span[1]], low[span[0]:span[1]]
+        if side == 1:
+            sl_hit, tp_hit = lo <= sl, h >= tp
+        else:
+            sl_hit, tp_hit = h >= sl, lo <= tp
+        n = len(h)
+        first_sl = int(np.argmax(sl_hit)) if sl_hit.any() else n
+        first_tp = int(np.argmax(tp_hit)) if tp_hit.any() else n
+        if first_tp < first_sl:
+            self.stats["resolved_tp"] += 1
+            return EXIT_TP, tp
+        if first_sl < first_tp:
+            self.stats["resolved_sl"] += 1
+            return EXIT_SL, sl
+        # Both inside one sub-bar, or the sub-bars never reach either level
+        self.stats["unresolved"] += 1
+        return EXIT_SL, sl
+
+
+@dataclass
+class BacktestResult:
+    symbol: str
+    strategy: str
+    trades: pd.DataFrame                  # one row per closed trade
+    equity: pd.Series                     # realised net PnL after each bar
+    intrabar: Dict[str, int] = field(default_factory=dict)
+
+    def trade_arrays(self) -> TradeArrays:
+        t = TradeArrays()
+        if len(self.trades):
+            t.append_arrays(
+                exit_ns=pd.DatetimeIndex(self.trades["exit_time"]).as_unit("ns").asi8,
+                entry_ns=pd.DatetimeIndex(self.trades["entry_time"]).as_unit("ns").asi8,
+                side=self.trades["side"].to_numpy(), entry_price=self.trades["entry_price"].to_numpy(),
+                pnl=self.trades["pnl"].to_numpy(),
+                net_pnl=self.trades["net_pnl"].to_numpy(), reason=self.trades["reason"].tolist(),
+            )
+        return t
+
+    def metrics(self) -> dict:
+        return compute_metrics(self.trade_arrays())
+
+
+class Backtester:
+    """
+    Runs one Strategy over one symbol's bars. `resolver` (an IntrabarResolver) settles bars
+    that touch both SL and TP; without one those exit at the SL, as the shadow book does.
+    `trail_pct` trails the SL behind new closing extremes by that fraction of the close
+    (bar_handler.manage_open_position's rule); 0 keeps the initial SL.
+    """
+
+    def __init__(self, strategy: Strategy, quantity: float = config.LOT_SIZE_BTC,
+                 fee_per_trade: float = config.FIXED_FEE_PER_TRADE, resolver: Optional[IntrabarResolver] = None,
+                 trail_pct: float = 0.0):
+        self.strategy = strategy
+        self.quantity = quantity
+        self.fee_per_trade = fee_per_trade
+        self.resolver = resolver
+        self.trail_pct = trail_pct
+
+    def signals(self, df: pd.DataFrame, symbol: str = "") -> np.ndarray:
+        """FLAT / LONG / SHORT per bar, from the strategy's signal_batch over the whole history."""
+        values = {role: compute_indicator(df, spec) for role, spec in self.strategy.indicators().items()}
+        return signal_array(self.strategy, df["Close"].to_numpy(dtype=float), values, symbol)
+
+    def run(self, df: pd.DataFrame, symbol: str = "") -> BacktestResult:
+        return self.simulate(df.index, df["High"].to_numpy(dtype=float), df["Low"].to_numpy(dtype=float),
+                             df["Close"].to_numpy(dtype=float), self.signals(df, symbol), symbol)
+
+    def simulate(self, times: pd.DatetimeIndex, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                 signal: np.ndarray, symbol: str = "", close_at_end: bool = False) -> BacktestResult:
+        """
+        The position loop over precomputed signals (utils.kernels.position_loop). With
+        `close_at_end` a position still open on the last bar is closed at its close
+        (reason "END"), e.g. at a walk-forward test window edge.
+        """
+        signal = np.asarray(signal, dtype=np.int8)
+        # The strategy's risk stage, evaluated only on bars that could open a position
+        sl_at, tp_at = np.full(len(close), np.nan), np.full(len(close), np.nan)
+        risk = self.strategy.risk
+        for i in np.flatnonzero(signal).tolist():
+            sl_at[i], tp_at[i] = risk("long" if signal[i] == 1 else "short", float(close[i]))
+        entry_i, exit_i, side, entry_px, exit_px, code = kernels.position_loop(
+            high, low, close, signal, sl_at, tp_at, self.trail_pct, close_at_end)
+
+        reason = np.array(_REASONS, dtype=object)[code]
+        both = np.flatnonzero(code == kernels.REASON_BOTH)
+        if len(both) and self.resolver:
+            start_us = times.as_unit("us").asi8
+            for k in both.tolist():
+                reason[k], exit_px[k] = self.resolver.resolve(int(start_us[exit_i[k]]), int(side[k]),
+                                                              float(exit_px[k]), float(tp_at[entry_i[k]]))
+        pnl = (exit_px - entry_px) * side * self.quantity
+        net = pnl - 2 * self.fee_per_trade   # entry + exit fee
+        equity = np.zeros(len(close))
+        np.add.at(equity, exit_i, net)
+
+        trades = pd.DataFrame({"entry_time": times[entry_i], "exit_time": times[exit_i], "side": side.astype(int),
+                               "entry_price": entry_px, "exit_price": exit_px, "reason": reason,
+                               "pnl": pnl, "net_pnl": net})
+        return BacktestResult(
+            symbol=symbol,
+            strategy=self.strategy.name,
+            trades=trades,
+            equity=pd.Series(np.cumsum(equity), index=times, name="equity"),
+            intrabar=dict(self.resolver.stats) if self.resolver else {},
+        )
+
+
+def main(argv=None) -> int:
+    from api.delta_client import DeltaAPIClient
+
+    parser = argparse.ArgumentParser(description="Backtest the configured live strategy on cached candles.")
+    parser.add_argument("--symbol", default=config.SYMBOL)
+    parser.add_argument("--resolution", default=config.RESOLUTION)
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--sub-resolution", default=config.BACKTEST_INTRABAR_RESOLUTION,
+                        help="candles used to settle bars that touch both SL and TP")
+    parser.add_argument("--no-intrabar", action="store_true", help="assume the SL on ambiguous bars")
+    parser.add_argument("--trail-pct", type=float, default=0.0, help="trail the SL this fraction behind new closing extremes")
+    parser.add_argument("--cache-dir", default=config.CANDLE_CACHE_DIR)
+    parser.add_argument("--offline", action="store_true", help="only use candles already in the cache")
+    args = parser.parse_args(argv)
+
+    client = None if args.offline else DeltaAPIClient(config.API_KEY or "", config.API_SECRET or "", config.BASE_URL)
+    cache = CandleCache(args.cache_dir, client)
+    df = cache.load(args.symbol, args.resolution, args.start, args.end)
+    if df.empty:
+        print(f"❌ No {args.resolution} candles for {args.symbol} between {args.start} and {args.end}.")
+        return 1
+    resolver = None if args.no_intrabar else IntrabarResolver(cache, args.symbol, args.resolution, args.sub_resolution)
+    strategy = build_strategy(config.LIVE_STRATEGY)
+    result = Backtester(strategy, resolver=resolver, trail_pct=args.trail_pct).run(df, args.symbol)
+    print(f"🧪 {strategy.name} on {args.symbol} {args.resolution}: {len(df)} bars, {df.index[0]} → {df.index[-1]}")
+    print_report(result.metrics())
+    if resolver:
+        s = resolver.stats
+        print(f"🔬 Ambiguous SL/TP bars: {s['ambiguous']} (TP first {s['resolved_tp']}, SL first {s['resolved_sl']}, "
+              f"undecided {s['unresolved']}, no {args.sub_resolution} data {s['no_data']} -> SL)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,232 @@
+# your_trading_bot/backtest/monte_carlo.py
+"""
+Monte Carlo robustness check of a trade sequence, for sizing LOT_SIZE_BTC.
+
+    cd new && python -m backtest.monte_carlo                      # live trade_log.csv
+    cd new && python -m backtest.monte_carlo --start 2024-01-01 --end 2025-01-01   # backtest
+
+Every path redraws the realised trades (bootstrap with replacement, or a reshuffle of
+the same trades) and charges its own fee multiplier and extra slippage, so one backtest
+becomes a distribution of max drawdown and terminal equity. Each trade is split into the
+part that scales with size (gross PnL, slippage on notional) and the fixed fees, which
+lets every candidate lot size reuse the same draws. Paths are simulated as a
+paths x trades matrix, a chunk of rows at a time, and only per-path summaries are kept.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config
+from utils.trade_analytics import TradeArrays
+
+METHODS = ("bootstrap", "shuffle")
+
+
+@dataclass
+class TradeSample:
+    gross: np.ndarray       # PnL before fees at `quantity`
+    fees: np.ndarray        # round-trip fees, independent of size
+    notional: np.ndarray    # entry price * quantity (0 where the entry price is unknown)
+    quantity: float
+
+    def __len__(self):
+        return len(self.gross)
+
+    @classmethod
+    def from_arrays(cls, t: TradeArrays, quantity: float = config.LOT_SIZE_BTC) -> "TradeSample":
+        """From ledger/backtest arrays traded at `quantity` (the ledger does not record sizes)."""
+        price = np.nan_to_num(t.entry_price, nan=0.0)
+        return cls(gross=t.pnl.copy(), fees=t.pnl - t.net_pnl, notional=price * quantity, quantity=quantity)
+
+
+@dataclass
+class MonteCarloResult:
+    sizes: np.ndarray             # lot sizes simulated
+    max_drawdown: np.ndarray      # (sizes, paths) peak-to-trough of net equity, in account currency
+    terminal: np.ndarray          # (sizes, paths) net PnL at the end of the path
+    min_equity: np.ndarray        # (sizes, paths) lowest account equity along the path
+    initial_equity: float
+    n_trades: int
+    method: str
+
+    def summary(self, confidence: float = config.MONTE_CARLO_CONFIDENCE,
+                max_drawdown_pct: float = config.MONTE_CARLO_MAX_DRAWDOWN_PCT) -> pd.DataFrame:
+        """One row per lot size: terminal PnL and drawdown quantiles, loss / ruin / budget-breach odds."""
+        lo, hi = (1 - confidence) / 2, 1 - (1 - confidence) / 2
+        budget = max_drawdown_pct * self.initial_equity
+        t = np.quantile(self.terminal, [lo, 0.5, hi], axis=1)
+        dd = np.quantile(self.max_drawdown, [0.5, confidence], axis=1)
+        return pd.DataFrame({
+            "lot_size": self.sizes,
+            f"pnl_p{lo * 100:g}": t[0],
+            "pnl_p50": t[1],
+            f"pnl_p{hi * 100:g}": t[2],
+            "dd_p50": dd[0],
+            f"dd_p{confidence * 100:g}": dd[1],
+            "p_loss": (self.terminal < 0).mean(axis=1),
+            "p_dd_over_budget": (self.max_drawdown > budget).mean(axis=1),
+            "p_ruin": (self.min_equity <= 0).mean(axis=1),
+        })
+
+    def suggest_size(self, confidence: float = config.MONTE_CARLO_CONFIDENCE,
+                     max_drawdown_pct: float = config.MONTE_CARLO_MAX_DRAWDOWN_PCT) -> Optional[float]:
+        """Largest simulated lot size whose `confidence` drawdown quantile stays within the budget."""
+        dd = np.quantile(self.max_drawdown, confidence, axis=1)
+        ok = np.flatnonzero(dd <= max_drawdown_pct * self.initial_equity)
+        return float(self.sizes[ok[-1]]) if len(ok) else None
+
+
+def lot_sizes(max_lots: int = None, lot: float = config.DELTA_EXCHANGE_BTC_LOT_SIZE) -> np.ndarray:
+    """Candidate sizes: 1..max_lots exchange lots."""
+    return np.round(np.arange(1, (max_lots or config.MONTE_CARLO_MAX_LOTS) + 1) * lot, 8)
+
+
+def _path_stats(pnl: np.ndarray, initial_equity: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(max drawdown, terminal PnL, min equity) per row; overwrites `pnl` with the equity curve."""
+    equity = np.cumsum(pnl, axis=1, out=pnl)
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peak, 0.0, out=peak)                      # the starting equity is a peak too
+    np.subtract(peak, equity, out=peak)
+    return peak.max(axis=1), equity[:, -1].copy(), initial_equity + np.minimum(equity.min(axis=1), 0.0)
+
+
+def simulate(sample: TradeSample, sizes: Sequence[float] = None, n_paths: int = None, method: str = "bootstrap",
+             n_trades: int = None, fee_mult: Tuple[float, float] = None, slippage_pct: Tuple[float, float] = None,
+             initial_equity: float = None, seed: Optional[int] = None, max_bytes: int = None) -> MonteCarloResult:
+    """
+    Simulates `n_paths` trade sequences of `n_trades` trades (default: as many as the sample)
+    for every lot size in `sizes`. Per path, fees are scaled by a factor drawn from
+    `fee_mult` and every trade pays an extra slippage drawn from `slippage_pct` per side,
+    on entry and exit notional. `max_bytes` bounds the working set of one chunk.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    if not len(sample):
+        raise ValueError("no trades to simulate")
+    sizes = np.atleast_1d(np.asarray(sizes if sizes is not None else [sample.quantity], float))
+    n_paths = n_paths or config.MONTE_CARLO_PATHS
+    n_trades = n_trades or len(sample)
+    if method == "shuffle" and n_trades != len(sample):
+        raise ValueError("shuffle reorders the sample, so n_trades must equal the number of trades")
+    fee_lo, fee_hi = fee_mult or config.MONTE_CARLO_FEE_MULT
+    slip_lo, slip_hi = slippage_pct or config.MONTE_CARLO_SLIPPAGE_PCT
+    initial_equity = config.MONTE_CARLO_INITIAL_EQUITY if initial_equity is None else initial_equity
+    # idx (int64), scaled and fixed parts, plus one scratch matrix for the size being evaluated
+    row_bytes = n_trades * 8 * 4
+    chunk = max(1, min(n_paths, (max_bytes or config.MONTE_CARLO_CHUNK_BYTES) // row_bytes))
+
+    rng = np.random.default_rng(seed)
+    scale = sizes / sample.quantity
+    out = {k: np.empty((len(sizes), n_paths)) for k in ("max_drawdown", "terminal", "min_equity")}
+    order = np.arange(n_trades)
+    for start in range(0, n_paths, chunk):
+        p = min(chunk, n_paths - start)
+        if method == "bootstrap":
+            idx = rng.integers(0, len(sample), size=(p, n_trades))
+        else:
+            idx = rng.permuted(np.broadcast_to(order, (p, n_trades)), axis=1)
+        fee_f = rng.uniform(fee_lo, fee_hi, size=(p, 1))
+        slip = rng.uniform(slip_lo, slip_hi, size=(p, n_trades))
+        # Size-proportional part: gross PnL minus entry+exit slippage on notional
+        variable = sample.gross[idx]
+        variable -= 2 * slip * sample.notional[idx]
+        fixed = sample.fees[idx]
+        fixed *= fee_f
+        del idx, slip
+        scratch = np.empty_like(variable)
+        for k, s in enumerate(scale):
+            np.multiply(variable, s, out=scratch)
+            scratch -= fixed
+            dd, term, low = _path_stats(scratch, initial_equity)
+            out["max_drawdown"][k, start:start + p] = dd
+            out["terminal"][k, start:start + p] = term
+            out["min_equity"][k, start:start + p] = low
+    return MonteCarloResult(sizes=sizes, initial_equity=initial_equity, n_trades=n_trades, method=method, **out)
+
+
+def print_monte_carlo(result: MonteCarloResult, confidence: float = config.MONTE_CARLO_CONFIDENCE,
+                      max_drawdown_pct: float = config.MONTE_CARLO_MAX_DRAWDOWN_PCT) -> None:
+    budget = max_drawdown_pct * result.initial_equity
+    print(f"🎲 {result.max_drawdown.shape[1]:,} {result.method} paths x {result.n_trades} trades, "
+          f"equity {result.initial_equity:,.2f}, drawdown budget {budget:,.2f} ({max_drawdown_pct:.0%})")
+    with pd.option_context("display.width", 200, "display.float_format", "{:,.4f}".format):
+        print(result.summary(confidence, max_drawdown_pct).to_string(index=False))
+    size = result.suggest_size(confidence, max_drawdown_pct)
+    if size is None:
+        print(f"⚠️ Even {result.sizes[0]:g} BTC breaches the drawdown budget at {confidence:.0%} confidence.")
+    else:
+        print(f"📏 Suggested LOT_SIZE_BTC: {size:g} (p{confidence * 100:g} max drawdown within budget; "
+              f"configured {config.LOT_SIZE_BTC:g})")
+
+
+def _backtest_trades(args) -> TradeArrays:
+    from api.delta_client import DeltaAPIClient
+    from backtest.candle_cache import CandleCache
+    from backtest.engine import Backtester, IntrabarResolver
+    from strategy.base import build_strategy
+
+    client = None if args.offline else DeltaAPIClient(config.API_KEY or "", config.API_SECRET or "", config.BASE_URL)
+    cache = CandleCache(args.cache_dir, client)
+    df = cache.load(args.symbol, args.resolution, args.start, args.end)
+    if df.empty:
+        return TradeArrays()
+    resolver = None if args.no_intrabar else IntrabarResolver(cache, args.symbol, args.resolution)
+    backtester = Backtester(build_strategy(config.LIVE_STRATEGY), quantity=args.quantity, resolver=resolver)
+    return backtester.run(df, args.symbol).trade_arrays()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Monte Carlo drawdown / terminal equity distribution of a trade ledger.")
+    parser.add_argument("--ledger", help="trade_log.csv (and its daily rotations); default: the bot's ledger")
+    parser.add_argument("--start", help="backtest the live strategy from here instead of reading a ledger")
+    parser.add_argument("--end")
+    parser.add_argument("--symbol", default=config.SYMBOL)
+    parser.add_argument("--resolution", default=config.RESOLUTION)
+    parser.add_argument("--cache-dir", default=config.CANDLE_CACHE_DIR)
+    parser.add_argument("--offline", action="store_true", help="only use candles already in the cache")
+    parser.add_argument("--no-intrabar", action="store_true", help="assume the SL on ambiguous bars")
+    parser.add_argument("--quantity", type=float, default=config.LOT_SIZE_BTC, help="size the trades were taken at")
+    parser.add_argument("--paths", type=int, default=config.MONTE_CARLO_PATHS)
+    parser.add_argument("--method", choices=METHODS, default="bootstrap")
+    parser.add_argument("--trades", type=int, help="trades per path (bootstrap only; default: as many as the sample)")
+    parser.add_argument("--equity", type=float, default=config.MONTE_CARLO_INITIAL_EQUITY, help="account equity")
+    parser.add_argument("--max-drawdown-pct", type=float, default=config.MONTE_CARLO_MAX_DRAWDOWN_PCT)
+    parser.add_argument("--confidence", type=float, default=config.MONTE_CARLO_CONFIDENCE)
+    parser.add_argument("--max-lots", type=int, default=config.MONTE_CARLO_MAX_LOTS)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    if args.start:
+        if not args.end:
+            parser.error("--start needs --end")
+        trades = _backtest_trades(args)
+        source = f"backtest {args.symbol} {args.resolution} {args.start} → {args.end}"
+    else:
+        from utils.trade_analytics import TradeLedgerReader
+        from utils.trade_logger import TRADE_LOG_FILE
+
+        reader = TradeLedgerReader(args.ledger or TRADE_LOG_FILE)
+        reader.refresh()
+        trades = reader.arrays
+        source = reader.path
+    if not len(trades):
+        print(f"❌ No trades in {source}.")
+        return 1
+    sample = TradeSample.from_arrays(trades, args.quantity)
+    if not sample.notional.any():
+        print("⚠️ No entry prices in the trades; slippage perturbation disabled.")
+    print(f"📂 {len(sample)} trades from {source} at {args.quantity:g} BTC, net {trades.net_pnl.sum():.2f}")
+    result = simulate(sample, lot_sizes(args.max_lots), args.paths, args.method, args.trades,
+                      initial_equity=args.equity, seed=args.seed)
+    print_monte_carlo(result, args.confidence, args.max_drawdown_pct)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
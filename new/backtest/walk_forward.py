@@ -0,0 +1,282 @@
+# your_trading_bot/backtest/walk_forward.py
+"""
+Walk-forward parameter selection for EmaRsiStrategy.
+
+    cd new && python -m backtest.walk_forward --symbol BTCUSD --start 2022-01-01 --end 2025-01-01
+
+History is split into rolling (optimize, test) windows: every parameter set in
+WALK_FORWARD_GRID is backtested on the optimize window, the best one by
+WALK_FORWARD_OBJECTIVE trades the following test window, and the test (out-of-sample)
+segments are stitched into one equity curve. A test window whose optimize window had no
+qualifying parameter set (every score -inf) stays flat and reports no winner. Each distinct indicator series is computed
+once over the whole history and shared with the worker processes through shared memory,
+so overlapping windows and parameter sets never recompute an EMA/RSI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config
+from backtest.candle_cache import CandleCache
+from backtest.engine import Backtester, BacktestResult, IntrabarResolver, signal_array
+from strategy.ema_rsi_strategy import EmaRsiStrategy
+from strategy.shadow import expand_grid
+from utils.indicators import compute_indicator
+from utils.trade_analytics import print_report
+
+_DAY_US = 86_400_000_000
+_WORKER: Dict = {}      # per-process state set by _init_worker
+
+
+def score(net: np.ndarray, objective: str, min_trades: int) -> float:
+    """Objective on per-trade net PnL; parameter sets with fewer than `min_trades` trades never win."""
+    n = len(net)
+    if n < max(min_trades, 2):
+        return -np.inf
+    if objective == "net_pnl":
+        return float(net.sum())
+    if objective == "profit_factor":
+        loss = -net[net < 0].sum()
+        return float(net[net > 0].sum() / loss) if loss > 0 else np.inf
+    if objective == "sharpe":
+        std = net.std(ddof=1)
+        return float(net.mean() / std * np.sqrt(n)) if std > 0 else -np.inf
+    raise ValueError(f"Unknown walk-forward objective: {objective}")
+
+
+def pick_winner(scores: np.ndarray) -> Optional[int]:
+    """
+    Index of the best score, or None when no variant qualified (every score -inf).
+    +inf is a real score (profit factor without a losing trade) and wins.
+    """
+    if not (scores > -np.inf).any():
+        return None
+    return int(np.argmax(scores))
+
+
+def rolling_windows(time_us: np.ndarray, optimize_days: float, test_days: float) -> List[Tuple[int, int, int]]:
+    """(optimize_start, test_start, test_end) bar indices; test windows tile the history after the first optimize span."""
+    windows = []
+    first = int(time_us[0])
+    test_start_us = first + int(optimize_days * _DAY_US)
+    while True:
+        test_end_us = test_start_us + int(test_days * _DAY_US)
+        lo, mid, hi = np.searchsorted(time_us, [test_start_us - int(optimize_days * _DAY_US), test_start_us, test_end_us])
+        if mid >= len(time_us):
+            break
+        windows.append((int(lo), int(mid), int(hi)))
+        test_start_us = test_end_us
+    return windows
+
+
+class IndicatorMatrix:
+    """
+    OHLC plus one row per distinct IndicatorSpec, computed once over the full history and
+    placed in a shared-memory float64 matrix that worker processes map without copying.
+    (Bar times ride along as float64: exact for microsecond timestamps below 2**53.)
+    """
+
+    BASE_ROWS = ("time_us", "high", "low", "close")
+
+    def __init__(self, df: pd.DataFrame, specs):
+        self.specs = sorted(set(specs), key=lambda s: (s.kind, s.period))
+        self.rows = {name: i for i, name in enumerate(self.BASE_ROWS)}
+        self.rows.update({spec: len(self.BASE_ROWS) + i for i, spec in enumerate(self.specs)})
+        shape = (len(self.rows), len(df))
+        self.shm = shared_memory.SharedMemory(create=True, size=max(8, int(np.prod(shape)) * 8))
+        self.matrix = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+        self.matrix[0] = df.index.as_unit("us").asi8
+        self.matrix[1] = df["High"].to_numpy(dtype=float)
+        self.matrix[2] = df["Low"].to_numpy(dtype=float)
+        self.matrix[3] = df["Close"].to_numpy(dtype=float)
+        for spec in self.specs:
+            self.matrix[self.rows[spec]] = compute_indicator(df, spec)
+
+    @property
+    def layout(self) -> Tuple[str, Tuple[int, int], Dict]:
+        return self.shm.name, self.matrix.shape, self.rows
+
+    def close(self) -> None:
+        del self.matrix
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(layout):
+    name, shape, rows = layout
+    shm = shared_memory.SharedMemory(name=name, create=False)
+    return shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf), rows
+
+
+def _variant_signals(strategy, matrix, rows, lo, hi, symbol=""):
+    values = {role: matrix[rows[spec], lo:hi] for role, spec in strategy.indicators().items()}
+    return signal_array(strategy, matrix[rows["close"], lo:hi], values, symbol)
+
+
+def _make_resolver(intrabar, symbol):
+    if not intrabar:
+        return None
+    cache_dir, bar_resolution, sub_resolution = intrabar
+    return IntrabarResolver(CandleCache(cache_dir), symbol, bar_resolution, sub_resolution)
+
+
+def _init_worker(layout, variants, symbol, objective, min_trades, intrabar):
+    shm, matrix, rows = _attach(layout)
+    _WORKER.update(shm=shm, matrix=matrix, rows=rows, variants=variants, symbol=symbol,
+                   objective=objective, min_trades=min_trades, resolver=_make_resolver(intrabar, symbol))
+
+
+def _evaluate(lo: int, hi: int, variant_ids: List[int]) -> List[Tuple[int, float, float, int]]:
+    """In a worker: (variant id, objective, net PnL, trades) for each variant on bars [lo, hi)."""
+    w = _WORKER
+    matrix, rows = w["matrix"], w["rows"]
+    times = pd.to_datetime(matrix[0, lo:hi].astype(np.int64), unit="us", utc=True)
+    high, low, close = matrix[1, lo:hi], matrix[2, lo:hi], matrix[3, lo:hi]
+    out = []
+    for vid in variant_ids:
+        strategy = w["variants"][vid]
+        signal = _variant_signals(strategy, matrix, rows, lo, hi, w["symbol"])
+        result = Backtester(strategy, resolver=w["resolver"]).simulate(times, high, low, close, signal, w["symbol"])
+        net = result.trades["net_pnl"].to_numpy()
+        out.append((vid, score(net, w["objective"], w["min_trades"]), float(net.sum()), len(net)))
+    return out
+
+
+def walk_forward(df: pd.DataFrame, symbol: str, variants: Optional[List[EmaRsiStrategy]] = None,
+                 optimize_days: float = None, test_days: float = None, objective: str = None,
+                 min_trades: int = None, workers: int = None, intrabar: Optional[Tuple[str, str, str]] = None):
+    """
+    Returns (windows DataFrame, stitched out-of-sample BacktestResult).
+    `intrabar` = (cache_dir, bar_resolution, sub_resolution) settles ambiguous SL/TP bars
+    from sub-bars already in that cache (workers run offline).
+    """
+    variants = variants or expand_grid(config.WALK_FORWARD_GRID)
+    optimize_days = optimize_days or config.WALK_FORWARD_OPTIMIZE_DAYS
+    test_days = test_days or config.WALK_FORWARD_TEST_DAYS
+    objective = objective or config.WALK_FORWARD_OBJECTIVE
+    min_trades = config.WALK_FORWARD_MIN_TRADES if min_trades is None else min_trades
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+
+    mat = IndicatorMatrix(df, [spec for v in variants for spec in v.indicators().values()])
+    time_us = mat.matrix[0].astype(np.int64)
+    windows = rolling_windows(time_us, optimize_days, test_days)
+    if not windows:
+        mat.close()
+        raise ValueError(f"History shorter than one optimize window ({optimize_days} days) plus a test bar")
+
+    # Every (window, chunk of variants) is one task, so all windows share the pool
+    n_chunks = max(1, min(len(variants), workers * 2))
+    chunks = [list(c) for c in np.array_split(np.arange(len(variants)), n_chunks) if len(c)]
+    scores = [np.full(len(variants), -np.inf) for _ in windows]
+    nets = [np.zeros(len(variants)) for _ in windows]
+    trades = [np.zeros(len(variants), np.int64) for _ in windows]
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"), initializer=_init_worker,
+                                 initargs=(mat.layout, variants, symbol, objective, min_trades, intrabar)) as pool:
+            futures = {pool.submit(_evaluate, lo, mid, chunk): w
+                       for w, (lo, mid, _) in enumerate(windows) for chunk in chunks}
+            for future, w in futures.items():
+                for vid, s, net, n in future.result():
+                    scores[w][vid], nets[w][vid], trades[w][vid] = s, net, n
+
+        # Out-of-sample: each window's winner trades its test span, flat at both edges
+        resolver = _make_resolver(intrabar, symbol)
+        rows, segments, seg_equity, offset = [], [], [], 0.0
+        for w, (lo, mid, hi) in enumerate(windows):
+            best = pick_winner(scores[w])
+            if best is not None:
+                strategy = variants[best]
+                signal = _variant_signals(strategy, mat.matrix, mat.rows, mid, hi, symbol)
+                is_score, is_net, is_trades = scores[w][best], nets[w][best], int(trades[w][best])
+            else:
+                # No variant qualified in-sample (e.g. all under min_trades): stay flat, no winner
+                strategy = variants[0]
+                signal = np.zeros(hi - mid, dtype=np.int8)
+                is_score, is_net, is_trades = np.nan, np.nan, 0
+            res = Backtester(strategy, resolver=resolver).simulate(
+                df.index[mid:hi], mat.matrix[1, mid:hi], mat.matrix[2, mid:hi], mat.matrix[3, mid:hi],
+                signal, symbol, close_at_end=True)
+            name = strategy.name if best is not None else None
+            segments.append(res.trades.assign(variant=name))
+            seg_equity.append(res.equity + offset)
+            offset += float(res.equity.iloc[-1]) if len(res.equity) else 0.0
+            rows.append({
+                "optimize_start": df.index[lo], "test_start": df.index[mid], "test_end": df.index[hi - 1],
+                "variant": name, "is_score": is_score, "is_net_pnl": is_net,
+                "is_trades": is_trades, "oos_net_pnl": float(res.trades["net_pnl"].sum()),
+                "oos_trades": len(res.trades),
+            })
+    finally:
+        mat.close()
+
+    stitched = BacktestResult(
+        symbol=symbol,
+        strategy="walk_forward",
+        trades=pd.concat(segments, ignore_index=True),
+        equity=pd.concat(seg_equity),
+        intrabar=dict(resolver.stats) if resolver else {},
+    )
+    return pd.DataFrame(rows), stitched
+
+
+def main(argv=None) -> int:
+    from api.delta_client import DeltaAPIClient
+
+    parser = argparse.ArgumentParser(description="Walk-forward selection of EmaRsiStrategy parameters.")
+    parser.add_argument("--symbol", default=config.SYMBOL)
+    parser.add_argument("--resolution", default=config.RESOLUTION)
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--optimize-days", type=float, default=config.WALK_FORWARD_OPTIMIZE_DAYS)
+    parser.add_argument("--test-days", type=float, default=config.WALK_FORWARD_TEST_DAYS)
+    parser.add_argument("--objective", default=config.WALK_FORWARD_OBJECTIVE, choices=("sharpe", "net_pnl", "profit_factor"))
+    parser.add_argument("--min-trades", type=int, default=config.WALK_FORWARD_MIN_TRADES)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--intrabar", action="store_true",
+                        help=f"prefetch {config.BACKTEST_INTRABAR_RESOLUTION} candles and settle ambiguous SL/TP bars with them")
+    parser.add_argument("--cache-dir", default=config.CANDLE_CACHE_DIR)
+    parser.add_argument("--offline", action="store_true", help="only use candles already in the cache")
+    parser.add_argument("--out", help="directory for windows.csv, oos_trades.csv and oos_equity.csv")
+    args = parser.parse_args(argv)
+
+    client = None if args.offline else DeltaAPIClient(config.API_KEY or "", config.API_SECRET or "", config.BASE_URL)
+    cache = CandleCache(args.cache_dir, client)
+    df = cache.load(args.symbol, args.resolution, args.start, args.end)
+    if df.empty:
+        print(f"❌ No {args.resolution} candles for {args.symbol} between {args.start} and {args.end}.")
+        return 1
+    intrabar = None
+    if args.intrabar:
+        # Workers read the cache offline, so every sub-bar month is fetched here first
+        cache.arrays(args.symbol, config.BACKTEST_INTRABAR_RESOLUTION, args.start, args.end)
+        intrabar = (args.cache_dir, args.resolution, config.BACKTEST_INTRABAR_RESOLUTION)
+
+    variants = expand_grid(config.WALK_FORWARD_GRID)
+    print(f"🚶 Walk-forward on {args.symbol} {args.resolution}: {len(df)} bars, {len(variants)} parameter sets, "
+          f"{args.optimize_days:g}d optimize / {args.test_days:g}d test, objective {args.objective}")
+    windows, oos = walk_forward(df, args.symbol, variants, args.optimize_days, args.test_days, args.objective,
+                                args.min_trades, args.workers, intrabar)
+    with pd.option_context("display.width", 200, "display.max_colwidth", 60):
+        print(windows.to_string(index=False))
+    print("--- stitched out-of-sample ---")
+    print_report(oos.metrics())
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        windows.to_csv(os.path.join(args.out, "windows.csv"), index=False)
+        oos.trades.to_csv(os.path.join(args.out, "oos_trades.csv"), index=False)
+        oos.equity.to_csv(os.path.join(args.out, "oos_equity.csv"))
+        print(f"💾 Results in {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+# your_trading_bot/bench/bench_analytics.py
+"""
+Trade analytics over a large synthetic ledger: metric computation, and incremental CSV refresh.
+
+    cd new && python -m bench.bench_analytics
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.ledger_writer import TRADE_LOG_COLUMNS
+from utils.trade_analytics import TradeArrays, TradeLedgerReader, compute_metrics
+
+REASONS = np.array(["Take Profit", "Stop Loss", "Trailing SL", "EMA Cross"])
+
+
+def synthetic(n, seed=3):
+    rng = np.random.default_rng(seed)
+    exit_ns = np.datetime64("2020-01-01", "ns").astype(np.int64) + np.cumsum(rng.integers(60, 3600, n)) * 1_000_000_000
+    net = rng.normal(0.05, 1.0, n)
+    return exit_ns, net, REASONS[rng.integers(0, len(REASONS), n)]
+
+
+def bench_compute(n=1_000_000):
+    exit_ns, net, reasons = synthetic(n)
+    t = TradeArrays()
+    t0 = time.perf_counter()
+    t.append_arrays(exit_ns, net, reason=reasons)
+    t1 = time.perf_counter()
+    compute_metrics(t)
+    t2 = time.perf_counter()
+    return {"trades": n, "load_arrays_ms": (t1 - t0) * 1e3, "compute_metrics_ms": (t2 - t1) * 1e3}
+
+
+def bench_refresh(n=100_000, appended=1_000):
+    exit_ns, net, reasons = synthetic(n + appended)
+    df = pd.DataFrame({c: "" for c in TRADE_LOG_COLUMNS}, index=range(n + appended))
+    df["Exit Time"] = pd.to_datetime(exit_ns, utc=True)
+    df["Entry Time"] = df["Exit Time"]
+    df["Type"], df["Reason"], df["PnL"], df["Net PnL"] = "Long", reasons, net, net
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "trade_log.csv")
+        df.iloc[:n].to_csv(path, index=False)
+        reader = TradeLedgerReader(path)
+        t0 = time.perf_counter()
+        reader.refresh()
+        t1 = time.perf_counter()
+        df.iloc[n:].to_csv(path, mode="a", header=False, index=False)
+        t2 = time.perf_counter()
+        added = reader.refresh()
+        t3 = time.perf_counter()
+    return {"initial_rows": n, "initial_load_ms": (t1 - t0) * 1e3,
+            "appended_rows": added, "refresh_ms": (t3 - t2) * 1e3}
+
+
+if __name__ == "__main__":
+    print("--- metrics over 1M trades ---")
+    for k, v in bench_compute().items():
+        print(f"{k}: {v:,.1f}")
+    print("--- incremental CSV refresh ---")
+    for k, v in bench_refresh().items():
+        print(f"{k}: {v:,.1f}")
@@ -0,0 +1,104 @@
+# your_trading_bot/bench/bench_kernels.py
+"""
+Indicator and backtest recurrences: pandas/ta vs. the utils.kernels NumPy and compiled paths.
+
+    cd new && python -m bench.bench_kernels
+    cd new && USE_NUMBA=0 python -m bench.bench_kernels      # NumPy / interpreted only
+
+The compiled column needs numba; its first call (compile or cache load) is timed separately.
+"""
+
+import time
+
+import numpy as np
+
+import config
+from bench.fixtures import year_of_candles
+from utils import kernels
+from utils.indicators import IndicatorSpec, IncrementalIndicators, compute_indicator, indicator_pandas
+
+SPECS = (IndicatorSpec("ema", config.EMA_PERIOD), IndicatorSpec("rsi", config.RSI_PERIOD),
+         IndicatorSpec("atr", config.ATR_PERIOD))
+
+
+def _best_us(fn, rounds=7):
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e6
+
+
+def _with_numba(enabled, fn):
+    saved = kernels.NUMBA
+    kernels.NUMBA = enabled
+    try:
+        return fn()
+    finally:
+        kernels.NUMBA = saved
+
+
+def _position_args(df):
+    close = df["Close"].to_numpy()
+    rng = np.random.default_rng(3)
+    signal = np.where(rng.random(len(close)) < 0.05, rng.choice([-1, 1], len(close)), 0).astype(np.int8)
+    sl = close * (1 - signal * config.stoploss_pct)
+    tp = close * (1 + signal * config.target_pct)
+    return df["High"].to_numpy(), df["Low"].to_numpy(), close, signal, sl, tp
+
+
+def run():
+    compiled = kernels.NUMBA
+    rows = []
+    warmup = None
+    if compiled:
+        small = year_of_candles(days=1)
+        t0 = time.perf_counter()
+        for spec in SPECS:
+            compute_indicator(small, spec)
+        kernels.position_loop(*_position_args(small), 0.002)
+        warmup = time.perf_counter() - t0
+
+    for label, df in (("300 bars", year_of_candles(days=4).iloc[-300:]), ("1y 15m", year_of_candles())):
+        for spec in SPECS:
+            row = {"case": f"{spec.label} {label}",
+                   "pandas/ta": _best_us(lambda: indicator_pandas(df, spec)),
+                   "numpy": _with_numba(False, lambda: _best_us(lambda: compute_indicator(df, spec)))}
+            if compiled:
+                row["compiled"] = _best_us(lambda: compute_indicator(df, spec))
+            rows.append(row)
+        closes = df["Close"].to_numpy()
+        per_bar = IncrementalIndicators([15, 20, 25, 35, 50], [config.RSI_PERIOD])
+
+        def seed_per_bar():
+            ind = IncrementalIndicators(per_bar.ema_periods, per_bar.rsi_periods)
+            for c in closes:
+                ind.update(float(c))
+
+        row = {"case": f"IncrementalIndicators.seed {label}", "pandas/ta": np.nan,
+               "per-bar update": _best_us(seed_per_bar, 3),
+               "numpy": _with_numba(False, lambda: _best_us(
+                   lambda: IncrementalIndicators(per_bar.ema_periods, per_bar.rsi_periods).seed(closes)))}
+        if compiled:
+            row["compiled"] = _best_us(lambda: IncrementalIndicators(per_bar.ema_periods, per_bar.rsi_periods).seed(closes))
+        rows.append(row)
+        args = _position_args(df)
+        row = {"case": f"position loop {label}", "pandas/ta": np.nan,
+               "numpy": _with_numba(False, lambda: _best_us(lambda: kernels.position_loop(*args, 0.002)))}
+        if compiled:
+            row["compiled"] = _best_us(lambda: kernels.position_loop(*args, 0.002))
+        rows.append(row)
+    return rows, warmup
+
+
+if __name__ == "__main__":
+    rows, warmup = run()
+    columns = ["pandas/ta", "per-bar update", "numpy", "compiled"]
+    print(f"--- indicator / backtest kernels, best of 7, µs (numba {'on' if kernels.NUMBA else 'off'}) ---")
+    print(f"{'case':<38}" + "".join(f"{c:>16}" for c in columns))
+    for row in rows:
+        cells = "".join(f"{row[c]:16.1f}" if c in row and not np.isnan(row[c]) else f"{'-':>16}" for c in columns)
+        print(f"{row['case']:<38}{cells}")
+    if warmup is not None:
+        print(f"First compiled call (compile or load from the numba cache): {warmup * 1e3:.1f} ms")
@@ -0,0 +1,56 @@
+# your_trading_bot/bench/bench_ledger.py
+"""
+Trade ledger throughput: per-record pandas to_csv (the old trade_log) vs. LedgerWriter.
+
+    cd new && python -m bench.bench_ledger
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from utils.ledger_writer import LedgerWriter, TRADE_LOG_COLUMNS
+
+
+def _record(i):
+    now = datetime.now(timezone.utc)
+    return {
+        'Entry Time': now, 'Exit Time': now, 'Type': 'Long' if i % 2 else 'Short', 'Reason': 'Take Profit',
+        'Entry Price': 100000.0 + i, 'Exit Price': 100500.0 + i, 'PnL': 2.5, 'Net PnL': 2.3,
+        'Session': 'Europe', 'Initial SL Price': 99800.0, 'Initial TP Price': 100500.0,
+    }
+
+
+def pandas_append(path, n):
+    records = [_record(i) for i in range(n)]
+    t0 = time.perf_counter()
+    for rec in records:
+        pd.DataFrame([rec]).to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+    elapsed = time.perf_counter() - t0
+    return {"records_per_s": n / elapsed, "caller_us_per_record": elapsed / n * 1e6}
+
+
+def ledger_writer(path, n, fsync):
+    records = [_record(i) for i in range(n)]
+    writer = LedgerWriter(path, TRADE_LOG_COLUMNS, fsync=fsync, rotate_daily=False)
+    t0 = time.perf_counter()
+    for rec in records:
+        writer.log(rec)
+    enqueued = time.perf_counter() - t0
+    writer.flush(timeout=60)
+    elapsed = time.perf_counter() - t0
+    writer.close()
+    return {"records_per_s": n / elapsed, "caller_us_per_record": enqueued / n * 1e6}
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as d:
+        results = {"pandas to_csv per record": pandas_append(os.path.join(d, "a.csv"), 2_000)}
+        for fsync in ("interval", "always"):
+            results[f"LedgerWriter fsync={fsync}"] = ledger_writer(os.path.join(d, f"b_{fsync}.csv"), 100_000, fsync)
+    print(f"{'':<28} {'records/s':>12} {'caller µs/record':>18}")
+    for name, r in results.items():
+        print(f"{name:<28} {r['records_per_s']:12,.0f} {r['caller_us_per_record']:18.2f}")
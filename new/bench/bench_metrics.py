@@ -0,0 +1,59 @@
+# your_trading_bot/bench/bench_metrics.py
+"""
+Per-span cost of the latency instrumentation (utils/metrics.py), against a bare clock read.
+
+    cd new && python -m bench.bench_metrics
+"""
+
+import time
+from time import perf_counter_ns
+
+from utils.metrics import MetricsRegistry, timed
+
+
+def per_call_ns(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e9
+
+
+def bench(n=1_000_000):
+    registry = MetricsRegistry()
+    hist = registry.histogram("bench", "bench span")
+    counter = registry.counter("bench", "bench counter")
+
+    def noop():
+        pass
+
+    def clock():
+        perf_counter_ns()
+
+    def since():
+        hist.since(perf_counter_ns())
+
+    def span():
+        with hist.time():
+            pass
+
+    def inc():
+        counter.inc()
+
+    decorated = timed("bench_timed")(noop)
+    baseline = per_call_ns(noop, n)
+    results = {
+        "perf_counter_ns()": per_call_ns(clock, n),
+        "counter.inc()": per_call_ns(inc, n),
+        "hist.since(t0) span": per_call_ns(since, n),
+        "with hist.time()": per_call_ns(span, n),
+        "@timed function": per_call_ns(decorated, n),
+    }
+    return baseline, results, hist
+
+
+if __name__ == "__main__":
+    baseline, results, hist = bench()
+    print(f"{'':<24} {'ns/call':>10} (minus {baseline:.0f} ns call overhead)")
+    for name, ns in results.items():
+        print(f"{name:<24} {ns - baseline:10.0f}")
+    print(f"recorded p50 {hist.percentile(0.5):.0f} ns, p99 {hist.percentile(0.99):.0f} ns over {hist.count:,} spans")
@@ -0,0 +1,67 @@
+# your_trading_bot/bench/bench_signals.py
+"""
+Per-evaluation cost of the entry/exit rules: DataFrame wrappers vs. array and scalar paths.
+
+    cd new && python -m bench.bench_signals
+"""
+
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from utils.indicators import calculate_indicators
+from strategy.simple_ema_rsi import (
+    check_entry_signal,
+    check_exit_signal,
+    entry_signal,
+    entry_signal_arrays,
+    exit_signal,
+    signal_arrays,
+)
+
+
+def _frame(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100000 + np.cumsum(rng.normal(0, 50, n))
+    idx = pd.date_range("2024-01-01", periods=n, freq="15min", tz="UTC")
+    df = pd.DataFrame({"Open": close, "High": close + 20, "Low": close - 20, "Close": close,
+                       "Volume": rng.uniform(1, 10, n)}, index=idx)
+    return calculate_indicators(df)
+
+
+def _per_call_ns(fn, n):
+    t0 = time.perf_counter_ns()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter_ns() - t0) / n
+
+
+def run(n=200_000):
+    df = _frame()
+    close, ema, rsi = signal_arrays(df)
+    c, pc, e, pe, r = close[-1].item(), close[-2].item(), ema[-1].item(), ema[-2].item(), rsi[-1].item()
+    flat = {"in_position": False}
+    long_state = {"in_position": True, "current_position_type": "long"}
+
+    # The wrappers print; keep that out of the measurement output
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = {
+            "check_entry_signal(df)": _per_call_ns(lambda: check_entry_signal(df, flat), n // 100),
+            "check_exit_signal(df)": _per_call_ns(lambda: check_exit_signal(df, long_state), n // 100),
+        }
+    results.update({
+        "entry_signal_arrays(views)": _per_call_ns(lambda: entry_signal_arrays(close, ema, rsi), n),
+        "entry_signal(floats)": _per_call_ns(lambda: entry_signal(c, pc, e, pe, r), n),
+        "exit_signal(floats)": _per_call_ns(lambda: exit_signal("long", c, e, r), n),
+    })
+    return results
+
+
+if __name__ == "__main__":
+    print(f"--- signal evaluation (EMA{config.EMA_PERIOD} + RSI), ns per call ---")
+    for name, ns in run().items():
+        print(f"{name:<28} {ns:10.1f}")
@@ -0,0 +1,115 @@
+# your_trading_bot/bench/bench_state_manager.py
+"""
+BotStateManager read/write cost, alone and under contention.
+
+    cd new && python -m bench.bench_state_manager
+"""
+
+import threading
+import time
+
+from utils.bot_state_manager import BotStateManager
+
+
+def _per_op_ns(fn, n):
+    t0 = time.perf_counter_ns()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter_ns() - t0) / n
+
+
+def single_thread(n=200_000):
+    m = BotStateManager()
+    m.mark_entry("long", 100000.0, 0.005, sl_price=99800.0, tp_price=100500.0)
+    return {
+        "get_state_ns": _per_op_ns(m.get_state, n // 10),
+        "snapshot_ns": _per_op_ns(m.snapshot, n),
+        "snapshot_field_ns": _per_op_ns(lambda: m.snapshot()["in_position"], n),
+        "set_trailing_stop_ns": _per_op_ns(lambda: m.set_trailing_stop(99900.0), n // 10),
+    }
+
+
+def contended(duration=2.0, readers=2, writers=2, read_fn="snapshot"):
+    """
+    Writers imitate the WS thread (position syncs, extrema updates), readers imitate
+    the strategy loop and the order router reading state per message.
+    """
+    m = BotStateManager()
+    m.mark_entry("long", 100000.0, 0.005)
+    stop = threading.Event()
+    reads = [0] * readers
+    writes = [0] * writers
+
+    def reader(i):
+        read = getattr(m, read_fn)
+        n = 0
+        while not stop.is_set():
+            for _ in range(100):
+                st = read()
+                st["in_position"]
+            n += 100
+        reads[i] = n
+
+    def writer(i):
+        n = 0
+        price = 100000.0
+        while not stop.is_set():
+            price += 1.0
+            m.sync_position_snapshot("long", 5, 100000.0, unrealised_pnl=price - 100000.0)
+            m.update_extrema_since_entry(price)
+            n += 2
+        writes[i] = n
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    return {
+        "reads_per_s": sum(reads) / duration,
+        "writes_per_s": sum(writes) / duration,
+        "final_version": m.version,
+    }
+
+
+def wait_latency(samples=2000):
+    """Time from a write to a waiting consumer observing it."""
+    m = BotStateManager()
+    seen = []
+    ready = threading.Event()
+
+    def consumer():
+        v = m.version
+        ready.set()
+        for _ in range(samples):
+            snap = m.wait_for_change(v, timeout=1.0)
+            seen.append(time.perf_counter_ns() - snap.realised_pnl)
+            v = snap.version
+
+    t = threading.Thread(target=consumer)
+    t.start()
+    ready.wait()
+    for _ in range(samples):
+        # Smuggle the publish time through realised_pnl
+        m.sync_position_snapshot(None, 0, 0.0, realised_pnl=time.perf_counter_ns())
+        time.sleep(0.0002)
+    t.join()
+    seen.sort()
+    return {"wake_p50_us": seen[len(seen) // 2] / 1e3, "wake_p99_us": seen[int(len(seen) * 0.99)] / 1e3}
+
+
+if __name__ == "__main__":
+    print("--- single thread ---")
+    for k, v in single_thread().items():
+        print(f"{k}: {v:.1f}")
+    for read_fn in ("get_state", "snapshot"):
+        print(f"--- 2 readers ({read_fn}) / 2 writers ---")
+        for k, v in contended(read_fn=read_fn).items():
+            print(f"{k}: {v:,.0f}")
+    print("--- wait_for_change wake-up ---")
+    for k, v in wait_latency().items():
+        print(f"{k}: {v:.1f}")
@@ -0,0 +1,122 @@
+# your_trading_bot/bench/fixtures.py
+"""
+Deterministic synthetic market data for the benchmarks: a year of candles (as a DataFrame
+and as the /v2/history/candles payload) and the raw WS frames the bot would receive for it.
+Recorded sessions (utils/session_recorder.py) can stand in for the synthetic streams.
+"""
+
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.helpers import get_resolution_seconds
+from utils.session_recorder import SessionRecorder, read_frames
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def year_of_candles(resolution: str = "15m", days: int = 365, seed: int = 11,
+                    start: str = "2024-01-01", price: float = 60000.0) -> pd.DataFrame:
+    """OHLCV on a geometric random walk, indexed by UTC candle start (35,040 bars at 15m)."""
+    step = get_resolution_seconds(resolution)
+    n = days * 86400 // step
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate(([price], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0015, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.uniform(5, 50, n).round(3)
+    index = pd.date_range(start, periods=n, freq=f"{step}s", tz="UTC")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+
+
+def history_payload(df: pd.DataFrame) -> Dict:
+    """The /v2/history/candles response for `df`: newest first, times in microseconds."""
+    times = df.index.as_unit("us").asi8
+    rows = [
+        {"time": int(t), "open": o, "high": h, "low": lo, "close": c, "volume": v}
+        for t, o, h, lo, c, v in zip(times[::-1], *(df[col].to_numpy()[::-1].tolist() for col in BAR_COLUMNS))
+    ]
+    return {"success": True, "result": rows}
+
+
+def candle_frames(df: pd.DataFrame, symbol: str = "BTCUSD", resolution: str = "15m",
+                  updates_per_bar: int = 4, seed: int = 5) -> List[str]:
+    """
+    Candlestick channel frames: `updates_per_bar` in-progress updates per bar, the last
+    one carrying the final OHLCV. A bar completes when the next one starts, as live.
+    """
+    rng = np.random.default_rng(seed)
+    channel = f"candlestick_{resolution}"
+    frames = []
+    starts = df.index.as_unit("us").asi8
+    o, h, lo, c, v = (df[col].to_numpy() for col in BAR_COLUMNS)
+    for i in range(len(df)):
+        for k in range(1, updates_per_bar + 1):
+            frac = k / updates_per_bar
+            close = c[i] if k == updates_per_bar else o[i] + (c[i] - o[i]) * frac + rng.normal(0, 1)
+            frames.append(json.dumps({
+                "type": channel, "symbol": symbol, "candle_start_time": int(starts[i]),
+                "open": o[i], "high": max(h[i] if k == updates_per_bar else close, o[i], close),
+                "low": min(lo[i] if k == updates_per_bar else close, o[i], close),
+                "close": close, "volume": round(v[i] * frac, 3), "resolution": resolution,
+            }))
+    return frames
+
+
+def order_frames(n: int = 10_000, product_id: int = 27, symbol: str = "BTCUSD", seed: int = 9) -> List[str]:
+    """
+    Private-channel traffic shaped like an active session: entry fills, SL/TP
+    placements and cancels, and position updates, in the router's accepted formats.
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    order_id = 1_000_000
+    for i in range(n):
+        kind = i % 4
+        price = float(60000 + rng.normal(0, 300))
+        if kind == 0:
+            order_id += 1
+            data = {"id": order_id, "status": "filled", "side": "buy", "type": "market", "reduce_only": False,
+                    "avg_fill_price": price, "filled_size": 5, "remaining_size": 0,
+                    "product_id": product_id, "product_symbol": symbol}
+            frames.append(json.dumps({"channel": "user.orders", "data": data}))
+        elif kind == 1:
+            order_id += 1
+            data = {"id": order_id, "status": "open", "side": "sell", "type": "stop", "reduce_only": True,
+                    "stop_price": price - 200, "filled_size": 0, "remaining_size": 5,
+                    "product_id": product_id, "product_symbol": symbol}
+            frames.append(json.dumps({"channel": "user.orders", "data": data}))
+        elif kind == 2:
+            data = {"size": 5, "avg_entry_price": price, "side": "buy", "realised_pnl": 0.0,
+                    "unrealised_pnl": float(rng.normal(0, 2)), "product_id": product_id, "product_symbol": symbol}
+            frames.append(json.dumps({"channel": "user.positions", "data": data}))
+        else:
+            data = {"id": order_id, "status": "cancelled", "side": "sell", "type": "stop", "reduce_only": True,
+                    "product_id": product_id, "product_symbol": symbol}
+            frames.append(json.dumps({"channel": "user.orders", "data": data}))
+    return frames
+
+
+def write_recording(path: str, frames_by_source: Dict[str, List[str]]) -> str:
+    """Stores fixture streams in the session recorder format, so recorded and synthetic runs share a reader."""
+    recorder = SessionRecorder(path)
+    ts = 0
+    for source, frames in frames_by_source.items():
+        for raw in frames:
+            ts += 1_000_000
+            recorder.record(source, raw, recv_ts_ns=ts)
+    recorder.close()
+    return path
+
+
+def load_recording(path: str, sources: Optional[tuple] = None) -> Dict[str, List[str]]:
+    """Raw frames per source from a recording made by the live bot (or write_recording)."""
+    out: Dict[str, List[str]] = {}
+    for _, source, raw in read_frames(path):
+        if sources is None or source in sources:
+            out.setdefault(source, []).append(raw)
+    return out
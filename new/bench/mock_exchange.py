@@ -0,0 +1,145 @@
+# your_trading_bot/bench/mock_exchange.py
+"""
+Local stand-in for the Delta REST endpoints DeltaAPIClient uses, so request round trips
+(signing, session pooling, JSON encode/decode) can be timed without the network.
+Market orders fill immediately at the last fixture close; positions are tracked per product.
+
+    with MockExchange(candles={"BTCUSD": df}) as ex:
+        client = DeltaAPIClient("key", "secret", ex.url)
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from bench.fixtures import history_payload
+
+
+class MockExchange:
+    def __init__(self, candles: Optional[Dict[str, pd.DataFrame]] = None, host: str = "127.0.0.1", port: int = 0):
+        self.candles = candles or {}
+        self.products = [
+            {"id": 27 + i, "symbol": symbol, "tick_size": "0.5", "contract_value": "0.001"}
+            for i, symbol in enumerate(self.candles or {"BTCUSD": None})
+        ]
+        self._by_id = {p["id"]: p for p in self.products}
+        self._lock = threading.Lock()
+        self._order_id = 0
+        self.positions: Dict[int, float] = {}     # product_id -> signed size in contracts
+        self.requests = 0
+        self._history_cache: Dict[tuple, bytes] = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockExchange":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-exchange", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    # ------------------------------------------------------------------ routes
+    def _history(self, query) -> bytes:
+        symbol = query.get("symbol", ["BTCUSD"])[0]
+        start, end = int(query.get("start", [0])[0]), int(query.get("end", [2**40])[0])
+        key = (symbol, start, end)
+        body = self._history_cache.get(key)
+        if body is None:
+            df = self.candles.get(symbol)
+            if df is None:
+                return json.dumps({"success": True, "result": []}).encode()
+            seconds = df.index.as_unit("s").asi8
+            body = json.dumps(history_payload(df[(seconds >= start) & (seconds <= end)])).encode()
+            self._history_cache[key] = body
+        return body
+
+    def _last_close(self, product_id) -> float:
+        product = self._by_id.get(product_id)
+        df = self.candles.get(product["symbol"]) if product else None
+        return float(df["Close"].iloc[-1]) if df is not None and len(df) else 60000.0
+
+    def _place(self, data) -> dict:
+        product_id = data.get("product_id")
+        size = int(data.get("size") or 0)
+        with self._lock:
+            self._order_id += 1
+            signed = size if data.get("side") == "buy" else -size
+            self.positions[product_id] = self.positions.get(product_id, 0) + signed
+            order_id = self._order_id
+        is_market = data.get("order_type") == "market_order" and not data.get("stop_price")
+        return {"success": True, "result": {
+            "id": order_id, "product_id": product_id, "side": data.get("side"), "size": size,
+            "unfilled_size": 0 if is_market else size, "state": "closed" if is_market else "open",
+            "order_type": data.get("order_type"), "limit_price": data.get("limit_price"),
+            "stop_price": data.get("stop_price"), "reduce_only": data.get("reduce_only", False),
+            "average_fill_price": str(self._last_close(product_id)) if is_market else None,
+        }}
+
+    def route(self, method: str, path: str, query: dict, data: Optional[dict]) -> bytes:
+        self.requests += 1
+        if method == "GET" and path == "/v2/history/candles":
+            return self._history(query)
+        if method == "GET" and path == "/v2/products":
+            result = {"success": True, "result": self.products}
+        elif method == "GET" and path == "/v2/positions":
+            product_id = int(query.get("product_id", [0])[0])
+            size = self.positions.get(product_id, 0)
+            result = {"success": True, "result": {
+                "product_id": product_id, "size": size,
+                "entry_price": str(self._last_close(product_id)) if size else None,
+            }}
+        elif method == "GET" and path == "/v2/orders/open":
+            result = {"success": True, "result": []}
+        elif method == "POST" and path == "/v2/orders":
+            result = self._place(data or {})
+        elif method == "DELETE" and path.startswith("/v2/orders"):
+            result = {"success": True, "result": {"id": (data or {}).get("order_id"), "state": "cancelled"}}
+        else:
+            result = {"success": False, "error": {"code": "not_found", "path": path}}
+        return json.dumps(result).encode()
+
+    def _handler(self):
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"     # keep-alive, like the real API
+            # One buffered write per response and no Nagle: otherwise delayed ACKs add ~40 ms per request
+            wbufsize = 1 << 16
+            disable_nagle_algorithm = True
+
+            def _serve(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                data = json.loads(self.rfile.read(length)) if length else None
+                body = exchange.route(self.command, url.path, parse_qs(url.query), data)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,415 @@
+# your_trading_bot/bench/suite.py
+"""
+Hot-path benchmark suite with JSON baselines and a regression gate.
+
+    cd new && python -m bench.suite run                      # print results
+    cd new && python -m bench.suite run --save-baseline      # write bench/baselines/baseline.json
+    cd new && python -m bench.suite run --compare            # run, then gate against the baseline
+    cd new && python -m bench.suite compare results.json     # gate a saved run
+    cd new && python -m bench.suite run -k rest --recording session.rec.gz
+
+Every case reports the median ns/op over --rounds rounds; `compare` flags cases slower
+than the baseline by more than --threshold (default 15%) and exits 1. Baselines are
+machine-specific, so none is committed: record one per box / CI runner at the commit you
+compare against (--baseline PATH); bench/baselines/ is git-ignored.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+import config
+from bench.fixtures import candle_frames, history_payload, load_recording, order_frames, year_of_candles
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_BASELINE = os.path.join(BASELINE_DIR, "baseline.json")
+
+# name -> (setup(ctx) -> fn, description); one fn() call performs `ops` operations
+CASES: Dict[str, tuple] = {}
+
+
+def case(name: str, description: str = ""):
+    def register(setup):
+        CASES[name] = (setup, description)
+        return setup
+    return register
+
+
+class Context:
+    """Fixtures shared across cases, built on first use."""
+
+    def __init__(self, recording: Optional[str] = None):
+        self.recording = recording
+        self.tmpdir = tempfile.mkdtemp(prefix="bench_suite_")
+        self._cache = {}
+        self._exchange = None
+        # Keep ledger side effects out of the working tree
+        config.SQLITE_LEDGER_PATH = os.path.join(self.tmpdir, "ledger.sqlite3")
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def year(self):
+        return self._get("year", year_of_candles)
+
+    def _recorded(self, source):
+        return self._get("recording", lambda: load_recording(self.recording)).get(source) if self.recording else None
+
+    @property
+    def candle_frames(self):
+        return self._get("candle_frames", lambda: self._recorded("candle") or candle_frames(self.year.iloc[-2000:]))
+
+    @property
+    def order_frames(self):
+        return self._get("order_frames", lambda: self._recorded("order") or order_frames(10_000))
+
+    @property
+    def exchange(self):
+        if self._exchange is None:
+            from bench.mock_exchange import MockExchange
+            self._exchange = MockExchange(candles={"BTCUSD": self.year.iloc[-6000:]}).start()
+        return self._exchange
+
+    def client(self):
+        from api.delta_client import DeltaAPIClient
+        return DeltaAPIClient("bench-key", "bench-secret", self.exchange.url)
+
+    def close(self):
+        if self._exchange is not None:
+            self._exchange.stop()
+        # Stop the ledger writers the cases pointed into tmpdir, then remove it
+        for module in ("utils.trade_logger", "utils.sqlite_ledger"):
+            mod = sys.modules.get(module)
+            ledger = getattr(mod, "_ledger", None)
+            if ledger is not None and os.path.abspath(ledger.path).startswith(self.tmpdir + os.sep):
+                ledger.close()
+                mod._ledger = None
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------- cases
+def _repeat(n: int, op: Callable[[], object]):
+    def run():
+        for _ in range(n):
+            op()
+    return n, run
+
+
+@case("indicators.window_300", "calculate_indicators on the live 300-bar window")
+def _indicators_window(ctx):
+    from utils.indicators import calculate_indicators
+    df = ctx.year.iloc[-300:].copy()
+    return _repeat(20, lambda: calculate_indicators(df))
+
+
+@case("indicators.year", "calculate_indicators on a year of 15m bars")
+def _indicators_year(ctx):
+    from utils.indicators import calculate_indicators
+    df = ctx.year.copy()
+    return _repeat(5, lambda: calculate_indicators(df))
+
+
+@case("history.parse_60d", "get_initial_historical_candles parsing 60 days of REST payload")
+def _history_parse(ctx):
+    from strategy.simple_ema_rsi import get_initial_historical_candles
+    payload = history_payload(ctx.year.iloc[-5760:])
+
+    class _Payload:
+        def get_candles(self, *args):
+            return payload
+
+    client = _Payload()
+    return _repeat(5, lambda: get_initial_historical_candles("BTCUSD", "15m", 50, client))
+
+
+@case("strategy.engine_evaluate", "StrategyEngine.evaluate for the live strategy on one symbol")
+def _engine(ctx):
+    from strategy.engine import live_engine
+    frames = {config.SYMBOL: ctx.year.iloc[-300:].copy()}
+    engine = live_engine()
+    return _repeat(50, lambda: engine.evaluate(frames))
+
+
+@case("ws.candle_on_message", "WebSocketCandleClient.on_message per candlestick frame")
+def _candle_ws(ctx):
+    import queue
+    from ws_confilct.candle_ws import WebSocketCandleClient
+    frames = ctx.candle_frames
+    q = queue.Queue()
+    client = WebSocketCandleClient("ws://unused", config.SYMBOL, config.RESOLUTION, q)
+
+    def run():
+        client.current_websocket_candle_data.clear()
+        client.last_completed_candle_timestamp.clear()
+        for raw in frames:
+            client.on_message(None, raw)
+        while not q.empty():
+            q.get_nowait()
+    return len(frames), run
+
+
+@case("ws.order_router", "OrderWebSocketRouter.handle_raw_message per private frame")
+def _order_router(ctx):
+    from ws_confilct.order_ws import OrderWebSocketRouter
+    from utils.bot_state_manager import BotStateManager
+    from utils.order_manager import OrderManager
+    frames = ctx.order_frames
+    state = BotStateManager()
+    orders = OrderManager()
+    router = OrderWebSocketRouter(on_log=lambda m: None, state_for=lambda data: state, orders=orders)
+    orders.on_change(router.on_order_change)
+
+    def run():
+        for raw in frames:
+            router.handle_raw_message(raw)
+    return len(frames), run
+
+
+def _state():
+    from utils.bot_state_manager import BotStateManager
+    m = BotStateManager()
+    m.mark_entry("long", 60000.0, 0.005, sl_price=59800.0, tp_price=60500.0)
+    return m
+
+
+@case("state.snapshot", "BotStateManager.snapshot() field read")
+def _state_snapshot(ctx):
+    m = _state()
+
+    def run():
+        for _ in range(10_000):
+            m.snapshot()["in_position"]
+    return 10_000, run
+
+
+@case("state.get_state", "BotStateManager.get_state() dict copy")
+def _state_get(ctx):
+    m = _state()
+
+    def run():
+        for _ in range(10_000):
+            m.get_state()
+    return 10_000, run
+
+
+@case("state.write", "BotStateManager.sync_position_snapshot + update_extrema_since_entry")
+def _state_write(ctx):
+    m = _state()
+
+    def run():
+        price = 60000.0
+        for _ in range(2_000):
+            price += 1.0
+            m.sync_position_snapshot("long", 5, 60000.0, unrealised_pnl=price - 60000.0)
+            m.update_extrema_since_entry(price)
+    return 2_000, run
+
+
+def _trade(i):
+    now = datetime.now(timezone.utc)
+    return {
+        'Entry Time': now, 'Exit Time': now, 'Type': 'Long' if i % 2 else 'Short', 'Reason': 'Take Profit',
+        'Entry Price': 60000.0 + i, 'Exit Price': 60500.0 + i, 'PnL': 2.5, 'Net PnL': 2.4,
+        'Session': 'Europe', 'Initial SL Price': 59800.0, 'Initial TP Price': 60500.0,
+    }
+
+
+@case("trade_log.enqueue", "trade_log() per record, including draining the CSV writer thread")
+def _trade_log(ctx):
+    import utils.trade_logger as trade_logger
+    from utils.ledger_writer import LedgerWriter, TRADE_LOG_COLUMNS
+    if trade_logger._ledger is None:
+        trade_logger._ledger = LedgerWriter(os.path.join(ctx.tmpdir, "trade_log.csv"), TRADE_LOG_COLUMNS,
+                                            rotate_daily=False)
+    records = [_trade(i) for i in range(2_000)]
+
+    def run():
+        for rec in records:
+            trade_logger.trade_log(rec)
+        trade_logger._ledger.flush(timeout=60)
+    return len(records), run
+
+
+@case("rest.get_position", "GET /v2/positions round trip against the local mock exchange")
+def _rest_position(ctx):
+    client = ctx.client()
+    product_id = client.get_product_id("BTCUSD")
+
+    def run():
+        for _ in range(50):
+            client.get_position("BTCUSD", product_id=product_id)
+    return 50, run
+
+
+@case("rest.place_order", "POST /v2/orders market order round trip")
+def _rest_order(ctx):
+    client = ctx.client()
+    client.get_product_id("BTCUSD")
+
+    def run():
+        for i in range(50):
+            client.place_order("BTCUSD", "buy" if i % 2 else "sell", config.LOT_SIZE_BTC)
+    return 50, run
+
+
+@case("rest.get_candles_60d", "GET /v2/history/candles, 60 days of 15m bars")
+def _rest_candles(ctx):
+    client = ctx.client()
+    df = ctx.year.iloc[-5760:]
+    start, end = int(df.index[0].timestamp()), int(df.index[-1].timestamp())
+    return _repeat(5, lambda: client.get_candles("BTCUSD", "15m", start, end))
+
+
+# ---------------------------------------------------------------------- runner
+def _measure(fn: Callable[[], None], ops: int, rounds: int) -> Dict:
+    fn()  # warm-up: imports, caches, connection pool
+    per_op = []
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        fn()
+        per_op.append((time.perf_counter_ns() - t0) / ops)
+    return {
+        "ns_per_op": statistics.median(per_op),
+        "min_ns_per_op": min(per_op),
+        "max_ns_per_op": max(per_op),
+        "ops_per_round": ops,
+        "rounds": rounds,
+    }
+
+
+def _meta() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                timeout=10).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} {platform.node()}",
+    }
+
+
+def run_suite(pattern: str = "", rounds: int = 5, recording: Optional[str] = None) -> Dict:
+    ctx = Context(recording)
+    results = {}
+    try:
+        for name, (setup, _) in CASES.items():
+            if pattern and pattern not in name:
+                continue
+            with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+                ops, fn = setup(ctx)
+                results[name] = _measure(fn, ops, rounds)
+            r = results[name]
+            print(f"{name:<28} {_fmt(r['ns_per_op']):>10}/op  (min {_fmt(r['min_ns_per_op'])}, "
+                  f"max {_fmt(r['max_ns_per_op'])}, {r['ops_per_round']} ops x {rounds})")
+    finally:
+        ctx.close()
+    return {"meta": _meta(), "results": results}
+
+
+def _fmt(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} µs"
+    return f"{ns:.0f} ns"
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.15) -> int:
+    """Prints a comparison table; returns the number of regressions."""
+    base, cur = baseline["results"], current["results"]
+    print(f"\nBaseline {baseline['meta'].get('commit') or '?'} ({baseline['meta'].get('created')}) "
+          f"vs. current {current['meta'].get('commit') or '?'}, threshold +{threshold:.0%}")
+    print(f"{'case':<28} {'baseline':>10} {'current':>10} {'change':>8}")
+    regressions = 0
+    for name in sorted(set(base) | set(cur)):
+        if name not in cur:
+            print(f"{name:<28} {_fmt(base[name]['ns_per_op']):>10} {'-':>10} {'':>8}  (not run)")
+            continue
+        if name not in base:
+            print(f"{name:<28} {'-':>10} {_fmt(cur[name]['ns_per_op']):>10} {'':>8}  (new)")
+            continue
+        b, c = base[name]["ns_per_op"], cur[name]["ns_per_op"]
+        change = c / b - 1 if b else 0.0
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "❌ REGRESSION"
+        elif change < -threshold:
+            flag = "✅ faster"
+        print(f"{name:<28} {_fmt(b):>10} {_fmt(c):>10} {change:+8.1%}  {flag}")
+    print(f"\n{regressions} regression(s) above +{threshold:.0%}")
+    return regressions
+
+
+def _load(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save(results: Dict, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"💾 Results written to {path}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="run the suite")
+    run_p.add_argument("-k", dest="pattern", default="", help="only cases whose name contains this")
+    run_p.add_argument("--rounds", type=int, default=5)
+    run_p.add_argument("--recording", help="use WS frames from a session recording instead of synthetic ones")
+    run_p.add_argument("--out", help="write results JSON here")
+    run_p.add_argument("--save-baseline", action="store_true", help="write results to --baseline")
+    run_p.add_argument("--compare", action="store_true", help="gate results against --baseline")
+    run_p.add_argument("--baseline", default=DEFAULT_BASELINE)
+    run_p.add_argument("--threshold", type=float, default=0.15)
+
+    cmp_p = sub.add_parser("compare", help="compare a results file with a baseline")
+    cmp_p.add_argument("results")
+    cmp_p.add_argument("--baseline", default=DEFAULT_BASELINE)
+    cmp_p.add_argument("--threshold", type=float, default=0.15)
+
+    sub.add_parser("list", help="list the cases")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name, (_, description) in CASES.items():
+            print(f"{name:<28} {description}")
+        return 0
+    if args.command == "compare":
+        return 1 if compare(_load(args.results), _load(args.baseline), args.threshold) else 0
+
+    results = run_suite(args.pattern, args.rounds, args.recording)
+    if args.out:
+        _save(results, args.out)
+    if args.save_baseline:
+        _save(results, args.baseline)
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"❌ No baseline at {args.baseline}; create one with --save-baseline")
+            return 2
+        return 1 if compare(results, _load(args.baseline), args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
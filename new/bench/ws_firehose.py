@@ -0,0 +1,311 @@
+# your_trading_bot/bench/ws_firehose.py
+"""
+WebSocket ingest load test: synthetic candlestick, ticker, user.orders and user.positions
+frames pushed through a local WS server into the real WebSocketCandleClient and
+OrderWebSocketRouter, wired the way main.py / private_ws.start_private_ws wire them.
+
+    cd new && python -m bench.ws_firehose --symbols 20 --candle-rate 5 --ticker-rate 5 --duration 10
+    cd new && python -m bench.ws_firehose --symbols 50 --ramp 1,2,5,10,20,40
+
+Rates are frames/s per symbol (candle, ticker) and frames/s overall (orders, positions);
+--ramp multiplies all of them step by step. Each step reports sustained throughput, end-to-end
+latency (frame handed to the server -> bot handler returned), candle_queue depth, and
+dropped frames (server send queue full because the client fell behind) or lost ones
+(sent but never handled). The first step that drops or loses frames or exceeds
+--max-p99-ms / --max-queue is the saturation point. A step whose generator cannot reach
+its target rate is flagged separately: it measures the generator, not the client.
+"""
+
+import argparse
+import contextlib
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from time import perf_counter_ns
+from typing import Dict, List
+
+from websocket import WebSocketApp
+
+import config
+from bench.ws_server import LocalWSServer
+from utils.metrics import Histogram
+from ws_confilct.candle_ws import WebSocketCandleClient
+from ws_confilct.order_ws import OrderWebSocketRouter
+from utils.order_manager import OrderManager
+from utils.bot_state_manager import BotStateManager
+
+
+class MarketGenerator:
+    """Per-symbol random-walk candles (a new bar every `updates_per_bar` updates) and tickers."""
+
+    def __init__(self, symbols: List[str], resolution: str, updates_per_bar: int, seed: int = 1):
+        self.rng = random.Random(seed)
+        self.channel = f"candlestick_{resolution}"
+        self.step_us = int(resolution[:-1]) * {"m": 60, "h": 3600, "d": 86400}[resolution[-1]] * 1_000_000
+        self.updates_per_bar = updates_per_bar
+        start_us = (int(time.time()) // 86400) * 86400 * 1_000_000
+        self.bars = {s: [start_us, 100.0 + i, 100.0 + i, 100.0 + i, 100.0 + i, 0.0, 0] for i, s in enumerate(symbols)}
+        self.completed = 0
+
+    def candle(self, symbol: str) -> str:
+        bar = self.bars[symbol]
+        if bar[6] >= self.updates_per_bar:          # roll to the next bar; the client queues the previous one
+            bar[0] += self.step_us
+            bar[1] = bar[2] = bar[3] = bar[4]
+            bar[5], bar[6] = 0.0, 0
+            self.completed += 1
+        close = bar[4] * (1 + self.rng.gauss(0, 0.0005))
+        bar[2], bar[3], bar[4] = max(bar[2], close), min(bar[3], close), close
+        bar[5] += 0.25
+        bar[6] += 1
+        return (f'{{"type":"{self.channel}","symbol":"{symbol}","candle_start_time":{bar[0]},'
+                f'"open":{bar[1]:.2f},"high":{bar[2]:.2f},"low":{bar[3]:.2f},"close":{close:.2f},'
+                f'"volume":{bar[5]:.2f}}}')
+
+    def ticker(self, symbol: str) -> str:
+        price = self.bars[symbol][4]
+        return (f'{{"type":"v2/ticker","symbol":"{symbol}","mark_price":"{price:.2f}",'
+                f'"close":{price:.2f},"timestamp":{int(time.time() * 1e6)}}}')
+
+
+class PrivateGenerator:
+    def __init__(self, symbols: List[str], seed: int = 2):
+        self.rng = random.Random(seed)
+        self.symbols = symbols
+        self.order_id = 1_000_000
+
+    def order(self) -> str:
+        self.order_id += 1
+        symbol = self.rng.choice(self.symbols)
+        status = self.rng.choice(("open", "filled", "cancelled"))
+        kind = self.rng.choice(("market", "limit", "stop"))
+        return (f'{{"channel":"user.orders","data":{{"id":{self.order_id},"status":"{status}","side":"buy",'
+                f'"type":"{kind}","reduce_only":{"true" if kind != "market" else "false"},'
+                f'"avg_fill_price":100.5,"filled_size":1,"remaining_size":0,"product_symbol":"{symbol}"}}}}')
+
+    def position(self) -> str:
+        symbol = self.rng.choice(self.symbols)
+        return (f'{{"channel":"user.positions","data":{{"size":1,"avg_entry_price":100.5,"side":"buy",'
+                f'"unrealised_pnl":{self.rng.gauss(0, 1):.4f},"product_symbol":"{symbol}"}}}}')
+
+
+class _Stream:
+    """Send-side bookkeeping for one connection: enqueue times by frame index, matched on receipt."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.sent_ns: List[int] = []
+        self.received = 0
+        self.latency = Histogram("e2e")
+
+    def send(self, frame: str) -> None:
+        # Record before sending: the reader thread may handle the frame before send() returns
+        self.sent_ns.append(perf_counter_ns())
+        if not self.conn.send(frame):
+            self.sent_ns.pop()
+
+    def on_handled(self) -> None:
+        # One TCP stream per connection: frames arrive in send order
+        self.latency.record(perf_counter_ns() - self.sent_ns[self.received])
+        self.received += 1
+
+
+def run_step(symbols: List[str], candle_rate: float, ticker_rate: float, order_rate: float, position_rate: float,
+             duration: float, updates_per_bar: int, consumer_delay: float, server_queue: int) -> Dict:
+    server = LocalWSServer(queue_size=server_queue)
+    candle_queue = queue.Queue()
+    ws_client = WebSocketCandleClient(server.url("/market"), symbols, config.RESOLUTION, candle_queue)
+    states = {s: BotStateManager() for s in symbols}
+    orders = OrderManager()
+    router = OrderWebSocketRouter(on_log=lambda m: None,
+                                  state_for=lambda data: states.get(data.get("product_symbol")),
+                                  orders=orders)
+    orders.on_change(router.on_order_change)
+
+    private_app = None
+
+    def connected(path: str) -> _Stream:
+        conn = server.wait_for(path)
+        if conn is None:
+            ws_client.stop()
+            if private_app:
+                private_app.close()
+            server.stop()
+            raise RuntimeError(f"client did not connect to {server.url(path)}")
+        return _Stream(conn)
+
+    handle_candle = ws_client.on_message
+
+    def timed_candle(ws, message):
+        handle_candle(ws, message)
+        market.on_handled()
+    # _run_websocket reads self.on_message when it builds the WebSocketApp, so bind before start()
+    ws_client.on_message = timed_candle
+    ws_client.start()
+    market = connected("/market")
+
+    private = None
+    if order_rate or position_rate:
+        def on_private(ws, message):
+            router.handle_raw_message(message)
+            private.on_handled()
+        private_app = WebSocketApp(server.url("/private"), on_message=on_private)
+        threading.Thread(target=private_app.run_forever, name="ws-order", daemon=True).start()
+        private = connected("/private")
+
+    # Strategy-loop stand-in: drains candle_queue, optionally spending time per bar
+    stop = threading.Event()
+    consumed = [0]
+    depth = {"max": 0, "sum": 0, "n": 0}
+
+    def consumer():
+        while not stop.is_set() or not candle_queue.empty():
+            try:
+                candle_queue.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            consumed[0] += 1
+            if consumer_delay:
+                time.sleep(consumer_delay)
+
+    def sampler():
+        while not stop.is_set():
+            d = candle_queue.qsize()
+            depth["max"] = max(depth["max"], d)
+            depth["sum"] += d
+            depth["n"] += 1
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=consumer, daemon=True), threading.Thread(target=sampler, daemon=True)]
+    for t in threads:
+        t.start()
+
+    mgen, pgen = MarketGenerator(symbols, config.RESOLUTION, updates_per_bar), PrivateGenerator(symbols)
+    market_rate = len(symbols) * (candle_rate + ticker_rate)
+    candle_share = candle_rate / (candle_rate + ticker_rate) if candle_rate + ticker_rate else 0
+    private_rate = order_rate + position_rate
+    order_share = order_rate / private_rate if private_rate else 0
+    rng = random.Random(3)
+    n_market = n_private = 0
+    t0 = time.perf_counter()
+    while True:
+        elapsed = time.perf_counter() - t0
+        if elapsed >= duration:
+            break
+        due_market = int(market_rate * elapsed) - n_market
+        due_private = int(private_rate * elapsed) - n_private
+        for _ in range(min(due_market, 5000)):
+            symbol = symbols[n_market % len(symbols)]
+            market.send(mgen.candle(symbol) if rng.random() < candle_share else mgen.ticker(symbol))
+            n_market += 1
+        for _ in range(min(due_private, 5000)):
+            private.send(pgen.order() if rng.random() < order_share else pgen.position())
+            n_private += 1
+        if due_market <= 0 and due_private <= 0:
+            time.sleep(0.0005)
+    gen_elapsed = time.perf_counter() - t0
+
+    # Let the client catch up on what was accepted, then stop
+    deadline = time.monotonic() + 10
+    streams = [s for s in (market, private) if s is not None]
+    while time.monotonic() < deadline and any(s.received < len(s.sent_ns) for s in streams):
+        time.sleep(0.02)
+    drain_elapsed = time.perf_counter() - t0
+    stop.set()
+    for t in threads:
+        t.join(timeout=2)
+    ws_client.stop()
+    if private_app:
+        private_app.close()
+    server.stop()
+
+    total_target = (market_rate + private_rate) * duration
+    generated = n_market + n_private
+    accepted = sum(len(s.sent_ns) for s in streams)
+    handled = sum(s.received for s in streams)
+    lat = Histogram("all")
+    for s in streams:
+        for i, c in enumerate(s.latency.counts):
+            lat.counts[i] += c
+        lat.count += s.latency.count
+        lat.sum_ns += s.latency.sum_ns
+        lat.max_ns = max(lat.max_ns, s.latency.max_ns)
+    return {
+        "target_per_s": total_target / duration,
+        "generated_per_s": generated / gen_elapsed,
+        "handled_per_s": handled / drain_elapsed,
+        "generated": generated,
+        "dropped": generated - accepted,          # server send queue full: client not keeping up
+        "lost": accepted - handled,               # accepted but not handled before the drain deadline
+        "p50_ms": lat.percentile(0.5) / 1e6,
+        "p99_ms": lat.percentile(0.99) / 1e6,
+        "p999_ms": lat.percentile(0.999) / 1e6,
+        "max_ms": lat.max_ns / 1e6,
+        "candles_expected": mgen.completed,
+        "candles_consumed": consumed[0],
+        "queue_max": depth["max"],
+        "queue_mean": depth["sum"] / depth["n"] if depth["n"] else 0.0,
+        "candle_share": candle_share,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--candle-rate", type=float, default=2.0, help="candlestick frames/s per symbol")
+    parser.add_argument("--ticker-rate", type=float, default=2.0, help="ticker frames/s per symbol")
+    parser.add_argument("--order-rate", type=float, default=20.0, help="user.orders frames/s")
+    parser.add_argument("--position-rate", type=float, default=20.0, help="user.positions frames/s")
+    parser.add_argument("--updates-per-bar", type=int, default=20, help="candle updates before a bar closes")
+    parser.add_argument("--consumer-delay-ms", type=float, default=0.0, help="simulated strategy work per closed bar")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per step")
+    parser.add_argument("--ramp", default="1", help="comma-separated rate multipliers, one step each")
+    parser.add_argument("--server-queue", type=int, default=100_000, help="frames buffered per connection before dropping")
+    parser.add_argument("--max-p99-ms", type=float, default=100.0)
+    parser.add_argument("--max-queue", type=int, default=50, help="candle_queue depth that counts as the strategy falling behind")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's per-frame prints on stdout")
+    args = parser.parse_args(argv)
+
+    symbols = ["BTCUSD"] + [f"SYM{i:03d}USD" for i in range(1, args.symbols)]
+    print(f"🔥 Firehose: {len(symbols)} symbols, {args.duration:g}s per step, ramp x{args.ramp}")
+    print(f"{'step':>6} {'target/s':>10} {'gen/s':>10} {'handled/s':>10} {'dropped':>8} {'lost':>6} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'p99.9 ms':>9} {'max ms':>8} {'bars':>11} {'q max':>6} {'q mean':>7}")
+    saturated_at = None
+    for mult in (float(m) for m in args.ramp.split(",")):
+        sink = open(os.devnull, "w") if not args.verbose else None
+        try:
+            with (contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext()):
+                r = run_step(symbols, args.candle_rate * mult, args.ticker_rate * mult, args.order_rate * mult,
+                             args.position_rate * mult, args.duration, args.updates_per_bar,
+                             args.consumer_delay_ms / 1000, args.server_queue)
+        except RuntimeError as e:
+            print(f"❌ Step x{mult:g} aborted: {e}")
+            return 1
+        finally:
+            if sink:
+                sink.close()
+        print(f"{'x' + format(mult, 'g'):>6} {r['target_per_s']:10,.0f} {r['generated_per_s']:10,.0f} "
+              f"{r['handled_per_s']:10,.0f} {r['dropped']:8,} {r['lost']:6,} {r['p50_ms']:8.2f} {r['p99_ms']:8.2f} "
+              f"{r['p999_ms']:9.2f} {r['max_ms']:8.1f} {r['candles_consumed']:>5}/{r['candles_expected']:<5} "
+              f"{r['queue_max']:6} {r['queue_mean']:7.1f}")
+        missed = r["generated_per_s"] < 0.95 * r["target_per_s"]
+        if saturated_at is None and (r["dropped"] or r["lost"] or r["p99_ms"] > args.max_p99_ms
+                                    or r["queue_max"] > args.max_queue):
+            saturated_at = (mult, r)
+        if missed:
+            print("   ⚠️ generator could not reach the target rate; results above this step measure the generator")
+    if saturated_at:
+        mult, r = saturated_at
+        print(f"🧯 Ingest saturates at x{mult:g} (~{r['target_per_s']:,.0f} frames/s for {len(symbols)} symbols): "
+              f"p99 {r['p99_ms']:.1f} ms, {r['dropped']:,} dropped, {r['lost']:,} lost, candle_queue max {r['queue_max']}")
+    else:
+        print(f"✅ No saturation up to x{args.ramp.split(',')[-1]} (p99 <= {args.max_p99_ms:g} ms, nothing dropped, "
+              f"candle_queue <= {args.max_queue})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
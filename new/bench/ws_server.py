@@ -0,0 +1,194 @@
+# your_trading_bot/bench/ws_server.py
+"""
+Minimal local WebSocket server (RFC 6455, text frames, no extensions) for load tests.
+Each accepted connection gets a bounded send queue drained by its own writer thread;
+send() never blocks the generator: when a slow client lets the queue fill, the frame
+is dropped and counted, as an exchange would drop or disconnect a lagging consumer.
+"""
+
+import base64
+import hashlib
+import queue
+import socket
+import struct
+import threading
+import time
+from typing import Dict, List, Optional
+
+_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_CLOSE = object()
+
+
+def encode_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+class WSConnection:
+    def __init__(self, sock: socket.socket, path: str, queue_size: int):
+        self.sock = sock
+        self.path = path
+        self.sent = 0
+        self.dropped = 0
+        self.client_messages: List[str] = []   # subscribe / auth frames from the bot
+        self.closed = threading.Event()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._send_lock = threading.Lock()
+        threading.Thread(target=self._writer, name=f"ws-server-writer{path}", daemon=True).start()
+        threading.Thread(target=self._reader, name=f"ws-server-reader{path}", daemon=True).start()
+
+    def send(self, text: str) -> bool:
+        if self.closed.is_set():
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(text)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    def close(self) -> None:
+        try:
+            self._queue.put_nowait(_CLOSE)
+        except queue.Full:
+            self.closed.set()
+            self.sock.close()
+
+    def _write(self, data: bytes) -> None:
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def _writer(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                batch = []
+                while item is not _CLOSE:
+                    batch.append(encode_frame(item.encode()))
+                    if len(batch) >= 256:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._write(b"".join(batch))
+                    self.sent += len(batch)
+                if item is _CLOSE:
+                    self._write(encode_frame(struct.pack("!H", 1000), opcode=0x8))
+                    return
+        except OSError:
+            pass
+        finally:
+            self.closed.set()
+
+    def _recv_exact(self, n: int) -> bytes:
+        buf = b""
+        while len(buf) < n:
+            chunk = self.sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("client went away")
+            buf += chunk
+        return buf
+
+    def _reader(self) -> None:
+        try:
+            while not self.closed.is_set():
+                b1, b2 = self._recv_exact(2)
+                opcode, length = b1 & 0x0F, b2 & 0x7F
+                if length == 126:
+                    length = struct.unpack("!H", self._recv_exact(2))[0]
+                elif length == 127:
+                    length = struct.unpack("!Q", self._recv_exact(8))[0]
+                mask = self._recv_exact(4) if b2 & 0x80 else None
+                payload = self._recv_exact(length) if length else b""
+                if mask:
+                    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+                if opcode == 0x9:                       # ping -> pong
+                    self._write(encode_frame(payload, opcode=0xA))
+                elif opcode == 0x8:                     # close
+                    self.close()
+                    return
+                elif opcode == 0x1:
+                    self.client_messages.append(payload.decode(errors="replace"))
+        except (OSError, ConnectionError, ValueError):
+            self.closed.set()
+
+
+class LocalWSServer:
+    """Accepts WS connections on 127.0.0.1; connections are looked up by request path."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, queue_size: int = 100_000):
+        self.queue_size = queue_size
+        self._sock = socket.create_server((host, port))
+        self.host, self.port = self._sock.getsockname()[:2]
+        self._conns: Dict[str, WSConnection] = {}
+        self._cond = threading.Condition()
+        self._running = True
+        threading.Thread(target=self._accept_loop, name="ws-server-accept", daemon=True).start()
+
+    def url(self, path: str = "/") -> str:
+        return f"ws://{self.host}:{self.port}{path}"
+
+    def _accept_loop(self) -> None:
+        while self._running:
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handshake, args=(sock,), daemon=True).start()
+
+    def _handshake(self, sock: socket.socket) -> None:
+        try:
+            data = b""
+            while b"\r\n\r\n" not in data:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    sock.close()
+                    return
+                data += chunk
+            lines = data.split(b"\r\n")
+            path = lines[0].split()[1].decode()
+            headers = {}
+            for line in lines[1:]:
+                if b":" in line:
+                    k, v = line.split(b":", 1)
+                    headers[k.strip().lower()] = v.strip()
+            accept = base64.b64encode(hashlib.sha1(headers[b"sec-websocket-key"] + _GUID).digest())
+            sock.sendall(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                         b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (OSError, KeyError, IndexError):
+            sock.close()
+            return
+        conn = WSConnection(sock, path, self.queue_size)
+        with self._cond:
+            self._conns[path] = conn
+            self._cond.notify_all()
+
+    def wait_for(self, path: str, timeout: float = 10.0) -> Optional[WSConnection]:
+        """The newest connection on `path`, waiting for the client to connect."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while path not in self._conns or self._conns[path].closed.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return self._conns[path]
+
+    def stop(self) -> None:
+        self._running = False
+        for conn in list(self._conns.values()):
+            conn.close()
+        self._sock.close()
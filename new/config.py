@@ -22,11 +22,40 @@ SYMBOL = "BTCUSD"
 PRODUCT_ID = 27
 RESOLUTION = "15m"
 
+# --- Multi-timeframe candles (utils/candle_aggregator.py) ---
+# main.py subscribes once at CANDLE_BASE_RESOLUTION and builds RESOLUTION plus CANDLE_TIMEFRAMES
+# from it locally; set it to RESOLUTION to subscribe to RESOLUTION candles directly
+CANDLE_BASE_RESOLUTION = os.getenv("CANDLE_BASE_RESOLUTION", "1m")
+CANDLE_TIMEFRAMES = ["5m", "15m", "1h", "4h", "1d"]
+CANDLE_TIMEFRAME_HISTORY = 500       # completed bars kept per timeframe
+
+# --- Candle validation (utils/candle_validation.py): REST history and live bars ---
+CANDLE_VALIDATION = True
+# Off = report only: issues are counted and printed, prices pass through unchanged (bars with
+# bad prices or out-of-order starts are still dropped on the live path). On = drop bad-price
+# rows, reset spike closes, clip wicks, fix High/Low.
+CANDLE_REPAIR = False
+CANDLE_OUTLIER_Z = 10.0              # robust sigmas before a move / wick counts as an outlier
+
+# --- Portfolio runner (portfolio.py) ---
+PORTFOLIO_SYMBOLS = [s.strip() for s in os.getenv("PORTFOLIO_SYMBOLS", SYMBOL).split(",") if s.strip()]
+BAR_CLOSE_GRACE_SECONDS = 2.0   # wait this long for every symbol's bar before evaluating a partial batch
+
+# --- Sharded runner (sharded_runner.py) ---
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", max(1, (os.cpu_count() or 3) - 2)))  # strategy processes
+CANDLE_RING_CAPACITY = 1024     # bars kept per symbol in the shared-memory ring
+
+# --- REST client ---
+REST_POOL_SIZE = 20             # keep-alive connections shared by all symbols
+REST_RATE_LIMIT_PER_SEC = 10    # shared request budget (token bucket refill rate)
+REST_RATE_BURST = 20
+
 # --- Indicators ---
 EMA_PERIOD = 25
 EMA_LONG_PERIOD=25
 ATR_PERIOD = 14
 RSI_PERIOD = 14
+USE_NUMBA = os.getenv("USE_NUMBA", "1") == "1"   # compiled indicator/backtest loops when numba is installed (utils/kernels.py)
 
 # --- Strategy params ---
 EMA_GAP_THRESHOLD_PCT = 0.001
@@ -40,9 +69,29 @@ TRAIL_STOPLOSS_PCT = 300  # points
 target_pct = 0.005  # 0.5% TP
 stoploss_pct = 0.002  # fallback 0.2% SL
 
+# Strategy plugin driving live entries (see strategy/base.py); params default to the values above
+LIVE_STRATEGY = {"kind": "ema_rsi", "name": "ema_rsi_live", "params": {}}
+
+# Shadow variants: paper-traded on the live feed, never sent to the exchange (strategy/shadow.py)
+SHADOW_ENABLED = True
+SHADOW_GRID = {"ema_period": [15, 20, 25, 35, 50], "rsi_long": [50, 55, 60], "stoploss_pct": [0.002, 0.004]}
+SHADOW_LOG_DIR = "shadow_log"        # columnar event log, one run directory per start
+SHADOW_SUMMARY_EVERY_BARS = 96       # print the leaderboard once a day on 15m bars
+
 USE_CANDLE_SL = True
 USE_PCT_SL = False
 
+# --- Entry execution / order book ---
+USE_ORDER_BOOK = True                # Keep a local L2 book to estimate entry fills
+MAX_ENTRY_SLIPPAGE_PCT = 0.0005      # 5 bps expected slippage vs. touch before we stop using market orders
+SLIPPAGE_ACTION = "limit"            # "limit" -> IOC limit capped at the slippage budget, "skip" -> no entry
+ORDER_BOOK_MAX_AGE_SECONDS = 5       # Ignore the book if no update arrived for this long
+
+# --- Order lifecycle (utils/order_manager.py) ---
+ORDER_RECONCILE_INTERVAL_SECONDS = float(os.getenv("ORDER_RECONCILE_INTERVAL_SECONDS", 60))  # diff against GET /v2/orders/open; 0 disables
+ORDER_RECONCILE_GRACE_SECONDS = 10   # a tracked order missing from the open list is only closed once this old
+ORDER_HISTORY_SIZE = 1000            # finished orders kept indexed for late WS frames
+
 # --- Lot size ---
 DELTA_EXCHANGE_BTC_LOT_SIZE = 0.001  # min lot
 LOT_SIZE_BTC = 0.005                 # trading size
@@ -53,3 +102,64 @@ assert LOT_SIZE_BTC % DELTA_EXCHANGE_BTC_LOT_SIZE == 0, \
 # --- Fees & misc ---
 FIXED_FEE_PER_TRADE = float(os.getenv("FEE_PER_TRADE", 0.10))
 POLLING_INTERVAL_SECONDS = 50
+
+# --- Trade ledger (utils/ledger_writer.py) ---
+TRADE_LEDGER_DIR = os.getenv("TRADE_LEDGER_DIR", ".")
+TRADE_LEDGER_ROTATE_DAILY = True     # trade_log_YYYY-MM-DD.csv
+TRADE_LEDGER_FSYNC = "interval"      # "always" | "interval" | "never"
+TRADE_LEDGER_FSYNC_INTERVAL = 1.0    # seconds, for "interval"
+TRADE_LEDGER_PARQUET = False         # also write Parquet segments (needs pyarrow)
+
+# --- SQLite ledger: orders, fills, positions, trades (utils/sqlite_ledger.py); "" disables ---
+SQLITE_LEDGER_PATH = os.getenv("SQLITE_LEDGER_PATH", "ledger.sqlite3")
+
+# --- Latency metrics (utils/metrics.py): Prometheus text on http://METRICS_HOST:METRICS_PORT/metrics; 0 disables ---
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# --- On-demand profiling (utils/profiler.py): SIGUSR1 / SIGUSR2 or `nc 127.0.0.1 PROFILE_ADMIN_PORT`; port 0 = signals only ---
+PROFILE_ADMIN_PORT = int(os.getenv("PROFILE_ADMIN_PORT", 9208))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_DEFAULT_SECONDS = 30
+PROFILE_SAMPLE_INTERVAL_MS = 5
+
+# --- State journal (crash-safe warm restart) ---
+STATE_JOURNAL_PATH = os.getenv("STATE_JOURNAL_PATH", "bot_state.journal")
+JOURNAL_SNAPSHOT_EVERY = 1000   # compact the journal into one snapshot after this many records
+JOURNAL_FSYNC = True            # fsync each record; state changes are rare enough to afford it
+
+# --- Paper trading (api/paper_client.py): orders fill in a local matcher on the live feed ---
+PAPER_TRADING = os.getenv("PAPER_TRADING", "0") == "1"
+PAPER_LATENCY_MS = float(os.getenv("PAPER_LATENCY_MS", 150))   # order submit -> matcher delay
+PAPER_SLIPPAGE_PCT = 0.0002          # against us on market and stop fills (when no L2 book VWAP is available)
+if PAPER_TRADING:
+    # Keep paper state, fills and trades away from the live files
+    STATE_JOURNAL_PATH = os.getenv("PAPER_STATE_JOURNAL_PATH", "paper_bot_state.journal")
+    SQLITE_LEDGER_PATH = os.getenv("PAPER_SQLITE_LEDGER_PATH", "paper_ledger.sqlite3")
+    TRADE_LEDGER_DIR = os.getenv("PAPER_TRADE_LEDGER_DIR", "paper")
+
+# --- Backtests (backtest/) ---
+CANDLE_CACHE_DIR = os.getenv("CANDLE_CACHE_DIR", "candle_cache")   # one .npz per symbol/resolution/month
+BACKTEST_INTRABAR_RESOLUTION = "1m"  # settles bars that touch both SL and TP
+
+# Walk-forward selection (backtest/walk_forward.py): EmaRsiStrategy params searched per window
+WALK_FORWARD_GRID = {"ema_period": [15, 20, 25, 35, 50], "rsi_long": [50, 55, 60], "rsi_short": [40, 45, 50],
+                     "stoploss_pct": [0.002, 0.004], "target_pct": [0.003, 0.005, 0.008]}
+WALK_FORWARD_OPTIMIZE_DAYS = 180
+WALK_FORWARD_TEST_DAYS = 30
+WALK_FORWARD_OBJECTIVE = "sharpe"    # "sharpe" (per-trade) | "net_pnl" | "profit_factor"
+WALK_FORWARD_MIN_TRADES = 20         # parameter sets with fewer in-sample trades are never selected
+
+# Monte Carlo sizing (backtest/monte_carlo.py): resampled trade sequences with perturbed costs
+MONTE_CARLO_PATHS = 100_000
+MONTE_CARLO_CHUNK_BYTES = 256 * 2**20  # working-set cap for one chunk of paths
+MONTE_CARLO_INITIAL_EQUITY = float(os.getenv("MONTE_CARLO_EQUITY", 1000.0))   # account equity, quote currency
+MONTE_CARLO_MAX_DRAWDOWN_PCT = 0.20  # drawdown budget as a share of MONTE_CARLO_INITIAL_EQUITY
+MONTE_CARLO_CONFIDENCE = 0.95        # drawdown quantile that must stay within the budget
+MONTE_CARLO_FEE_MULT = (1.0, 1.5)    # per-path fee multiplier range
+MONTE_CARLO_SLIPPAGE_PCT = (0.0, 0.0005)   # extra slippage per side, drawn per trade
+MONTE_CARLO_MAX_LOTS = 10            # sizes tried: 1..N x DELTA_EXCHANGE_BTC_LOT_SIZE
+
+# --- Session recording ---
+# Set WS_RECORD_DIR to capture every raw WS frame for offline replay (replay_session.py)
+WS_RECORD_DIR = os.getenv("WS_RECORD_DIR")
@@ -15,91 +15,137 @@ load_dotenv()
 # --- Project imports ---
 import config
 from api.delta_client import DeltaAPIClient
+from api.paper_client import PaperTradingClient
 from ws_confilct.candle_ws import WebSocketCandleClient
+from utils.candle_aggregator import CandleAggregator
+from utils.candle_validation import LiveCandleValidator
 from ws_confilct.order_ws import OrderWebSocketRouter
-from utils.trade_logger import trade_log, TRADE_LOG_FILE
+from ws_confilct.orderbook_ws import WebSocketOrderBookClient
+from utils.trade_logger import trade_log, get_trade_ledger
+from utils.sqlite_ledger import get_sqlite_ledger
 from utils.indicators import calculate_indicators
-from strategy.simple_ema_rsi import (
-    check_entry_signal,
-    calculate_initial_sl_tp,
-    get_initial_historical_candles,
-    place_sl_tp_orders,
-)
+from strategy.simple_ema_rsi import get_initial_historical_candles
+from strategy.bar_handler import handle_bar_close
+from strategy.shadow import ShadowBook, expand_grid
 from utils.bot_state_manager import manager as bot_state
+from utils.order_manager import manager as order_manager
+from utils.session_recorder import SessionRecorder
+from utils.startup_pipeline import run_startup_pipeline, print_startup_timings
+from utils.metrics import serve_metrics
+from utils.profiler import PROFILER, install_profiler_hooks
 
 # --- REST API client ---
 API_KEY = os.getenv("DELTA_API_KEY")
 API_SECRET = os.getenv("DELTA_API_SECRET")
-if not API_KEY or not API_SECRET:
-    raise SystemExit("❌ DELTA_API_KEY / DELTA_API_SECRET not set.")
-
-delta_client = DeltaAPIClient(API_KEY, API_SECRET, config.BASE_URL)
-
-# current_pos = delta_client.get_position(config.SYMBOL)
-
-# if current_pos is not None:
-#     size = float(current_pos.get("size", 0.0))
-#     avg_price = float(current_pos.get("avg_entry_price", 0.0))
-
-#     # Determine side based on size
-#     if size > 0:
-#         side = "long"
-#     elif size < 0:
-#         side = "short"
-#     else:
-#         side = None
-
-#     if side is not None:
-#         bot_state.mark_entry(
-#             position_type=side,
-#             entry_price=avg_price,
-#             position_size=abs(size)
-#         )
-#         print(f"ℹ️ Existing position detected on startup: {side} {abs(size)} @ {avg_price}")
-#     else:
-#         bot_state.reset_all()
-#         print("ℹ️ No valid open positions on startup, bot is flat")
-# else:
-#     bot_state.reset_all()
-#     print("ℹ️ No open positions on startup, bot is flat")
-
-# --- Safe cancel helper ---
-def safe_cancel(client, order_id):
-    if not order_id:
-        return
-    try:
-        client.cancel_order(order_id)
-    except Exception as e:
-        print(f"⚠️ Failed to cancel order {order_id}: {e}")
+if config.PAPER_TRADING:
+    # Orders fill locally; the exchange client only serves candles and product details
+    delta_client = PaperTradingClient(DeltaAPIClient(API_KEY or "", API_SECRET or "", config.BASE_URL))
+else:
+    if not API_KEY or not API_SECRET:
+        raise SystemExit("❌ DELTA_API_KEY / DELTA_API_SECRET not set.")
+    delta_client = DeltaAPIClient(API_KEY, API_SECRET, config.BASE_URL)
 
 # --- Main Bot Loop ---
 def run_bot():
-    print("🤖 Bot starting...")
+    print("🤖 Bot starting..." + (" (📝 paper trading)" if config.PAPER_TRADING else ""))
 
     candle_queue = queue.Queue()
 
+    # Optional raw frame capture for offline replay
+    recorder = None
+    if config.WS_RECORD_DIR:
+        os.makedirs(config.WS_RECORD_DIR, exist_ok=True)
+        session_name = datetime.now(timezone.utc).strftime("session_%Y%m%d_%H%M%S.rec.gz")
+        recorder = SessionRecorder(os.path.join(config.WS_RECORD_DIR, session_name))
+        print(f"🎙️ Recording WS frames to {recorder.path}")
+
+    # Higher timeframes (and RESOLUTION itself) are built locally from one finer candle stream
+    aggregator = None
+    if config.CANDLE_BASE_RESOLUTION != config.RESOLUTION:
+        aggregator = CandleAggregator(config.CANDLE_BASE_RESOLUTION, config.CANDLE_TIMEFRAMES + [config.RESOLUTION],
+                                      history=config.CANDLE_TIMEFRAME_HISTORY, hold=True)
+        aggregator.on_bar(config.RESOLUTION, candle_queue.put)
+
     # Start WebSocket for candles
-    ws_client = WebSocketCandleClient(config.WS_URL, config.SYMBOL, config.RESOLUTION, candle_queue)
+    ws_client = WebSocketCandleClient(config.WS_URL, config.SYMBOL, config.CANDLE_BASE_RESOLUTION if aggregator
+                                      else config.RESOLUTION, aggregator or candle_queue, recorder=recorder,
+                                      on_update=delta_client.on_candle if config.PAPER_TRADING else None)
     ws_client.start()
 
+    # Order/fill/position history goes to the SQLite ledger
+    ledger = get_sqlite_ledger()
+
     # Start WS router for live order/position updates
     router = OrderWebSocketRouter(
         on_log=lambda m: print(f"[ORDER_WS] {m}"),
-        on_error=lambda m: print(f"[ORDER_WS][ERROR] {m}")
+        on_error=lambda m: print(f"[ORDER_WS][ERROR] {m}"),
+        on_event=ledger.on_ws_event if ledger else None,
+        recorder=recorder,
     )
+    # SL/TP transitions from WS, REST replies and reconciliation keep bot_state's order ids current
+    order_manager.on_change(router.on_order_change)
+    if config.PAPER_TRADING:
+        # Simulated fills come back as user.orders / user.positions frames through the same router
+        delta_client.attach_router(router)
+
+    # Local L2 book for slippage-aware entries
+    book_client = None
+    if config.USE_ORDER_BOOK:
+        book_client = WebSocketOrderBookClient(config.WS_URL, [config.SYMBOL], recorder=recorder)
+        book_client.start()
+        if config.PAPER_TRADING:
+            delta_client.book_for = book_client.get_book
 
     # Make sure enough candles for indicators
     min_candles = max(config.EMA_LONG_PERIOD, config.ATR_PERIOD, config.RSI_PERIOD) + 2
     min_candles = max(min_candles, 50)
 
-    # Seed candles from history
-    df_candles = get_initial_historical_candles(config.SYMBOL, config.RESOLUTION, min_candles, delta_client)
+    # Journal replay, then position / open orders / product / candle history in parallel,
+    # then reconciliation of the restored state against the exchange
+    startup = run_startup_pipeline(
+        delta_client,
+        bot_state,
+        config.SYMBOL,
+        config.PRODUCT_ID,
+        config.RESOLUTION,
+        min_candles,
+        journal_path=config.STATE_JOURNAL_PATH,
+        journal_snapshot_every=config.JOURNAL_SNAPSHOT_EVERY,
+        journal_fsync=config.JOURNAL_FSYNC,
+    )
+    print_startup_timings(startup)
+    # Periodic diff of the tracked orders against GET /v2/orders/open (WS frames do the rest)
+    order_manager.start_reconciler(delta_client, [config.SYMBOL])
+    if aggregator:
+        # Buckets already in progress are completed from base history, then the held live bars replay
+        aggregator.seed_from_client(delta_client, config.SYMBOL)
+    df_candles = startup.df_candles
     if df_candles.empty:
         print("❌ Initial candle data empty. Exiting.")
         ws_client.stop()
+        if book_client:
+            book_client.stop()
+        if recorder:
+            recorder.close()
         return
 
     df_candles = calculate_indicators(df_candles)
+    PROFILER.watch("candle_queue", candle_queue.qsize)
+
+    # Live bars get the same checks as the history, continuing from its last bar
+    validator = None
+    if config.CANDLE_VALIDATION:
+        validator = LiveCandleValidator(config.RESOLUTION)
+        validator.seed(config.SYMBOL, df_candles)
+    PROFILER.watch("df_candles_rows", lambda: len(df_candles))
+
+    # Parameter variants traded virtually on the same bars
+    shadow = None
+    if config.SHADOW_ENABLED:
+        shadow = ShadowBook(config.SYMBOL, expand_grid(config.SHADOW_GRID), log_dir=config.SHADOW_LOG_DIR)
+        shadow.seed(df_candles)
+        print(f"👻 Shadow-trading {len(shadow.variants)} variants"
+              + (f", log in {shadow.log.directory}" if shadow.log else ""))
     print("✅ Bot ready. Waiting for live candles...")
 
     while True:
@@ -107,6 +153,11 @@ def run_bot():
             new_candle = False
             while not candle_queue.empty():
                 c = candle_queue.get(timeout=1)
+                if validator and c['time'] != df_candles.index[-1]:
+                    c = validator.check(c)
+                    if c is None:
+                        continue
+                c.pop('symbol', None)
                 cdf = pd.DataFrame([c], index=[c['time']])
                 if not df_candles.empty and c['time'] == df_candles.index[-1]:
                     df_candles.loc[c['time']] = cdf.iloc[0]
@@ -114,86 +165,19 @@ def run_bot():
                     df_candles = pd.concat([df_candles, cdf])
                 df_candles = df_candles.iloc[-(min_candles + 10):]
                 new_candle = True
+                if shadow and shadow.on_bar(c['time'], c['High'], c['Low'], c['Close']) is not None \
+                        and shadow.live_bars % config.SHADOW_SUMMARY_EVERY_BARS == 0:
+                    shadow.print_summary()
 
             if not new_candle:
                 time.sleep(config.POLLING_INTERVAL_SECONDS)
                 continue
 
-            # Recalculate indicators
-            df_candles = calculate_indicators(df_candles)
-            if pd.isna(df_candles[f'EMA{config.EMA_LONG_PERIOD}'].iloc[-1]) or pd.isna(df_candles['RSI'].iloc[-1]):
-                time.sleep(config.POLLING_INTERVAL_SECONDS)
-                continue
-
-            current_price = float(df_candles['Close'].iloc[-1])
-
-            # --- POSITION MANAGEMENT ---
-            st = bot_state.get_state()
-            if st['in_position']:
-                # Long position
-                if st['current_position_type'] == 'long':
-                    if current_price > st['highest_price_since_entry']:
-                        new_sl = current_price * (1 - config.TRAIL_STOPLOSS_PCT)
-                        # Only update if no previous TSL or new SL is higher
-                        if st['trailing_stop_loss_price'] is None or new_sl > st['trailing_stop_loss_price']:
-                            print(f"📈 Updating TSL: {st['trailing_stop_loss_price']} → {new_sl:.2f}")
-                            safe_cancel(delta_client, st['sl_order_id'])
-                            new_sl_id, _ = place_sl_tp_orders(
-                                delta_client,
-                                config.SYMBOL,
-                                'long',
-                                new_sl,
-                                st['initial_take_profit_price'],
-                                st['current_position_size']
-                            )
-                            if new_sl_id:
-                                bot_state.set_sl_tp_order_ids(new_sl_id, st['tp_order_id'])
-                            bot_state.set_trailing_stop(new_sl)
-
-                # Short position
-                elif st['current_position_type'] == 'short':
-                    if current_price < st['lowest_price_since_entry']:
-                        new_sl = current_price * (1 + config.TRAIL_STOPLOSS_PCT)
-                        # Only update if no previous TSL or new SL is lower
-                        if st['trailing_stop_loss_price'] is None or new_sl < st['trailing_stop_loss_price']:
-                            print(f"📉 Updating TSL: {st['trailing_stop_loss_price']} → {new_sl:.2f}")
-                            safe_cancel(delta_client, st['sl_order_id'])
-                            new_sl_id, _ = place_sl_tp_orders(
-                                delta_client,
-                                config.SYMBOL,
-                                'short',
-                                new_sl,
-                                st['initial_take_profit_price'],
-                                st['current_position_size']
-                            )
-                            if new_sl_id:
-                                bot_state.set_sl_tp_order_ids(new_sl_id, st['tp_order_id'])
-                            bot_state.set_trailing_stop(new_sl)
-
-
-            else:
-                # --- ENTRY LOGIC (one trade at a time) ---
-                entry_signal, signal_type = check_entry_signal(df_candles, st)
-                if entry_signal:
-                    side = 'buy' if signal_type == 'long' else 'sell'
-                    resp = delta_client.place_order(config.SYMBOL, side, config.LOT_SIZE_BTC, order_type='market')
-                    if resp and resp.get('success'):
-                        avg_price = float(resp['result']['average_fill_price'])
-                        print(f"🟢 Entry executed at {avg_price:.2f}")
-                        sl, tp = calculate_initial_sl_tp(avg_price, signal_type, config.stoploss_pct, config.target_pct)
-                        bot_state.mark_entry(
-                            position_type=signal_type,
-                            entry_price= avg_price,
-                            position_size= config.LOT_SIZE_BTC,
-                            sl_price=sl,
-                            tp_price=tp
-                            )
-
-                        
-                        # bot_state.set_initial_sl_tp(sl, tp)
-
-                        sl_id, tp_id = place_sl_tp_orders(delta_client, config.SYMBOL, signal_type, sl, tp, config.LOT_SIZE_BTC)
-                        bot_state.set_sl_tp_order_ids(sl_id, tp_id)
+            # The strategy engine computes the indicators its live strategy declares
+            book = book_client.get_book(config.SYMBOL) if book_client else None
+            with PROFILER.scope("strategy"):
+                handle_bar_close(delta_client, config.SYMBOL, bot_state, df_candles, order_book=book,
+                                 bar_close_ns=ws_client.last_close_ns.get(config.SYMBOL))
 
             time.sleep(config.POLLING_INTERVAL_SECONDS)
 
@@ -206,11 +190,12 @@ def run_bot():
 
 # --- EXECUTION ---
 if __name__ == "__main__":
-    # Ensure trade log exists
-    if not os.path.exists(TRADE_LOG_FILE):
-        cols = ['Entry Time','Exit Time','Type','Reason','Entry Price','Exit Price','PnL','Net PnL','Session','Initial SL Price','Initial TP Price']
-        pd.DataFrame(columns=cols).to_csv(TRADE_LOG_FILE, index=False)
-        print(f"Created trade log file: {TRADE_LOG_FILE}")
+    # Start the trade ledger writer (creates today's file with its header)
+    get_trade_ledger().flush()
+    if config.METRICS_PORT:
+        serve_metrics(config.METRICS_PORT, config.METRICS_HOST)
+    install_profiler_hooks(config.PROFILE_ADMIN_PORT, out_dir=config.PROFILE_DIR,
+                           sample_interval=config.PROFILE_SAMPLE_INTERVAL_MS / 1000)
 
     try:
         run_bot()
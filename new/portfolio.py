@@ -0,0 +1,198 @@
+# your_trading_bot/portfolio.py
+"""
+Trades several symbols from a single process:
+  - one pooled DeltaAPIClient with a shared REST rate budget,
+  - one multiplexed candle WebSocket and one private order/position WebSocket,
+  - one BotStateManager (with its own journal) and CandleStore per product,
+  - strategy evaluation scheduled per bar close across all symbols.
+
+    PORTFOLIO_SYMBOLS=BTCUSD,ETHUSD python portfolio.py
+"""
+
+import os
+import queue
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import config
+from api.delta_client import DeltaAPIClient
+from ws_confilct.candle_ws import WebSocketCandleClient
+from ws_confilct.order_ws import OrderWebSocketRouter
+from ws_confilct.private_ws import start_private_ws
+from utils.bot_state_manager import BotStateManager
+from utils.candle_store import CandleStore
+from utils.order_manager import manager as order_manager
+from utils.rate_limiter import TokenBucket
+from utils.sqlite_ledger import get_sqlite_ledger
+from utils.metrics import serve_metrics
+from utils.profiler import PROFILER, install_profiler_hooks
+from utils.startup_pipeline import run_startup_pipeline, print_startup_timings
+from strategy.bar_handler import act_on_bar
+from strategy.engine import live_engine
+
+
+@dataclass
+class SymbolContext:
+    symbol: str
+    product_id: int
+    state: BotStateManager
+    candles: CandleStore
+    quantity: float
+
+
+class BarCloseScheduler:
+    """
+    Groups completed bars by their start time. A bar time is released for evaluation
+    once every symbol has reported it, or `grace_seconds` after the first one did,
+    so one slow feed cannot hold back the rest of the portfolio.
+    """
+
+    def __init__(self, symbols, grace_seconds):
+        self.symbols = set(symbols)
+        self.grace_seconds = grace_seconds
+        self._pending = {}   # bar time -> (first seen monotonic, set of symbols)
+
+    def add(self, symbol, bar_time):
+        first_seen, reported = self._pending.setdefault(bar_time, (time.monotonic(), set()))
+        reported.add(symbol)
+
+    def pop_due(self):
+        now = time.monotonic()
+        due = []
+        for bar_time in sorted(self._pending):
+            first_seen, reported = self._pending[bar_time]
+            if reported >= self.symbols or now - first_seen >= self.grace_seconds:
+                due.append((bar_time, sorted(reported)))
+        for bar_time, _ in due:
+            del self._pending[bar_time]
+        return due
+
+
+def journal_path_for(symbol):
+    root, ext = os.path.splitext(config.STATE_JOURNAL_PATH)
+    return f"{root}_{symbol}{ext or '.journal'}"
+
+
+def build_contexts(client, symbols, min_candles):
+    """Resolves products and runs every symbol's startup pipeline concurrently."""
+    def start_symbol(symbol):
+        product_id = client.get_product_id(symbol)
+        state = BotStateManager()
+        result = run_startup_pipeline(
+            client, state, symbol, product_id, config.RESOLUTION, min_candles,
+            journal_path=journal_path_for(symbol),
+            journal_snapshot_every=config.JOURNAL_SNAPSHOT_EVERY,
+            journal_fsync=config.JOURNAL_FSYNC,
+        )
+        print(f"--- {symbol} ---")
+        print_startup_timings(result)
+        return SymbolContext(symbol, product_id, state, CandleStore(symbol, min_candles + 10, result.df_candles),
+                             config.LOT_SIZE_BTC)
+
+    # Warm the shared product cache with a single /v2/products call
+    client.get_product_details(symbols[0])
+    with ThreadPoolExecutor(max_workers=min(8, len(symbols)), thread_name_prefix="startup-symbol") as pool:
+        contexts = list(pool.map(start_symbol, symbols))
+    return {ctx.symbol: ctx for ctx in contexts}
+
+
+def evaluate(client, engine, batch, close_ns=None):
+    """
+    One engine pass for every flat symbol in the batch, then per-symbol execution.
+    close_ns: symbol -> perf_counter_ns of its bar close, for the latency histograms.
+    """
+    flat = {ctx.symbol: ctx.candles.df for ctx in batch if not ctx.state.snapshot()['in_position']}
+    decisions = {}
+    for d in engine.evaluate(flat):
+        decisions.setdefault(d.symbol, d)   # first registered strategy wins per symbol
+    for ctx in batch:
+        if ctx.candles.df.empty:
+            continue
+        d = decisions.get(ctx.symbol)
+        try:
+            act_on_bar(client, ctx.symbol, ctx.state, float(ctx.candles.df['Close'].iloc[-1]),
+                       signal_type=d.signal.side if d else None,
+                       strategy=d.strategy if d else None,
+                       quantity=ctx.quantity,
+                       bar_close_ns=close_ns.get(ctx.symbol) if close_ns else None)
+        except Exception as e:
+            print(f"❌ {ctx.symbol} execution error: {e}")
+            traceback.print_exc()
+
+
+def run_portfolio(symbols):
+    print(f"🤖 Portfolio runner starting for {len(symbols)} symbols: {symbols}")
+    api_key, api_secret = os.getenv("DELTA_API_KEY"), os.getenv("DELTA_API_SECRET")
+    if not api_key or not api_secret:
+        raise SystemExit("❌ DELTA_API_KEY / DELTA_API_SECRET not set.")
+
+    rate_limiter = TokenBucket(config.REST_RATE_LIMIT_PER_SEC, config.REST_RATE_BURST)
+    client = DeltaAPIClient(api_key, api_secret, config.BASE_URL,
+                            pool_size=config.REST_POOL_SIZE, rate_limiter=rate_limiter)
+
+    # One subscription for every symbol; start before backfill so no bar is missed
+    candle_queue = queue.Queue()
+    ws_client = WebSocketCandleClient(config.WS_URL, symbols, config.RESOLUTION, candle_queue)
+    ws_client.start()
+    PROFILER.watch("candle_queue", candle_queue.qsize)
+
+    min_candles = max(config.EMA_LONG_PERIOD, config.ATR_PERIOD, config.RSI_PERIOD) + 2
+    min_candles = max(min_candles, 50)
+    contexts = build_contexts(client, symbols, min_candles)
+    PROFILER.watch("candle_rows", lambda: sum(len(ctx.candles.df) for ctx in contexts.values()))
+    by_product_id = {ctx.product_id: ctx for ctx in contexts.values()}
+
+    def state_for(data):
+        ctx = contexts.get(data.get("product_symbol") or data.get("symbol"))
+        if ctx is None:
+            ctx = by_product_id.get(data.get("product_id"))
+        return ctx.state if ctx else None
+
+    ledger = get_sqlite_ledger()
+    router = OrderWebSocketRouter(state_for=state_for, on_event=ledger.on_ws_event if ledger else None)
+    order_manager.on_change(router.on_order_change)
+    start_private_ws(router, api_key, api_secret)
+    order_manager.start_reconciler(client, symbols)   # one open-orders call covers every symbol
+
+    scheduler = BarCloseScheduler(symbols, config.BAR_CLOSE_GRACE_SECONDS)
+    engine = live_engine()
+    print(f"✅ Portfolio ready. Rate budget {config.REST_RATE_LIMIT_PER_SEC}/s, waiting for bar closes...")
+
+    while True:
+        try:
+            try:
+                c = candle_queue.get(timeout=0.5)
+                ctx = contexts.get(c.get('symbol'))
+                if ctx is not None:
+                    ctx.candles.append(c)
+                    scheduler.add(ctx.symbol, c['time'])
+            except queue.Empty:
+                pass
+
+            for bar_time, batch in scheduler.pop_due():
+                t0 = time.perf_counter()
+                with PROFILER.scope("strategy"):
+                    evaluate(client, engine, [contexts[symbol] for symbol in batch], ws_client.last_close_ns)
+                print(f"🕒 Bar {bar_time}: evaluated {len(batch)}/{len(symbols)} symbols "
+                      f"in {(time.perf_counter() - t0) * 1e3:.1f} ms")
+        except Exception as e:
+            print(f"❌ Portfolio loop error: {e}")
+            traceback.print_exc()
+            time.sleep(5)
+
+
+if __name__ == "__main__":
+    if config.METRICS_PORT:
+        serve_metrics(config.METRICS_PORT, config.METRICS_HOST)
+    install_profiler_hooks(config.PROFILE_ADMIN_PORT, out_dir=config.PROFILE_DIR,
+                           sample_interval=config.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    try:
+        run_portfolio(config.PORTFOLIO_SYMBOLS)
+    except KeyboardInterrupt:
+        print("🛑 Portfolio runner stopped by user.")
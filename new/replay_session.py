@@ -0,0 +1,106 @@
+# your_trading_bot/replay_session.py
+"""
+Replays a recorded WS session (see utils/session_recorder.py) through the live
+handlers and the strategy, without any network access.
+
+    python replay_session.py recordings/session_20250820_101500.rec.gz
+    python replay_session.py session.rec.gz --speed 60 --history candles.csv
+"""
+
+import argparse
+import queue
+import time
+
+import pandas as pd
+
+import config
+from ws_confilct.candle_ws import WebSocketCandleClient
+from ws_confilct.order_ws import OrderWebSocketRouter
+from utils.indicators import calculate_indicators
+from utils.session_recorder import SessionReplayer
+from utils.bot_state_manager import manager as bot_state
+from utils.order_manager import manager as order_manager
+from strategy.simple_ema_rsi import check_entry_signal
+
+
+def load_history(path):
+    """Seed candles from a CSV with a 'time' column plus Open/High/Low/Close/Volume."""
+    df = pd.read_csv(path)
+    df["time"] = pd.to_datetime(df["time"], utc=True)
+    return df.set_index("time").sort_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded WS session through the bot pipeline.")
+    parser.add_argument("recording", help="Path to a .rec.gz file written by SessionRecorder")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="Time-scale factor (1.0 = real time). Omit to replay at max speed.")
+    parser.add_argument("--history", default=None, help="Optional CSV of candles to seed indicators")
+    parser.add_argument("--symbol", default=config.SYMBOL)
+    parser.add_argument("--resolution", default=config.RESOLUTION)
+    args = parser.parse_args()
+
+    bot_state.reset_all()
+    candle_queue = queue.Queue()
+    # Never started: we only borrow its on_message parsing
+    ws_client = WebSocketCandleClient(config.WS_URL, args.symbol, args.resolution, candle_queue)
+    router = OrderWebSocketRouter(on_log=lambda m: None)
+    order_manager.on_change(router.on_order_change)
+
+    df_candles = load_history(args.history) if args.history else pd.DataFrame()
+    min_candles = max(config.EMA_LONG_PERIOD, config.ATR_PERIOD, config.RSI_PERIOD) + 2
+    ema_col = f"EMA{config.EMA_PERIOD}"
+
+    decisions = {"bars": 0, "evaluated": 0, "long": 0, "short": 0}
+    decision_latencies = []
+
+    def after_frame(source):
+        nonlocal df_candles
+        if source != "candle":
+            return
+        while not candle_queue.empty():
+            t0 = time.perf_counter()
+            c = candle_queue.get_nowait()
+            c.pop("symbol", None)
+            cdf = pd.DataFrame([c], index=[c["time"]])
+            if not df_candles.empty and c["time"] == df_candles.index[-1]:
+                df_candles.loc[c["time"]] = cdf.iloc[0]
+            else:
+                df_candles = pd.concat([df_candles, cdf]) if not df_candles.empty else cdf
+            df_candles = df_candles.iloc[-(min_candles + 10):]
+            decisions["bars"] += 1
+            if len(df_candles) < min_candles:
+                continue
+
+            df_candles = calculate_indicators(df_candles)
+            if pd.isna(df_candles[ema_col].iloc[-1]) or pd.isna(df_candles["RSI"].iloc[-1]):
+                continue
+            signal, side = check_entry_signal(df_candles, bot_state.snapshot())
+            decision_latencies.append(time.perf_counter() - t0)
+            decisions["evaluated"] += 1
+            if signal:
+                decisions[side] += 1
+
+    replayer = SessionReplayer(
+        args.recording,
+        handlers={
+            "candle": lambda raw: ws_client.on_message(None, raw),
+            "order": router.handle_raw_message,
+        },
+        speed=args.speed,
+    )
+    stats = replayer.run(after_frame=after_frame)
+
+    print("\n--- Replay summary ---")
+    for k, v in stats.items():
+        print(f"{k}: {v:.3f}" if isinstance(v, float) else f"{k}: {v}")
+    for k, v in decisions.items():
+        print(f"{k}: {v}")
+    if decision_latencies:
+        lat = pd.Series(decision_latencies) * 1e3
+        print(f"bar->decision ms: p50={lat.quantile(0.5):.3f} p99={lat.quantile(0.99):.3f} max={lat.max():.3f}")
+    print(f"final state: {bot_state.get_state()}")
+
+
+if __name__ == "__main__":
+    main()
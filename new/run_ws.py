@@ -138,15 +138,12 @@
 #         print("🛑 Stopping bot...")
 
 # run_ws.py
-import threading
-import time
-import json
-import hmac
-import hashlib
+# Standalone private WS with its own router. Importing this module checks the API keys and
+# builds a router; library code uses ws_confilct.private_ws instead.
 import os
-from websocket import WebSocketApp
 from dotenv import load_dotenv
 from ws_confilct.order_ws import OrderWebSocketRouter
+from ws_confilct.private_ws import generate_signature, start_private_ws
 from utils.bot_state_manager import manager as bot_state
 
 load_dotenv()
@@ -156,39 +153,12 @@ API_SECRET = os.getenv("DELTA_API_SECRET")
 if not API_KEY or not API_SECRET:
     raise SystemExit("❌ DELTA_API_KEY / DELTA_API_SECRET not set.")
 
-def generate_signature(secret: str, message: str) -> str:
-    return hmac.new(bytes(secret, 'utf-8'), bytes(message, 'utf-8'), hashlib.sha256).hexdigest()
-
 router = OrderWebSocketRouter(
     on_log=lambda m: print("[LOG]", m),
     on_error=lambda m: print("[ERROR]", m),
     on_event=lambda name, payload: print(f"[EVENT] {name}: {payload}")
 )
 
-def on_open(ws):
-    timestamp = str(int(time.time()))
-    method = "GET"
-    path = "/live"
-    signature = generate_signature(API_SECRET, method + timestamp + path)
-    ws.send(json.dumps({"type": "auth", "payload": {"api-key": API_KEY, "signature": signature, "timestamp": timestamp}}))
-    print("✅ Auth message sent")
-    ws.send(json.dumps({"type": "subscribe", "payload": {"channels": ["user.orders", "user.positions"]}}))
-    print("✅ Subscription message sent")
-
-def on_message(ws, message):
-    router.handle_raw_message(message)
-
-def on_error(ws, error):
-    print("[WS ERROR]", error)
-
-def on_close(ws, close_status_code, close_msg):
-    print("[WS CLOSED]", close_status_code, close_msg)
-
-def start_ws():
-    print("🔹 WebSocket client starting in a separate thread...")
-    ws_url = "wss://socket.india.delta.exchange"
-    ws_app = WebSocketApp(ws_url, on_open=on_open, on_message=on_message, on_error=on_error, on_close=on_close)
-    ws_thread = threading.Thread(target=ws_app.run_forever, daemon=True)
-    ws_thread.start()
-    print("✅ WebSocket thread started!")
-    return ws_thread
+def start_ws(message_router=None):
+    """Starts the private order/position WS. Pass a router to use your own (e.g. multi-symbol) state wiring."""
+    return start_private_ws(message_router or router, API_KEY, API_SECRET)
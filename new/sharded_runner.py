@@ -0,0 +1,246 @@
+# your_trading_bot/sharded_runner.py
+"""
+Multi-process deployment for large symbol universes:
+
+  ingest process     owns the candle WebSocket + history backfill and writes completed
+                     bars into shared-memory rings (utils/candle_bus.py)
+  N worker processes each own a shard of symbols; they read bars zero-copy from the
+                     rings, compute indicators/signals and send small order intents back
+  this process       the single execution process: REST client, per-symbol state,
+                     private order WS. Order submission stays serialized here.
+
+With METRICS_PORT set, each process serves its own /metrics: this process on METRICS_PORT,
+ingest on +1, worker w on +2+w. Every process takes the profiler signals (kill -USR1 <pid>);
+the admin socket runs in this one. Bar-close timestamps ride along with the bar notifications,
+so bar_close_to_order_ack here spans all three processes.
+
+    PORTFOLIO_SYMBOLS=BTCUSD,ETHUSD,SOLUSD SHARD_WORKERS=3 python sharded_runner.py
+"""
+
+import os
+import queue
+import threading
+import time
+import traceback
+import multiprocessing as mp
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import config
+
+
+def ingest_main(bus_name, symbols, capacity, notify_queues, assignment, min_candles, stop_event):
+    """Ingest process: WS parsing and backfill only, no strategy work."""
+    from concurrent.futures import ThreadPoolExecutor
+    from api.delta_client import DeltaAPIClient
+    from ws_confilct.candle_ws import WebSocketCandleClient
+    from strategy.simple_ema_rsi import get_initial_historical_candles
+    from utils.candle_bus import CandleRingBus
+    from utils.metrics import serve_metrics
+    from utils.profiler import PROFILER, install_profiler_hooks
+
+    threading.current_thread().name = "ingest"
+    if config.METRICS_PORT:
+        serve_metrics(config.METRICS_PORT + 1, config.METRICS_HOST)
+    install_profiler_hooks(out_dir=config.PROFILE_DIR, sample_interval=config.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    bus = CandleRingBus.attach(bus_name, symbols, capacity)
+    candle_queue = queue.Queue()
+    ws_client = WebSocketCandleClient(config.WS_URL, symbols, config.RESOLUTION, candle_queue)
+    ws_client.start()
+    PROFILER.watch("candle_queue", candle_queue.qsize)
+
+    client = DeltaAPIClient(os.getenv("DELTA_API_KEY"), os.getenv("DELTA_API_SECRET"), config.BASE_URL)
+
+    def backfill(symbol):
+        df = get_initial_historical_candles(symbol, config.RESOLUTION, min_candles, client)
+        if not df.empty:
+            bus.write_frame(bus.index[symbol], df)
+        return symbol, len(df)
+
+    with ThreadPoolExecutor(max_workers=min(8, len(symbols)), thread_name_prefix="backfill") as pool:
+        for symbol, n in pool.map(backfill, symbols):
+            print(f"[INGEST] {symbol}: {n} history bars in ring")
+
+    try:
+        while not stop_event.is_set():
+            try:
+                c = candle_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            idx = bus.index.get(c.get("symbol"))
+            if idx is None:
+                continue
+            seq = bus.write(idx, c["time"].value // 1000, c["Open"], c["High"], c["Low"], c["Close"], c["Volume"])
+            notify_queues[assignment[idx]].put((idx, seq, ws_client.last_close_ns.get(c["symbol"])))
+    finally:
+        ws_client.stop()
+        bus.close()
+
+
+def worker_main(worker_id, bus_name, symbols, capacity, notify_queue, intent_queue, window, stop_event):
+    """Strategy worker: reads bars from shared memory, evaluates signals, emits intents."""
+    from utils.candle_bus import CandleRingBus, bars_to_frame
+    from strategy.engine import live_engine
+    from utils.metrics import serve_metrics
+    from utils.profiler import PROFILER, install_profiler_hooks
+
+    threading.current_thread().name = f"strategy-{worker_id}"
+    if config.METRICS_PORT:
+        serve_metrics(config.METRICS_PORT + 2 + worker_id, config.METRICS_HOST)
+    install_profiler_hooks(out_dir=config.PROFILE_DIR, sample_interval=config.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    bus = CandleRingBus.attach(bus_name, symbols, capacity)
+    engine = live_engine()
+    try:
+        while not stop_event.is_set():
+            try:
+                idx, _, close_ns = notify_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            # Coalesce a backlog: only the newest bar per symbol matters
+            pending = {idx: close_ns}
+            while True:
+                try:
+                    idx, _, close_ns = notify_queue.get_nowait()
+                    pending[idx] = close_ns
+                except queue.Empty:
+                    break
+
+            for idx, close_ns in pending.items():
+                t0 = time.perf_counter()
+                bars, _ = bus.window(idx, window)
+                if bars is None or len(bars) < 2:
+                    continue
+                # Position state lives in the execution process; workers only report the flat-entry signal
+                with PROFILER.scope("strategy"):
+                    decisions = engine.evaluate({symbols[idx]: bars_to_frame(bars)})
+                intent_queue.put({
+                    "symbol": symbols[idx],
+                    "bar_time_us": int(bars["time"][-1]),
+                    "close": float(bars["close"][-1]),
+                    "signal": decisions[0].signal.side if decisions else None,
+                    "strategy": decisions[0].strategy.name if decisions else None,
+                    "worker": worker_id,
+                    "eval_ms": (time.perf_counter() - t0) * 1e3,
+                    "bar_close_ns": close_ns,
+                })
+    finally:
+        bus.close()
+
+
+def run_sharded(symbols, n_workers):
+    from api.delta_client import DeltaAPIClient
+    from ws_confilct.order_ws import OrderWebSocketRouter
+    from ws_confilct.private_ws import start_private_ws
+    from utils.bot_state_manager import BotStateManager
+    from utils.candle_bus import CandleRingBus
+    from utils.order_manager import manager as order_manager
+    from utils.rate_limiter import TokenBucket
+    from utils.sqlite_ledger import get_sqlite_ledger
+    from utils.startup_pipeline import run_startup_pipeline, print_startup_timings
+    from strategy.bar_handler import act_on_bar
+    from strategy.engine import live_engine
+    from utils.metrics import serve_metrics
+    from utils.profiler import PROFILER, install_profiler_hooks
+    from portfolio import journal_path_for
+
+    api_key, api_secret = os.getenv("DELTA_API_KEY"), os.getenv("DELTA_API_SECRET")
+    if not api_key or not api_secret:
+        raise SystemExit("❌ DELTA_API_KEY / DELTA_API_SECRET not set.")
+
+    if config.METRICS_PORT:
+        serve_metrics(config.METRICS_PORT, config.METRICS_HOST)
+    install_profiler_hooks(config.PROFILE_ADMIN_PORT, out_dir=config.PROFILE_DIR,
+                           sample_interval=config.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    n_workers = max(1, min(n_workers, len(symbols)))
+    print(f"🤖 Sharded runner: {len(symbols)} symbols across {n_workers} strategy workers")
+
+    min_candles = max(config.EMA_LONG_PERIOD, config.ATR_PERIOD, config.RSI_PERIOD) + 2
+    min_candles = max(min_candles, 50)
+    window = min_candles + 10
+
+    ctx = mp.get_context("spawn")
+    bus = CandleRingBus.create(symbols, config.CANDLE_RING_CAPACITY)
+    stop_event = ctx.Event()
+    intent_queue = ctx.Queue()
+    notify_queues = [ctx.Queue() for _ in range(n_workers)]
+    assignment = [i % n_workers for i in range(len(symbols))]
+
+    # --- Execution side: client, state and reconciliation live only here ---
+    client = DeltaAPIClient(api_key, api_secret, config.BASE_URL, pool_size=config.REST_POOL_SIZE,
+                            rate_limiter=TokenBucket(config.REST_RATE_LIMIT_PER_SEC, config.REST_RATE_BURST))
+    client.get_product_details(symbols[0])
+    states, by_product_id = {}, {}
+    for symbol in symbols:
+        product_id = client.get_product_id(symbol)
+        states[symbol] = BotStateManager()
+        by_product_id[product_id] = states[symbol]
+        result = run_startup_pipeline(
+            client, states[symbol], symbol, product_id, config.RESOLUTION, min_candles,
+            journal_path=journal_path_for(symbol),
+            journal_snapshot_every=config.JOURNAL_SNAPSHOT_EVERY,
+            journal_fsync=config.JOURNAL_FSYNC,
+            fetch_candles=False,
+        )
+        print(f"--- {symbol} ---")
+        print_startup_timings(result)
+
+    ledger = get_sqlite_ledger()
+    router = OrderWebSocketRouter(
+        state_for=lambda data: states.get(data.get("product_symbol") or data.get("symbol"))
+        or by_product_id.get(data.get("product_id")),
+        on_event=ledger.on_ws_event if ledger else None,
+    )
+    order_manager.on_change(router.on_order_change)
+    start_private_ws(router, api_key, api_secret)
+    order_manager.start_reconciler(client, symbols)
+
+    processes = [ctx.Process(
+        target=ingest_main, name="ingest",
+        args=(bus.name, symbols, config.CANDLE_RING_CAPACITY, notify_queues, assignment, min_candles, stop_event),
+        daemon=True,
+    )]
+    for w in range(n_workers):
+        processes.append(ctx.Process(
+            target=worker_main, name=f"strategy-{w}",
+            args=(w, bus.name, symbols, config.CANDLE_RING_CAPACITY, notify_queues[w], intent_queue, window, stop_event),
+            daemon=True,
+        ))
+    for p in processes:
+        p.start()
+    engine = live_engine()   # same config as the workers; used here for the risk stage
+    print("✅ Sharded runner ready. Waiting for intents...")
+
+    try:
+        while True:
+            try:
+                intent = intent_queue.get(timeout=1)
+            except queue.Empty:
+                dead = [p.name for p in processes if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Child process exited: {dead}")
+                continue
+            state = states.get(intent["symbol"])
+            if state is None:
+                continue
+            try:
+                with PROFILER.scope("strategy"):
+                    act_on_bar(client, intent["symbol"], state, intent["close"],
+                               signal_type=intent["signal"], strategy=engine.get(intent["strategy"] or ""),
+                               bar_close_ns=intent.get("bar_close_ns"))
+            except Exception as e:
+                print(f"❌ {intent['symbol']} execution error: {e}")
+                traceback.print_exc()
+    finally:
+        stop_event.set()
+        for p in processes:
+            p.join(timeout=5)
+        bus.close()
+
+
+if __name__ == "__main__":
+    try:
+        run_sharded(config.PORTFOLIO_SYMBOLS, config.SHARD_WORKERS)
+    except KeyboardInterrupt:
+        print("🛑 Sharded runner stopped by user.")
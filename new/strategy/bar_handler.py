@@ -0,0 +1,177 @@
+# your_trading_bot/strategy/bar_handler.py
+
+import config
+from strategy.simple_ema_rsi import (
+    calculate_initial_sl_tp,
+    place_sl_tp_orders,
+    plan_entry_order,
+)
+from strategy.engine import live_engine
+from utils.sqlite_ledger import get_sqlite_ledger
+from utils.order_manager import manager as order_manager
+from utils.metrics import METRICS
+
+_BAR_TO_DECISION = METRICS.histogram("bar_close_to_decision", "Candle queued by the WS thread -> signal decided")
+_BAR_TO_ACK = METRICS.histogram("bar_close_to_order_ack", "Candle queued by the WS thread -> entry order acknowledged")
+
+
+# --- Safe cancel helper ---
+def safe_cancel(client, order_id):
+    if not order_id:
+        return
+    try:
+        order_manager.cancel(client, order_id)
+    except Exception as e:
+        print(f"⚠️ Failed to cancel order {order_id}: {e}")
+
+
+def sync_bracket_ids(state, symbol):
+    """Copies the order manager's live SL/TP for `symbol` into the state (a stop that already filled is not kept)."""
+    sl, tp = order_manager.bracket(symbol)
+    state.set_sl_tp_order_ids(sl.exchange_id if sl else None, tp.exchange_id if tp else None)
+
+
+def manage_open_position(client, symbol, state, current_price):
+    """Trails the stop-loss for an open position on a new bar close price."""
+    st = state.snapshot()
+    # Long position
+    if st['current_position_type'] == 'long':
+        if current_price > st['highest_price_since_entry']:
+            new_sl = current_price * (1 - config.TRAIL_STOPLOSS_PCT)
+            # Only update if no previous TSL or new SL is higher
+            if st['trailing_stop_loss_price'] is None or new_sl > st['trailing_stop_loss_price']:
+                print(f"📈 Updating TSL: {st['trailing_stop_loss_price']} → {new_sl:.2f}")
+                safe_cancel(client, st['sl_order_id'])
+                new_sl_id, _ = place_sl_tp_orders(
+                    client,
+                    symbol,
+                    'long',
+                    new_sl,
+                    None,   # the live TP stays
+                    st['current_position_size']
+                )
+                if new_sl_id:
+                    sync_bracket_ids(state, symbol)
+                state.set_trailing_stop(new_sl)
+
+    # Short position
+    elif st['current_position_type'] == 'short':
+        if current_price < st['lowest_price_since_entry']:
+            new_sl = current_price * (1 + config.TRAIL_STOPLOSS_PCT)
+            # Only update if no previous TSL or new SL is lower
+            if st['trailing_stop_loss_price'] is None or new_sl < st['trailing_stop_loss_price']:
+                print(f"📉 Updating TSL: {st['trailing_stop_loss_price']} → {new_sl:.2f}")
+                safe_cancel(client, st['sl_order_id'])
+                new_sl_id, _ = place_sl_tp_orders(
+                    client,
+                    symbol,
+                    'short',
+                    new_sl,
+                    None,   # the live TP stays
+                    st['current_position_size']
+                )
+                if new_sl_id:
+                    sync_bracket_ids(state, symbol)
+                state.set_trailing_stop(new_sl)
+
+
+def execute_entry(client, symbol, state, signal_type, order_book=None, quantity=None, risk=None, bar_close_ns=None):
+    """
+    Places the entry (market or slippage-capped IOC limit), then SL/TP, and records the position.
+    `risk(side, entry_price) -> (sl, tp)` is the strategy's risk stage; defaults to the config percentages.
+    `bar_close_ns` (perf_counter_ns of the bar close) times the close -> order-ack path.
+    """
+    quantity = quantity or config.LOT_SIZE_BTC
+    entry_contracts = int(quantity / client.LOT_SIZE_BTC)
+    tick_size = float(client.get_product_details(symbol).get('tick_size') or 0) or None
+    plan = plan_entry_order(order_book, signal_type, entry_contracts, tick_size)
+    resp = None
+    if plan['order_type']:
+        resp = order_manager.submit(
+            client,
+            symbol,
+            plan['side'],
+            quantity,
+            order_type=plan['order_type'],
+            role='entry',
+            price=plan['price'],
+            time_in_force=plan['time_in_force'],
+        )
+        if bar_close_ns is not None:
+            _BAR_TO_ACK.since(bar_close_ns)
+        ledger = get_sqlite_ledger()
+        if ledger and resp and resp.get('success'):
+            ledger.record_order_submitted(resp['result'], symbol=symbol)
+    fill_price = resp['result'].get('average_fill_price') if resp and resp.get('success') else None
+    if fill_price:
+        avg_price = float(fill_price)
+        position_size = quantity
+        # IOC limits may only partially fill
+        order_size = resp['result'].get('size')
+        unfilled = resp['result'].get('unfilled_size')
+        if order_size and unfilled:
+            position_size = quantity * (float(order_size) - float(unfilled)) / float(order_size)
+        print(f"🟢 Entry executed at {avg_price:.2f}")
+        if plan['expected_price']:
+            realised_slip = (avg_price - plan['expected_price']) / plan['expected_price']
+            print(f"📐 Expected fill {plan['expected_price']:.2f}, realised {avg_price:.2f} "
+                  f"({realised_slip * 1e4:+.2f} bps vs. book estimate)")
+        if risk is not None:
+            sl, tp = risk(signal_type, avg_price)
+        else:
+            sl, tp = calculate_initial_sl_tp(avg_price, signal_type, config.stoploss_pct, config.target_pct)
+        state.mark_entry(
+            position_type=signal_type,
+            entry_price= avg_price,
+            position_size= position_size,
+            sl_price=sl,
+            tp_price=tp,
+            expected_entry_price=plan['expected_price'],
+        )
+
+        place_sl_tp_orders(client, symbol, signal_type, sl, tp, position_size)
+        sync_bracket_ids(state, symbol)
+    elif plan['order_type']:
+        print(f"⚪ Entry order did not fill ({plan['order_type']}), staying flat.")
+
+
+def act_on_bar(client, symbol, state, current_price, signal_type=None, strategy=None, order_book=None, quantity=None,
+               bar_close_ns=None):
+    """
+    Execution stage for one symbol on a completed bar: trail the stop if in a position,
+    otherwise enter on `signal_type` ('long' / 'short') using `strategy`'s risk stage.
+    """
+    if bar_close_ns is not None:
+        _BAR_TO_DECISION.since(bar_close_ns)
+    st = state.snapshot()
+    if st['in_position']:
+        # --- POSITION MANAGEMENT ---
+        manage_open_position(client, symbol, state, current_price)
+    elif signal_type:
+        # --- ENTRY (one trade at a time) ---
+        name = strategy.name if strategy else "default"
+        print(f"✅ {signal_type.upper()} Entry Signal for {symbol} at {current_price} ({name})")
+        execute_entry(client, symbol, state, signal_type, order_book, quantity,
+                      risk=strategy.risk if strategy else None, bar_close_ns=bar_close_ns)
+
+
+def handle_bar_close(client, symbol, state, df_candles, order_book=None, quantity=None, engine=None, bar_close_ns=None):
+    """
+    Runs position management (trailing stop) or entry logic for one symbol on a
+    completed bar. `df_candles` is the OHLCV window ending at that bar; `state` is that
+    symbol's BotStateManager. Signals come from `engine` (the configured live strategy
+    by default); the first strategy that fires for the symbol wins.
+    """
+    current_price = float(df_candles['Close'].iloc[-1])
+    decision = None
+    if not state.snapshot()['in_position']:
+        decisions = (engine or live_engine()).evaluate({symbol: df_candles})
+        decision = decisions[0] if decisions else None
+    act_on_bar(
+        client, symbol, state, current_price,
+        signal_type=decision.signal.side if decision else None,
+        strategy=decision.strategy if decision else None,
+        order_book=order_book,
+        quantity=quantity,
+        bar_close_ns=bar_close_ns,
+    )
@@ -0,0 +1,96 @@
+# your_trading_bot/strategy/base.py
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.indicators import IndicatorSpec
+from strategy.simple_ema_rsi import Signal, NO_SIGNAL, LONG_ENTRY, SHORT_ENTRY
+
+# Side codes returned by Strategy.signal_batch
+FLAT, LONG, SHORT = 0, 1, -1
+SIDE_SIGNALS = {FLAT: NO_SIGNAL, LONG: LONG_ENTRY, SHORT: SHORT_ENTRY}
+
+
+@dataclass
+class BarBatch:
+    """
+    Inputs for one vectorized signal call. Row i is (symbols[i], strategies[i]);
+    last[role][i] / prev[role][i] hold that row's indicator values on the last two bars.
+    """
+    symbols: List[str]
+    strategies: List["Strategy"]
+    close: np.ndarray
+    prev_close: np.ndarray
+    last: Dict[str, np.ndarray]
+    prev: Dict[str, np.ndarray]
+
+
+@dataclass(frozen=True)
+class Decision:
+    symbol: str
+    strategy: "Strategy"
+    signal: Signal
+    bar_time: Any
+    close: float
+
+
+class Strategy(ABC):
+    """
+    Strategy plugin. Three stages, kept separate so one engine can drive many instances:
+      signal    - signal_batch(): vectorized over every (symbol, instance) row of this class
+      risk      - risk(): SL/TP for a fill
+      execution - not here; decisions go to bar_handler (live) or a shadow book
+    Subclasses declare their inputs in indicators() as {role: IndicatorSpec}; the engine
+    computes each distinct spec once per symbol however many instances share it.
+    indicators(), signal_batch() and risk() are abstract: a subclass missing one fails at
+    construction, not on the first bar.
+    """
+
+    kind = ""
+
+    def __init__(self, name: Optional[str] = None, symbols: Optional[Sequence[str]] = None):
+        self.name = name or self.kind
+        self.symbols = set(symbols) if symbols else None   # None -> every symbol the engine sees
+
+    def applies_to(self, symbol: str) -> bool:
+        return self.symbols is None or symbol in self.symbols
+
+    @abstractmethod
+    def indicators(self) -> Dict[str, IndicatorSpec]:
+        """{role: IndicatorSpec} this instance reads from the batch."""
+
+    @classmethod
+    @abstractmethod
+    def signal_batch(cls, batch: BarBatch) -> np.ndarray:
+        """Returns an int8 array of FLAT / LONG / SHORT, one per row of the batch."""
+
+    @abstractmethod
+    def risk(self, side: str, entry_price: float) -> Tuple[float, float]:
+        """(stop_loss_price, take_profit_price) for a fill at entry_price on `side`."""
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+STRATEGY_REGISTRY: Dict[str, type] = {}
+
+
+def register_strategy(cls):
+    """Class decorator: makes a Strategy subclass constructible by its `kind` from config."""
+    if not cls.kind:
+        raise ValueError(f"{cls.__name__} must set a non-empty `kind`")
+    STRATEGY_REGISTRY[cls.kind] = cls
+    return cls
+
+
+def build_strategy(spec: Dict[str, Any]) -> Strategy:
+    """Builds an instance from a config dict: {"kind": ..., "name": ..., "symbols": [...], "params": {...}}."""
+    cls = STRATEGY_REGISTRY.get(spec["kind"])
+    if cls is None:
+        raise ValueError(f"Unknown strategy kind '{spec['kind']}'. Registered: {sorted(STRATEGY_REGISTRY)}")
+    return cls(name=spec.get("name"), symbols=spec.get("symbols"), **spec.get("params", {}))
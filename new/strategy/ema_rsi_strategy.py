@@ -0,0 +1,58 @@
+# your_trading_bot/strategy/ema_rsi_strategy.py
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+import config
+from utils.indicators import IndicatorSpec
+from strategy.base import BarBatch, Strategy, register_strategy, LONG, SHORT, FLAT
+from strategy.simple_ema_rsi import calculate_initial_sl_tp
+
+
+@register_strategy
+class EmaRsiStrategy(Strategy):
+    """
+    EMA cross + RSI momentum filter (the rule in simple_ema_rsi.entry_signal) as a plugin.
+    With default params it reproduces the live bot exactly.
+    """
+
+    kind = "ema_rsi"
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        symbols: Optional[Sequence[str]] = None,
+        ema_period: int = config.EMA_PERIOD,
+        rsi_period: int = config.RSI_PERIOD,
+        rsi_long: float = config.RSI_MOMENTUM_LEVEL,
+        rsi_short: float = config.RSI_MOMENTUM_LEVEL,
+        stoploss_pct: float = config.stoploss_pct,
+        target_pct: float = config.target_pct,
+    ):
+        super().__init__(name, symbols)
+        self.ema_period = ema_period
+        self.rsi_period = rsi_period
+        self.rsi_long = rsi_long
+        self.rsi_short = rsi_short
+        self.stoploss_pct = stoploss_pct
+        self.target_pct = target_pct
+
+    def indicators(self) -> Dict[str, IndicatorSpec]:
+        return {"ema": IndicatorSpec("ema", self.ema_period), "rsi": IndicatorSpec("rsi", self.rsi_period)}
+
+    @classmethod
+    def signal_batch(cls, batch: BarBatch) -> np.ndarray:
+        rsi_long = np.fromiter((s.rsi_long for s in batch.strategies), float, len(batch.strategies))
+        rsi_short = np.fromiter((s.rsi_short for s in batch.strategies), float, len(batch.strategies))
+        close, prev_close = batch.close, batch.prev_close
+        ema, prev_ema, rsi = batch.last["ema"], batch.prev["ema"], batch.last["rsi"]
+        # NaN compares False everywhere, so warm-up rows never fire
+        long_ = (close > ema) & (prev_close <= prev_ema) & (rsi > rsi_long)
+        short = (close < ema) & (prev_close >= prev_ema) & (rsi < rsi_short)
+        return np.where(long_, LONG, np.where(short, SHORT, FLAT)).astype(np.int8)
+
+    def risk(self, side: str, entry_price: float) -> Tuple[float, float]:
+        return calculate_initial_sl_tp(entry_price, side, self.stoploss_pct, self.target_pct)
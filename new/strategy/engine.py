@@ -0,0 +1,121 @@
+# your_trading_bot/strategy/engine.py
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+from utils.indicators import IndicatorSpec, compute_indicator
+from utils.metrics import METRICS
+from strategy.base import BarBatch, Decision, Strategy, SIDE_SIGNALS, build_strategy
+import strategy.ema_rsi_strategy  # noqa: F401  registers the built-in plugins
+
+
+_INDICATOR_LATENCY = METRICS.histogram("engine_indicators", "StrategyEngine.evaluate indicator stage")
+_SIGNAL_LATENCY = METRICS.histogram("engine_signals", "StrategyEngine.evaluate signal stage")
+
+
+class StrategyEngine:
+    """
+    Evaluates every registered strategy instance on the latest bar of each symbol:
+      1. the union of declared indicators is computed once per (symbol, spec),
+      2. each strategy class gets a single vectorized signal_batch() call covering
+         all of its instances on all symbols,
+      3. fired rows come back as Decisions for an execution stage to act on.
+    """
+
+    def __init__(self, strategies: Iterable[Strategy] = ()):
+        self.strategies: List[Strategy] = []
+        self._by_name: Dict[str, Strategy] = {}
+        self.last_stats: Dict[str, float] = {}
+        for s in strategies:
+            self.register(s)
+
+    def register(self, strategy: Strategy) -> Strategy:
+        if strategy.name in self._by_name:
+            raise ValueError(f"Duplicate strategy name '{strategy.name}'")
+        self.strategies.append(strategy)
+        self._by_name[strategy.name] = strategy
+        return strategy
+
+    def get(self, name: str) -> Optional[Strategy]:
+        return self._by_name.get(name)
+
+    def required_indicators(self, symbol: str) -> set:
+        return {spec for s in self.strategies if s.applies_to(symbol) for spec in s.indicators().values()}
+
+    def compute_indicators(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict[IndicatorSpec, np.ndarray]]:
+        return {
+            symbol: {spec: compute_indicator(df, spec) for spec in self.required_indicators(symbol)}
+            for symbol, df in frames.items()
+        }
+
+    def evaluate(self, frames: Dict[str, pd.DataFrame], include_flat: bool = False) -> List[Decision]:
+        """
+        frames: symbol -> OHLCV DataFrame ending at the bar just closed.
+        Returns fired decisions (every row if include_flat), ordered by registration.
+        """
+        t0 = time.perf_counter()
+        frames = {s: df for s, df in frames.items() if len(df) >= 2}
+        values = self.compute_indicators(frames)
+        t1 = time.perf_counter()
+
+        closes = {s: df['Close'].to_numpy(dtype=float) for s, df in frames.items()}
+        groups = defaultdict(list)   # strategy class -> [(symbol, strategy)]
+        for strategy in self.strategies:
+            for symbol in frames:
+                if strategy.applies_to(symbol):
+                    groups[type(strategy)].append((symbol, strategy))
+
+        decisions = []
+        for cls, rows in groups.items():
+            roles = rows[0][1].indicators().keys()
+            last = {r: np.empty(len(rows)) for r in roles}
+            prev = {r: np.empty(len(rows)) for r in roles}
+            close = np.empty(len(rows))
+            prev_close = np.empty(len(rows))
+            for i, (symbol, strategy) in enumerate(rows):
+                close[i], prev_close[i] = closes[symbol].item(-1), closes[symbol].item(-2)
+                for role, spec in strategy.indicators().items():
+                    series = values[symbol][spec]
+                    last[role][i], prev[role][i] = series.item(-1), series.item(-2)
+            batch = BarBatch([r[0] for r in rows], [r[1] for r in rows], close, prev_close, last, prev)
+            sides = cls.signal_batch(batch)
+            for i in (range(len(rows)) if include_flat else np.flatnonzero(sides)):
+                symbol, strategy = rows[i]
+                decisions.append(Decision(symbol, strategy, SIDE_SIGNALS[int(sides[i])],
+                                          frames[symbol].index[-1], float(close[i])))
+
+        order = {id(s): i for i, s in enumerate(self.strategies)}
+        decisions.sort(key=lambda d: order[id(d.strategy)])
+        t2 = time.perf_counter()
+        _INDICATOR_LATENCY.record(int((t1 - t0) * 1e9))
+        _SIGNAL_LATENCY.record(int((t2 - t1) * 1e9))
+        self.last_stats = {
+            "indicator_ms": (t1 - t0) * 1e3,
+            "signal_ms": (t2 - t1) * 1e3,
+            "indicator_series": sum(len(v) for v in values.values()),
+            "rows": sum(len(r) for r in groups.values()),
+        }
+        return decisions
+
+
+def build_engine(specs: Optional[List[dict]] = None) -> StrategyEngine:
+    """Engine holding the configured live strategy (or the given config dicts)."""
+    return StrategyEngine(build_strategy(spec) for spec in (specs or [config.LIVE_STRATEGY]))
+
+
+_live_engine = None
+
+
+def live_engine() -> StrategyEngine:
+    """Process-wide engine for config.LIVE_STRATEGY, built on first use."""
+    global _live_engine
+    if _live_engine is None:
+        _live_engine = build_engine()
+    return _live_engine
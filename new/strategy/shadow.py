@@ -0,0 +1,183 @@
+# your_trading_bot/strategy/shadow.py
+
+from __future__ import annotations
+
+import itertools
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+from utils.columnar_log import ColumnarLog
+from utils.indicators import IncrementalIndicators
+from strategy.ema_rsi_strategy import EmaRsiStrategy
+
+# Event codes in the shadow log
+EVENT_ENTRY, EVENT_TP, EVENT_SL = 1, 2, 3
+
+SHADOW_SCHEMA = {
+    "time_us": "i8",     # bar start time of the event
+    "variant": "i2",     # index into meta["variants"]
+    "event": "i1",       # EVENT_*
+    "side": "i1",        # 1 long, -1 short
+    "price": "f8",       # virtual fill price
+    "pnl": "f8",         # realised on exits (after FIXED_FEE_PER_TRADE), 0 on entries
+}
+
+
+def expand_grid(grid: Dict[str, list]) -> List[EmaRsiStrategy]:
+    """Cartesian product of EmaRsiStrategy params, e.g. {"ema_period": [20, 25], "rsi_long": [50, 55]}."""
+    keys = sorted(grid)
+    variants = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        params = dict(zip(keys, values))
+        name = "_".join(f"{k}={v}" for k, v in params.items())
+        variants.append(EmaRsiStrategy(name=name, **params))
+    return variants
+
+
+class ShadowBook:
+    """
+    Paper-trades many EmaRsiStrategy variants on one symbol's live bars. No orders are sent.
+
+    Indicators for every distinct EMA/RSI period come from one IncrementalIndicators, so a bar
+    costs O(variants) vectorized ops regardless of history length. Entries fill at the signal
+    bar's close (the live bot enters with a market order right after the close); exits fill at
+    the SL/TP price on the first later bar whose high/low crosses it, SL first if both do.
+    The trailing stop is not modelled.
+    """
+
+    def __init__(self, symbol: str, variants: List[EmaRsiStrategy], quantity: float = config.LOT_SIZE_BTC,
+                 fee_per_trade: float = config.FIXED_FEE_PER_TRADE, log_dir: Optional[str] = None):
+        self.symbol = symbol
+        self.variants = list(variants)
+        self.quantity = quantity
+        self.fee_per_trade = fee_per_trade
+        n = len(self.variants)
+
+        self.ind = IncrementalIndicators([v.ema_period for v in self.variants], [v.rsi_period for v in self.variants])
+        self._ema_idx = np.array([self.ind.ema_index(v.ema_period) for v in self.variants])
+        self._rsi_idx = np.array([self.ind.rsi_index(v.rsi_period) for v in self.variants])
+        self._rsi_long = np.array([v.rsi_long for v in self.variants], dtype=float)
+        self._rsi_short = np.array([v.rsi_short for v in self.variants], dtype=float)
+        self._sl_pct = np.array([v.stoploss_pct for v in self.variants], dtype=float)
+        self._tp_pct = np.array([v.target_pct for v in self.variants], dtype=float)
+
+        # Virtual positions
+        self.side = np.zeros(n, dtype=np.int8)
+        self.entry = np.full(n, np.nan)
+        self.sl = np.full(n, np.nan)
+        self.tp = np.full(n, np.nan)
+        # Per-variant results
+        self.trades = np.zeros(n, dtype=np.int64)
+        self.wins = np.zeros(n, dtype=np.int64)
+        self.pnl = np.zeros(n)
+
+        self.last_bar_time = None
+        self.live_bars = 0
+        self.last_update_us = 0.0
+        self.log = None
+        if log_dir:
+            run = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+            meta = {"symbol": symbol, "quantity": quantity, "fee_per_trade": fee_per_trade,
+                    "variants": [{"name": v.name, **self._params(v)} for v in self.variants]}
+            self.log = ColumnarLog(os.path.join(log_dir, symbol, run), SHADOW_SCHEMA, meta)
+
+    @staticmethod
+    def _params(v: EmaRsiStrategy) -> dict:
+        return {"ema_period": v.ema_period, "rsi_period": v.rsi_period, "rsi_long": v.rsi_long,
+                "rsi_short": v.rsi_short, "stoploss_pct": v.stoploss_pct, "target_pct": v.target_pct}
+
+    def seed(self, df_candles: pd.DataFrame) -> None:
+        """Warms the indicators on history; no virtual trades are taken on it."""
+        if df_candles.empty:
+            return
+        self.ind.seed(df_candles["Close"].to_numpy(dtype=float))
+        self.last_bar_time = df_candles.index[-1]
+
+    def on_bar(self, bar_time, high: float, low: float, close: float) -> Optional[int]:
+        """Processes one completed bar. Returns the number of logged events, or None for an already seen bar."""
+        if self.last_bar_time is not None and bar_time <= self.last_bar_time:
+            return None
+        t0 = time.perf_counter()
+        self.last_bar_time = bar_time
+        self.live_bars += 1
+        time_us = pd.Timestamp(bar_time).value // 1000
+        events = []
+
+        # --- Exits on positions opened before this bar ---
+        is_long, is_short = self.side == 1, self.side == -1
+        sl_hit = (is_long & (low <= self.sl)) | (is_short & (high >= self.sl))
+        tp_hit = ~sl_hit & ((is_long & (high >= self.tp)) | (is_short & (low <= self.tp)))
+        exiting = sl_hit | tp_hit
+        if exiting.any():
+            exit_price = np.where(sl_hit, self.sl, self.tp)
+            gross = (exit_price - self.entry) * self.side * self.quantity
+            net = gross - 2 * self.fee_per_trade   # entry + exit fee
+            idx = np.flatnonzero(exiting)
+            self.pnl[idx] += net[idx]
+            self.trades[idx] += 1
+            self.wins[idx] += net[idx] > 0
+            events.append((idx, np.where(sl_hit[idx], EVENT_SL, EVENT_TP), self.side[idx], exit_price[idx], net[idx]))
+            self.side[idx] = 0
+
+        # --- Indicators, then entries for flat variants (same rule as EmaRsiStrategy.signal_batch) ---
+        prev_close = self.ind.last_close
+        self.ind.update(close)
+        ema = self.ind.ema[self._ema_idx]
+        prev_ema = self.ind.prev_ema[self._ema_idx]
+        rsi = self.ind.rsi[self._rsi_idx]
+        flat = self.side == 0
+        go_long = flat & (close > ema) & (prev_close <= prev_ema) & (rsi > self._rsi_long)
+        go_short = flat & (close < ema) & (prev_close >= prev_ema) & (rsi < self._rsi_short)
+        entering = go_long | go_short
+        if entering.any():
+            idx = np.flatnonzero(entering)
+            side = np.where(go_long[idx], 1, -1).astype(np.int8)
+            self.side[idx] = side
+            self.entry[idx] = close
+            self.sl[idx] = close * (1 - side * self._sl_pct[idx])
+            self.tp[idx] = close * (1 + side * self._tp_pct[idx])
+            events.append((idx, np.full(len(idx), EVENT_ENTRY), side, np.full(len(idx), close), np.zeros(len(idx))))
+
+        n_events = sum(len(e[0]) for e in events)
+        if self.log and n_events:
+            variant, event, side, price, pnl = (np.concatenate(cols) for cols in zip(*events))
+            self.log.append(time_us=np.full(n_events, time_us), variant=variant, event=event,
+                            side=side, price=price, pnl=pnl)
+            self.log.flush()
+        self.last_update_us = (time.perf_counter() - t0) * 1e6
+        return n_events
+
+    def summary(self) -> pd.DataFrame:
+        df = pd.DataFrame({
+            "variant": [v.name for v in self.variants],
+            "trades": self.trades,
+            "win_rate": np.divide(self.wins, self.trades, out=np.zeros(len(self.variants)), where=self.trades > 0),
+            "pnl": self.pnl,
+            "open": self.side,
+        })
+        return df.sort_values("pnl", ascending=False).reset_index(drop=True)
+
+    def print_summary(self, top: int = 10) -> None:
+        print(f"👻 Shadow variants for {self.symbol} ({len(self.variants)} variants, "
+              f"last bar update {self.last_update_us:.1f} µs):")
+        print(self.summary().head(top).to_string(index=False))
+
+    def close(self) -> None:
+        if self.log:
+            self.log.close()
+
+
+def load_shadow_log(run_dir: str) -> pd.DataFrame:
+    """Reads one run's columnar log into a DataFrame with variant names resolved."""
+    cols = ColumnarLog.read(run_dir)
+    names = [v["name"] for v in ColumnarLog.read_meta(run_dir)["variants"]]
+    df = pd.DataFrame(cols)
+    df["time"] = pd.to_datetime(df.pop("time_us"), unit="us", utc=True)
+    df["variant"] = pd.Categorical.from_codes(df["variant"], categories=names)
+    return df
@@ -2,9 +2,14 @@
 
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 from utils.helpers import get_resolution_seconds
 from utils.indicators import calculate_indicators
+from utils.candle_validation import validate_candles
+from utils.metrics import timed
+from utils.order_manager import manager as order_manager
 import config
 from api.delta_client import DeltaAPIClient
 
@@ -53,6 +58,15 @@ def get_initial_historical_candles(symbol, resolution, min_required_for_indicato
         print(f"Dropping incomplete current candle: {last_candle_time}")
         df_candles = df_candles.iloc[:-1]
 
+    # Sort / dedupe, flag bad prices, gaps and outliers (repaired only with CANDLE_REPAIR).
+    # Runs on completed bars only: the in-progress bar's range is not an outlier.
+    if config.CANDLE_VALIDATION:
+        df_candles, report = validate_candles(df_candles, resolution)
+        if report.issues:
+            print(f"🧹 {report}")
+        if df_candles.empty:
+            return pd.DataFrame()
+
     # Indicators
     df_candles = calculate_indicators(df_candles)
 
@@ -72,10 +86,80 @@ def get_initial_historical_candles(symbol, resolution, min_required_for_indicato
     return df_candles
 
 
+@dataclass(frozen=True, slots=True)
+class Signal:
+    """Result of a signal evaluation. Instances below are shared; evaluations allocate nothing."""
+    fired: bool
+    side: Optional[str] = None      # 'long' / 'short' for entries
+    reason: Optional[str] = None    # exit reason
+
+    def __bool__(self):
+        return self.fired
+
+
+NO_SIGNAL = Signal(False)
+LONG_ENTRY = Signal(True, "long")
+SHORT_ENTRY = Signal(True, "short")
+EXIT_BELOW_EMA = Signal(True, reason="Price crossed below EMA")
+EXIT_ABOVE_EMA = Signal(True, reason="Price crossed above EMA")
+EXIT_OVERBOUGHT = Signal(True, reason="RSI overbought")
+EXIT_OVERSOLD = Signal(True, reason="RSI oversold")
+
+
+def entry_signal(close, prev_close, ema, prev_ema, rsi) -> Signal:
+    """
+    EMA cross + RSI filter on plain floats (last two bars).
+    NaN inputs never fire (x != x is the NaN test).
+    """
+    if ema != ema or rsi != rsi or prev_ema != prev_ema:
+        return NO_SIGNAL
+    if close > ema and prev_close <= prev_ema and rsi > 50:
+        return LONG_ENTRY
+    if close < ema and prev_close >= prev_ema and rsi < 50:
+        return SHORT_ENTRY
+    return NO_SIGNAL
+
+
+def entry_signal_arrays(close: np.ndarray, ema: np.ndarray, rsi: np.ndarray) -> Signal:
+    """Same rule on NumPy views of the Close / EMA / RSI columns (uses the last two rows)."""
+    if len(close) < 2:
+        return NO_SIGNAL
+    # ndarray.item() yields Python floats; comparing numpy scalars is several times slower
+    return entry_signal(close.item(-1), close.item(-2), ema.item(-1), ema.item(-2), rsi.item(-1))
+
+
+def exit_signal(position_type, close, ema, rsi) -> Signal:
+    """EMA cross or RSI extreme against the open position, on plain floats."""
+    if ema != ema or rsi != rsi:
+        return NO_SIGNAL
+    if position_type == "long":
+        if close < ema:
+            return EXIT_BELOW_EMA
+        if rsi > config.RSI_OVERBOUGHT:
+            return EXIT_OVERBOUGHT
+    elif position_type == "short":
+        if close > ema:
+            return EXIT_ABOVE_EMA
+        if rsi < config.RSI_OVERSOLD:
+            return EXIT_OVERSOLD
+    return NO_SIGNAL
+
+
+def signal_arrays(df_candles):
+    """Close / EMA / RSI columns as NumPy arrays (NaN-filled if an indicator is missing)."""
+    close = df_candles["Close"].to_numpy(dtype=float)
+    ema_col = f"EMA{config.EMA_PERIOD}"
+    ema = df_candles[ema_col].to_numpy(dtype=float) if ema_col in df_candles else np.full(len(close), np.nan)
+    rsi = df_candles["RSI"].to_numpy(dtype=float) if "RSI" in df_candles else np.full(len(close), np.nan)
+    return close, ema, rsi
+
+
+@timed("signal_check", "DataFrame entry/exit signal checks", kind="entry")
 def check_entry_signal(df_candles_subset, bot_state):
     """
     Check for EMA25 + RSI entry signal.
     Returns (True, 'long') / (True, 'short') or (False, None).
+    DataFrame wrapper around entry_signal_arrays.
     """
     print("--- Checking Entry Signal ---")
     if bot_state.get("in_position", False):
@@ -85,37 +169,23 @@ def check_entry_signal(df_candles_subset, bot_state):
     if len(df_candles_subset) < 2:
         return False, None
 
-    current = df_candles_subset.iloc[-1]
-    prev = df_candles_subset.iloc[-2]
-
-    close = current["Close"]
-    ema = current.get(f"EMA{config.EMA_PERIOD}", np.nan)
-    rsi = current.get("RSI", np.nan)
-    prev_close = prev["Close"]
-    prev_ema = prev.get(f"EMA{config.EMA_PERIOD}", np.nan)
-
-    if any(pd.isna([ema, rsi, prev_ema])):
+    close, ema, rsi = signal_arrays(df_candles_subset)
+    if np.isnan(ema[-1]) or np.isnan(rsi[-1]) or np.isnan(ema[-2]):
         print("Skipping entry check due to NaN values.")
         return False, None
 
-    # --- Bullish ---
-    cond1 = close > ema and prev_close <= prev_ema
-    cond2 = rsi > 50
-    if cond1 and cond2:
-        print(f"✅ LONG Entry Signal at {current.name} | Close {close} > EMA {ema}, RSI {rsi}")
-        return True, "long"
-
-    # --- Bearish ---
-    cond3 = close < ema and prev_close >= prev_ema
-    cond4 = rsi < 50
-    if cond3 and cond4:
-        print(f"✅ SHORT Entry Signal at {current.name} | Close {close} < EMA {ema}, RSI {rsi}")
-        return True, "short"
+    signal = entry_signal_arrays(close, ema, rsi)
+    if signal.fired:
+        op = ">" if signal.side == "long" else "<"
+        print(f"✅ {signal.side.upper()} Entry Signal at {df_candles_subset.index[-1]} | "
+              f"Close {close[-1]} {op} EMA {ema[-1]}, RSI {rsi[-1]}")
+        return True, signal.side
 
     print("No entry signal.")
     return False, None
 
 
+@timed("signal_check", "DataFrame entry/exit signal checks", kind="exit")
 def check_exit_signal(df_candles_subset, bot_state):
     """
     Check for EMA cross or RSI extremes to exit.
@@ -123,31 +193,15 @@ def check_exit_signal(df_candles_subset, bot_state):
     if not bot_state.get("in_position", False) or len(df_candles_subset) < 2:
         return False, None
 
-    current = df_candles_subset.iloc[-1]
-    close = current["Close"]
-    ema = current.get(f"EMA{config.EMA_PERIOD}", np.nan)
-    rsi = current.get("RSI", np.nan)
-
-    if pd.isna(ema) or pd.isna(rsi):
-        return False, None
-
-    if bot_state["current_position_type"] == "long":
-        if close < ema:
-            return True, "Price crossed below EMA"
-        if rsi > config.RSI_OVERBOUGHT:
-            return True, "RSI overbought"
-    elif bot_state["current_position_type"] == "short":
-        if close > ema:
-            return True, "Price crossed above EMA"
-        if rsi < config.RSI_OVERSOLD:
-            return True, "RSI oversold"
-
-    return False, None
+    close, ema, rsi = signal_arrays(df_candles_subset)
+    signal = exit_signal(bot_state["current_position_type"], close.item(-1), ema.item(-1), rsi.item(-1))
+    return signal.fired, signal.reason
 
 
 def place_sl_tp_orders(client: DeltaAPIClient, symbol, position_type, stop_loss_price, take_profit_price, quantity_in_btc):
     """
-    Places SL/TP orders.
+    Places SL/TP orders through the order manager, which tracks them as the symbol's bracket.
+    A take_profit_price of None places only the stop (trailing-stop moves keep the live TP).
     """
     sl_order_id = None
     tp_order_id = None
@@ -157,15 +211,17 @@ def place_sl_tp_orders(client: DeltaAPIClient, symbol, position_type, stop_loss_
         print(f"Invalid position type {position_type}")
         return None, None
 
-    print(f"Placing SL at {stop_loss_price}, TP at {take_profit_price}")
+    print(f"Placing SL at {stop_loss_price}" + (f", TP at {take_profit_price}" if take_profit_price is not None else ""))
 
     # SL
     try:
-        sl_response = client.place_order(
+        sl_response = order_manager.submit(
+            client,
             symbol,
             side,
             quantity_in_btc,
             order_type="stop",
+            role="sl",
             stop_price=stop_loss_price,
             reduce_only=True,
         )
@@ -176,12 +232,16 @@ def place_sl_tp_orders(client: DeltaAPIClient, symbol, position_type, stop_loss_
         print(f"❌ SL order error: {e}")
 
     # TP
+    if take_profit_price is None:
+        return sl_order_id, None
     try:
-        tp_response = client.place_order(
+        tp_response = order_manager.submit(
+            client,
             symbol,
             side,
             quantity_in_btc,
             order_type="limit",
+            role="tp",
             price=take_profit_price,
             reduce_only=True,
         )
@@ -194,6 +254,56 @@ def place_sl_tp_orders(client: DeltaAPIClient, symbol, position_type, stop_loss_
     return sl_order_id, tp_order_id
 
 
+def plan_entry_order(order_book, position_type, size_contracts, tick_size=None):
+    """
+    Chooses how to enter given the local L2 book.
+    Returns a dict with order_type ('market' | 'limit' | None to skip), limit price,
+    time_in_force, and the expected fill price used later to measure realised slippage.
+    """
+    side = "buy" if position_type == "long" else "sell"
+    plan = {"side": side, "order_type": "market", "price": None, "time_in_force": None,
+            "expected_price": None, "expected_slippage_pct": None}
+
+    # One locked copy, so the touch, fill estimate and slippage all describe the same book
+    book = order_book.snapshot() if order_book is not None else None
+    if book is None or not book.is_fresh(config.ORDER_BOOK_MAX_AGE_SECONDS):
+        print("Order book unavailable or stale, entering with a market order.")
+        return plan
+
+    touch = book.best_ask() if side == "buy" else book.best_bid()
+    vwap, filled, _ = book.expected_fill(side, size_contracts)
+    if touch is None or vwap is None:
+        print("Order book empty on entry side, entering with a market order.")
+        return plan
+
+    slippage = book.expected_slippage_pct(side, size_contracts)
+    plan["expected_price"] = vwap
+    plan["expected_slippage_pct"] = slippage
+
+    if slippage is not None and slippage <= config.MAX_ENTRY_SLIPPAGE_PCT:
+        print(f"Expected fill {vwap:.2f} (touch {touch[0]:.2f}, slippage {slippage * 1e4:.2f} bps) -> market")
+        return plan
+
+    reason = "insufficient depth" if slippage is None else f"slippage {slippage * 1e4:.2f} bps"
+    if config.SLIPPAGE_ACTION == "skip":
+        print(f"Skipping entry: {reason} exceeds budget of {config.MAX_ENTRY_SLIPPAGE_PCT * 1e4:.2f} bps")
+        plan["order_type"] = None
+        return plan
+
+    # Cap the damage: IOC limit at the worst price we are willing to pay
+    if side == "buy":
+        limit_price = touch[0] * (1 + config.MAX_ENTRY_SLIPPAGE_PCT)
+        if tick_size:
+            limit_price = np.floor(limit_price / tick_size) * tick_size
+    else:
+        limit_price = touch[0] * (1 - config.MAX_ENTRY_SLIPPAGE_PCT)
+        if tick_size:
+            limit_price = np.ceil(limit_price / tick_size) * tick_size
+    plan.update({"order_type": "limit", "price": float(limit_price), "time_in_force": "ioc"})
+    print(f"Entry {reason} over budget -> IOC limit at {plan['price']}")
+    return plan
+
+
 def calculate_initial_sl_tp(entry_price, position_type, stoploss_pct, target_pct):
     """
     SL/TP calculation.
@@ -0,0 +1,7 @@
+# your_trading_bot/tests/conftest.py
+
+import os
+import sys
+
+# Modules import each other from the package root (e.g. `import config`, `from utils...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
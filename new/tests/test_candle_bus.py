@@ -0,0 +1,61 @@
+# your_trading_bot/tests/test_candle_bus.py
+
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from utils.candle_bus import CandleRingBus
+
+
+@pytest.fixture
+def bus():
+    b = CandleRingBus.create(["BTCUSD", "ETHUSD"], capacity=4)
+    yield b
+    b.close()
+
+
+def test_append_replace_and_stale(bus):
+    assert bus.write(0, 100, 1, 2, 0.5, 1.5, 10) == 1
+    assert bus.write(0, 200, 1.5, 3, 1, 2.5, 5) == 2
+    assert bus.write(0, 200, 1.5, 4, 1, 3.5, 7) == 2          # same start: replaced in place
+    assert bus.write(0, 100, 9, 9, 9, 9, 9) == 2              # older than the last bar: ignored
+    bars, seq = bus.window(0, 10)
+    assert seq == 2 and bars["time"].tolist() == [100, 200]
+    assert bars["close"].tolist() == [1.5, 3.5] and bars["volume"].tolist() == [10, 7]
+    assert bus.window(1, 10)[0].size == 0
+
+
+def test_window_wraps_in_time_order_and_is_a_copy(bus):
+    for t in range(1, 7):
+        bus.write(0, t, t, t, t, t, t)
+    bars, seq = bus.window(0, 3)
+    assert seq == 6 and bars["time"].tolist() == [4, 5, 6]
+    full, _ = bus.window(0, 10)
+    assert full["time"].tolist() == [3, 4, 5, 6]
+    bus.write(0, 6, 0, 0, 0, 0, 0)
+    assert full["close"][-1] == 6
+
+
+def _rewrite_last_bar(name, n):
+    bus = CandleRingBus.attach(name, ["BTCUSD", "ETHUSD"], 4)
+    for i in range(n):
+        v = float(i)
+        bus.write(0, 1_000 + (i // 1000), v, v, v, v, v)
+    bus.close()
+
+
+def test_reader_never_sees_a_half_written_bar(bus):
+    bus.write(0, 1_000, 0, 0, 0, 0, 0)
+    writer = mp.get_context("fork").Process(target=_rewrite_last_bar, args=(bus.name, 200_000))
+    writer.start()
+    reads = 0
+    while writer.is_alive() or reads == 0:
+        bars, _ = bus.window(0, 4)
+        if bars is None:
+            continue
+        fields = np.stack([bars[f] for f in ("open", "high", "low", "close", "volume")])
+        assert (fields == fields[0]).all()
+        reads += 1
+    writer.join()
+    assert writer.exitcode == 0
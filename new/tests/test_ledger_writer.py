@@ -0,0 +1,26 @@
+# your_trading_bot/tests/test_ledger_writer.py
+
+import csv
+
+from utils.ledger_writer import LedgerWriter
+
+
+def test_segment_numbering_continues_after_existing_segments(tmp_path):
+    path = tmp_path / "trades_2026-01-02.csv"
+    for no in (0, 1, 7):
+        (tmp_path / f"trades_2026-01-02.{no:05d}.parquet").touch()
+    (tmp_path / "trades_2026-01-02.tmp.parquet").touch()
+    assert LedgerWriter._next_segment_no(str(path)) == 8
+    assert LedgerWriter._next_segment_no(str(tmp_path / "other.csv")) == 0
+
+
+def test_malformed_record_is_skipped_and_writer_survives(tmp_path):
+    writer = LedgerWriter(str(tmp_path / "ledger.csv"), columns=("a", "b"), rotate_daily=False)
+    writer.log({"a": 1, "b": 2})
+    writer.log(None)
+    writer.log({"a": 3})
+    assert writer.flush()
+    writer.close()
+    with open(tmp_path / "ledger.csv", newline="") as f:
+        assert list(csv.reader(f)) == [["a", "b"], ["1", "2"], ["3", ""]]
+    assert (writer.errors, writer.records_written) == (1, 2)
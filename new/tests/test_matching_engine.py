@@ -0,0 +1,120 @@
+# your_trading_bot/tests/test_matching_engine.py
+
+import pytest
+
+from utils.matching_engine import CANCELLED, FILLED, OPEN, MatchingEngine, SimOrder
+
+SYMBOL = "BTCUSD"
+
+
+def order(oid, side, kind, size=5, limit=None, stop=None, reduce_only=False, tif=None):
+    return SimOrder(id=oid, symbol=SYMBOL, product_id=27, side=side, size=size, kind=kind, limit_price=limit,
+                    stop_price=stop, reduce_only=reduce_only, time_in_force=tif)
+
+
+@pytest.fixture
+def engine():
+    e = MatchingEngine(contract_size=0.001, fee_per_fill=0.1, slippage_pct=0.001)
+    e.on_price(SYMBOL, 60000.0)
+    return e
+
+
+def test_market_order_fills_with_slippage_and_opens_position(engine):
+    o = order(1, "buy", "market")
+    assert engine.submit(o) == [o]
+    assert o.state == FILLED and o.avg_fill_price == pytest.approx(60060.0)
+    pos = engine.position(SYMBOL)
+    assert (pos.size, pos.entry_price, pos.realised_pnl) == (5, pytest.approx(60060.0), pytest.approx(-0.1))
+
+
+def test_market_order_uses_caller_price_without_slippage(engine):
+    o = order(1, "sell", "market")
+    engine.submit(o, market_price=59990.0)
+    assert o.avg_fill_price == 59990.0
+
+
+def test_resting_limit_fills_at_limit_or_better_on_a_gap(engine):
+    buy = order(1, "buy", "limit", limit=59900.0)
+    engine.submit(buy)
+    assert buy.state == OPEN and engine.open_orders(SYMBOL) == [buy]
+    assert engine.on_price(SYMBOL, 59950.0) == []
+    engine.on_price(SYMBOL, 59800.0)               # traded through the limit
+    assert buy.state == FILLED and buy.avg_fill_price == 59900.0
+
+    sell = order(2, "sell", "limit", limit=60100.0)
+    engine.submit(sell)
+    engine.on_price(SYMBOL, 60200.0)               # path 59800 -> 60200 passes the limit
+    assert sell.avg_fill_price == 60100.0
+
+
+def test_marketable_limit_fills_on_arrival_capped_at_limit(engine):
+    o = order(1, "buy", "limit", limit=60500.0)
+    engine.submit(o)
+    assert o.state == FILLED and o.avg_fill_price == 60000.0
+
+
+def test_unmarketable_ioc_limit_is_cancelled(engine):
+    o = order(1, "buy", "limit", limit=59000.0, tif="ioc")
+    engine.submit(o)
+    assert o.state == CANCELLED and engine.open_orders() == []
+
+
+def test_stop_triggers_with_slippage_and_closes_position(engine):
+    engine.submit(order(1, "buy", "market"), market_price=60000.0)
+    sl = order(2, "sell", "stop", stop=59800.0, reduce_only=True)
+    tp = order(3, "sell", "limit", limit=60500.0, reduce_only=True)
+    engine.submit(sl)
+    engine.submit(tp)
+    changed = engine.on_price(SYMBOL, 59700.0)
+    assert sl.state == FILLED and sl.avg_fill_price == pytest.approx(59800.0 * 0.999)
+    # Flat: the other reduce-only order is cancelled with it
+    assert tp.state == CANCELLED and set(changed) == {sl, tp}
+    pos = engine.position(SYMBOL)
+    assert pos.size == 0
+    assert pos.realised_pnl == pytest.approx(5 * 0.001 * (59800.0 * 0.999 - 60000.0) - 0.2)
+
+
+def test_stop_already_through_on_arrival_triggers_at_once(engine):
+    o = order(1, "buy", "stop", stop=59500.0)
+    engine.submit(o)
+    assert o.state == FILLED and o.avg_fill_price == pytest.approx(60000.0 * 1.001)
+
+
+def test_stop_limit_rests_as_limit_after_trigger(engine):
+    o = order(1, "sell", "stop_limit", stop=59800.0, limit=59900.0)
+    engine.submit(o)
+    changed = engine.on_price(SYMBOL, 59700.0)     # triggers, but 59700 is below the sell limit
+    assert changed == [o] and o.triggered and o.state == OPEN
+    engine.on_price(SYMBOL, 59950.0)
+    assert o.state == FILLED and o.avg_fill_price == 59900.0
+
+
+def test_reduce_only_is_clipped_to_position_or_cancelled_when_flat(engine):
+    flat = order(1, "sell", "limit", limit=61000.0, reduce_only=True)
+    engine.submit(flat)
+    assert flat.state == CANCELLED
+    engine.submit(order(2, "buy", "market", size=3), market_price=60000.0)
+    clipped = order(3, "sell", "limit", size=5, limit=61000.0, reduce_only=True)
+    engine.submit(clipped)
+    assert clipped.size == 3 and clipped.state == OPEN
+
+
+def test_cancel_is_lazy_and_heaps_compact(engine):
+    for i in range(2000):
+        engine.submit(order(i, "buy", "limit", limit=50000.0 - i))
+    for i in range(1990):
+        assert engine.cancel(i).state == CANCELLED
+    assert engine.cancel(0) is None
+    heap = engine.book(SYMBOL).buy_limits
+    assert len(heap) < 2000                        # compacted once dead entries outnumbered live ones
+    engine.on_price(SYMBOL, 40000.0)
+    assert engine.open_orders() == []
+    assert engine.position(SYMBOL).size == 10 * 5
+
+
+@pytest.mark.parametrize("kind, limit, stop", [("stop", None, None), ("stop_limit", None, 59000.0),
+                                              ("stop_limit", 59100.0, None), ("limit", None, None)])
+def test_order_missing_its_price_is_cancelled_on_arrival(engine, kind, limit, stop):
+    o = order(1, "sell", kind, limit=limit, stop=stop)
+    assert engine.submit(o) == [o]
+    assert o.state == CANCELLED and engine.open_orders() == []
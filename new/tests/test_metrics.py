@@ -0,0 +1,32 @@
+# your_trading_bot/tests/test_metrics.py
+
+from utils.metrics import MetricsRegistry
+
+
+def _families(text):
+    """metric family -> (type, sample names), requiring each family's lines to be contiguous."""
+    families, current = {}, None
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert name not in families, f"family {name} declared twice"
+            families[name], current = (kind, []), name
+        elif line and not line.startswith("#"):
+            families[current][1].append(line.split("{")[0].split(" ")[0])
+    return families
+
+
+def test_histogram_max_is_a_separate_gauge_family():
+    reg = MetricsRegistry()
+    for stream in ("candle", "book"):
+        h = reg.histogram("ws_message", "WS on_message handling time", stream=stream)
+        h.record(1_000)
+        h.record(5_000)
+    reg.counter("ws_messages", "WS messages received", stream="book").inc()
+    families = _families(reg.render_prometheus())
+
+    kind, samples = families["ws_message_seconds"]
+    assert kind == "summary"
+    assert set(samples) == {"ws_message_seconds", "ws_message_seconds_sum", "ws_message_seconds_count"}
+    assert families["ws_message_seconds_max"] == ("gauge", ["ws_message_seconds_max"] * 2)
+    assert families["ws_messages_total"][0] == "counter"
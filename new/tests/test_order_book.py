@@ -0,0 +1,84 @@
+# your_trading_bot/tests/test_order_book.py
+
+import json
+
+import pytest
+
+from utils.order_book import OrderBook, OrderBookSequenceError
+from ws_confilct.orderbook_ws import WebSocketOrderBookClient
+
+
+@pytest.fixture
+def book():
+    b = OrderBook("BTCUSD")
+    b.apply_snapshot(bids=[(59990, 10), (59980, 20)], asks=[(60010, 5), (60020, 10), (60030, 50)], sequence_no=1)
+    return b
+
+
+def test_levels_update_and_delete(book):
+    book.apply_update(bids=[(59995, 3), (59980, 0)], asks=[(60010, 7)], sequence_no=2)
+    assert book.depth() == {"bids": [(59995.0, 3.0), (59990.0, 10.0)],
+                            "asks": [(60010.0, 7.0), (60020.0, 10.0), (60030.0, 50.0)]}
+
+
+def test_expected_fill_and_slippage(book):
+    assert book.expected_fill("buy", 10) == (pytest.approx(60015.0), 10.0, 60020.0)
+    assert book.expected_slippage_pct("buy", 10) == pytest.approx(5 / 60010)
+    assert book.expected_slippage_pct("sell", 100) is None          # not enough depth
+
+
+def test_snapshot_is_detached_from_later_updates(book):
+    snap = book.snapshot()
+    book.apply_update(bids=[], asks=[(60010, 0)], sequence_no=2)
+    assert snap.best_ask() == (60010.0, 5.0) and book.best_ask() == (60020.0, 10.0)
+    assert snap.expected_fill("buy", 10) == (pytest.approx(60015.0), 10.0, 60020.0)
+    assert snap.expected_slippage_pct("buy", 10) == pytest.approx(5 / 60010)
+    assert snap.is_fresh(60) and snap.mid_price() == 60000.0
+
+
+def test_update_without_sequence_keeps_gap_detection(book):
+    book.apply_update(bids=[(59995, 1)], asks=[], sequence_no=2)
+    book.apply_update(bids=[(59996, 1)], asks=[], sequence_no=None)
+    assert book.sequence_no == 2 and book.synced
+    with pytest.raises(OrderBookSequenceError):
+        book.apply_update(bids=[], asks=[], sequence_no=99)
+    assert not book.synced
+
+
+def test_updates_before_a_snapshot_are_dropped_quietly():
+    b = OrderBook("BTCUSD")
+    assert b.apply_update(bids=[(1, 1)], asks=[], sequence_no=5) is False
+    assert b.depth() == {"bids": [], "asks": []}
+
+
+class _FakeWS:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+def _frame(action, seq, bids=(), asks=()):
+    return json.dumps({"type": "l2_updates", "symbol": "BTCUSD", "action": action, "sequence_no": seq,
+                       "bids": list(bids), "asks": list(asks)})
+
+
+def test_one_gap_sends_a_single_resubscribe():
+    client = WebSocketOrderBookClient("ws://unused", ["BTCUSD"])
+    client.ws = _FakeWS()
+    client.on_message(client.ws, _frame("snapshot", 1, bids=[(59990, 10)], asks=[(60010, 5)]))
+    client.on_message(client.ws, _frame("update", 2, bids=[(59991, 1)]))
+    client.on_message(client.ws, _frame("update", 4))
+    for seq in range(5, 25):
+        client.on_message(client.ws, _frame("update", seq))
+    assert client.resyncs == 1
+    assert [m["type"] for m in client.ws.sent] == ["unsubscribe", "subscribe"]
+
+    book = client.get_book("BTCUSD")
+    assert not book.synced
+    client.on_message(client.ws, _frame("snapshot", 50, bids=[(59980, 2)], asks=[(60020, 3)]))
+    client.on_message(client.ws, _frame("update", 51, asks=[(60015, 1)]))
+    assert book.synced and book.sequence_no == 51 and book.best_ask() == (60015.0, 1.0)
+    client.on_message(client.ws, _frame("update", 60))   # a later, separate gap resyncs again
+    assert client.resyncs == 2 and len(client.ws.sent) == 4
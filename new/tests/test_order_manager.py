@@ -0,0 +1,205 @@
+# your_trading_bot/tests/test_order_manager.py
+
+import time
+
+import pytest
+
+from utils.order_manager import (
+    CANCELLED, FILLED, OPEN, PARTIALLY_FILLED, PENDING, REJECTED, OrderManager,
+)
+
+SYMBOL = "BTCUSD"
+
+
+class FakeClient:
+    """place_order / cancel_order / get_open_orders with scripted replies."""
+    LOT_SIZE_BTC = 0.001
+
+    def __init__(self, place_reply=None, open_orders=None):
+        self.place_reply = place_reply
+        self.open_orders = open_orders or []
+        self.placed = []
+
+    def place_order(self, symbol, side, quantity_in_btc, order_type='market', price=None, stop_price=None,
+                    reduce_only=False, time_in_force=None, client_order_id=None):
+        self.placed.append(client_order_id)
+        reply = self.place_reply
+        return reply(client_order_id) if callable(reply) else reply
+
+    def cancel_order(self, order_id):
+        return {"success": True, "result": {"id": order_id, "state": "cancelled", "size": 5, "unfilled_size": 5}}
+
+    def get_open_orders(self, symbol=None):
+        return {"success": True, "result": list(self.open_orders)}
+
+
+def ws_frame(order, status, filled, remaining, **extra):
+    data = {"id": order.exchange_id, "client_order_id": order.client_order_id, "status": status,
+            "filled_size": filled, "remaining_size": remaining, "product_symbol": SYMBOL}
+    data.update(extra)
+    return data
+
+
+@pytest.fixture
+def manager():
+    return OrderManager(history=100, grace_seconds=5)
+
+
+def test_lifecycle_pending_open_partial_filled(manager):
+    seen = []
+    manager.on_change(lambda order, prev: seen.append((prev, order.state)))
+    order = manager.track(SYMBOL, "buy", 5, "limit", role="entry", price=60000)
+    assert order.state == PENDING and manager.get_by_client_id(order.client_order_id) is order
+
+    manager.on_rest_response({"success": True, "result": {"id": 1, "size": 5, "unfilled_size": 5, "state": "open"}},
+                             order.client_order_id)
+    assert (order.state, order.exchange_id, manager.get(1)) == (OPEN, 1, order)
+
+    manager.on_order_update(ws_frame(order, "open", 2, 3))
+    assert (order.state, order.filled, order.remaining) == (PARTIALLY_FILLED, 2, 3)
+    manager.on_order_update(ws_frame(order, "open", 4, 1))
+    assert order.filled == 4
+    manager.on_order_update(ws_frame(order, "filled", 5, 0, avg_fill_price=60001.5))
+    assert (order.state, order.avg_fill_price) == (FILLED, 60001.5)
+    assert manager.live_orders(SYMBOL) == []
+    assert seen == [(PENDING, OPEN), (OPEN, PARTIALLY_FILLED), (PARTIALLY_FILLED, FILLED)]
+
+
+def test_ws_frame_before_rest_reply_is_matched_by_client_order_id(manager):
+    order = manager.track(SYMBOL, "sell", 5, "stop", role="sl", stop_price=59000, reduce_only=True)
+    manager.on_order_update({"id": 7, "client_order_id": order.client_order_id, "status": "open",
+                             "filled_size": 0, "remaining_size": 5})
+    assert (order.state, order.exchange_id, manager.get(7)) == (OPEN, 7, order)
+    manager.on_rest_response({"success": True, "result": {"id": 7, "size": 5, "unfilled_size": 5,
+                                                          "state": "pending"}}, order.client_order_id)
+    assert order.state == OPEN
+    assert manager.bracket(SYMBOL) == (order, None)
+    assert manager.stats["adopted"] == 0
+
+
+def test_late_rest_reply_after_fill_is_ignored(manager):
+    order = manager.track(SYMBOL, "buy", 5, "limit", role="entry", price=60000)
+    manager.on_order_update({"id": 3, "client_order_id": order.client_order_id, "status": "filled",
+                             "filled_size": 5, "remaining_size": 0})
+    manager.on_rest_response({"success": True, "result": {"id": 3, "size": 5, "unfilled_size": 5, "state": "open"}},
+                             order.client_order_id)
+    assert (order.state, order.filled) == (FILLED, 5)
+    assert manager.stats["stale_updates"] == 1
+
+
+def test_partial_fill_never_goes_backwards(manager):
+    order = manager.track(SYMBOL, "buy", 5, "limit", role="entry", price=60000)
+    manager.on_order_update({"id": 4, "client_order_id": order.client_order_id, "status": "open",
+                             "filled_size": 3, "remaining_size": 2})
+    manager.on_order_update({"id": 4, "status": "open", "filled_size": 1, "remaining_size": 4})
+    assert (order.state, order.filled) == (PARTIALLY_FILLED, 3)
+
+
+def test_closed_with_remainder_is_cancelled(manager):
+    order = manager.track(SYMBOL, "buy", 5, "limit", role="entry", price=60000)
+    manager.on_rest_response({"success": True, "result": {"id": 5, "size": 5, "unfilled_size": 3, "state": "closed"}},
+                             order.client_order_id)
+    assert (order.state, order.filled) == (CANCELLED, 2)
+
+
+def test_rest_timeout_leaves_order_pending_until_ws_settles_it(manager):
+    client = FakeClient(place_reply=None)          # DeltaAPIClient returns None on timeouts / HTTP errors
+    resp = manager.submit(client, SYMBOL, "sell", 0.005, order_type="stop", role="sl", stop_price=59000,
+                          reduce_only=True)
+    assert resp is None
+    (order,) = manager.live_orders(SYMBOL)
+    assert order.state == PENDING and order.client_order_id == client.placed[0]
+    assert manager.bracket(SYMBOL)[0] is order
+
+    manager.on_order_update({"id": 11, "client_order_id": order.client_order_id, "status": "pending",
+                             "filled_size": 0, "remaining_size": 5})
+    assert (order.state, order.exchange_id) == (OPEN, 11)
+    assert manager.bracket(SYMBOL)[0] is order
+
+
+def test_rest_timeout_settled_by_reconciliation(manager):
+    order = manager.track(SYMBOL, "sell", 5, "stop", role="sl", stop_price=59000, reduce_only=True)
+    manager.on_rest_response(None, order.client_order_id)
+    listed = {"id": 12, "client_order_id": order.client_order_id, "state": "pending", "size": 5,
+              "unfilled_size": 5, "product_symbol": SYMBOL, "reduce_only": True, "stop_price": "59000"}
+    summary = manager.sync_open_orders({"success": True, "result": [listed]}, [SYMBOL])
+    assert summary == {"adopted": 0, "updated": 1, "closed": 0}
+    assert (order.state, order.exchange_id) == (OPEN, 12)
+
+
+def test_explicit_failure_rejects(manager):
+    order = manager.track(SYMBOL, "sell", 5, "stop", role="sl", stop_price=59000)
+    manager.on_rest_response({"success": False, "error": {"code": "insufficient_margin"}}, order.client_order_id)
+    assert order.state == REJECTED
+    assert manager.bracket(SYMBOL) == (None, None)
+
+
+def test_reconcile_closes_vanished_orders_after_grace(manager):
+    acked = manager.track(SYMBOL, "sell", 5, "limit", role="tp", price=61000, reduce_only=True)
+    manager.on_rest_response({"success": True, "result": {"id": 21, "size": 5, "unfilled_size": 5, "state": "open"}},
+                             acked.client_order_id)
+    lost = manager.track(SYMBOL, "sell", 5, "stop", role="sl", stop_price=59000, reduce_only=True)
+    manager.on_rest_response(None, lost.client_order_id)
+
+    # Too young: the exchange list may simply predate them
+    assert manager.sync_open_orders([], [SYMBOL])["closed"] == 0
+    assert acked.state == OPEN and lost.state == PENDING
+
+    summary = manager.sync_open_orders([], [SYMBOL], now=time.time() + 60)
+    assert summary["closed"] == 2
+    assert (acked.state, lost.state) == (CANCELLED, REJECTED)
+    assert manager.bracket(SYMBOL) == (None, None)
+    assert manager.live_orders() == []
+
+
+def test_reconcile_adopts_unknown_orders_into_empty_bracket(manager):
+    client = FakeClient(open_orders=[
+        {"id": 31, "state": "pending", "size": 5, "unfilled_size": 5, "product_symbol": SYMBOL, "side": "sell",
+         "reduce_only": True, "order_type": "market_order", "stop_order_type": "stop_loss_order", "stop_price": "59000"},
+        {"id": 32, "state": "open", "size": 5, "unfilled_size": 5, "product_symbol": SYMBOL, "side": "sell",
+         "reduce_only": True, "order_type": "limit_order", "limit_price": "61000"},
+        {"id": 33, "state": "open", "size": 5, "unfilled_size": 5, "product_symbol": "ETHUSD", "side": "buy",
+         "order_type": "limit_order", "limit_price": "3000"},
+    ])
+    assert manager.reconcile(client, [SYMBOL]) == {"adopted": 2, "updated": 0, "closed": 0}
+    sl, tp = manager.bracket(SYMBOL)
+    assert (sl.exchange_id, sl.order_type, tp.exchange_id, tp.order_type) == (31, "stop", 32, "limit")
+    assert manager.get(33) is None
+    # Unchanged on the next pass
+    assert manager.reconcile(client, [SYMBOL]) == {"adopted": 0, "updated": 0, "closed": 0}
+
+
+def test_cancel_reply_moves_order_to_cancelled(manager):
+    order = manager.track(SYMBOL, "sell", 5, "limit", role="tp", price=61000)
+    manager.on_rest_response({"success": True, "result": {"id": 41, "size": 5, "unfilled_size": 5, "state": "open"}},
+                             order.client_order_id)
+    manager.cancel(FakeClient(), 41)
+    assert order.state == CANCELLED and manager.bracket(SYMBOL) == (None, None)
+
+
+def test_finished_orders_are_evicted_beyond_history():
+    manager = OrderManager(history=2, grace_seconds=5)
+    orders = []
+    for i in range(3):
+        order = manager.track(SYMBOL, "buy", 1, "market")
+        manager.on_order_update({"id": 100 + i, "client_order_id": order.client_order_id, "state": "closed",
+                                 "size": 1, "unfilled_size": 0})
+        orders.append(order)
+    assert manager.get(100) is None and manager.get_by_client_id(orders[0].client_order_id) is None
+    assert manager.get(102) is orders[2]
+
+
+def test_listeners_are_registered_once_and_removable(manager):
+    calls = []
+
+    def listener(order, prev):
+        calls.append(prev)
+    manager.on_change(listener)
+    manager.on_change(listener)
+    order = manager.track(SYMBOL, "buy", 1, "market")
+    manager.on_rest_response({"success": False}, order.client_order_id)
+    assert calls == [PENDING]
+    manager.remove_listener(listener)
+    order = manager.track(SYMBOL, "buy", 1, "market")
+    manager.on_rest_response({"success": False}, order.client_order_id)
+    assert calls == [PENDING]
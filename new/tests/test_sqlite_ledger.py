@@ -0,0 +1,34 @@
+# your_trading_bot/tests/test_sqlite_ledger.py
+
+import pytest
+
+from utils.sqlite_ledger import SqliteLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    led = SqliteLedger(str(tmp_path / "ledger.sqlite3"), max_tracked_orders=3)
+    yield led
+    led.close()
+
+
+def update(order_id, filled, status="open"):
+    return {"id": order_id, "product_symbol": "BTCUSD", "side": "buy", "status": status,
+            "filled_size": filled, "avg_fill_price": 60000.0}
+
+
+def test_fills_are_deltas_of_cumulative_filled_size(ledger):
+    for filled, status in ((0, "open"), (2, "open"), (2, "open"), (5, "closed"), (5, "closed")):
+        ledger.record_order_update(update(1, filled, status))
+    assert ledger.flush()
+    fills = ledger.query("SELECT size FROM fills WHERE order_id = 1 ORDER BY id")
+    assert fills["size"].tolist() == [2.0, 3.0]
+
+
+def test_tracked_orders_are_bounded(ledger):
+    for order_id in range(10):
+        ledger.record_order_update(update(order_id, 1, "closed"))
+    assert list(ledger._filled) == [7, 8, 9]
+    ledger.record_order_update(update(7, 2))            # recently updated orders are kept
+    ledger.record_order_update(update(10, 1))
+    assert list(ledger._filled) == [9, 7, 10]
@@ -0,0 +1,19 @@
+# your_trading_bot/tests/test_trade_analytics.py
+
+import pandas as pd
+
+from utils.trade_analytics import TradeArrays
+
+
+def test_rows_with_unreadable_exit_time_are_skipped():
+    df = pd.DataFrame({
+        "Entry Time": ["2026-01-01T00:00:00Z", "not a time", "2026-01-01T02:00:00Z"],
+        "Exit Time": ["2026-01-01T01:00:00Z", "not a time", None],
+        "Type": ["long", "short", "long"], "Reason": ["TP", "SL", "TP"],
+        "PnL": [1.0, 2.0, 3.0], "Net PnL": [0.9, 1.9, 2.9], "Entry Price": [100.0, 101.0, 102.0],
+        "Session": ["US", "US", "US"],
+    })
+    arrays = TradeArrays()
+    assert arrays.append_frame(df) == 1
+    assert len(arrays) == 1 and arrays.net_pnl.tolist() == [0.9]
+    assert arrays.append_frame(df.iloc[1:]) == 0
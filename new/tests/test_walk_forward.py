@@ -0,0 +1,19 @@
+# your_trading_bot/tests/test_walk_forward.py
+
+import numpy as np
+
+from backtest.walk_forward import pick_winner, score
+
+
+def test_unqualified_variants_never_win():
+    net = np.array([5.0, -1.0, 2.0])
+    assert score(net, "net_pnl", min_trades=5) == -np.inf
+    assert pick_winner(np.array([-np.inf, -np.inf])) is None
+
+
+def test_profit_factor_without_losses_wins():
+    scores = np.array([-np.inf, score(np.array([1.0, 2.0, 3.0]), "profit_factor", 2),
+                       score(np.array([4.0, -1.0]), "profit_factor", 2)])
+    assert scores[1] == np.inf
+    assert pick_winner(scores) == 1
+    assert pick_winner(np.array([-np.inf, np.inf])) == 1
@@ -59,10 +59,15 @@
 from __future__ import annotations
 
 import threading
-from dataclasses import dataclass, asdict, field
+import time
+from dataclasses import dataclass, asdict, field, fields
 from typing import Optional, Dict, Any
 from datetime import datetime, timezone
 
+from utils.state_journal import StateJournal
+
+_ISO_FIELDS = ("entry_time", "trade_open_candle_time", "last_update_ts")
+
 
 @dataclass
 class PositionState:
@@ -70,6 +75,7 @@ class PositionState:
     current_position_type: Optional[str] = None    # 'long' | 'short' | None
     current_position_size: float = 0.0             # Absolute size (e.g., in BTC)
     current_entry_price: float = 0.0               # Average entry price
+    expected_entry_price: Optional[float] = None   # Book-estimated fill price at entry (slippage analytics)
     entry_time: Optional[datetime] = None          # When we entered
     trade_open_candle_time: Optional[datetime] = None  # Candle timestamp at entry (optional)
 
@@ -95,7 +101,51 @@ class PositionState:
     def to_dict(self) -> Dict[str, Any]:
         d = asdict(self)
         # Convert datetimes to ISO for safe UI/logs if needed
-        for k in ["entry_time", "trade_open_candle_time", "last_update_ts"]:
+        for k in _ISO_FIELDS:
+            if d.get(k) and isinstance(d[k], datetime):
+                d[k] = d[k].astimezone(timezone.utc).isoformat()
+        return d
+
+
+@dataclass(frozen=True, slots=True)
+class StateSnapshot:
+    """
+    Immutable copy of PositionState published after every mutation.
+    `version` increases by one per published change. Supports `snap["key"]`
+    and `snap.get("key")` so it can stand in for the old get_state() dict.
+    """
+    version: int
+    in_position: bool
+    current_position_type: Optional[str]
+    current_position_size: float
+    current_entry_price: float
+    expected_entry_price: Optional[float]
+    entry_time: Optional[datetime]
+    trade_open_candle_time: Optional[datetime]
+    sl_order_id: Optional[int]
+    tp_order_id: Optional[int]
+    initial_stop_loss_price: Optional[float]
+    initial_take_profit_price: Optional[float]
+    trailing_stop_loss_price: Optional[float]
+    highest_price_since_entry: float
+    lowest_price_since_entry: float
+    realised_pnl: float
+    unrealised_pnl: float
+    last_update_ts: Optional[datetime]
+    last_exit_reason: Optional[str]
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {name: getattr(self, name) for name in self.__slots__ if name != "version"}
+        for k in _ISO_FIELDS:
             if d.get(k) and isinstance(d[k], datetime):
                 d[k] = d[k].astimezone(timezone.utc).isoformat()
         return d
@@ -106,22 +156,94 @@ class BotStateManager:
     Thread-safe state manager for your trading bot. This is the single source
     of truth that `simple_ema_rsi.py`, your REST logic, and your WS handlers
     use to stay in sync.
+
+    Writers mutate the private PositionState under `_lock` and then publish a
+    new StateSnapshot with a single reference assignment. Readers call
+    `snapshot()`, which is just that reference load: no lock, no copy.
+
+    With `enable_journal()` every published change is first appended to a
+    StateJournal, so the state survives a crash and is replayed on restart.
     """
     def __init__(self):
         self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
         self._state = PositionState()
+        self._version = 0
+        self._snapshot = StateSnapshot(0, **vars(self._state))
+        self._journal: Optional[StateJournal] = None
+
+    def _publish(self, op: str) -> None:
+        # Caller holds _lock
+        self._version += 1
+        prev = self._snapshot
+        current = vars(self._state)
+        if self._journal is not None:
+            # Write-ahead: the change is on disk before anyone can observe it
+            changed = {k: v for k, v in current.items() if getattr(prev, k) != v}
+            self._journal.append(op, changed, self._version, current)
+        self._snapshot = StateSnapshot(self._version, **current)
+        self._changed.notify_all()
+
+    # -------------------------------
+    # Persistence
+    # -------------------------------
+    def enable_journal(self, path: str, snapshot_every: int = 1000, fsync: bool = True) -> bool:
+        """
+        Replays `path` (if present) into this manager, then journals every further change.
+        Returns True if a previous state was restored.
+        """
+        t0 = time.perf_counter()
+        restored_fields, version, records = StateJournal.load(path)
+        journal = StateJournal(path, [f.name for f in fields(PositionState)], snapshot_every, fsync)
+        with self._lock:
+            if restored_fields is not None:
+                known = {k: v for k, v in restored_fields.items() if k in PositionState.__dataclass_fields__}
+                self._state = PositionState(**known)
+                self._version = version - 1
+                self._publish("restore")
+            journal.open(vars(self._state), self._version)
+            self._journal = journal
+        if restored_fields is not None:
+            print(f"♻️ Restored bot state v{version} from {records} journal records "
+                  f"in {(time.perf_counter() - t0) * 1e3:.2f} ms")
+        return restored_fields is not None
+
+    def close_journal(self) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
 
     # -------------------------------
     # Basic accessors
     # -------------------------------
+    def snapshot(self) -> StateSnapshot:
+        """Latest published state. Safe to hold on to; it never changes."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def wait_for_change(self, since_version: int, timeout: Optional[float] = None) -> StateSnapshot:
+        """
+        Blocks until a snapshot newer than `since_version` is published (or timeout)
+        and returns the latest snapshot either way.
+        """
+        snap = self._snapshot
+        if snap.version != since_version:
+            return snap
+        with self._changed:
+            self._changed.wait_for(lambda: self._snapshot.version != since_version, timeout)
+            return self._snapshot
+
     def get_state(self) -> Dict[str, Any]:
-        with self._lock:
-            return self._state.to_dict()
+        # Plain dict copy (datetimes as ISO strings) for logs/UI; hot paths should use snapshot()
+        return self._snapshot.to_dict()
 
-    def get_state_object(self) -> PositionState:
-        # Use this if you need read-only structured access;
-        # do not mutate without holding _lock.
-        return self._state
+    def get_state_object(self) -> StateSnapshot:
+        # Immutable, so it can be shared across threads without holding _lock
+        return self._snapshot
 
     # -------------------------------
     # Entry / Exit lifecycle
@@ -135,6 +257,7 @@ class BotStateManager:
         trade_open_candle_time: Optional[datetime] = None,
         sl_price: Optional[float] = None,
         tp_price: Optional[float] = None,
+        expected_entry_price: Optional[float] = None,
     ) -> None:
         if position_type not in ("long", "short"):
             raise ValueError(f"position_type must be 'long' or 'short', got {position_type}")
@@ -144,6 +267,7 @@ class BotStateManager:
             self._state.current_position_type = position_type
             self._state.current_position_size = float(position_size or 0.0)
             self._state.current_entry_price = float(entry_price or 0.0)
+            self._state.expected_entry_price = expected_entry_price
             self._state.entry_time = entry_time or datetime.now(timezone.utc)
             self._state.trade_open_candle_time = trade_open_candle_time
 
@@ -160,6 +284,7 @@ class BotStateManager:
             # Clear old SL/TP IDs; caller can set them later with set_sl_tp_order_ids()
             self._state.sl_order_id = None
             self._state.tp_order_id = None
+            self._publish("mark_entry")
 
     def mark_exit(self, exit_reason: str, exit_time: Optional[datetime] = None) -> None:
         with self._lock:
@@ -167,6 +292,7 @@ class BotStateManager:
             self._state.current_position_type = None
             self._state.current_position_size = 0.0
             self._state.current_entry_price = 0.0
+            self._state.expected_entry_price = None
             self._state.entry_time = None
             self._state.trade_open_candle_time = None
 
@@ -181,10 +307,12 @@ class BotStateManager:
 
             self._state.last_exit_reason = exit_reason
             self._state.last_update_ts = exit_time or datetime.now(timezone.utc)
+            self._publish("mark_exit")
 
     def reset_all(self) -> None:
         with self._lock:
             self._state = PositionState()
+            self._publish("reset_all")
 
     # -------------------------------
     # SL/TP helpers
@@ -194,11 +322,13 @@ class BotStateManager:
             self._state.sl_order_id = sl_order_id
             self._state.tp_order_id = tp_order_id
             self._state.last_update_ts = datetime.now(timezone.utc)
+            self._publish("set_sl_tp_order_ids")
 
     def set_trailing_stop(self, price: float) -> None:
         with self._lock:
             self._state.trailing_stop_loss_price = float(price)
             self._state.last_update_ts = datetime.now(timezone.utc)
+            self._publish("set_trailing_stop")
 
     # -------------------------------
     # Price extrema (for trailing stops)
@@ -219,6 +349,7 @@ class BotStateManager:
                     self._state.lowest_price_since_entry = last_price
 
             self._state.last_update_ts = datetime.now(timezone.utc)
+            self._publish("update_extrema_since_entry")
 
     # -------------------------------
     # PnL / position sync (from WS or REST)
@@ -259,6 +390,7 @@ class BotStateManager:
 
             # Keep SL/TP IDs as-is; WS order updates will adjust them
             self._state.last_update_ts = datetime.now(timezone.utc)
+            self._publish("sync_position_snapshot")
 
     # -------------------------------
     # WS update convenience methods
@@ -276,18 +408,21 @@ class BotStateManager:
                 self.update_extrema_since_entry(avg_fill_price)
 
             self._state.last_update_ts = datetime.now(timezone.utc)
+            self._publish("on_order_filled")
 
     def clear_sl_if_order(self, order_id: int) -> None:
         with self._lock:
             if self._state.sl_order_id == order_id:
                 self._state.sl_order_id = None
                 self._state.last_update_ts = datetime.now(timezone.utc)
+                self._publish("clear_sl_if_order")
 
     def clear_tp_if_order(self, order_id: int) -> None:
         with self._lock:
             if self._state.tp_order_id == order_id:
                 self._state.tp_order_id = None
                 self._state.last_update_ts = datetime.now(timezone.utc)
+                self._publish("clear_tp_if_order")
 
 
 # Export a module-level singleton for convenience across the project
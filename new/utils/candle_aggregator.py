@@ -0,0 +1,185 @@
+# your_trading_bot/utils/candle_aggregator.py
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import pandas as pd
+
+from utils.helpers import get_resolution_seconds, to_microseconds
+
+DEFAULT_TIMEFRAMES = ("5m", "15m", "1h", "4h", "1d")
+_US = 1_000_000
+
+
+class CandleAggregator:
+    """
+    Higher-timeframe bars built from one stream of completed base candles (the dicts
+    WebSocketCandleClient queues). Every base bar is folded into the open bar of each
+    timeframe, a constant amount of work per update. Buckets are aligned to the UTC epoch
+    like the exchange's own candles (4h at 00/04/08 UTC, 1d at midnight).
+
+    A timeframe bar is emitted to its on_bar() callbacks as soon as its last base bar
+    arrives, or when a later base bar shows the bucket has ended (a gap in the feed). Bars
+    whose first base bar was never seen (the bot started mid-bucket) are dropped, unless
+    seed() supplied the missing base history. put() makes the aggregator a drop-in
+    candle_queue for the WS client; callbacks run on the caller's (WS) thread.
+    """
+
+    def __init__(self, base_resolution: str, timeframes: Sequence[str] = DEFAULT_TIMEFRAMES,
+                 history: int = 500, hold: bool = False):
+        self.base_resolution = base_resolution
+        self.base_us = get_resolution_seconds(base_resolution) * _US
+        if not self.base_us:
+            raise ValueError(f"Unsupported base resolution: {base_resolution}")
+        self.timeframes: List[str] = []
+        self._steps: List[Tuple[str, int]] = []
+        for tf in sorted(set(timeframes), key=get_resolution_seconds):
+            step = get_resolution_seconds(tf) * _US
+            if not step or step % self.base_us:
+                raise ValueError(f"Timeframe {tf} is not a multiple of the base resolution {base_resolution}")
+            self.timeframes.append(tf)
+            self._steps.append((tf, step))
+        self._open: Dict[Tuple[str, str], list] = {}          # (symbol, tf) -> [bucket_us, o, h, l, c, v, n, whole]
+        self._last_us: Dict[str, int] = {}                     # symbol -> start of the last base bar folded in
+        self._callbacks: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+        self._history: Dict[Tuple[str, str], deque] = defaultdict(lambda: deque(maxlen=history))
+        self._lock = threading.Lock()
+        self._held: List[dict] = [] if hold else None
+        self.stats = Counter()
+
+    # ------------------------------------------------------------------ subscriptions
+    def on_bar(self, timeframe: str, callback: Callable[[dict], None]) -> Callable[[dict], None]:
+        """Calls callback(bar) with every completed `timeframe` bar (same dict shape as the WS candles)."""
+        if timeframe not in self.timeframes:
+            raise ValueError(f"Timeframe {timeframe} is not aggregated (have {self.timeframes})")
+        self._callbacks[timeframe].append(callback)
+        return callback
+
+    # ------------------------------------------------------------------ input
+    def put(self, candle: dict) -> None:
+        """queue.Queue-compatible entry point for WebSocketCandleClient."""
+        with self._lock:
+            if self._held is not None:
+                self._held.append(candle)
+                return
+            emitted = self._fold(candle)
+        self._dispatch(emitted)
+
+    def seed(self, symbol: str, df_base: pd.DataFrame) -> int:
+        """
+        Folds completed base bars from history (bot-shaped DataFrame) without firing callbacks,
+        so buckets already in progress when the bot started are emitted whole. Then replays
+        live candles held since construction (hold=True), skipping ones the history covers.
+        Returns the number of history bars used.
+        """
+        used = 0
+        with self._lock:
+            for t, o, h, lo, c, v in zip(df_base.index, df_base["Open"], df_base["High"], df_base["Low"],
+                                         df_base["Close"], df_base.get("Volume", pd.Series(0.0, index=df_base.index))):
+                done = self._fold({"symbol": symbol, "time": t, "Open": o, "High": h, "Low": lo, "Close": c, "Volume": v})
+                used += 1
+                for tf, bar in done:
+                    self._history[(symbol, tf)].append(bar)
+            held, self._held = self._held or [], None
+            emitted = [e for candle in held for e in self._fold(candle)]
+        self._dispatch(emitted)
+        return used
+
+    def seed_from_client(self, client, symbol: str, now_s: float = None) -> int:
+        """seed() from /v2/history/candles: base bars since the start of the widest bucket in progress."""
+        now_s = int(now_s if now_s is not None else time.time())
+        widest = self._steps[-1][1] // _US
+        base_s = self.base_us // _US
+        start_s = now_s - now_s % widest
+        end_s = now_s - now_s % base_s            # the base bar in progress is not final yet
+        df = pd.DataFrame()
+        if end_s > start_s:
+            resp = client.get_candles(symbol, self.base_resolution, start_s, end_s)
+            if resp and isinstance(resp.get("result"), list) and resp["result"]:
+                df = pd.DataFrame(resp["result"])
+                df.index = pd.to_datetime(to_microseconds(df["time"].to_numpy()), unit="us", utc=True)
+                df = df.rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close",
+                                        "volume": "Volume"}).sort_index()
+                df = df[df.index < pd.Timestamp(end_s, unit="s", tz="UTC")]
+            else:
+                print(f"⚠️ Candle aggregator: no {self.base_resolution} history for {symbol}: {resp}")
+        used = self.seed(symbol, df)
+        print(f"🧱 Candle aggregator seeded with {used} {self.base_resolution} bars for {symbol} "
+              f"({', '.join(self.timeframes)})")
+        return used
+
+    # ------------------------------------------------------------------ output
+    def history(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Completed `timeframe` bars seen so far (bounded), as a bot-shaped DataFrame."""
+        bars = list(self._history.get((symbol, timeframe), ()))
+        if not bars:
+            return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+        df = pd.DataFrame(bars).set_index("time")
+        return df.drop(columns=["symbol"])
+
+    def current(self, symbol: str, timeframe: str) -> dict:
+        """The `timeframe` bar still being built, or None."""
+        bar = self._open.get((symbol, timeframe))
+        return self._as_candle(symbol, bar) if bar else None
+
+    # ------------------------------------------------------------------ internals
+    def _fold(self, candle: dict) -> List[Tuple[str, dict]]:
+        symbol = candle.get("symbol", "")
+        t_us = pd.Timestamp(candle["time"]).value // 1000
+        last = self._last_us.get(symbol)
+        if last is not None and t_us <= last:
+            self.stats["stale"] += 1
+            return []
+        self._last_us[symbol] = t_us
+        o, h, lo, c = float(candle["Open"]), float(candle["High"]), float(candle["Low"]), float(candle["Close"])
+        v = float(candle.get("Volume") or 0.0)
+        done = []
+        for tf, step in self._steps:
+            key = (symbol, tf)
+            bucket = t_us - t_us % step
+            bar = self._open.get(key)
+            if bar is not None and bar[0] != bucket:
+                # The feed skipped the rest of that bucket
+                del self._open[key]
+                self._close(symbol, tf, step, bar, done)
+                bar = None
+            if bar is None:
+                bar = self._open[key] = [bucket, o, h, lo, c, v, 1, t_us == bucket]
+            else:
+                if h > bar[2]:
+                    bar[2] = h
+                if lo < bar[3]:
+                    bar[3] = lo
+                bar[4] = c
+                bar[5] += v
+                bar[6] += 1
+            if t_us + self.base_us >= bucket + step:
+                del self._open[key]
+                self._close(symbol, tf, step, bar, done)
+        return done
+
+    def _close(self, symbol: str, tf: str, step: int, bar: list, done: list) -> None:
+        if not bar[7]:
+            self.stats[f"partial_{tf}"] += 1
+            return
+        if bar[6] < step // self.base_us:
+            self.stats[f"gaps_{tf}"] += 1
+        done.append((tf, self._as_candle(symbol, bar)))
+
+    @staticmethod
+    def _as_candle(symbol: str, bar: list) -> dict:
+        return {"symbol": symbol, "time": pd.Timestamp(bar[0], unit="us", tz="UTC"), "Open": bar[1], "High": bar[2],
+                "Low": bar[3], "Close": bar[4], "Volume": bar[5]}
+
+    def _dispatch(self, emitted: List[Tuple[str, dict]]) -> None:
+        for tf, bar in emitted:
+            self._history[(bar["symbol"], tf)].append(bar)
+            for callback in self._callbacks.get(tf, ()):
+                try:
+                    callback(dict(bar))
+                except Exception as e:
+                    print(f"❌ Candle aggregator {tf} callback error: {e}")
@@ -0,0 +1,158 @@
+# your_trading_bot/utils/candle_bus.py
+
+from __future__ import annotations
+
+import time
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# One completed bar. Time is the candle start in microseconds since epoch (same unit as the feed).
+CANDLE_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+_HEADER_ALIGN = 64
+
+
+class CandleRingBus:
+    """
+    Shared-memory ring buffers of completed bars, one ring per symbol.
+
+    Layout: an int64 write counter per symbol, an int64 version per symbol, then a
+    (n_symbols, capacity) array of CANDLE_DTYPE. Exactly one process (the ingest
+    process) writes; any number of processes attach by name and read.
+
+    Every write is a seqlock section: the writer makes the symbol's version odd,
+    writes the slot and bumps the counter, then makes the version even again.
+    Readers copy the window between two reads of the version and retry if it was
+    odd or changed, so a bar replaced in place (same start time) or a slot reused
+    after a lap is never returned half-written.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, symbols: List[str], capacity: int, owner: bool):
+        self._shm = shm
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.capacity = capacity
+        self.owner = owner
+        n = len(self.symbols)
+        self.seq = np.ndarray((n,), dtype="<i8", buffer=shm.buf, offset=0)
+        self.version = np.ndarray((n,), dtype="<i8", buffer=shm.buf, offset=n * 8)
+        self.rings = np.ndarray((n, capacity), dtype=CANDLE_DTYPE, buffer=shm.buf, offset=self._header(n))
+
+    @staticmethod
+    def _header(n_symbols: int) -> int:
+        return -(-n_symbols * 16 // _HEADER_ALIGN) * _HEADER_ALIGN
+
+    @classmethod
+    def _size(cls, n_symbols: int, capacity: int) -> int:
+        return cls._header(n_symbols) + n_symbols * capacity * CANDLE_DTYPE.itemsize
+
+    @classmethod
+    def create(cls, symbols: List[str], capacity: int, name: Optional[str] = None) -> "CandleRingBus":
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls._size(len(symbols), capacity))
+        bus = cls(shm, symbols, capacity, owner=True)
+        bus.seq[:] = 0
+        bus.version[:] = 0
+        return bus
+
+    @classmethod
+    def attach(cls, name: str, symbols: List[str], capacity: int) -> "CandleRingBus":
+        shm = shared_memory.SharedMemory(name=name, create=False)
+        return cls(shm, symbols, capacity, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    # -------------------------------
+    # Writer side (ingest process only)
+    # -------------------------------
+    def write(self, symbol_idx: int, time_us: int, o: float, h: float, l: float, c: float, v: float) -> int:
+        """Appends a bar (or replaces the last one if it has the same start time). Returns the new counter."""
+        seq = int(self.seq[symbol_idx])
+        ring = self.rings[symbol_idx]
+        if seq > 0:
+            last_time = ring[(seq - 1) % self.capacity]["time"]
+            if last_time > time_us:
+                return seq  # stale bar; history already covers it
+            if last_time == time_us:
+                slot, new_seq = (seq - 1) % self.capacity, seq
+            else:
+                slot, new_seq = seq % self.capacity, seq + 1
+        else:
+            slot, new_seq = 0, 1
+        version = self.version
+        version[symbol_idx] += 1          # odd: write in progress
+        ring[slot] = (time_us, o, h, l, c, v)
+        self.seq[symbol_idx] = new_seq
+        version[symbol_idx] += 1          # even: consistent again
+        return new_seq
+
+    def write_frame(self, symbol_idx: int, df_candles: pd.DataFrame) -> int:
+        """Bulk-loads a history DataFrame (DatetimeIndex + Open/High/Low/Close/Volume)."""
+        seq = 0
+        # as_unit: pandas may hold the index in s/ms/us/ns depending on how it was built
+        times = df_candles.index.as_unit("us").asi8 if df_candles.index.dtype.kind == "M" else df_candles.index.to_numpy()
+        cols = [df_candles[c].to_numpy(dtype=float) for c in ("Open", "High", "Low", "Close", "Volume")]
+        for i in range(len(df_candles)):
+            seq = self.write(symbol_idx, int(times[i]), cols[0][i], cols[1][i], cols[2][i], cols[3][i], cols[4][i])
+        return seq
+
+    # -------------------------------
+    # Reader side
+    # -------------------------------
+    def window(self, symbol_idx: int, n: int, retries: int = 1000) -> Tuple[Optional[np.ndarray], int]:
+        """
+        Returns (bars, counter) with up to the last `n` bars in time order, as a copy
+        taken while no write was in progress. Returns (None, counter) if every attempt
+        raced a write.
+        """
+        version, ring = self.version, self.rings[symbol_idx]
+        for _ in range(retries):
+            before = int(version[symbol_idx])
+            if before & 1:
+                time.sleep(0)             # writer mid-update: yield and retry
+                continue
+            seq = int(self.seq[symbol_idx])
+            k = min(n, seq, self.capacity)
+            start = (seq - k) % self.capacity
+            if start + k <= self.capacity:
+                bars = ring[start:start + k].copy()
+            else:
+                bars = np.concatenate((ring[start:], ring[:start + k - self.capacity]))
+            if int(version[symbol_idx]) == before:
+                return bars, seq
+        return None, int(self.seq[symbol_idx])
+
+    def close(self) -> None:
+        # Drop numpy views before closing the mapping
+        self.seq = None
+        self.version = None
+        self.rings = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+
+def bars_to_frame(bars: np.ndarray) -> pd.DataFrame:
+    """Builds the DataFrame shape the strategy expects from ring bars."""
+    index = pd.to_datetime(bars["time"], unit="us", utc=True)
+    return pd.DataFrame(
+        {
+            "Open": bars["open"],
+            "High": bars["high"],
+            "Low": bars["low"],
+            "Close": bars["close"],
+            "Volume": bars["volume"],
+        },
+        index=index,
+    )
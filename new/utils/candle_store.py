@@ -0,0 +1,43 @@
+# your_trading_bot/utils/candle_store.py
+
+import pandas as pd
+
+from utils.indicators import calculate_indicators
+
+
+class CandleStore:
+    """
+    Rolling OHLCV window for one symbol: seeded from history, then fed completed
+    WS candles. Same upsert/trim rules run_bot applies to its DataFrame.
+    """
+
+    def __init__(self, symbol, max_rows, df_candles=None):
+        self.symbol = symbol
+        self.max_rows = max_rows
+        self.df = df_candles if df_candles is not None else pd.DataFrame()
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def last_time(self):
+        return self.df.index[-1] if not self.df.empty else None
+
+    def append(self, candle: dict) -> None:
+        """Insert or replace the bar at candle['time'] and trim to max_rows."""
+        row = {k: v for k, v in candle.items() if k != 'symbol'}
+        if not self.df.empty and row['time'] < self.df.index[-1]:
+            # Already covered by the REST backfill (WS starts before history is fetched)
+            return
+        cdf = pd.DataFrame([row], index=[row['time']])
+        if not self.df.empty and row['time'] == self.df.index[-1]:
+            self.df.loc[row['time']] = cdf.iloc[0]
+        elif self.df.empty:
+            self.df = cdf
+        else:
+            self.df = pd.concat([self.df, cdf])
+        self.df = self.df.iloc[-self.max_rows:]
+
+    def with_indicators(self) -> pd.DataFrame:
+        self.df = calculate_indicators(self.df)
+        return self.df
@@ -0,0 +1,242 @@
+# your_trading_bot/utils/candle_validation.py
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config
+from utils.helpers import get_resolution_seconds
+
+_PRICES = ("Open", "High", "Low", "Close")
+_MAD_TO_SIGMA = 1.4826
+_MEAN_ABS_TO_SIGMA = math.sqrt(math.pi / 2)
+
+
+@dataclass
+class CandleQualityReport:
+    resolution: str
+    rows_in: int = 0
+    rows_out: int = 0
+    unsorted: bool = False
+    duplicates: int = 0
+    misaligned: int = 0          # start time off the resolution grid
+    bad_prices: int = 0          # NaN / zero / negative OHLC
+    hl_inconsistent: int = 0     # High below or Low above the other prices
+    spikes: int = 0              # single-bar close moves that reverse on the next bar
+    jumps: int = 0               # outsized close moves that do not reverse (reported only)
+    wicks: int = 0               # outsized wicks
+    gaps: int = 0
+    missing_bars: int = 0
+    largest_gap: Optional[Tuple[pd.Timestamp, int]] = None   # (last bar before it, bars missing)
+    repaired: bool = False
+
+    @property
+    def issues(self) -> int:
+        return (self.duplicates + self.misaligned + self.bad_prices + self.hl_inconsistent + self.spikes
+                + self.jumps + self.wicks + self.gaps + int(self.unsorted))
+
+    def __str__(self):
+        parts = [f"{self.resolution} candles: {self.rows_in} → {self.rows_out} rows"]
+        if self.unsorted:
+            parts.append("unsorted")
+        for name in ("duplicates", "misaligned", "bad_prices", "hl_inconsistent", "spikes", "jumps", "wicks"):
+            if getattr(self, name):
+                parts.append(f"{name.replace('_', ' ')} {getattr(self, name)}")
+        if self.gaps:
+            start, bars = self.largest_gap
+            parts.append(f"gaps {self.gaps} ({self.missing_bars} bars missing, largest {bars} after {start})")
+        if self.repaired:
+            parts.append("repaired")
+        return " | ".join(parts)
+
+
+def _robust_sigma(x: np.ndarray) -> Tuple[float, float]:
+    """(median, MAD-based sigma) of x; sigma 0 when there is too little dispersion to judge."""
+    if len(x) < 10:
+        return 0.0, 0.0
+    med = float(np.median(x))
+    return med, float(_MAD_TO_SIGMA * np.median(np.abs(x - med)))
+
+
+def validate_candles(df: pd.DataFrame, resolution: str, repair: bool = None,
+                     outlier_z: float = None) -> Tuple[pd.DataFrame, CandleQualityReport]:
+    """
+    One vectorized pass over a bot-shaped OHLCV frame (UTC DatetimeIndex). Always sorts and
+    drops duplicate timestamps (the last row wins, as with WS upserts). Flags rows with bad
+    prices, inconsistent High/Low, off-grid start times, spikes / jumps / wicks beyond
+    `outlier_z` robust sigmas, and gaps against the resolution grid. With `repair`, bad
+    rows are dropped, spike closes reset to the previous close, wicks clipped and High/Low
+    widened to cover Open/Close. Gaps are reported, never filled.
+    """
+    repair = config.CANDLE_REPAIR if repair is None else repair
+    outlier_z = outlier_z or config.CANDLE_OUTLIER_Z
+    report = CandleQualityReport(resolution=resolution, rows_in=len(df))
+    if df.empty:
+        return df, report
+
+    # --- Order and duplicates ---
+    t = df.index.as_unit("ns").asi8
+    if not df.index.is_monotonic_increasing:
+        report.unsorted = True
+        order = np.argsort(t, kind="stable")
+    else:
+        order = np.arange(len(t))
+    ts = t[order]
+    keep = np.ones(len(ts), bool)
+    keep[:-1] = ts[1:] != ts[:-1]
+    report.duplicates = int((~keep).sum())
+    rows = order[keep]
+    ts = ts[keep]
+    o, h, lo, c = (pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)[rows] for col in _PRICES)
+
+    # --- Row-level checks ---
+    valid = np.isfinite(o) & np.isfinite(h) & np.isfinite(lo) & np.isfinite(c) & (o > 0) & (h > 0) & (lo > 0) & (c > 0)
+    report.bad_prices = int((~valid).sum())
+    body_hi, body_lo = np.maximum(o, c), np.minimum(o, c)
+    report.hl_inconsistent = int((valid & ((h < np.maximum(body_hi, lo)) | (lo > np.minimum(body_lo, h)))).sum())
+    step_ns = get_resolution_seconds(resolution) * 1_000_000_000
+    if step_ns:
+        report.misaligned = int((ts % step_ns != 0).sum())
+
+    # --- Outliers on the valid rows: close-to-close log returns and wick sizes ---
+    vi = np.flatnonzero(valid)
+    cv = c[vi]
+    spike_at = np.empty(0, np.int64)
+    if len(vi) > 2:
+        ret = np.diff(np.log(cv))
+        med, sigma = _robust_sigma(ret)
+        if sigma > 0:
+            z = (ret - med) / sigma
+            big = np.abs(z) > outlier_z
+            # ret[j-1] moves into bar vi[j], ret[j] moves out of it
+            reverts = np.zeros(len(big), bool)
+            reverts[:-1] = big[:-1] & (np.abs(z[1:]) > outlier_z / 2) & (np.sign(z[1:]) == -np.sign(z[:-1]))
+            spike_at = vi[1:][reverts]
+            report.spikes = int(reverts.sum())
+            report.jumps = int(big.sum()) - report.spikes - int((big[1:] & reverts[:-1]).sum())
+    wick_cap = np.full(len(c), np.inf)
+    if len(vi) > 2:
+        wick = np.concatenate(((h - body_hi)[vi], (body_lo - lo)[vi])) / np.concatenate((cv, cv))
+        med, sigma = _robust_sigma(wick)
+        if sigma > 0:
+            cap = med + outlier_z * sigma
+            wick_cap[vi] = cap * c[vi]
+            report.wicks = int((((h - body_hi) > wick_cap) | ((body_lo - lo) > wick_cap))[vi].sum())
+
+    # --- Gaps against the grid ---
+    if step_ns and len(vi) > 1:
+        dt = np.diff(ts[vi])
+        gap = np.flatnonzero(dt > step_ns)
+        if len(gap):
+            missing = dt[gap] // step_ns - 1
+            report.gaps = len(gap)
+            report.missing_bars = int(missing.sum())
+            worst = int(np.argmax(missing))
+            report.largest_gap = (pd.Timestamp(int(ts[vi][gap[worst]]), tz="UTC"), int(missing[worst]))
+
+    out = df.iloc[rows]
+    if repair and (report.bad_prices or report.hl_inconsistent or report.spikes or report.wicks):
+        out = out.copy()
+        if len(spike_at):
+            # The spike's close goes back to the previous valid close
+            prev = np.searchsorted(vi, spike_at) - 1
+            c[spike_at] = c[vi[prev]]
+            body_hi, body_lo = np.maximum(o, c), np.minimum(o, c)
+        h = np.minimum(h, body_hi + wick_cap)
+        lo = np.maximum(lo, body_lo - wick_cap)
+        h, lo = np.maximum(h, np.maximum(body_hi, lo)), np.minimum(lo, np.minimum(body_lo, h))
+        for col, values in zip(_PRICES, (o, h, lo, c)):
+            out[col] = values
+        out = out[valid]
+        report.repaired = True
+    report.rows_out = len(out)
+    return out, report
+
+
+@dataclass
+class _SymbolState:
+    last_ns: int
+    last_close: float
+    abs_ret: float = 0.0          # EWMA of |log return|, 0 until seeded or warmed up
+    bars: int = 0
+
+
+class LiveCandleValidator:
+    """
+    The same checks for completed WS candles, one bar at a time in O(1): out-of-order /
+    duplicate starts, gaps, bad prices, High/Low consistency and outsized close moves
+    (against an EWMA of absolute returns, seeded from history). Bars with bad prices or a
+    start at or before the last one are rejected; with `repair`, High/Low are widened to
+    cover Open/Close. Outliers are only counted: a live spike cannot be told from a real
+    move until the next bar.
+    """
+
+    def __init__(self, resolution: str, repair: bool = None, outlier_z: float = None, span: int = 500):
+        self.resolution = resolution
+        self.repair = config.CANDLE_REPAIR if repair is None else repair
+        self.outlier_z = outlier_z or config.CANDLE_OUTLIER_Z
+        self.span = span
+        self.report = CandleQualityReport(resolution=resolution)
+        self._state: Dict[str, _SymbolState] = {}
+        self._step_ns = get_resolution_seconds(resolution) * 1_000_000_000
+        self._alpha = 2.0 / (span + 1.0)
+
+    def seed(self, symbol: str, df: pd.DataFrame) -> None:
+        """Starts from the last bar of (validated) history and its return dispersion."""
+        if df.empty:
+            return
+        close = df["Close"].to_numpy(dtype=float)
+        ret = np.abs(np.diff(np.log(close[close > 0])))
+        self._state[symbol] = _SymbolState(last_ns=int(df.index[-1].value), last_close=float(close[-1]),
+                                           abs_ret=float(ret[-self.span:].mean()) if len(ret) >= 10 else 0.0,
+                                           bars=len(ret))
+
+    def check(self, candle: dict) -> Optional[dict]:
+        """The candle (possibly repaired) to pass on, or None to drop it."""
+        r = self.report
+        r.rows_in += 1
+        symbol = candle.get("symbol", "")
+        t_ns = int(candle["time"].value)
+        o, h, lo, c = (float(candle[k]) for k in _PRICES)
+        st = self._state.get(symbol)
+        if st is not None and t_ns <= st.last_ns:
+            r.duplicates += 1
+            print(f"⚠️ Candle {symbol} {candle['time']} is not after the last bar; dropped.")
+            return None
+        if not (o > 0 and h > 0 and lo > 0 and c > 0 and math.isfinite(o + h + lo + c)):
+            r.bad_prices += 1
+            print(f"⚠️ Candle {symbol} {candle['time']} has bad prices {o, h, lo, c}; dropped.")
+            return None
+        if self._step_ns and t_ns % self._step_ns:
+            r.misaligned += 1
+        if h < max(o, c, lo) or lo > min(o, c, h):
+            r.hl_inconsistent += 1
+            if self.repair:
+                candle = dict(candle, High=max(o, h, lo, c), Low=min(o, h, lo, c))
+                r.repaired = True
+        if st is None:
+            self._state[symbol] = _SymbolState(last_ns=t_ns, last_close=c)
+        else:
+            if self._step_ns and t_ns - st.last_ns > self._step_ns:
+                missing = (t_ns - st.last_ns) // self._step_ns - 1
+                r.gaps += 1
+                r.missing_bars += missing
+                if r.largest_gap is None or missing > r.largest_gap[1]:
+                    r.largest_gap = (pd.Timestamp(st.last_ns, tz="UTC"), missing)
+                print(f"⚠️ Candle gap for {symbol}: {missing} bar(s) missing before {candle['time']}")
+            move = abs(math.log(c / st.last_close))
+            if st.abs_ret > 0 and st.bars >= 10 and move > self.outlier_z * _MEAN_ABS_TO_SIGMA * st.abs_ret:
+                r.jumps += 1
+                print(f"⚠️ Candle {symbol} {candle['time']}: close moved {move:.2%} "
+                      f"(> {self.outlier_z:g} sigma of recent bars)")
+            else:
+                st.abs_ret += self._alpha * (move - st.abs_ret) if st.bars >= 10 else (move - st.abs_ret) / (st.bars + 1)
+                st.bars += 1
+            st.last_ns, st.last_close = t_ns, c
+        r.rows_out += 1
+        return candle
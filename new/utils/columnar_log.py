@@ -0,0 +1,74 @@
+# your_trading_bot/utils/columnar_log.py
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class ColumnarLog:
+    """
+    Append-only column store: one raw little-endian file per column inside `directory`,
+    plus schema.json. Rows are appended in batches; a reader maps each column with
+    np.fromfile and trims to the shortest column, so a torn final batch is dropped.
+    """
+
+    SCHEMA_FILE = "schema.json"
+
+    def __init__(self, directory: str, schema: Dict[str, str], meta: Optional[dict] = None):
+        self.directory = directory
+        self.schema = {name: np.dtype(dt).newbyteorder("<") for name, dt in schema.items()}
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, self.SCHEMA_FILE), "w") as f:
+            json.dump({"columns": {n: d.str for n, d in self.schema.items()}, "meta": meta or {}}, f, indent=1)
+        self._files = {name: open(self._column_path(directory, name), "ab") for name in self.schema}
+        self._buffers: Dict[str, List[np.ndarray]] = {name: [] for name in self.schema}
+        self._pending = 0
+        self.rows_written = 0
+
+    @staticmethod
+    def _column_path(directory: str, name: str) -> str:
+        return os.path.join(directory, f"{name}.col")
+
+    def append(self, **columns) -> None:
+        """Buffers a batch; every schema column must be given, all with the same length."""
+        lengths = {len(np.atleast_1d(v)) for v in columns.values()}
+        if set(columns) != set(self.schema) or len(lengths) != 1:
+            raise ValueError(f"append() needs equal-length columns {sorted(self.schema)}")
+        for name, dtype in self.schema.items():
+            self._buffers[name].append(np.asarray(np.atleast_1d(columns[name]), dtype=dtype))
+        self._pending += lengths.pop()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        for name, chunks in self._buffers.items():
+            self._files[name].write(np.concatenate(chunks).tobytes())
+            self._files[name].flush()
+            chunks.clear()
+        self.rows_written += self._pending
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+    @classmethod
+    def read(cls, directory: str) -> Dict[str, np.ndarray]:
+        with open(os.path.join(directory, cls.SCHEMA_FILE)) as f:
+            columns = json.load(f)["columns"]
+        data = {}
+        for name, dt in columns.items():
+            path = cls._column_path(directory, name)
+            data[name] = np.fromfile(path, dtype=np.dtype(dt)) if os.path.exists(path) else np.empty(0, dt)
+        n = min((len(v) for v in data.values()), default=0)
+        return {name: v[:n] for name, v in data.items()}
+
+    @classmethod
+    def read_meta(cls, directory: str) -> dict:
+        with open(os.path.join(directory, cls.SCHEMA_FILE)) as f:
+            return json.load(f)["meta"]
@@ -1,6 +1,7 @@
 # your_trading_bot/utils/helpers.py
 
 from datetime import datetime, timezone
+import numpy as np
 import pytz
 
 def get_session(timestamp):
@@ -22,3 +23,16 @@ def get_resolution_seconds(resolution_str):
     elif resolution_str.endswith('d'): # Corrected 'res' to 'resolution_str'
         return int(resolution_str[:-1]) * 86400
     return 0
+
+
+def to_microseconds(times):
+    """History 'time' values in microseconds, whether the payload used s, ms or us."""
+    times = np.asarray(times, dtype=np.int64)
+    if not len(times):
+        return times
+    peak = int(np.abs(times).max())
+    if peak < 10**11:
+        return times * 1_000_000
+    if peak < 10**14:
+        return times * 1000
+    return times
@@ -1,10 +1,15 @@
 # utils/indicators.py
 
+from dataclasses import dataclass
+
 import pandas as pd
 import numpy as np
 from ta.momentum import RSIIndicator
 import config  # Assuming config.py is in the parent directory
+from utils import kernels
+from utils.metrics import timed
 
+@timed("calculate_indicators", "calculate_indicators() over the candle window")
 def calculate_indicators(df_candles: pd.DataFrame):
     """Calculates EMA25, ATR, and RSI for the DataFrame."""
     if df_candles.empty:
@@ -17,30 +22,141 @@ def calculate_indicators(df_candles: pd.DataFrame):
     df_candles.sort_index(inplace=True)
 
     # ✅ EMA25
-    df_candles[f'EMA{config.EMA_PERIOD}'] = (
-        df_candles['Close'].ewm(span=config.EMA_PERIOD, adjust=False).mean()
-    )
+    df_candles[f'EMA{config.EMA_PERIOD}'] = compute_indicator(df_candles, IndicatorSpec('ema', config.EMA_PERIOD))
 
     # ✅ ATR
     if len(df_candles) >= config.ATR_PERIOD:
-        df_candles['TR'] = np.maximum(
-            df_candles['High'] - df_candles['Low'],
-            np.abs(df_candles['High'] - df_candles['Close'].shift(1)),
-            np.abs(df_candles['Low'] - df_candles['Close'].shift(1))
-        )
-        df_candles['ATR'] = df_candles['TR'].rolling(
-            window=config.ATR_PERIOD, min_periods=config.ATR_PERIOD
-        ).mean()
+        df_candles['TR'] = kernels.true_range(df_candles['High'].to_numpy(float), df_candles['Low'].to_numpy(float),
+                                              df_candles['Close'].to_numpy(float))
+        df_candles['ATR'] = compute_indicator(df_candles, IndicatorSpec('atr', config.ATR_PERIOD))
     else:
         df_candles['TR'] = np.nan
         df_candles['ATR'] = np.nan
 
     # ✅ RSI
-    if len(df_candles) >= config.RSI_PERIOD:
-        df_candles['RSI'] = RSIIndicator(
-            close=df_candles['Close'], window=config.RSI_PERIOD, fillna=False
-        ).rsi()
-    else:
-        df_candles['RSI'] = np.nan
+    df_candles['RSI'] = compute_indicator(df_candles, IndicatorSpec('rsi', config.RSI_PERIOD))
 
     return df_candles
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """One indicator series a strategy depends on, e.g. IndicatorSpec('ema', 25)."""
+    kind: str      # 'ema' | 'rsi' | 'atr'
+    period: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.kind.upper()}{self.period}"
+
+
+def compute_indicator(df_candles: pd.DataFrame, spec: IndicatorSpec) -> np.ndarray:
+    """
+    Computes a single indicator as a float array aligned with df_candles (the series
+    calculate_indicators writes). Runs the utils.kernels recurrences; gappy (NaN) prices
+    take the pandas / ta path, which skips missing values the way those libraries do.
+    """
+    cols = ['Close'] if spec.kind != 'atr' else ['High', 'Low', 'Close']
+    arrays = [pd.to_numeric(df_candles[c], errors='coerce').to_numpy(dtype=float) for c in cols]
+    if not all(np.isfinite(a).all() for a in arrays):
+        return indicator_pandas(df_candles, spec)
+    close = arrays[-1]
+    if spec.kind == 'ema':
+        return kernels.ema(close, 2.0 / (spec.period + 1.0))
+    if spec.kind == 'rsi':
+        return kernels.rsi(close, spec.period)
+    if spec.kind == 'atr':
+        return kernels.atr(arrays[0], arrays[1], close, spec.period)
+    raise ValueError(f"Unknown indicator kind: {spec.kind}")
+
+
+def indicator_pandas(df_candles: pd.DataFrame, spec: IndicatorSpec) -> np.ndarray:
+    """The same indicator through pandas ewm/rolling and ta (NaN-tolerant reference path)."""
+    close = pd.to_numeric(df_candles['Close'], errors='coerce')
+    n = len(close)
+    if spec.kind == 'ema':
+        return close.ewm(span=spec.period, adjust=False).mean().to_numpy(dtype=float)
+    if spec.kind == 'rsi':
+        if n < spec.period:
+            return np.full(n, np.nan)
+        return RSIIndicator(close=close, window=spec.period, fillna=False).rsi().to_numpy(dtype=float)
+    if spec.kind == 'atr':
+        if n < spec.period:
+            return np.full(n, np.nan)
+        high = pd.to_numeric(df_candles['High'], errors='coerce')
+        low = pd.to_numeric(df_candles['Low'], errors='coerce')
+        prev = close.shift(1)
+        tr = pd.concat([high - low, (high - prev).abs(), (low - prev).abs()], axis=1).max(axis=1, skipna=False)
+        return tr.rolling(window=spec.period, min_periods=spec.period).mean().to_numpy(dtype=float)
+    raise ValueError(f"Unknown indicator kind: {spec.kind}")
+
+
+class IncrementalIndicators:
+    """
+    EMA and Wilder RSI for many periods at once, advanced one bar at a time.
+    Every update is a handful of vectorized ops over the period arrays, so the cost per
+    bar does not depend on history length. Recursions match calculate_indicators
+    (pandas ewm with adjust=False, ta's RSI with min_periods=window) on the same stream.
+    """
+
+    def __init__(self, ema_periods, rsi_periods):
+        self.ema_periods = np.asarray(sorted(set(ema_periods)), dtype=int)
+        self.rsi_periods = np.asarray(sorted(set(rsi_periods)), dtype=int)
+        self._ema_alpha = 2.0 / (self.ema_periods + 1.0)
+        self._rsi_alpha = 1.0 / self.rsi_periods
+        self.ema = np.full(len(self.ema_periods), np.nan)
+        self.prev_ema = np.full(len(self.ema_periods), np.nan)
+        self.rsi = np.full(len(self.rsi_periods), np.nan)
+        self._avg_up = np.zeros(len(self.rsi_periods))
+        self._avg_dn = np.zeros(len(self.rsi_periods))
+        self.prev_close = np.nan
+        self.last_close = np.nan
+        self.bars = 0
+
+    def ema_index(self, period: int) -> int:
+        return int(np.searchsorted(self.ema_periods, period))
+
+    def rsi_index(self, period: int) -> int:
+        return int(np.searchsorted(self.rsi_periods, period))
+
+    def update(self, close: float) -> None:
+        self.prev_ema[:] = self.ema
+        if self.bars == 0:
+            # ewm starts from the first value; ta counts the first (NaN) diff as a zero move
+            self.ema[:] = close
+            self._avg_up[:] = 0.0
+            self._avg_dn[:] = 0.0
+        else:
+            self.ema += self._ema_alpha * (close - self.ema)
+            diff = close - self.last_close
+            up, dn = max(diff, 0.0), max(-diff, 0.0)
+            self._avg_up += self._rsi_alpha * (up - self._avg_up)
+            self._avg_dn += self._rsi_alpha * (dn - self._avg_dn)
+        self.bars += 1
+        self.prev_close, self.last_close = self.last_close, close
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(self._avg_dn == 0, 100.0, 100.0 - 100.0 / (1.0 + self._avg_up / self._avg_dn))
+        self.rsi[:] = np.where(self.bars >= self.rsi_periods, rsi, np.nan)
+
+    def seed(self, closes) -> None:
+        """Advances over a whole history at once with the utils.kernels recurrences; same state as update() per bar."""
+        closes = np.asarray(closes, dtype=float)
+        if len(closes) < 2 or not np.isfinite(closes).all():
+            for c in closes:
+                self.update(float(c))
+            return
+        started = self.bars > 0
+        for j, alpha in enumerate(self._ema_alpha):
+            ema = kernels.ema(closes, alpha, self.ema[j] if started else np.nan)
+            self.prev_ema[j], self.ema[j] = ema[-2], ema[-1]
+        diff = np.diff(closes, prepend=self.last_close if started else closes[0])
+        up, dn = np.maximum(diff, 0.0), np.maximum(-diff, 0.0)
+        for j, alpha in enumerate(self._rsi_alpha):
+            self._avg_up[j] = kernels.ema(up, alpha, self._avg_up[j] if started else np.nan)[-1]
+            self._avg_dn[j] = kernels.ema(dn, alpha, self._avg_dn[j] if started else np.nan)[-1]
+        self.bars += len(closes)
+        self.prev_close, self.last_close = closes[-2], closes[-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(self._avg_dn == 0, 100.0, 100.0 - 100.0 / (1.0 + self._avg_up / self._avg_dn))
+        self.rsi[:] = np.where(self.bars >= self.rsi_periods, rsi, np.nan)
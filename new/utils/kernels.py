@@ -0,0 +1,212 @@
+# your_trading_bot/utils/kernels.py
+"""
+Sequential recurrences shared by the indicators, the incremental engine and the backtester:
+EMA (pandas ewm adjust=False), Wilder RSI (as ta computes it), true range / ATR and the
+bar-by-bar SL/TP/trailing position loop.
+
+With numba installed (and USE_NUMBA on) the loops are compiled with cache=True, so only the
+very first run on a machine pays for compilation; later processes load the cached machine
+code. Without numba the EMA runs as a blocked closed form in NumPy and the position loop
+runs as plain Python over lists.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+import config
+
+try:  # optional: compiled loops
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA = numba is not None and config.USE_NUMBA
+
+# Exit reasons returned by position_loop
+REASON_SL, REASON_TP, REASON_BOTH, REASON_END = 0, 1, 2, 3
+
+
+def _jit(fn):
+    return numba.njit(cache=True, nogil=True)(fn) if NUMBA else fn
+
+
+# ---------------------------------------------------------------------- loops
+def _ema_loop(x, alpha, y0):
+    n = x.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    r = 1.0 - alpha
+    y = x[0] if math.isnan(y0) else r * y0 + alpha * x[0]
+    out[0] = y
+    for i in range(1, n):
+        y = r * y + alpha * x[i]
+        out[i] = y
+    return out
+
+
+def _rolling_mean_loop(x, period):
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    s = 0.0
+    for i in range(n):
+        s += x[i]
+        if i >= period:
+            s -= x[i - period]
+        if i >= period - 1:
+            out[i] = s / period
+    return out
+
+
+def _position_loop(high, low, close, signal, sl_at, tp_at, trail_pct, close_at_end):
+    n = len(close)
+    entry_i = np.empty(n, np.int64)
+    exit_i = np.empty(n, np.int64)
+    sides = np.empty(n, np.int8)
+    entry_px = np.empty(n)
+    exit_px = np.empty(n)
+    reasons = np.empty(n, np.int8)
+    k = 0
+    side, entry, sl, tp, best, ei = 0, 0.0, 0.0, 0.0, 0.0, -1
+    for i in range(n):
+        # --- Exits for a position opened on an earlier bar ---
+        if side != 0:
+            if side == 1:
+                sl_hit, tp_hit = low[i] <= sl, high[i] >= tp
+            else:
+                sl_hit, tp_hit = high[i] >= sl, low[i] <= tp
+            if sl_hit or tp_hit:
+                entry_i[k], exit_i[k], sides[k], entry_px[k] = ei, i, side, entry
+                if sl_hit and tp_hit:
+                    reasons[k], exit_px[k] = REASON_BOTH, sl
+                elif sl_hit:
+                    reasons[k], exit_px[k] = REASON_SL, sl
+                else:
+                    reasons[k], exit_px[k] = REASON_TP, tp
+                k += 1
+                side = 0
+            elif trail_pct > 0.0:
+                # Trail on a new closing extreme, only ever tightening (bar_handler.manage_open_position)
+                if side == 1 and close[i] > best:
+                    best = close[i]
+                    sl = max(sl, best * (1.0 - trail_pct))
+                elif side == -1 and close[i] < best:
+                    best = close[i]
+                    sl = min(sl, best * (1.0 + trail_pct))
+        # --- Entries at the close ---
+        if side == 0 and signal[i] != 0:
+            side, entry, ei = signal[i], close[i], i
+            sl, tp, best = sl_at[i], tp_at[i], close[i]
+    if side != 0 and close_at_end and ei < n - 1:
+        entry_i[k], exit_i[k], sides[k], entry_px[k] = ei, n - 1, side, entry
+        reasons[k], exit_px[k] = REASON_END, close[n - 1]
+        k += 1
+    return entry_i[:k], exit_i[:k], sides[:k], entry_px[:k], exit_px[:k], reasons[:k]
+
+
+_ema_jit = _jit(_ema_loop)
+_rolling_mean_jit = _jit(_rolling_mean_loop)
+_position_jit = _jit(_position_loop)
+
+
+# ---------------------------------------------------------------------- NumPy fallbacks
+def ema_numpy(x: np.ndarray, alpha: float, y0: float = np.nan) -> np.ndarray:
+    """
+    EMA without a Python loop. Within a block, y_t = r^(t+1) c + alpha r^t cumsum(x_j r^-j)
+    (r = 1 - alpha, c = value carried in), with blocks short enough that r^-j stays finite;
+    only the block-end carries are chained one block at a time.
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    if n == 0 or alpha >= 1.0:
+        return x.copy()
+    r = 1.0 - alpha
+    carry = x[0] if math.isnan(y0) else y0      # r * x0 + alpha * x0 == x0, pandas' starting value
+    b = int(min(n, max(1, 200 / -math.log10(r))))
+    nb = -(-n // b)
+    blocks = np.zeros(nb * b)
+    blocks[:n] = x
+    blocks = blocks.reshape(nb, b)
+    k = np.arange(b, dtype=float)
+    local = np.cumsum(blocks * r ** -k, axis=1)
+    local *= alpha * r ** k
+    carries = np.empty(nb)
+    carries[0] = carry
+    rb = r ** b
+    for j in range(1, nb):
+        carries[j] = local[j - 1, -1] + rb * carries[j - 1]
+    local += r ** (k + 1) * carries[:, None]
+    return local.ravel()[:n]
+
+
+def rolling_mean_numpy(x: np.ndarray, period: int) -> np.ndarray:
+    x = np.asarray(x, dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        c = np.cumsum(np.concatenate(([0.0], x)))
+        out[period - 1:] = (c[period:] - c[:-period]) / period
+    return out
+
+
+# ---------------------------------------------------------------------- public
+def ema(x: np.ndarray, alpha: float, y0: float = np.nan) -> np.ndarray:
+    """
+    y_t = (1 - alpha) y_{t-1} + alpha x_t, starting from y0 (or from x[0] when y0 is NaN,
+    like pandas ewm(adjust=False)). Inputs must be finite.
+    """
+    x = np.ascontiguousarray(x, dtype=float)
+    return _ema_jit(x, float(alpha), float(y0)) if NUMBA else ema_numpy(x, alpha, y0)
+
+
+def rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """ta's RSIIndicator(fillna=False): Wilder averages of up/down moves, NaN for the first period-1 bars."""
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    if n < period:
+        return np.full(n, np.nan)
+    diff = np.diff(close, prepend=close[0])     # ta counts the first (NaN) move as zero
+    up = ema(np.maximum(diff, 0.0), 1.0 / period)
+    dn = ema(np.maximum(-diff, 0.0), 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(dn == 0, 100.0, 100.0 - 100.0 / (1.0 + up / dn))
+    out[:period - 1] = np.nan
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """max(H - L, |H - prev C|, |L - prev C|); NaN on the first bar."""
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    prev = np.concatenate(([np.nan], close[:-1]))
+    return np.maximum(high - low, np.maximum(np.abs(high - prev), np.abs(low - prev)))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average of the true range over `period` bars (as calculate_indicators)."""
+    tr = true_range(high, low, close)
+    out = np.full(len(tr), np.nan)
+    if len(tr) > period:
+        tail = np.ascontiguousarray(tr[1:])
+        out[1:] = _rolling_mean_jit(tail, int(period)) if NUMBA else rolling_mean_numpy(tail, period)
+    return out
+
+
+def position_loop(high: np.ndarray, low: np.ndarray, close: np.ndarray, signal: np.ndarray,
+                  sl_at: np.ndarray, tp_at: np.ndarray, trail_pct: float = 0.0,
+                  close_at_end: bool = False) -> Tuple[np.ndarray, ...]:
+    """
+    One position at a time: enter at the close of a bar with a signal (SL/TP from sl_at / tp_at
+    of that bar), exit on the first later bar whose range touches the SL or TP. A bar touching
+    both is reported as REASON_BOTH at the SL price for the caller to settle. With `trail_pct`
+    the SL follows new closing extremes at that fraction. Returns per-trade arrays
+    (entry_i, exit_i, side, entry_price, exit_price, reason).
+    """
+    args = (high, low, close, signal, sl_at, tp_at)
+    if NUMBA:
+        args = tuple(np.ascontiguousarray(a) for a in args)
+        return _position_jit(*args, float(trail_pct), bool(close_at_end))
+    # Interpreted: Python floats index and compare far faster than NumPy scalars
+    return _position_loop(*(a.tolist() for a in args), float(trail_pct), bool(close_at_end))
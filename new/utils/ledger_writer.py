@@ -0,0 +1,220 @@
+# your_trading_bot/utils/ledger_writer.py
+
+from __future__ import annotations
+
+import csv
+import glob
+import io
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+try:  # optional: columnar segments next to the CSV
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+TRADE_LOG_COLUMNS = (
+    'Entry Time', 'Exit Time', 'Type', 'Reason', 'Entry Price', 'Exit Price',
+    'PnL', 'Net PnL', 'Session', 'Initial SL Price', 'Initial TP Price',
+)
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+_FLUSH = object()
+_STOP = object()
+
+
+class LedgerWriter:
+    """
+    Append-only CSV ledger written by a background thread.
+
+    log() only enqueues, so callers (order handling, backtests, shadow runs) never wait on
+    disk. The writer drains the queue in batches, formats rows against a fixed column
+    schema, writes through a large buffer and fsyncs per `fsync` policy:
+      "always"   - after every batch
+      "interval" - at most every `fsync_interval` seconds
+      "never"    - leave it to the OS
+    With rotate_daily, files are named <stem>_YYYY-MM-DD<ext> by the UTC write date.
+    With parquet=True (needs pyarrow), every `parquet_segment_rows` rows are also written
+    as a Parquet segment beside the CSV; numbering continues after the segments already on
+    disk, so a restart on the same day never overwrites one.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        columns: Sequence[str] = TRADE_LOG_COLUMNS,
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+        rotate_daily: bool = True,
+        parquet: bool = False,
+        parquet_segment_rows: int = 50_000,
+        batch_size: int = 4096,
+        buffer_bytes: int = 1 << 20,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        if parquet and pa is None:
+            print("⚠️ pyarrow not installed; ledger Parquet segments disabled.")
+            parquet = False
+        self.path = path
+        self.columns = tuple(columns)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.rotate_daily = rotate_daily
+        self.parquet = parquet
+        self.parquet_segment_rows = parquet_segment_rows
+        self.batch_size = batch_size
+        self.buffer_bytes = buffer_bytes
+
+        self.records_written = 0
+        self.batches_written = 0
+        self.errors = 0
+
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._file = None
+        self._file_path = None
+        self._last_fsync = time.monotonic()
+        self._segment: List[list] = []
+        self._segment_no = 0
+        self._header = self._format([self.columns])
+        self._unknown_keys_warned = False
+        self._thread = threading.Thread(target=self._run, name="ledger-writer", daemon=True)
+        self._thread.start()
+
+    # -------------------------------
+    # Producer side (any thread)
+    # -------------------------------
+    def log(self, record: Dict) -> None:
+        """Queues one record (dict keyed by column name). Never blocks."""
+        self._queue.put(record)
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Waits until everything queued so far is written (and fsynced unless policy is 'never')."""
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    # -------------------------------
+    # Writer thread
+    # -------------------------------
+    def _current_path(self) -> str:
+        if not self.rotate_daily:
+            return self.path
+        stem, ext = os.path.splitext(self.path)
+        return f"{stem}_{datetime.now(timezone.utc):%Y-%m-%d}{ext or '.csv'}"
+
+    def _open(self, path: str) -> None:
+        self._close_file()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", buffering=self.buffer_bytes, newline="", encoding="utf-8")
+        self._file_path = path
+        self._segment_no = self._next_segment_no(path)
+        if new_file:
+            self._file.write(self._header)
+
+    @staticmethod
+    def _next_segment_no(path: str) -> int:
+        stem = os.path.splitext(path)[0]
+        taken = []
+        for seg in glob.glob(f"{glob.escape(stem)}.*.parquet"):
+            no = seg[len(stem) + 1:-len(".parquet")]
+            if no.isdigit():
+                taken.append(int(no))
+        return max(taken) + 1 if taken else 0
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._write_segment()
+            self._file.flush()
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def _format(rows: List[Sequence]) -> str:
+        out = io.StringIO()
+        csv.writer(out, lineterminator="\n").writerows(rows)
+        return out.getvalue()
+
+    def _to_row(self, record: Dict) -> list:
+        if not self._unknown_keys_warned and not record.keys() <= set(self.columns):
+            self._unknown_keys_warned = True
+            print(f"⚠️ Ledger ignores fields outside its schema: {sorted(set(record) - set(self.columns))}")
+        return [record.get(c, "") for c in self.columns]
+
+    def _write_segment(self) -> None:
+        if not self.parquet or not self._segment:
+            return
+        stem = os.path.splitext(self._file_path)[0]
+        seg_path = f"{stem}.{self._segment_no:05d}.parquet"
+        table = pa.table({c: [str(r[i]) for r in self._segment] for i, c in enumerate(self.columns)})
+        pq.write_table(table, seg_path)
+        self._segment_no += 1
+        self._segment = []
+
+    def _write(self, rows: List[list], force_fsync: bool = False) -> None:
+        path = self._current_path()
+        if path != self._file_path or self._file is None:
+            self._open(path)
+        if rows:
+            self._file.write(self._format(rows))
+            self.records_written += len(rows)
+            self.batches_written += 1
+            if self.parquet:
+                self._segment.extend(rows)
+                if len(self._segment) >= self.parquet_segment_rows:
+                    self._write_segment()
+
+        now = time.monotonic()
+        sync = self.fsync == "always" or (self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval)
+        if sync or force_fsync:
+            self._file.flush()
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            rows, waiters, stop = [], [], False
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, tuple) and item and item[0] is _FLUSH:
+                    waiters.append(item[1])
+                else:
+                    try:
+                        rows.append(self._to_row(item))
+                    except Exception as e:
+                        # One malformed record must not kill the writer thread
+                        self.errors += 1
+                        print(f"❌ Ledger skipped a malformed record ({type(item).__name__}): {e}")
+                if stop or len(rows) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self._write(rows, force_fsync=bool(waiters))
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Ledger write error ({len(rows)} records lost): {e}")
+            for w in waiters:
+                w.set()
+            if stop:
+                self._close_file()
+                return
@@ -0,0 +1,302 @@
+# your_trading_bot/utils/matching_engine.py
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+OPEN, FILLED, CANCELLED = "open", "filled", "cancelled"
+
+
+def missing_price(kind: str, limit_price: Optional[float], stop_price: Optional[float]) -> Optional[str]:
+    """Which price an order of `kind` needs but lacks, or None when it is complete."""
+    if kind in ("stop", "stop_limit") and stop_price is None:
+        return "stop_price"
+    if kind in ("limit", "stop_limit") and limit_price is None:
+        return "limit_price"
+    return None
+
+
+@dataclass(eq=False)
+class SimOrder:
+    id: int
+    symbol: str
+    product_id: Optional[int]
+    side: str                         # 'buy' | 'sell'
+    size: int                         # contracts
+    kind: str                         # 'market' | 'limit' | 'stop' | 'stop_limit'
+    limit_price: Optional[float] = None
+    stop_price: Optional[float] = None
+    reduce_only: bool = False
+    time_in_force: Optional[str] = None
+    client_order_id: Optional[str] = None
+    state: str = OPEN
+    triggered: bool = False           # stop_limit converted to a resting limit
+    filled: int = 0
+    avg_fill_price: Optional[float] = None
+    fee: float = 0.0
+
+    @property
+    def remaining(self) -> int:
+        return self.size - self.filled
+
+
+@dataclass
+class SimPosition:
+    size: int = 0                     # signed contracts
+    entry_price: float = 0.0
+    realised_pnl: float = 0.0
+    fees: float = 0.0
+
+
+@dataclass
+class _SymbolBook:
+    # Heap keys are arranged so the order that triggers first is on top:
+    # buy limits fire as price falls (max-heap on limit), sell limits as it rises (min-heap),
+    # buy stops as it rises (min-heap on stop), sell stops as it falls (max-heap).
+    buy_limits: list = field(default_factory=list)
+    sell_limits: list = field(default_factory=list)
+    buy_stops: list = field(default_factory=list)
+    sell_stops: list = field(default_factory=list)
+    last_price: Optional[float] = None
+
+
+class MatchingEngine:
+    """
+    Price-driven matcher for simulated orders: resting limit/stop orders sit in per-symbol
+    heaps, so placing one is O(log n) and each price update only pops what it triggers.
+    Cancels are lazy (the heap entry is skipped when it surfaces) and the heaps are
+    compacted once dead entries outnumber live ones.
+
+    Fill rules on a move from the last price to `price` (a continuous path is assumed):
+    limits fill at their limit, or better if the price opened through it; stops fill at the
+    stop (or the gap price) plus `slippage_pct` against us. Market orders fill at the price
+    handed in by the caller. Reduce-only orders are clipped to the position and all of a
+    symbol's reduce-only orders are cancelled when its position goes flat, like the exchange.
+    Every fill pays `fee_per_fill`; PnL uses `contract_size` (base units per contract).
+    """
+
+    def __init__(self, contract_size: float, fee_per_fill: float = 0.0, slippage_pct: float = 0.0):
+        self.contract_size = contract_size
+        self.fee_per_fill = fee_per_fill
+        self.slippage_pct = slippage_pct
+        self.orders: Dict[int, SimOrder] = {}          # open orders only
+        self.positions: Dict[str, SimPosition] = {}
+        self._books: Dict[str, _SymbolBook] = {}
+        self._seq = itertools.count()
+        self._dead = 0
+
+    # ------------------------------------------------------------------ queries
+    def book(self, symbol: str) -> _SymbolBook:
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _SymbolBook()
+        return book
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        return self.book(symbol).last_price
+
+    def position(self, symbol: str) -> SimPosition:
+        pos = self.positions.get(symbol)
+        if pos is None:
+            pos = self.positions[symbol] = SimPosition()
+        return pos
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[SimOrder]:
+        return [o for o in self.orders.values() if symbol is None or o.symbol == symbol]
+
+    # ------------------------------------------------------------------ order entry
+    def submit(self, order: SimOrder, market_price: Optional[float] = None) -> List[SimOrder]:
+        """
+        Accepts `order` and returns every order whose state changed (the order itself,
+        plus reduce-only orders cancelled if it closed the position).
+        `market_price` overrides the fill price of a market order (e.g. an L2 book VWAP).
+        A limit/stop order without the price its kind needs is cancelled on arrival.
+        """
+        changed: List[SimOrder] = [order]
+        if missing_price(order.kind, order.limit_price, order.stop_price):
+            # Could never trigger or rest: rejected on arrival, like the exchange would
+            order.state = CANCELLED
+            return changed
+        book = self.book(order.symbol)
+        last = book.last_price
+        if order.reduce_only and self._clip_reduce_only(order) == 0:
+            order.state = CANCELLED
+            return changed
+
+        if order.kind == "market":
+            price = market_price if market_price is not None else last
+            if price is None:
+                order.state = CANCELLED
+                return changed
+            if market_price is None:
+                price *= 1 + self.slippage_pct if order.side == "buy" else 1 - self.slippage_pct
+            self._fill(order, price, changed)
+            return changed
+
+        if order.kind == "limit" and last is not None and self._limit_marketable(order, last):
+            # Crosses the spread on arrival: takes the current price, capped at the limit
+            self._fill(order, min(last, order.limit_price) if order.side == "buy" else max(last, order.limit_price),
+                       changed)
+            return changed
+        if order.time_in_force in ("ioc", "fok") and order.kind == "limit":
+            order.state = CANCELLED
+            return changed
+
+        if order.kind in ("stop", "stop_limit") and last is not None and self._stop_triggered(order, last):
+            return self._trigger_stop(order, last, last, changed)
+
+        self.orders[order.id] = order
+        self._rest(order, book)
+        return changed
+
+    def cancel(self, order_id: int) -> Optional[SimOrder]:
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        order.state = CANCELLED
+        self._note_dead()
+        return order
+
+    def cancel_all(self, symbol: Optional[str] = None) -> List[SimOrder]:
+        return [self.cancel(o.id) for o in self.open_orders(symbol)]
+
+    # ------------------------------------------------------------------ market data
+    def on_price(self, symbol: str, price: float) -> List[SimOrder]:
+        """Moves `symbol` to `price` and fills whatever the move triggers; returns changed orders."""
+        book = self.book(symbol)
+        last = book.last_price if book.last_price is not None else price
+        book.last_price = price
+        lo, hi = (last, price) if last <= price else (price, last)
+        changed: List[SimOrder] = []
+
+        heap = book.sell_limits                      # fire when price >= limit
+        while heap and heap[0][0] <= price:
+            order = self._pop_live(heap)
+            if order is not None:
+                self._fill(order, max(order.limit_price, lo), changed)
+        heap = book.buy_limits                       # fire when price <= limit
+        while heap and -heap[0][0] >= price:
+            order = self._pop_live(heap)
+            if order is not None:
+                self._fill(order, min(order.limit_price, hi), changed)
+        heap = book.buy_stops                        # fire when price >= stop
+        while heap and heap[0][0] <= price:
+            order = self._pop_live(heap)
+            if order is not None:
+                self._trigger_stop(order, max(order.stop_price, lo), price, changed)
+        heap = book.sell_stops                       # fire when price <= stop
+        while heap and -heap[0][0] >= price:
+            order = self._pop_live(heap)
+            if order is not None:
+                self._trigger_stop(order, min(order.stop_price, hi), price, changed)
+        return changed
+
+    def on_bar(self, symbol: str, open_: float, high: float, low: float, close: float) -> List[SimOrder]:
+        """OHLC as a price path: open, then the nearer extreme first (low first on up bars), then close."""
+        path = (open_, low, high, close) if close >= open_ else (open_, high, low, close)
+        changed: List[SimOrder] = []
+        for price in path:
+            changed.extend(self.on_price(symbol, price))
+        return changed
+
+    # ------------------------------------------------------------------ internals
+    @staticmethod
+    def _limit_marketable(order: SimOrder, price: float) -> bool:
+        return price <= order.limit_price if order.side == "buy" else price >= order.limit_price
+
+    @staticmethod
+    def _stop_triggered(order: SimOrder, price: float) -> bool:
+        return price >= order.stop_price if order.side == "buy" else price <= order.stop_price
+
+    def _rest(self, order: SimOrder, book: _SymbolBook) -> None:
+        seq = next(self._seq)
+        if order.kind == "limit" or order.triggered:
+            if order.side == "buy":
+                heapq.heappush(book.buy_limits, (-order.limit_price, seq, order))
+            else:
+                heapq.heappush(book.sell_limits, (order.limit_price, seq, order))
+        elif order.side == "buy":
+            heapq.heappush(book.buy_stops, (order.stop_price, seq, order))
+        else:
+            heapq.heappush(book.sell_stops, (-order.stop_price, seq, order))
+
+    def _pop_live(self, heap: list) -> Optional[SimOrder]:
+        order = heapq.heappop(heap)[2]
+        if order.state != OPEN or self.orders.get(order.id) is not order:
+            self._dead -= 1
+            return None
+        return order
+
+    def _trigger_stop(self, order: SimOrder, trigger_price: float, price: float,
+                      changed: List[SimOrder]) -> List[SimOrder]:
+        if order.kind == "stop_limit":
+            order.triggered = True
+            if self._limit_marketable(order, price):
+                self._fill(order, min(price, order.limit_price) if order.side == "buy"
+                           else max(price, order.limit_price), changed)
+            else:
+                self.orders[order.id] = order
+                self._rest(order, self.book(order.symbol))
+                changed.append(order)
+            return changed
+        slip = 1 + self.slippage_pct if order.side == "buy" else 1 - self.slippage_pct
+        self._fill(order, trigger_price * slip, changed)
+        return changed
+
+    def _clip_reduce_only(self, order: SimOrder) -> int:
+        pos = self.position(order.symbol).size
+        closable = -pos if order.side == "buy" else pos
+        order.size = max(0, min(order.size, closable))
+        return order.size
+
+    def _fill(self, order: SimOrder, price: float, changed: List[SimOrder]) -> None:
+        self.orders.pop(order.id, None)
+        if order.reduce_only and self._clip_reduce_only(order) == 0:
+            order.state = CANCELLED
+            if order not in changed:
+                changed.append(order)
+            return
+        qty = order.remaining
+        order.filled += qty
+        order.avg_fill_price = price
+        order.fee += self.fee_per_fill
+        order.state = FILLED
+        if order not in changed:
+            changed.append(order)
+
+        pos = self.position(order.symbol)
+        signed = qty if order.side == "buy" else -qty
+        pos.fees += self.fee_per_fill
+        pos.realised_pnl -= self.fee_per_fill
+        if pos.size == 0 or (pos.size > 0) == (signed > 0):
+            total = pos.size + signed
+            pos.entry_price = (pos.entry_price * abs(pos.size) + price * abs(signed)) / abs(total)
+            pos.size = total
+            return
+        closed = min(abs(signed), abs(pos.size))
+        direction = 1 if pos.size > 0 else -1
+        pos.realised_pnl += direction * closed * self.contract_size * (price - pos.entry_price)
+        pos.size += signed
+        if pos.size == 0:
+            pos.entry_price = 0.0
+            for other in self.open_orders(order.symbol):
+                if other.reduce_only:
+                    changed.append(self.cancel(other.id))
+        elif (pos.size > 0) != (direction > 0):
+            pos.entry_price = price                  # flipped through zero
+
+    def _note_dead(self) -> None:
+        self._dead += 1
+        if self._dead > 1024 and self._dead > len(self.orders):
+            self._compact()
+
+    def _compact(self) -> None:
+        for book in self._books.values():
+            # In place: on_price may be iterating one of these heaps when a fill cancels orders
+            for heap in (book.buy_limits, book.sell_limits, book.buy_stops, book.sell_stops):
+                heap[:] = [e for e in heap if self.orders.get(e[2].id) is e[2]]
+                heapq.heapify(heap)
+        self._dead = 0
@@ -0,0 +1,226 @@
+# your_trading_bot/utils/metrics.py
+
+from __future__ import annotations
+
+import functools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter_ns
+from typing import Dict, Optional, Tuple
+
+# Log-linear buckets, HDR-style: values < 32 ns get exact buckets, above that each power
+# of two is split into 16 sub-buckets (<= 6.25% relative error). 1024 buckets cover int64.
+_SUB_BITS = 4
+_N_BUCKETS = 1024
+
+
+def _bucket_index(ns: int) -> int:
+    if ns < 32:
+        return ns if ns > 0 else 0
+    shift = ns.bit_length() - (_SUB_BITS + 1)
+    return (shift << _SUB_BITS) + (ns >> shift)
+
+
+def _bucket_mid(idx: int) -> float:
+    if idx < 32:
+        return float(idx)
+    shift = (idx >> _SUB_BITS) - 1
+    low = ((idx & 15) + 16) << shift
+    return low + ((1 << shift) - 1) / 2.0
+
+
+def _label_str(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """
+    Latency histogram in nanoseconds. record() is a couple of integer ops and one list
+    increment; concurrent writers may rarely lose a count, which is fine for monitoring.
+    """
+
+    __slots__ = ("name", "labels", "counts", "count", "sum_ns", "max_ns")
+
+    def __init__(self, name: str, labels: Tuple[Tuple[str, str], ...] = ()):
+        self.name = name
+        self.labels = labels
+        self.counts = [0] * _N_BUCKETS
+        self.count = 0
+        self.sum_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        # _bucket_index inlined: this runs on every instrumented call
+        if ns < 32:
+            idx = ns if ns > 0 else 0
+        else:
+            shift = ns.bit_length() - 5
+            idx = (shift << 4) + (ns >> shift)
+        self.counts[idx] += 1
+        self.count += 1
+        self.sum_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def since(self, t0_ns: int) -> None:
+        """Records perf_counter_ns() - t0_ns; the cheapest way to time a block."""
+        self.record(perf_counter_ns() - t0_ns)
+
+    def time(self) -> "_Span":
+        return _Span(self)
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-quantile (0..1) in ns."""
+        total = sum(self.counts)
+        if not total:
+            return 0.0
+        target = q * total
+        running = 0
+        for idx, c in enumerate(self.counts):
+            running += c
+            if c and running >= target:
+                return min(_bucket_mid(idx), float(self.max_ns))
+        return float(self.max_ns)
+
+
+class _Span:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.hist.record(perf_counter_ns() - self.t0)
+        return False
+
+
+class Counter:
+    __slots__ = ("name", "labels", "value")
+
+    def __init__(self, name: str, labels: Tuple[Tuple[str, str], ...] = ()):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, n: int = 1) -> None:
+        self.value += n
+
+
+class MetricsRegistry:
+    """
+    Named histograms and counters, rendered in Prometheus text format.
+    Look metrics up once (at import or construction) and keep the object; lookups
+    take a lock, recording does not.
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, tuple], Histogram] = {}
+        self._counters: Dict[Tuple[str, tuple], Counter] = {}
+        self._help: Dict[str, str] = {}
+
+    def histogram(self, name: str, help: str = "", **labels) -> Histogram:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = Histogram(name, key[1])
+                self._help.setdefault(name, help)
+            return h
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            c = self._counters.get(key)
+            if c is None:
+                c = self._counters[key] = Counter(name, key[1])
+                self._help.setdefault(name, help)
+            return c
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            histograms = sorted(self._histograms.values(), key=lambda h: (h.name, h.labels))
+            counters = sorted(self._counters.values(), key=lambda c: (c.name, c.labels))
+        lines, seen = [], set()
+        by_name: Dict[str, list] = {}
+        for h in histograms:
+            by_name.setdefault(h.name, []).append(h)
+        for name, group in by_name.items():
+            # A summary family only holds quantiles, _sum and _count; the max is its own gauge family
+            metric, help_text = f"{name}_seconds", self._help.get(name) or name
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for h in group:
+                for q in self.QUANTILES:
+                    q_label = 'quantile="%s"' % q
+                    lines.append(f"{metric}{_label_str(h.labels, q_label)} {h.percentile(q) / 1e9:.9f}")
+                lines.append(f"{metric}_sum{_label_str(h.labels)} {h.sum_ns / 1e9:.9f}")
+                lines.append(f"{metric}_count{_label_str(h.labels)} {h.count}")
+            lines.append(f"# HELP {metric}_max {help_text} (maximum)")
+            lines.append(f"# TYPE {metric}_max gauge")
+            for h in group:
+                lines.append(f"{metric}_max{_label_str(h.labels)} {h.max_ns / 1e9:.9f}")
+        for c in counters:
+            metric = f"{c.name}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# HELP {metric} {self._help.get(c.name) or c.name}")
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_label_str(c.labels)} {c.value}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def timed(name: str, help: str = "", **labels):
+    """Decorator recording each call's duration into METRICS.histogram(name, **labels)."""
+    hist = METRICS.histogram(name, help, **labels)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.record(perf_counter_ns() - t0)
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = METRICS
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1", registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """Serves GET /metrics on a daemon thread. Bind to localhost unless scraping remotely."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry or METRICS})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"📟 Metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
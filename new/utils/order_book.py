@@ -0,0 +1,261 @@
+# your_trading_bot/utils/order_book.py
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class OrderBookSequenceError(Exception):
+    """Raised when an incremental update does not follow the last applied sequence number."""
+
+
+class _BookSide:
+    """
+    One side of an L2 book kept as two parallel arrays sorted by ascending price.
+    Finding a level is O(log n) (binary search) and a size change on an existing level is
+    O(1), but adding or removing a level is O(n): list.insert/del shift the tail. For the
+    few hundred levels an exchange L2 feed carries that shift is one small memmove, and the
+    arrays give best() in O(1) and an in-order walk() with no sorting, which the fill
+    estimates need on every query.
+    """
+
+    __slots__ = ("prices", "sizes", "descending")
+
+    def __init__(self, descending: bool):
+        self.prices = []
+        self.sizes = []
+        # Bids are consumed from the highest price down, asks from the lowest up
+        self.descending = descending
+
+    def clear(self) -> None:
+        self.prices.clear()
+        self.sizes.clear()
+
+    def set_level(self, price: float, size: float) -> None:
+        prices = self.prices
+        i = bisect_left(prices, price)
+        exists = i < len(prices) and prices[i] == price
+        if size <= 0:
+            if exists:
+                del prices[i]
+                del self.sizes[i]
+        elif exists:
+            self.sizes[i] = size
+        else:
+            prices.insert(i, price)
+            self.sizes.insert(i, size)
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        if not self.prices:
+            return None
+        i = -1 if self.descending else 0
+        return self.prices[i], self.sizes[i]
+
+    def walk(self) -> Iterable[Tuple[float, float]]:
+        """Levels from best to worst."""
+        if self.descending:
+            return zip(reversed(self.prices), reversed(self.sizes))
+        return zip(self.prices, self.sizes)
+
+
+def _walk_fill(levels: Iterable[Tuple[float, float]], size: float) -> Tuple[Optional[float], float, Optional[float]]:
+    """(vwap, filled_size, worst_price) for taking `size` from `levels`, best first."""
+    remaining = float(size)
+    notional = 0.0
+    worst = None
+    for price, level_size in levels:
+        take = level_size if level_size < remaining else remaining
+        notional += take * price
+        remaining -= take
+        worst = price
+        if remaining <= 0:
+            break
+    filled = float(size) - remaining
+    if filled <= 0:
+        return None, 0.0, None
+    return notional / filled, filled, worst
+
+
+def _slippage(side: str, vwap: Optional[float], filled: float, size: float,
+              touch: Optional[Tuple[float, float]]) -> Optional[float]:
+    if vwap is None or touch is None or filled < size:
+        return None
+    if side == "buy":
+        return (vwap - touch[0]) / touch[0]
+    return (touch[0] - vwap) / touch[0]
+
+
+def _check_side(side: str) -> None:
+    if side not in ("buy", "sell"):
+        raise ValueError(f"side must be 'buy' or 'sell', got {side}")
+
+
+@dataclass(frozen=True)
+class BookSnapshot:
+    """
+    Immutable copy of an OrderBook taken under one lock acquisition. Decisions that read
+    several quantities (touch, expected fill, slippage) use it so they all describe the
+    same book, not one interleaved with WS updates. Levels are best first.
+    """
+    symbol: str
+    bids: Tuple[Tuple[float, float], ...]
+    asks: Tuple[Tuple[float, float], ...]
+    sequence_no: Optional[int]
+    synced: bool
+    last_update_monotonic: Optional[float]
+
+    def is_fresh(self, max_age_seconds: float) -> bool:
+        last = self.last_update_monotonic
+        return self.synced and last is not None and time.monotonic() - last <= max_age_seconds
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        return self.bids[0] if self.bids else None
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        return self.asks[0] if self.asks else None
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def mid_price(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (ask[0] + bid[0]) / 2.0
+
+    def expected_fill(self, side: str, size: float) -> Tuple[Optional[float], float, Optional[float]]:
+        _check_side(side)
+        return _walk_fill(self.asks if side == "buy" else self.bids, size)
+
+    def expected_slippage_pct(self, side: str, size: float) -> Optional[float]:
+        vwap, filled, _ = self.expected_fill(side, size)
+        return _slippage(side, vwap, filled, size, self.best_ask() if side == "buy" else self.best_bid())
+
+
+class OrderBook:
+    """
+    Thread-safe local L2 book for a single product.
+
+    The WS thread applies snapshots/updates, the strategy thread queries it.
+    Sizes are in exchange contracts, exactly as they arrive on the feed.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._lock = threading.Lock()
+        self._bids = _BookSide(descending=True)
+        self._asks = _BookSide(descending=False)
+        self.sequence_no: Optional[int] = None
+        self.last_update_monotonic: Optional[float] = None
+        self.synced = False
+
+    # -------------------------------
+    # Feed side
+    # -------------------------------
+    def apply_snapshot(self, bids, asks, sequence_no: Optional[int]) -> None:
+        with self._lock:
+            self._bids.clear()
+            self._asks.clear()
+            for price, size in bids:
+                self._bids.set_level(float(price), float(size))
+            for price, size in asks:
+                self._asks.set_level(float(price), float(size))
+            self.sequence_no = sequence_no
+            self.synced = True
+            self.last_update_monotonic = time.monotonic()
+
+    def apply_update(self, bids, asks, sequence_no: Optional[int]) -> bool:
+        """
+        Applies one incremental update. Returns False when the book is waiting for a snapshot
+        (before the first one, or after a gap): such updates are dropped, not errors. Raises
+        OrderBookSequenceError on a gap, after which the book stays unsynced. An update without
+        a sequence number is applied but keeps the last known one, so gap detection stays on.
+        """
+        with self._lock:
+            if not self.synced:
+                return False
+            if sequence_no is not None and self.sequence_no is not None and sequence_no != self.sequence_no + 1:
+                # Gap or replay: the book can no longer be trusted until a fresh snapshot arrives
+                self.synced = False
+                raise OrderBookSequenceError(
+                    f"{self.symbol}: expected sequence {self.sequence_no + 1}, got {sequence_no}"
+                )
+            for price, size in bids:
+                self._bids.set_level(float(price), float(size))
+            for price, size in asks:
+                self._asks.set_level(float(price), float(size))
+            if sequence_no is not None:
+                self.sequence_no = sequence_no
+            self.last_update_monotonic = time.monotonic()
+            return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.synced = False
+
+    # -------------------------------
+    # Queries
+    # -------------------------------
+    def is_fresh(self, max_age_seconds: float) -> bool:
+        last = self.last_update_monotonic
+        return self.synced and last is not None and time.monotonic() - last <= max_age_seconds
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            return self._bids.best()
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            return self._asks.best()
+
+    def spread(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self._bids.best(), self._asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def mid_price(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self._bids.best(), self._asks.best()
+        if bid is None or ask is None:
+            return None
+        return (ask[0] + bid[0]) / 2.0
+
+    def expected_fill(self, side: str, size: float) -> Tuple[Optional[float], float, Optional[float]]:
+        """
+        Walks the opposite side of the book for a market order of `size` contracts.
+        Returns (vwap, filled_size, worst_price). vwap is None if the book is empty;
+        filled_size < size means the visible depth is not enough.
+        """
+        _check_side(side)
+        with self._lock:
+            return _walk_fill(self._asks.walk() if side == "buy" else self._bids.walk(), size)
+
+    def expected_slippage_pct(self, side: str, size: float) -> Optional[float]:
+        """Expected fill price vs. the touch, as a positive fraction (0.0005 = 5 bps)."""
+        _check_side(side)
+        book_side = self._asks if side == "buy" else self._bids
+        with self._lock:
+            vwap, filled, _ = _walk_fill(book_side.walk(), size)
+            touch = book_side.best()
+        return _slippage(side, vwap, filled, size, touch)
+
+    def depth(self, levels: int = 10) -> Dict[str, list]:
+        with self._lock:
+            bids = list(self._bids.walk())[:levels]
+            asks = list(self._asks.walk())[:levels]
+        return {"bids": bids, "asks": asks}
+
+    def snapshot(self) -> BookSnapshot:
+        """Copies the whole book (both sides plus sync state) under a single lock acquisition."""
+        with self._lock:
+            return BookSnapshot(self.symbol, tuple(self._bids.walk()), tuple(self._asks.walk()),
+                                self.sequence_no, self.synced, self.last_update_monotonic)
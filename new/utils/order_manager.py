@@ -0,0 +1,442 @@
+# your_trading_bot/utils/order_manager.py
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import config
+from utils.reconcile import is_stop_order, order_list
+
+# Local lifecycle. PENDING = sent, not yet acknowledged; the exchange's own "pending"
+# (an untriggered stop) is live on the book and maps to OPEN.
+PENDING, OPEN, PARTIALLY_FILLED = "pending", "open", "partially_filled"
+FILLED, CANCELLED, REJECTED = "filled", "cancelled", "rejected"
+TERMINAL = frozenset((FILLED, CANCELLED, REJECTED))
+_TRANSITIONS = {
+    PENDING: frozenset((OPEN, PARTIALLY_FILLED, FILLED, CANCELLED, REJECTED)),
+    OPEN: frozenset((OPEN, PARTIALLY_FILLED, FILLED, CANCELLED)),
+    PARTIALLY_FILLED: frozenset((PARTIALLY_FILLED, FILLED, CANCELLED)),
+}
+_EXCHANGE_STATES = {
+    "pending": OPEN, "untriggered": OPEN, "triggered": OPEN, "open": OPEN,
+    "partially_filled": PARTIALLY_FILLED,
+    "filled": FILLED, "closed": FILLED,
+    "cancelled": CANCELLED, "canceled": CANCELLED, "expired": CANCELLED,
+    "rejected": REJECTED,
+}
+ROLES = ("entry", "sl", "tp")
+
+
+def _float(v) -> Optional[float]:
+    try:
+        return None if v is None or v == "" else float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fills(data: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    """(filled, unfilled) contracts: REST results carry unfilled_size, WS frames filled_size / remaining_size."""
+    filled = data.get("filled_size")
+    if filled is None:
+        filled = data.get("filled_qty", data.get("filled"))
+    unfilled = data.get("unfilled_size")
+    if unfilled is None:
+        unfilled = data.get("remaining_size", data.get("remaining_qty"))
+    return _float(filled), _float(unfilled)
+
+
+@dataclass(eq=False, slots=True)
+class TrackedOrder:
+    client_order_id: Optional[str]
+    symbol: Optional[str]
+    side: str                          # 'buy' | 'sell'
+    size: float                        # contracts
+    order_type: str                    # as passed to place_order: 'market' | 'limit' | 'stop' | 'stop_limit'
+    role: Optional[str] = None         # 'entry' | 'sl' | 'tp'; None for orders we did not place
+    exchange_id: Optional[int] = None
+    product_id: Optional[int] = None
+    limit_price: Optional[float] = None
+    stop_price: Optional[float] = None
+    reduce_only: bool = False
+    state: str = PENDING
+    filled: float = 0.0
+    avg_fill_price: Optional[float] = None
+    created_ts: float = field(default_factory=time.time)
+    updated_ts: float = 0.0
+
+    @property
+    def remaining(self) -> float:
+        return self.size - self.filled
+
+    @property
+    def is_live(self) -> bool:
+        return self.state in (OPEN, PARTIALLY_FILLED)
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.state in TERMINAL
+
+
+class OrderManager:
+    """
+    Every order the bot places, indexed by exchange id and by client order id, with an
+    explicit lifecycle: pending → open → partially_filled → filled / cancelled (or
+    rejected). REST replies, private WS frames and periodic reconciliation against
+    GET /v2/orders/open all feed the same transitions, so whichever arrives first wins
+    and late or out-of-order updates that would move an order backwards are ignored.
+
+    Live orders are also indexed per symbol, and the current SL / TP of each symbol's
+    bracket is one dict lookup. Orders seen on the exchange that we did not place (an
+    earlier session, the web UI) are adopted; reduce-only stops / limits fill an empty
+    SL / TP slot. Finished orders stay indexed (bounded by `history`) for late frames.
+
+    on_change(callback) listeners get (order, previous_state) after every transition,
+    outside the lock, from whichever thread applied it. A callback is registered at most
+    once; remove_listener() unsubscribes it.
+    """
+
+    def __init__(self, history: int = None, grace_seconds: float = None):
+        self._lock = threading.RLock()
+        self._by_id: Dict[int, TrackedOrder] = {}
+        self._by_client: Dict[str, TrackedOrder] = {}
+        self._live: Dict[Optional[str], set] = defaultdict(set)               # symbol -> live / pending orders
+        self._brackets: Dict[Tuple[Optional[str], str], TrackedOrder] = {}    # (symbol, 'sl' | 'tp') -> order
+        self._finished: deque = deque()
+        self._history = config.ORDER_HISTORY_SIZE if history is None else history
+        self.grace_seconds = config.ORDER_RECONCILE_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        self._listeners: List[Callable[[TrackedOrder, Optional[str]], None]] = []
+        self._seq = itertools.count(1)
+        self._session = _base36(int(time.time()))
+        self._stop = threading.Event()
+        self._reconciler: Optional[threading.Thread] = None
+        self.stats = Counter()
+
+    # ------------------------------------------------------------------ subscriptions
+    def on_change(self, callback: Callable[[TrackedOrder, Optional[str]], None]):
+        with self._lock:
+            if callback not in self._listeners:
+                # Copy-on-write: _apply iterates the list outside the lock
+                self._listeners = self._listeners + [callback]
+        return callback
+
+    def remove_listener(self, callback: Callable[[TrackedOrder, Optional[str]], None]) -> None:
+        with self._lock:
+            self._listeners = [cb for cb in self._listeners if cb != callback]
+
+    # ------------------------------------------------------------------ lookups (O(1))
+    def get(self, exchange_id) -> Optional[TrackedOrder]:
+        return self._by_id.get(int(exchange_id)) if exchange_id is not None else None
+
+    def get_by_client_id(self, client_order_id: str) -> Optional[TrackedOrder]:
+        return self._by_client.get(client_order_id)
+
+    def bracket(self, symbol: str) -> Tuple[Optional[TrackedOrder], Optional[TrackedOrder]]:
+        """(stop-loss, take-profit) orders currently protecting `symbol`'s position."""
+        return self._brackets.get((symbol, "sl")), self._brackets.get((symbol, "tp"))
+
+    def is_bracket(self, order: TrackedOrder) -> bool:
+        return order.role in ("sl", "tp") and self._brackets.get((order.symbol, order.role)) is order
+
+    def live_orders(self, symbol: str = None) -> List[TrackedOrder]:
+        with self._lock:
+            if symbol is not None:
+                return list(self._live.get(symbol, ()))
+            return [o for orders in self._live.values() for o in orders]
+
+    # ------------------------------------------------------------------ placing / cancelling
+    def new_client_order_id(self, role: str = None) -> str:
+        """Unique per process and session, within the exchange's 32-character limit."""
+        return f"{self._session}-{role or 'o'}-{next(self._seq)}"[:32]
+
+    def track(self, symbol: str, side: str, size: float, order_type: str, role: str = None,
+              client_order_id: str = None, price: float = None, stop_price: float = None,
+              reduce_only: bool = False) -> TrackedOrder:
+        """Registers an order about to be sent (PENDING). SL / TP roles take over the bracket slot."""
+        if role is not None and role not in ROLES:
+            raise ValueError(f"role must be one of {ROLES}, got {role}")
+        order = TrackedOrder(client_order_id=client_order_id or self.new_client_order_id(role), symbol=symbol,
+                             side=side, size=float(size), order_type=order_type, role=role,
+                             limit_price=_float(price), stop_price=_float(stop_price), reduce_only=bool(reduce_only))
+        with self._lock:
+            self._by_client[order.client_order_id] = order
+            self._live[symbol].add(order)
+            if role in ("sl", "tp"):
+                self._brackets[(symbol, role)] = order
+            self.stats["tracked"] += 1
+        return order
+
+    def submit(self, client, symbol: str, side: str, quantity_in_btc: float, order_type: str = "market",
+               role: str = None, price: float = None, stop_price: float = None, reduce_only: bool = False,
+               time_in_force: str = None):
+        """
+        client.place_order() with a client order id, tracked from before the request leaves,
+        so a WS frame that beats the REST reply already finds the order. Returns the raw
+        response. If the request raises or the reply is lost (DeltaAPIClient returns None on
+        timeouts and HTTP errors), the order stays PENDING until a WS frame or reconciliation
+        finds it by client order id, or reconciliation gives up on it after the grace period.
+        """
+        order = self.track(symbol, side, int(quantity_in_btc / client.LOT_SIZE_BTC), order_type, role=role,
+                           price=price, stop_price=stop_price, reduce_only=reduce_only)
+        resp = client.place_order(symbol, side, quantity_in_btc, order_type=order_type, price=price,
+                                  stop_price=stop_price, reduce_only=reduce_only, time_in_force=time_in_force,
+                                  client_order_id=order.client_order_id)
+        self.on_rest_response(resp, order.client_order_id)
+        return resp
+
+    def cancel(self, client, exchange_id):
+        """client.cancel_order(); a successful reply moves the order to cancelled right away."""
+        resp = client.cancel_order(exchange_id)
+        if resp and resp.get("success") and isinstance(resp.get("result"), dict):
+            self.on_order_update(resp["result"])
+        return resp
+
+    # ------------------------------------------------------------------ updates
+    def on_rest_response(self, resp, client_order_id: str = None) -> Optional[TrackedOrder]:
+        """
+        Applies a place_order() reply. Only an explicit success: false rejects the order; a
+        missing reply (None, or no result) says nothing about whether the order reached the
+        exchange, so it stays PENDING for the WS feed or the reconciler to settle.
+        """
+        result = resp.get("result") if resp and resp.get("success") else None
+        if isinstance(result, dict):
+            return self.on_order_update(result, client_order_id)
+        order = self._by_client.get(client_order_id)
+        if order is None:
+            return None
+        if resp and resp.get("success") is False:
+            self.stats["rest_rejected"] += 1
+            self._apply(order, REJECTED)
+        else:
+            self.stats["rest_unknown"] += 1
+        return order
+
+    def on_order_update(self, data: Dict[str, Any], client_order_id: str = None) -> Optional[TrackedOrder]:
+        """
+        One order payload (REST result or private WS frame): finds the order by exchange id,
+        then by client order id, else adopts it. Returns the tracked order.
+        """
+        exchange_id = _int(data.get("id"))
+        client_order_id = client_order_id or data.get("client_order_id")
+        with self._lock:
+            order = self._by_id.get(exchange_id) if exchange_id is not None else None
+            if order is None and client_order_id:
+                order = self._by_client.get(client_order_id)
+            if order is None:
+                if exchange_id is None:
+                    return None
+                order = self._adopt(data, exchange_id, client_order_id)
+            if order.exchange_id is None and exchange_id is not None:
+                order.exchange_id = exchange_id
+                self._by_id[exchange_id] = order
+            if order.product_id is None:
+                order.product_id = _int(data.get("product_id"))
+
+        size = _float(data.get("size")) or order.size
+        filled, unfilled = _fills(data)
+        if filled is None and unfilled is not None:
+            filled = size - unfilled
+        state = _EXCHANGE_STATES.get((data.get("state") or data.get("status") or data.get("order_state") or "").lower())
+        if state is None:
+            self.stats["unknown_state"] += 1
+            return order
+        if state == OPEN and filled:
+            state = PARTIALLY_FILLED
+        elif state == FILLED and filled is not None and filled < size:
+            state = CANCELLED         # closed with size left over (IOC remainder)
+        if state == order.state and (filled is None or filled == order.filled):
+            return order              # nothing new (repeated frame, or the REST reply after the WS update)
+        avg = _float(data.get("average_fill_price") or data.get("avg_fill_price"))
+        self._apply(order, state, filled, avg, size)
+        return order
+
+    def _adopt(self, data: Dict[str, Any], exchange_id: int, client_order_id: Optional[str]) -> TrackedOrder:
+        # Caller holds _lock
+        stop = is_stop_order(data)
+        kind = (data.get("order_type") or data.get("type") or "").lower()
+        order_type = "stop" if stop else "limit" if kind in ("limit_order", "limit") else "market"
+        symbol = data.get("product_symbol") or data.get("symbol")
+        role = None
+        reduce_only = bool(data.get("reduce_only") or data.get("reduceOnly"))
+        if reduce_only and order_type in ("stop", "limit"):
+            slot = "sl" if stop else "tp"
+            current = self._brackets.get((symbol, slot))
+            if current is None or current.is_terminal:
+                role = slot
+        size = _float(data.get("size"))
+        if size is None:
+            # WS frames carry filled + remaining rather than the order size
+            filled, unfilled = _fills(data)
+            size = (filled or 0.0) + (unfilled or 0.0)
+        order = TrackedOrder(client_order_id=client_order_id, symbol=symbol, side=(data.get("side") or "").lower(),
+                             size=size, order_type=order_type, role=role,
+                             exchange_id=exchange_id, product_id=_int(data.get("product_id")),
+                             limit_price=_float(data.get("limit_price") or data.get("price")),
+                             stop_price=_float(data.get("stop_price") or data.get("trigger_price")),
+                             reduce_only=reduce_only)
+        self._by_id[exchange_id] = order
+        if client_order_id:
+            self._by_client[client_order_id] = order
+        self._live[symbol].add(order)
+        if role is not None:
+            self._brackets[(symbol, role)] = order
+        self.stats["adopted"] += 1
+        return order
+
+    def _apply(self, order: TrackedOrder, state: str, filled: float = None, avg_fill_price: float = None,
+               size: float = None) -> bool:
+        with self._lock:
+            prev = order.state
+            if state not in _TRANSITIONS.get(prev, ()):
+                if state != prev:
+                    self.stats["stale_updates"] += 1
+                return False
+            if filled is not None:
+                if filled < order.filled:
+                    self.stats["stale_updates"] += 1
+                    return False
+                order.filled = filled
+            if size:
+                order.size = size
+            if avg_fill_price:
+                order.avg_fill_price = avg_fill_price
+            order.state = state
+            order.updated_ts = time.time()
+            if state in TERMINAL:
+                self._retire(order)
+            if state != prev:
+                self.stats[state] += 1
+        if state != prev:
+            for callback in self._listeners:
+                try:
+                    callback(order, prev)
+                except Exception as e:
+                    print(f"❌ Order manager listener error: {e}")
+        return True
+
+    def _retire(self, order: TrackedOrder) -> None:
+        # Caller holds _lock
+        self._live[order.symbol].discard(order)
+        if order.role in ("sl", "tp") and self._brackets.get((order.symbol, order.role)) is order:
+            del self._brackets[(order.symbol, order.role)]
+        self._finished.append(order)
+        while len(self._finished) > self._history:
+            old = self._finished.popleft()
+            if old.exchange_id is not None and self._by_id.get(old.exchange_id) is old:
+                del self._by_id[old.exchange_id]
+            if old.client_order_id and self._by_client.get(old.client_order_id) is old:
+                del self._by_client[old.client_order_id]
+
+    def set_bracket(self, symbol: str, role: str, exchange_id) -> Optional[TrackedOrder]:
+        """Makes an already tracked live order `symbol`'s SL or TP (startup reconciliation)."""
+        order = self.get(exchange_id)
+        if order is None or order.is_terminal:
+            return None
+        with self._lock:
+            current = self._brackets.get((symbol, role))
+            if current is not None and current is not order and current.role == role:
+                current.role = None
+            order.role = role
+            self._brackets[(symbol, role)] = order
+        return order
+
+    # ------------------------------------------------------------------ reconciliation
+    def sync_open_orders(self, open_orders_response, symbols: Iterable[str] = None, now: float = None) -> Dict[str, int]:
+        """
+        Diffs the tracked live orders of `symbols` (default: every symbol tracked or listed)
+        against an open-orders snapshot. Listed orders are adopted or updated; tracked
+        orders missing from the list, and older than the grace period, are closed: as
+        rejected if never acknowledged, otherwise as cancelled (the list cannot say whether
+        a vanished order filled; the position feed settles that).
+        """
+        now = time.time() if now is None else now
+        wanted = set(symbols) if symbols is not None else None
+        summary = {"adopted": 0, "updated": 0, "closed": 0}
+        seen = set()
+        for data in order_list(open_orders_response):
+            symbol = data.get("product_symbol") or data.get("symbol")
+            if wanted is not None and symbol not in wanted:
+                continue
+            adopted = self.stats["adopted"]
+            order = self.get(data.get("id")) or self._by_client.get(data.get("client_order_id"))
+            before = (order.state, order.filled) if order is not None else None
+            order = self.on_order_update(data)
+            if order is None:
+                continue
+            seen.add(order)
+            if self.stats["adopted"] > adopted:
+                summary["adopted"] += 1
+            elif before != (order.state, order.filled):
+                summary["updated"] += 1
+
+        with self._lock:
+            live = [o for s, orders in self._live.items() if wanted is None or s in wanted for o in orders]
+        for order in live:
+            if order in seen or now - max(order.created_ts, order.updated_ts) < self.grace_seconds:
+                continue
+            if self._apply(order, CANCELLED if order.exchange_id is not None else REJECTED):
+                summary["closed"] += 1
+                self.stats["reconcile_closed"] += 1
+        return summary
+
+    def reconcile(self, client, symbols: Iterable[str] = None) -> Optional[Dict[str, int]]:
+        """One GET /v2/orders/open (per symbol when there is just one) diffed into the local book."""
+        symbols = list(symbols) if symbols is not None else None
+        resp = client.get_open_orders(symbols[0] if symbols and len(symbols) == 1 else None)
+        if not (resp and resp.get("success", True) and isinstance(resp.get("result"), list)):
+            print(f"⚠️ Order reconciliation skipped: open orders unavailable ({resp})")
+            return None
+        summary = self.sync_open_orders(resp, symbols)
+        if any(summary.values()):
+            print(f"🔄 Orders reconciled: {summary['adopted']} adopted, {summary['updated']} updated, "
+                  f"{summary['closed']} closed")
+        return summary
+
+    def start_reconciler(self, client, symbols: Iterable[str] = None, interval: float = None) -> bool:
+        """Runs reconcile() every `interval` seconds on a daemon thread; 0 disables."""
+        interval = config.ORDER_RECONCILE_INTERVAL_SECONDS if interval is None else interval
+        if not interval or self._reconciler is not None:
+            return False
+        symbols = list(symbols) if symbols is not None else None
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.reconcile(client, symbols)
+                except Exception as e:
+                    print(f"❌ Order reconciliation error: {e}")
+
+        self._stop.clear()
+        self._reconciler = threading.Thread(target=loop, name="order-reconcile", daemon=True)
+        self._reconciler.start()
+        return True
+
+    def stop_reconciler(self) -> None:
+        self._stop.set()
+        if self._reconciler is not None:
+            self._reconciler.join(timeout=5)
+            self._reconciler = None
+
+
+def _int(v) -> Optional[int]:
+    try:
+        return None if v is None or v == "" else int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _base36(n: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while n:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+    return out or "0"
+
+
+# Process-wide order book shared by the order placement code, the WS router and the reconciler
+manager = OrderManager()
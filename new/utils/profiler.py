@@ -0,0 +1,396 @@
+# your_trading_bot/utils/profiler.py
+"""
+On-demand profiling of the running bot, without stopping it.
+
+Control surface (install_profiler_hooks):
+  kill -USR1 <pid>              sample every thread for PROFILE_DEFAULT_SECONDS
+  kill -USR2 <pid>              tracemalloc snapshot (tracing starts on the first one)
+  nc 127.0.0.1 <PROFILE_ADMIN_PORT>, then one command per line:
+      sample [seconds]          sampling profiler -> collapsed stacks per subsystem
+      cprofile [seconds]        cProfile inside profiler.scope() blocks -> .pstats per subsystem
+      mem                       tracemalloc snapshot, diffed against the previous one
+      mem stop                  stop tracemalloc
+      status
+
+Collapsed stacks ("frame;frame;frame count") feed flamegraph.pl or speedscope directly.
+Everything is labelled by subsystem: "ws" (WebSocket threads), "strategy" (the bar loop),
+"rest" (stacks inside api/), "other".
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import signal
+import socketserver
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+SUBSYSTEMS = ("ws", "strategy", "rest", "other")
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_REST_DIR = os.path.join(_REPO_ROOT, "api") + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+# Files whose allocations belong to each subsystem (first matching repo frame wins)
+_FILE_SUBSYSTEMS = (
+    (os.path.join(_REPO_ROOT, "ws_confilct") + os.sep, "ws"),
+    (os.path.join(_REPO_ROOT, "run_ws.py"), "ws"),
+    (_REST_DIR, "rest"),
+    (_REPO_ROOT + os.sep, "strategy"),
+)
+
+
+def thread_subsystem(name: str) -> str:
+    """WS threads are named ws-*; the bar loop runs on the main thread or a strategy-* worker."""
+    if name.startswith("ws-"):
+        return "ws"
+    if name == "MainThread" or name.startswith("strategy"):
+        return "strategy"
+    return "other"
+
+
+def file_subsystem(filename: str) -> Optional[str]:
+    for prefix, subsystem in _FILE_SUBSYSTEMS:
+        if filename.startswith(prefix):
+            return subsystem
+    return None
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_REPO_ROOT):
+        filename = os.path.relpath(filename, _REPO_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename})"
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _CProfileScope:
+    __slots__ = ("controller", "subsystem", "profile")
+
+    def __init__(self, controller, subsystem):
+        self.controller = controller
+        self.subsystem = subsystem
+        self.profile = None
+
+    def __enter__(self):
+        self.profile = self.controller._enter_cprofile(self.subsystem)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profile is not None:
+            self.controller._exit_cprofile(self.profile)
+        return False
+
+
+class ProfilerController:
+    """
+    One per process (PROFILER). Sampling and cProfile sessions run on background threads
+    and write to out_dir; only one of each runs at a time.
+    """
+
+    def __init__(self, out_dir: str = "profiles", sample_interval: float = 0.005):
+        self.out_dir = out_dir
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+        self._sampling = False
+        self._cprofile_until = 0.0                  # monotonic deadline; 0 when off
+        self._cprofiles: Dict[tuple, cProfile.Profile] = {}   # (subsystem, thread id) -> profile
+        self._cprofile_active = 0
+        self._local = threading.local()
+        self._last_sites: Optional[Counter] = None
+        self._watches: Dict[str, Callable[[], int]] = {}
+
+    # ------------------------------------------------------------------ helpers
+    def _path(self, kind: str, subsystem: str, ext: str) -> str:
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.out_dir, f"{kind}_{stamp}_pid{os.getpid()}_{subsystem}.{ext}")
+
+    def watch(self, name: str, size_fn: Callable[[], int]) -> None:
+        """Size reported with every memory snapshot, e.g. watch("candle_queue", q.qsize)."""
+        self._watches[name] = size_fn
+
+    def status(self) -> str:
+        return (f"sampling={'on' if self._sampling else 'off'} "
+                f"cprofile={'on' if self._cprofile_until else 'off'} "
+                f"tracemalloc={'on' if tracemalloc.is_tracing() else 'off'} out_dir={self.out_dir}")
+
+    # ------------------------------------------------------------------ sampling
+    def start_sampling(self, seconds: float) -> bool:
+        with self._lock:
+            if self._sampling:
+                return False
+            self._sampling = True
+        threading.Thread(target=self._sample, args=(seconds,), name="profiler-sampler", daemon=True).start()
+        print(f"🔬 Sampling profiler on for {seconds:g}s")
+        return True
+
+    def _sample(self, seconds: float) -> None:
+        me = threading.get_ident()
+        stacks: Dict[str, Counter] = defaultdict(Counter)
+        names: Dict[int, str] = {}
+        samples = 0
+        deadline = time.monotonic() + seconds
+        try:
+            while time.monotonic() < deadline:
+                if samples % 200 == 0:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    labels, in_rest = [], False
+                    while frame is not None:
+                        code = frame.f_code
+                        in_rest = in_rest or code.co_filename.startswith(_REST_DIR)
+                        labels.append(_frame_label(code))
+                        frame = frame.f_back
+                    name = names.get(ident, f"thread-{ident}")
+                    subsystem = "rest" if in_rest else thread_subsystem(name)
+                    labels.append(name)
+                    stacks[subsystem][";".join(reversed(labels))] += 1
+                samples += 1
+                time.sleep(self.sample_interval)
+            for subsystem, counts in stacks.items():
+                path = self._path("sample", subsystem, "collapsed")
+                with open(path, "w") as f:
+                    for stack, n in counts.most_common():
+                        f.write(f"{stack} {n}\n")
+                print(f"🔬 {subsystem}: {sum(counts.values())} stack samples -> {path}")
+        except Exception as e:
+            print(f"❌ Sampling profiler failed: {e}")
+        finally:
+            self._sampling = False
+
+    # ------------------------------------------------------------------ cProfile
+    def scope(self, subsystem: str):
+        """
+        Wrap a subsystem's entry point: `with PROFILER.scope("strategy"): ...`.
+        Free (a shared no-op object) unless a cProfile session is running. cProfile only
+        sees the thread that enables it, so each entry point profiles itself; nested scopes
+        on the same thread count toward the outermost one.
+        """
+        if not self._cprofile_until:
+            return _NULL_SCOPE
+        return _CProfileScope(self, subsystem)
+
+    def _enter_cprofile(self, subsystem: str) -> Optional[cProfile.Profile]:
+        if getattr(self._local, "profiling", False) or time.monotonic() > self._cprofile_until:
+            return None
+        key = (subsystem, threading.get_ident())
+        with self._lock:
+            if not self._cprofile_until:
+                return None
+            profile = self._cprofiles.get(key)
+            if profile is None:
+                profile = self._cprofiles[key] = cProfile.Profile()
+            self._cprofile_active += 1
+        self._local.profiling = True
+        try:
+            profile.enable()
+        except Exception as e:
+            # e.g. another profiler already owns this thread: run the block unprofiled
+            self._local.profiling = False
+            with self._lock:
+                self._cprofile_active -= 1
+            print(f"⚠️ cProfile scope '{subsystem}' not profiled: {e}")
+            return None
+        return profile
+
+    def _exit_cprofile(self, profile: cProfile.Profile) -> None:
+        try:
+            profile.disable()
+        finally:
+            self._local.profiling = False
+            with self._lock:
+                self._cprofile_active -= 1
+
+    def start_cprofile(self, seconds: float) -> bool:
+        with self._lock:
+            if self._cprofile_until:
+                return False
+            self._cprofiles = {}
+            self._cprofile_until = time.monotonic() + seconds
+        threading.Thread(target=self._finish_cprofile, args=(seconds,), name="profiler-cprofile", daemon=True).start()
+        print(f"🔬 cProfile on for {seconds:g}s (strategy / ws / rest scopes)")
+        return True
+
+    def _finish_cprofile(self, seconds: float) -> None:
+        time.sleep(seconds)
+        # Scopes already inside a profiled block finish it; wait for them before dumping
+        deadline = time.monotonic() + 30
+        while self._cprofile_active and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with self._lock:
+            profiles, self._cprofiles = self._cprofiles, {}
+            self._cprofile_until = 0.0
+        by_subsystem = defaultdict(list)
+        for (subsystem, _), profile in profiles.items():
+            by_subsystem[subsystem].append(profile)
+        if not by_subsystem:
+            print("🔬 cProfile: no profiled scope ran in the window")
+        for subsystem, group in by_subsystem.items():
+            try:
+                stats = pstats.Stats(group[0])
+                for profile in group[1:]:
+                    stats.add(profile)
+                path = self._path("cprofile", subsystem, "pstats")
+                stats.dump_stats(path)
+                top = io.StringIO()
+                pstats.Stats(path, stream=top).sort_stats("cumulative").print_stats(15)
+                with open(path[:-len("pstats")] + "txt", "w") as f:
+                    f.write(top.getvalue())
+                print(f"🔬 {subsystem}: cProfile from {len(group)} thread(s) -> {path}")
+            except Exception as e:
+                # e.g. a profile whose enable() failed has no data; the other subsystems still dump
+                print(f"❌ cProfile dump for {subsystem} failed: {e}")
+
+    # ------------------------------------------------------------------ tracemalloc
+    def memory_snapshot(self, top: int = 15) -> Optional[str]:
+        """First call starts tracemalloc; later calls dump top allocation sites per subsystem and growth since the last."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self._last_sites = Counter()
+            print("🧠 tracemalloc started; the next snapshot reports growth from now")
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, _THIS_FILE, all_frames=True),   # the profiler's own work
+        ))
+        lines = [f"# tracemalloc snapshot pid {os.getpid()} {datetime.now(timezone.utc).isoformat()}",
+                 f"# traced: {tracemalloc.get_traced_memory()[0] / 1e6:.1f} MB current, "
+                 f"{tracemalloc.get_traced_memory()[1] / 1e6:.1f} MB peak"]
+        for name, size_fn in self._watches.items():
+            try:
+                lines.append(f"# watch {name}: {size_fn()}")
+            except Exception as e:
+                lines.append(f"# watch {name}: error {e}")
+
+        # Each allocation is charged to the most recent repo frame that made it (the line in
+        # our code, not the pandas internals under it)
+        sites: Counter = Counter()   # (subsystem, filename, lineno) -> bytes
+        for trace in snapshot.traces:
+            frames = trace.traceback
+            subsystem, site = "other", frames[-1]
+            for frame in reversed(frames):
+                found = file_subsystem(frame.filename)
+                if found:
+                    subsystem, site = found, frame
+                    break
+            sites[(subsystem, site.filename, site.lineno)] += trace.size
+        for subsystem in SUBSYSTEMS:
+            mine = Counter({k: v for k, v in sites.items() if k[0] == subsystem})
+            if not mine:
+                continue
+            lines.append(f"\n## {subsystem}: {sum(mine.values()) / 1e6:.2f} MB")
+            for (_, filename, lineno), size in mine.most_common(top):
+                lines.append(f"{size / 1e3:12.1f} KB  {filename}:{lineno}")
+
+        if self._last_sites is not None:
+            growth = Counter(sites)
+            growth.subtract(self._last_sites)
+            lines.append("\n## growth since previous snapshot")
+            for (subsystem, filename, lineno), diff in sorted(growth.items(), key=lambda kv: -abs(kv[1]))[:top]:
+                lines.append(f"{diff / 1e3:+12.1f} KB  [{subsystem}] {filename}:{lineno}")
+        self._last_sites = sites
+
+        path = self._path("tracemalloc", "all", "txt")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        print(f"🧠 tracemalloc snapshot -> {path}")
+        return path
+
+    def stop_memory(self) -> None:
+        tracemalloc.stop()
+        self._last_sites = None
+
+    # ------------------------------------------------------------------ control surface
+    def command(self, line: str) -> str:
+        parts = line.split()
+        if not parts:
+            return "commands: sample [s] | cprofile [s] | mem | mem stop | status"
+        cmd, args = parts[0].lower(), parts[1:]
+        try:
+            if cmd in ("sample", "cprofile"):
+                seconds = float(args[0]) if args else _default_seconds()
+                start = self.start_sampling if cmd == "sample" else self.start_cprofile
+                return f"{cmd} started for {seconds:g}s" if start(seconds) else f"{cmd} already running"
+            if cmd == "mem":
+                if args and args[0] == "stop":
+                    self.stop_memory()
+                    return "tracemalloc stopped"
+                path = self.memory_snapshot()
+                return f"snapshot written to {path}" if path else "tracemalloc started"
+            if cmd == "status":
+                return self.status()
+        except Exception as e:
+            return f"error: {e}"
+        return f"unknown command {cmd!r}"
+
+
+def _default_seconds() -> float:
+    import config
+    return float(config.PROFILE_DEFAULT_SECONDS)
+
+
+class _AdminServer(socketserver.ThreadingTCPServer):
+    # Rebind straight after a restart; set here, not on ThreadingTCPServer for the whole process
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _AdminHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            line = raw.decode(errors="replace").strip()
+            if line in ("quit", "exit"):
+                return
+            self.wfile.write((self.server.controller.command(line) + "\n").encode())
+
+
+PROFILER = ProfilerController()
+
+
+def install_profiler_hooks(admin_port: int = 0, host: str = "127.0.0.1", out_dir: Optional[str] = None,
+                           sample_interval: Optional[float] = None):
+    """
+    SIGUSR1 -> sampling run, SIGUSR2 -> memory snapshot (main thread only, POSIX), plus the
+    line-based admin socket when admin_port is set. Returns the admin server or None.
+    """
+    if out_dir:
+        PROFILER.out_dir = out_dir
+    if sample_interval:
+        PROFILER.sample_interval = sample_interval
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        # The handlers only start background threads, so the interrupted loop resumes at once
+        signal.signal(signal.SIGUSR1, lambda signum, frame: PROFILER.start_sampling(_default_seconds()))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: threading.Thread(
+            target=PROFILER.memory_snapshot, name="profiler-mem", daemon=True).start())
+    if not admin_port:
+        return None
+    server = _AdminServer((host, admin_port), _AdminHandler)
+    server.controller = PROFILER
+    threading.Thread(target=server.serve_forever, name="profiler-admin", daemon=True).start()
+    print(f"🔬 Profiler admin on {host}:{server.server_address[1]} (pid {os.getpid()}; SIGUSR1 sample, SIGUSR2 mem)")
+    return server
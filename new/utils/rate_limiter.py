@@ -0,0 +1,40 @@
+# your_trading_bot/utils/rate_limiter.py
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every caller of one REST client.
+    `rate` tokens are added per second up to `burst`; acquire() blocks until a token is free.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Takes `tokens`, sleeping if needed. Returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.waited_seconds += waited
+                    return waited
+                shortfall = (tokens - self._tokens) / self.rate
+            time.sleep(shortfall)
+            waited += shortfall
@@ -0,0 +1,140 @@
+# your_trading_bot/utils/reconcile.py
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+CLOSED_ORDER_STATES = ("closed", "cancelled", "canceled", "filled", "rejected", "expired")
+
+
+def order_list(open_orders_response) -> List[Dict[str, Any]]:
+    """Accepts the raw get_open_orders() response or an already extracted list."""
+    if open_orders_response is None:
+        return []
+    if isinstance(open_orders_response, list):
+        return open_orders_response
+    result = open_orders_response.get("result") if open_orders_response.get("success", True) else None
+    return result if isinstance(result, list) else []
+
+
+def is_stop_order(order: Dict[str, Any]) -> bool:
+    return bool(order.get("stop_order_type")) or order.get("order_type") in ("stop", "stop_market", "stop_limit") \
+        or order.get("stop_price") not in (None, "", 0, "0")
+
+
+def classify_protective_orders(
+    open_orders: List[Dict[str, Any]],
+    position_type: Optional[str],
+    product_id: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Splits live reduce-only orders into (stop-loss candidates, take-profit candidates, orphans).
+    An order is an orphan if we are flat or it sits on the wrong side to close the position.
+    """
+    closing_side = {"long": "sell", "short": "buy"}.get(position_type)
+    sl, tp, orphans = [], [], []
+    for order in open_orders:
+        if product_id is not None and order.get("product_id") not in (None, product_id):
+            continue
+        if not order.get("reduce_only"):
+            continue
+        if (order.get("state") or "").lower() in CLOSED_ORDER_STATES:
+            continue
+        if closing_side is None or (order.get("side") or "").lower() != closing_side:
+            orphans.append(order)
+        elif is_stop_order(order):
+            sl.append(order)
+        elif order.get("order_type") in ("limit_order", "limit"):
+            tp.append(order)
+        else:
+            orphans.append(order)
+    return sl, tp, orphans
+
+
+def reconcile_state(
+    state_manager,
+    client,
+    position: Optional[Dict[str, Any]],
+    open_orders_response,
+    product_id: Optional[int] = None,
+    cancel_orphans: bool = True,
+) -> Dict[str, Any]:
+    """
+    Aligns the (possibly journal-restored) bot state with what the exchange reports.
+
+    - The exchange position is the source of truth for side/size/entry.
+    - Local SL/TP ids are kept only if that order is still open; otherwise the
+      matching reduce-only stop/limit order on the exchange is adopted.
+    - Reduce-only orders that cannot protect the current position are cancelled.
+
+    `position` is the result of client.get_position() (None when flat).
+    Returns a summary dict for logging.
+    """
+    orders = order_list(open_orders_response)
+    st = state_manager.snapshot()
+    summary = {"action": "none", "sl_order_id": None, "tp_order_id": None, "cancelled": [], "warnings": []}
+
+    contracts = float(position.get("size", 0) or 0) if position else 0.0
+    if contracts == 0:
+        if st["in_position"]:
+            state_manager.mark_exit("Reconciled: flat on exchange")
+            summary["action"] = "marked_exit"
+        position_type = None
+    else:
+        position_type = "long" if contracts > 0 else "short"
+        # Same contracts<->BTC convention place_order uses, so SL/TP resizing round-trips
+        size_btc = abs(contracts) * client.LOT_SIZE_BTC
+        entry_price = float(position.get("entry_price") or position.get("avg_entry_price") or 0.0)
+        if not st["in_position"] or st["current_position_type"] != position_type:
+            state_manager.mark_entry(position_type=position_type, entry_price=entry_price, position_size=size_btc)
+            summary["action"] = "adopted_exchange_position"
+        else:
+            state_manager.sync_position_snapshot(position_type, size_btc, entry_price)
+            summary["action"] = "synced"
+
+    sl_orders, tp_orders, orphans = classify_protective_orders(orders, position_type, product_id)
+    st = state_manager.snapshot()
+
+    def pick(candidates, known_id):
+        for o in candidates:
+            if known_id is not None and int(o.get("id")) == int(known_id):
+                return o
+        return candidates[0] if candidates else None
+
+    sl = pick(sl_orders, st["sl_order_id"])
+    tp = pick(tp_orders, st["tp_order_id"])
+    # Duplicates beyond the one we keep are leftovers from earlier TSL moves
+    orphans += [o for o in sl_orders if o is not sl] + [o for o in tp_orders if o is not tp]
+
+    sl_id = int(sl["id"]) if sl else None
+    tp_id = int(tp["id"]) if tp else None
+    if (sl_id, tp_id) != (st["sl_order_id"], st["tp_order_id"]):
+        state_manager.set_sl_tp_order_ids(sl_id, tp_id)
+    if sl and position_type and st["trailing_stop_loss_price"] is None and st["initial_stop_loss_price"] is None:
+        # Restore the stop level from the live order when the journal had none
+        state_manager.set_trailing_stop(float(sl.get("stop_price")))
+    summary["sl_order_id"], summary["tp_order_id"] = sl_id, tp_id
+
+    if position_type and sl is None:
+        summary["warnings"].append("No live stop-loss order protects the open position")
+    if position_type and tp is None:
+        summary["warnings"].append("No live take-profit order for the open position")
+
+    for order in orphans:
+        if not cancel_orphans:
+            summary["warnings"].append(f"Orphaned reduce-only order {order.get('id')} left open")
+            continue
+        resp = client.cancel_order(order.get("id"))
+        if resp and resp.get("success"):
+            summary["cancelled"].append(int(order["id"]))
+        else:
+            summary["warnings"].append(f"Failed to cancel orphaned order {order.get('id')}")
+
+    return summary
+
+
+def print_reconcile_summary(summary: Dict[str, Any]) -> None:
+    print(f"🔄 Reconciliation: {summary['action']} | SL={summary['sl_order_id']} TP={summary['tp_order_id']} "
+          f"| cancelled orphans={summary['cancelled']}")
+    for w in summary["warnings"]:
+        print(f"⚠️ {w}")
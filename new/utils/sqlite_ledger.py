@@ -0,0 +1,372 @@
+# your_trading_bot/utils/sqlite_ledger.py
+
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+import config
+from utils.helpers import get_session
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    ts_us INTEGER NOT NULL,          -- local receive/submit time
+    product_id INTEGER,
+    symbol TEXT,
+    order_id INTEGER,
+    status TEXT,                     -- 'submitted' for our own REST submits, else the WS status
+    side TEXT,
+    order_type TEXT,
+    reduce_only INTEGER,
+    price REAL,
+    stop_price REAL,
+    size REAL,
+    filled_size REAL,
+    avg_fill_price REAL
+);
+CREATE INDEX IF NOT EXISTS ix_orders_ts ON orders (ts_us);
+CREATE INDEX IF NOT EXISTS ix_orders_product_ts ON orders (product_id, ts_us);
+CREATE INDEX IF NOT EXISTS ix_orders_order_id ON orders (order_id, ts_us);
+
+CREATE TABLE IF NOT EXISTS fills (
+    id INTEGER PRIMARY KEY,
+    ts_us INTEGER NOT NULL,
+    product_id INTEGER,
+    symbol TEXT,
+    order_id INTEGER,
+    side TEXT,
+    price REAL,
+    size REAL                        -- increment of filled_size seen on this update
+);
+CREATE INDEX IF NOT EXISTS ix_fills_ts ON fills (ts_us);
+CREATE INDEX IF NOT EXISTS ix_fills_product_ts ON fills (product_id, ts_us);
+CREATE INDEX IF NOT EXISTS ix_fills_order_id ON fills (order_id, ts_us);
+
+CREATE TABLE IF NOT EXISTS positions (
+    id INTEGER PRIMARY KEY,
+    ts_us INTEGER NOT NULL,
+    product_id INTEGER,
+    symbol TEXT,
+    direction TEXT,
+    size REAL,
+    avg_entry_price REAL,
+    realised_pnl REAL,
+    unrealised_pnl REAL
+);
+CREATE INDEX IF NOT EXISTS ix_positions_ts ON positions (ts_us);
+CREATE INDEX IF NOT EXISTS ix_positions_product_ts ON positions (product_id, ts_us);
+
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    entry_ts_us INTEGER,
+    exit_ts_us INTEGER NOT NULL,
+    product_id INTEGER,
+    symbol TEXT,
+    side TEXT,
+    reason TEXT,
+    entry_price REAL,
+    exit_price REAL,
+    size REAL,
+    pnl REAL,
+    net_pnl REAL,
+    session TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_trades_exit_ts ON trades (exit_ts_us);
+CREATE INDEX IF NOT EXISTS ix_trades_product_ts ON trades (product_id, exit_ts_us);
+"""
+
+_COLUMNS = {
+    "orders": ("ts_us", "product_id", "symbol", "order_id", "status", "side", "order_type", "reduce_only",
+               "price", "stop_price", "size", "filled_size", "avg_fill_price"),
+    "fills": ("ts_us", "product_id", "symbol", "order_id", "side", "price", "size"),
+    "positions": ("ts_us", "product_id", "symbol", "direction", "size", "avg_entry_price",
+                  "realised_pnl", "unrealised_pnl"),
+    "trades": ("entry_ts_us", "exit_ts_us", "product_id", "symbol", "side", "reason", "entry_price",
+               "exit_price", "size", "pnl", "net_pnl", "session"),
+}
+_INSERTS = {t: f"INSERT INTO {t} ({', '.join(c)}) VALUES ({', '.join('?' * len(c))})" for t, c in _COLUMNS.items()}
+
+_STOP = object()
+
+
+def _now_us() -> int:
+    return time.time_ns() // 1000
+
+
+def _ts_us(value) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    return pd.Timestamp(value).value // 1000
+
+
+def _f(v: Any) -> Optional[float]:
+    try:
+        return None if v is None or v == "" else float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _i(v: Any) -> Optional[int]:
+    try:
+        return None if v is None or v == "" else int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+class SqliteLedger:
+    """
+    Embedded SQLite ledger (WAL) for orders, fills, position snapshots and closed trades.
+
+    Producers call the record_* methods (or plug on_ws_event into OrderWebSocketRouter);
+    rows are queued and a writer thread inserts them with executemany, one transaction per
+    batch. Reads use their own connection, so queries never wait for the writer.
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000, commit_interval: float = 0.2,
+                 max_tracked_orders: int = 10_000):
+        self.path = path
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self.max_tracked_orders = max_tracked_orders
+        self.rows_written = 0
+        self.errors = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        # order_id -> filled_size already turned into fills, least recently updated first.
+        # Bounded: finished orders age out, while a late duplicate frame for one still dedupes.
+        self._filled: "OrderedDict[int, float]" = OrderedDict()
+        self._filled_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+        self._thread = threading.Thread(target=self._run, name="sqlite-ledger", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # -------------------------------
+    # Producers
+    # -------------------------------
+    def _put(self, table: str, row: tuple) -> None:
+        self._queue.put((table, row))
+
+    def record_order_submitted(self, order: Dict[str, Any], symbol: Optional[str] = None,
+                               product_id: Optional[int] = None) -> None:
+        """
+        Call with the REST `result` of place_order; its time is the start point for fill latency.
+        Fills already reported in the response (market / IOC) are recorded too.
+        """
+        ts = _now_us()
+        order_id = _i(order.get("id"))
+        product_id = product_id or _i(order.get("product_id"))
+        symbol = symbol or order.get("product_symbol")
+        size, unfilled = _f(order.get("size")), _f(order.get("unfilled_size"))
+        filled = size - unfilled if size is not None and unfilled is not None else None
+        avg_price = _f(order.get("average_fill_price"))
+        self._put("orders", (
+            ts, product_id, symbol, order_id, "submitted", order.get("side"), order.get("order_type"),
+            int(bool(order.get("reduce_only"))), _f(order.get("limit_price") or order.get("price")),
+            _f(order.get("stop_price")), size, filled, avg_price,
+        ))
+        if filled:
+            self._track_fill(ts, order_id, product_id, symbol, order.get("side"), filled, avg_price)
+
+    def record_order_update(self, data: Dict[str, Any]) -> None:
+        ts = _now_us()
+        order_id = _i(data.get("id"))
+        product_id = _i(data.get("product_id"))
+        symbol = data.get("product_symbol") or data.get("symbol")
+        side = (data.get("side") or "").lower()
+        filled = _f(data.get("filled_size") or data.get("filled_qty") or data.get("filled")) or 0.0
+        avg_price = _f(data.get("avg_fill_price") or data.get("avg_fill") or data.get("average_price"))
+        self._put("orders", (
+            ts, product_id, symbol, order_id,
+            (data.get("status") or data.get("order_state") or "").lower(), side,
+            (data.get("type") or data.get("order_type") or "").lower(),
+            int(bool(data.get("reduce_only") or data.get("reduceOnly"))),
+            _f(data.get("price")), _f(data.get("stop_price") or data.get("trigger_price")),
+            _f(data.get("size")), filled, avg_price,
+        ))
+        self._track_fill(ts, order_id, product_id, symbol, side, filled, avg_price)
+
+    def _track_fill(self, ts, order_id, product_id, symbol, side, filled, avg_price) -> None:
+        """Turns growth of an order's cumulative filled size into a fill row."""
+        if order_id is None:
+            return
+        with self._filled_lock:
+            seen = self._filled.get(order_id, 0.0)
+            delta = filled - seen
+            self._filled[order_id] = max(filled, seen)
+            self._filled.move_to_end(order_id)
+            while len(self._filled) > self.max_tracked_orders:
+                self._filled.popitem(last=False)
+        if delta > 0:
+            # Updates carry the order's average price; for partial fills that is an approximation
+            self._put("fills", (ts, product_id, symbol, order_id, side, avg_price, delta))
+
+    def record_position(self, data: Dict[str, Any]) -> None:
+        size = _f(data.get("size") or data.get("position_size") or data.get("quantity")) or 0.0
+        side = (data.get("side") or data.get("direction") or "").lower()
+        direction = {"buy": "long", "sell": "short"}.get(side, side) or \
+            ("long" if size > 0 else "short" if size < 0 else None)
+        self._put("positions", (
+            _now_us(), _i(data.get("product_id")), data.get("product_symbol") or data.get("symbol"),
+            direction, size,
+            _f(data.get("avg_entry_price") or data.get("average_entry_price") or data.get("entry_price")),
+            _f(data.get("realised_pnl") or data.get("realized_pnl")),
+            _f(data.get("unrealised_pnl") or data.get("unrealized_pnl")),
+        ))
+
+    def record_trade(self, trade: Dict[str, Any], symbol: Optional[str] = None,
+                     product_id: Optional[int] = None) -> None:
+        """Takes the trade_log dict ('Entry Time', 'Exit Time', 'Type', 'Net PnL', ...)."""
+        exit_time = pd.Timestamp(trade.get("Exit Time") or pd.Timestamp.now(tz="UTC"))
+        if exit_time.tzinfo is None:
+            exit_time = exit_time.tz_localize("UTC")
+        self._put("trades", (
+            _ts_us(trade.get("Entry Time")), exit_time.value // 1000,
+            product_id or trade.get("Product ID"), symbol or trade.get("Symbol") or config.SYMBOL,
+            str(trade.get("Type", "")).lower(), trade.get("Reason"),
+            _f(trade.get("Entry Price")), _f(trade.get("Exit Price")), _f(trade.get("Size")),
+            _f(trade.get("PnL")), _f(trade.get("Net PnL")),
+            trade.get("Session") or get_session(exit_time.tz_convert("UTC")),
+        ))
+
+    def on_ws_event(self, name: str, payload: Dict[str, Any]) -> None:
+        """OrderWebSocketRouter on_event hook."""
+        if name == "order_update":
+            self.record_order_update(payload)
+        elif name == "position_update":
+            self.record_position(payload)
+
+    # -------------------------------
+    # Writer thread
+    # -------------------------------
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        done = threading.Event()
+        self._queue.put(("__flush__", done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            batches: Dict[str, list] = {}
+            waiters, stop, n = [], False, 0
+            deadline = time.monotonic() + self.commit_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif item[0] == "__flush__":
+                    waiters.append(item[1])
+                else:
+                    batches.setdefault(item[0], []).append(item[1])
+                    n += 1
+                if stop or waiters or n >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    for table, rows in batches.items():
+                        conn.executemany(_INSERTS[table], rows)
+                self.rows_written += n
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ SQLite ledger write error ({n} rows lost): {e}")
+            for w in waiters:
+                w.set()
+            if stop:
+                conn.close()
+                return
+
+    # -------------------------------
+    # Queries
+    # -------------------------------
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+
+    def pnl_by_day(self, start=None, end=None, product_id: Optional[int] = None) -> pd.DataFrame:
+        """Closed-trade PnL per UTC day (by exit time)."""
+        where, params = self._range("exit_ts_us", start, end, product_id)
+        return self.query(
+            f"SELECT date(exit_ts_us / 1000000, 'unixepoch') AS day, COUNT(*) AS trades, "
+            f"SUM(net_pnl > 0) AS wins, SUM(pnl) AS pnl, SUM(net_pnl) AS net_pnl "
+            f"FROM trades {where} GROUP BY day ORDER BY day", params)
+
+    def pnl_by_session(self, start=None, end=None, product_id: Optional[int] = None) -> pd.DataFrame:
+        """
+        Closed-trade PnL grouped by the session stored with each trade: the record's 'Session'
+        label when it had one, else get_session() on the exit time (see record_trade).
+        Sorted by net PnL, best session first.
+        """
+        where, params = self._range("exit_ts_us", start, end, product_id)
+        return self.query(
+            f"SELECT session, COUNT(*) AS trades, SUM(net_pnl > 0) AS wins, SUM(pnl) AS pnl, "
+            f"SUM(net_pnl) AS net_pnl FROM trades {where} GROUP BY session ORDER BY net_pnl DESC", params)
+
+    def order_fill_latency(self, start=None, end=None, product_id: Optional[int] = None) -> pd.DataFrame:
+        """
+        Per order: first record (our submit, else the first WS update) to first fill, in ms.
+        """
+        where, params = self._range("o.ts_us", start, end, product_id, alias="o.")
+        return self.query(
+            f"SELECT o.order_id, o.product_id, MIN(o.ts_us) AS first_seen_us, f.first_fill_us, "
+            f"(f.first_fill_us - MIN(o.ts_us)) / 1000.0 AS latency_ms "
+            f"FROM orders o JOIN (SELECT order_id, MIN(ts_us) AS first_fill_us FROM fills GROUP BY order_id) f "
+            f"ON f.order_id = o.order_id {where} GROUP BY o.order_id ORDER BY first_seen_us", params)
+
+    @staticmethod
+    def _range(ts_col, start, end, product_id, alias=""):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append(f"{ts_col} >= ?")
+            params.append(_ts_us(start))
+        if end is not None:
+            clauses.append(f"{ts_col} < ?")
+            params.append(_ts_us(end))
+        if product_id is not None:
+            clauses.append(f"{alias}product_id = ?")
+            params.append(product_id)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", tuple(params)
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_sqlite_ledger() -> Optional[SqliteLedger]:
+    """Process-wide ledger at config.SQLITE_LEDGER_PATH; None when the path is empty."""
+    global _ledger
+    if not config.SQLITE_LEDGER_PATH:
+        return None
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = SqliteLedger(config.SQLITE_LEDGER_PATH)
+            atexit.register(_ledger.close)
+        return _ledger
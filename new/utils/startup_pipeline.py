@@ -0,0 +1,141 @@
+# your_trading_bot/utils/startup_pipeline.py
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from utils.order_manager import manager as order_manager
+from utils.reconcile import order_list, reconcile_state, print_reconcile_summary
+from strategy.simple_ema_rsi import get_initial_historical_candles
+
+
+@dataclass
+class PhaseTiming:
+    name: str
+    started_ms: float = 0.0    # offset from pipeline start
+    duration_ms: float = 0.0
+    ok: bool = True
+    error: Optional[str] = None
+
+
+@dataclass
+class StartupResult:
+    df_candles: pd.DataFrame
+    position: Optional[Dict[str, Any]] = None
+    open_orders: Any = None
+    product: Optional[Dict[str, Any]] = None
+    reconcile_summary: Optional[Dict[str, Any]] = None
+    timings: Dict[str, PhaseTiming] = field(default_factory=dict)
+    total_ms: float = 0.0
+
+    @property
+    def reconciled(self) -> bool:
+        return self.reconcile_summary is not None
+
+
+def _timed(name: str, fn: Callable[[], Any], t_start: float, timings: Dict[str, PhaseTiming],
+           required: bool = False):
+    """
+    Runs one phase and records its timing. An optional phase that fails returns None and the
+    pipeline carries on without it; a required phase re-raises so startup aborts.
+    """
+    phase = PhaseTiming(name, started_ms=(time.perf_counter() - t_start) * 1e3)
+    t0 = time.perf_counter()
+    try:
+        return fn()
+    except Exception as e:
+        phase.ok = False
+        phase.error = str(e)
+        if required:
+            print(f"❌ Startup phase '{name}' failed, aborting startup: {e}")
+            raise
+        return None
+    finally:
+        phase.duration_ms = (time.perf_counter() - t0) * 1e3
+        timings[name] = phase
+
+
+def run_startup_pipeline(
+    client,
+    state_manager,
+    symbol: str,
+    product_id: int,
+    resolution: str,
+    min_candles: int,
+    journal_path: Optional[str] = None,
+    journal_snapshot_every: int = 1000,
+    journal_fsync: bool = True,
+    fetch_candles: bool = True,
+) -> StartupResult:
+    """
+    Brings the bot from cold start to ready:
+      1. replay the local state journal (ms, local disk),
+      2. fetch position, open orders, product details and candle backfill concurrently,
+      3. reconcile bot state against the exchange.
+    Time-to-ready is the journal replay + the slowest REST phase + reconciliation.
+    A failed position/orders fetch skips reconciliation rather than guessing. A failed journal
+    replay or reconciliation raises: trading on a half-restored or unreconciled state is worse
+    than not starting.
+    fetch_candles=False skips the backfill for processes that do not evaluate the strategy.
+    """
+    timings: Dict[str, PhaseTiming] = {}
+    t_start = time.perf_counter()
+
+    if journal_path:
+        _timed("journal_replay",
+               lambda: state_manager.enable_journal(journal_path, journal_snapshot_every, journal_fsync),
+               t_start, timings, required=True)
+
+    jobs = {
+        "position": lambda: client.get_position(symbol, raise_on_error=True, product_id=product_id),
+        "open_orders": lambda: client.get_open_orders(symbol),
+        "product": lambda: client.get_product_details(symbol),
+    }
+    if fetch_candles:
+        jobs["candles"] = lambda: get_initial_historical_candles(symbol, resolution, min_candles, client)
+    with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="startup") as pool:
+        futures = {name: pool.submit(_timed, name, fn, t_start, timings) for name, fn in jobs.items()}
+        results = {name: f.result() for name, f in futures.items()}
+
+    result = StartupResult(
+        df_candles=results["candles"] if results.get("candles") is not None else pd.DataFrame(),
+        position=results["position"],
+        open_orders=results["open_orders"],
+        product=results["product"],
+        timings=timings,
+    )
+
+    if timings["position"].ok and results["open_orders"] is not None:
+        result.reconcile_summary = _timed(
+            "reconcile",
+            lambda: reconcile_state(state_manager, client, results["position"], results["open_orders"], product_id=product_id),
+            t_start, timings, required=True,
+        )
+        if result.reconcile_summary:
+            print_reconcile_summary(result.reconcile_summary)
+            # Index what is still open (orphans were just cancelled) and mark the kept SL/TP as the bracket
+            summary = result.reconcile_summary
+            still_open = [o for o in order_list(results["open_orders"]) if int(o.get("id")) not in summary["cancelled"]]
+            order_manager.sync_open_orders(still_open, [symbol])
+            for role in ("sl", "tp"):
+                if summary[f"{role}_order_id"] is not None:
+                    order_manager.set_bracket(symbol, role, summary[f"{role}_order_id"])
+    else:
+        print("⚠️ Startup reconciliation skipped: position or open orders unavailable.")
+
+    result.total_ms = (time.perf_counter() - t_start) * 1e3
+    return result
+
+
+def print_startup_timings(result: StartupResult) -> None:
+    print("⏱️ Startup phases:")
+    for phase in sorted(result.timings.values(), key=lambda p: p.started_ms):
+        status = "ok" if phase.ok else f"FAILED ({phase.error})"
+        print(f"   {phase.name:<15} +{phase.started_ms:8.1f} ms  {phase.duration_ms:8.1f} ms  {status}")
+    serial_ms = sum(p.duration_ms for p in result.timings.values())
+    print(f"   time-to-ready {result.total_ms:.1f} ms (serial would be ~{serial_ms:.1f} ms)")
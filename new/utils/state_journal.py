@@ -0,0 +1,233 @@
+# your_trading_bot/utils/state_journal.py
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# File layout: a sequence of frames, each `length (uint32) | crc32 (uint32) | payload`.
+# The first frame of a file is a header naming the state fields, so field indices stay
+# valid even if PositionState gains or reorders fields between versions.
+_FRAME = struct.Struct("<II")
+
+_KIND_HEADER = 0
+_KIND_DELTA = 1      # only the fields that changed in one mutation
+_KIND_SNAPSHOT = 2   # every field; written on compaction
+
+# Mutation names stored as one byte. Append only.
+OPS = (
+    "restore",
+    "mark_entry",
+    "mark_exit",
+    "reset_all",
+    "set_sl_tp_order_ids",
+    "set_trailing_stop",
+    "update_extrema_since_entry",
+    "sync_position_snapshot",
+    "on_order_filled",
+    "clear_sl_if_order",
+    "clear_tp_if_order",
+)
+_OP_IDS = {name: i for i, name in enumerate(OPS)}
+
+# Tagged value encoding
+_T_NONE, _T_FALSE, _T_TRUE, _T_FLOAT, _T_INT, _T_STR, _T_DATETIME = range(7)
+_D = struct.Struct("<d")
+_Q = struct.Struct("<q")
+_H = struct.Struct("<H")
+_RECORD_HEAD = struct.Struct("<BBQ")  # kind, op id, version
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class JournalCorruptError(Exception):
+    """Raised when a journal header is missing or unreadable."""
+
+
+def _encode_value(v: Any, out: bytearray) -> None:
+    if v is None:
+        out.append(_T_NONE)
+    elif v is True:
+        out.append(_T_TRUE)
+    elif v is False:
+        out.append(_T_FALSE)
+    elif isinstance(v, float):
+        out.append(_T_FLOAT)
+        out += _D.pack(v)
+    elif isinstance(v, int):
+        out.append(_T_INT)
+        out += _Q.pack(v)
+    elif isinstance(v, str):
+        b = v.encode("utf-8")
+        out.append(_T_STR)
+        out += _H.pack(len(b))
+        out += b
+    elif isinstance(v, datetime):
+        if v.tzinfo is None:
+            v = v.replace(tzinfo=timezone.utc)
+        delta = v - _EPOCH
+        out.append(_T_DATETIME)
+        out += _Q.pack((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+    else:
+        # numpy scalars and similar: store as float
+        out.append(_T_FLOAT)
+        out += _D.pack(float(v))
+
+
+def _decode_value(buf: bytes, pos: int) -> Tuple[Any, int]:
+    tag = buf[pos]
+    pos += 1
+    if tag == _T_NONE:
+        return None, pos
+    if tag == _T_TRUE:
+        return True, pos
+    if tag == _T_FALSE:
+        return False, pos
+    if tag == _T_FLOAT:
+        return _D.unpack_from(buf, pos)[0], pos + 8
+    if tag == _T_INT:
+        return _Q.unpack_from(buf, pos)[0], pos + 8
+    if tag == _T_STR:
+        n = _H.unpack_from(buf, pos)[0]
+        pos += 2
+        return buf[pos:pos + n].decode("utf-8"), pos + n
+    if tag == _T_DATETIME:
+        us = _Q.unpack_from(buf, pos)[0]
+        return datetime.fromtimestamp(us / 1_000_000, tz=timezone.utc), pos + 8
+    raise ValueError(f"Unknown value tag {tag}")
+
+
+def _frame(payload: bytes) -> bytes:
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _read_frames(path: str) -> Tuple[List[bytes], int]:
+    """Returns (payloads, valid_length). Stops at the first torn or corrupt frame."""
+    with open(path, "rb") as fh:
+        data = fh.read()
+    payloads = []
+    pos = 0
+    while pos + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, pos)
+        start = pos + _FRAME.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        payloads.append(payload)
+        pos = start + length
+    return payloads, pos
+
+
+class StateJournal:
+    """
+    Append-only binary write-ahead journal for BotStateManager.
+
+    - Every published state change appends one small delta record (changed fields only).
+    - Every `snapshot_every` records the file is compacted into a single snapshot
+      record via write-to-temp + atomic rename.
+    - `load()` replays header + snapshot + deltas and ignores a torn tail left by a crash.
+    """
+
+    def __init__(self, path: str, field_names: List[str], snapshot_every: int = 1000, fsync: bool = True):
+        self.path = path
+        self.field_names = list(field_names)
+        self._field_ids = {name: i for i, name in enumerate(self.field_names)}
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._fh = None
+        self._records_since_snapshot = 0
+
+    # -------------------------------
+    # Reading
+    # -------------------------------
+    @staticmethod
+    def load(path: str) -> Tuple[Optional[Dict[str, Any]], int, int]:
+        """
+        Replays a journal file.
+        Returns (fields, version, records_replayed); fields is None if the file
+        does not exist or holds no state yet.
+        """
+        if not os.path.exists(path):
+            return None, 0, 0
+        payloads, _ = _read_frames(path)
+        if not payloads:
+            return None, 0, 0
+        if payloads[0][0] != _KIND_HEADER:
+            raise JournalCorruptError(f"{path}: first record is not a header")
+
+        names = payloads[0][1:].decode("utf-8").split(",")
+        fields: Optional[Dict[str, Any]] = None
+        version = 0
+        for payload in payloads[1:]:
+            kind, _op, version = _RECORD_HEAD.unpack_from(payload, 0)
+            if kind == _KIND_SNAPSHOT:
+                fields = {}
+            elif fields is None:
+                fields = {}
+            pos = _RECORD_HEAD.size
+            while pos < len(payload):
+                field_id = payload[pos]
+                value, pos = _decode_value(payload, pos + 1)
+                fields[names[field_id]] = value
+        return fields, version, len(payloads) - 1
+
+    # -------------------------------
+    # Writing
+    # -------------------------------
+    def open(self, current: Dict[str, Any], version: int) -> None:
+        """Starts journaling from `current`, compacting whatever was on disk."""
+        with self._lock:
+            self._compact_locked(current, version)
+
+    def append(self, op: str, changed: Dict[str, Any], version: int, current: Dict[str, Any]) -> None:
+        if not changed:
+            return
+        out = bytearray(_RECORD_HEAD.pack(_KIND_DELTA, _OP_IDS[op], version))
+        for name, value in changed.items():
+            out.append(self._field_ids[name])
+            _encode_value(value, out)
+        with self._lock:
+            if self._fh is None:
+                return
+            self._fh.write(_frame(bytes(out)))
+            self._fh.flush()
+            if self.fsync:
+                os.fsync(self._fh.fileno())
+            self._records_since_snapshot += 1
+            if self._records_since_snapshot >= self.snapshot_every:
+                self._compact_locked(current, version)
+
+    def _compact_locked(self, current: Dict[str, Any], version: int) -> None:
+        t0 = time.perf_counter()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+        header = bytes([_KIND_HEADER]) + ",".join(self.field_names).encode("utf-8")
+        snap = bytearray(_RECORD_HEAD.pack(_KIND_SNAPSHOT, _OP_IDS["restore"], version))
+        for name in self.field_names:
+            snap.append(self._field_ids[name])
+            _encode_value(current.get(name), snap)
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(_frame(header))
+            fh.write(_frame(bytes(snap)))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._fh = open(self.path, "ab")
+        self._records_since_snapshot = 0
+        print(f"🗜️ State journal compacted at version {version} in {(time.perf_counter() - t0) * 1e3:.2f} ms")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
@@ -0,0 +1,251 @@
+# your_trading_bot/utils/trade_analytics.py
+
+from __future__ import annotations
+
+import glob
+import io
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.ledger_writer import TRADE_LOG_COLUMNS
+
+SESSIONS = ("Asia", "Europe", "US")
+_NS_PER_HOUR = 3_600_000_000_000
+_NS_PER_DAY = 24 * _NS_PER_HOUR
+
+
+def session_codes(exit_ns: np.ndarray) -> np.ndarray:
+    """Vectorized utils.helpers.get_session: UTC hour 0-7 Asia, 8-15 Europe, 16-23 US."""
+    return ((exit_ns // _NS_PER_HOUR) % 24 // 8).astype(np.int8)
+
+
+class TradeArrays:
+    """
+    The trade ledger as columnar NumPy arrays, sorted by exit time.
+    Reasons are dictionary-encoded (reason_code -> reasons[code]); sessions use SESSIONS order.
+    """
+
+    def __init__(self):
+        self.exit_ns = np.empty(0, np.int64)
+        self.entry_ns = np.empty(0, np.int64)
+        self.side = np.empty(0, np.int8)         # 1 long, -1 short, 0 unknown
+        self.entry_price = np.empty(0)           # NaN when unknown
+        self.pnl = np.empty(0)
+        self.net_pnl = np.empty(0)
+        self.reason_code = np.empty(0, np.int32)
+        self.session_code = np.empty(0, np.int8)
+        self.reasons: List[str] = []
+        self._reason_index: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.exit_ns)
+
+    def append_frame(self, df: pd.DataFrame) -> int:
+        """
+        Appends rows in the trade_log.csv schema. Returns the number of rows added; rows
+        whose Exit Time does not parse are skipped (every metric is keyed on it).
+        """
+        if df.empty:
+            return 0
+        exit_time = pd.to_datetime(df["Exit Time"], utc=True, format="ISO8601", errors="coerce")
+        bad = exit_time.isna().to_numpy()
+        if bad.any():
+            print(f"⚠️ Trade analytics skipped {int(bad.sum())} row(s) with an unreadable Exit Time.")
+            df, exit_time = df[~bad], exit_time[~bad]
+            if df.empty:
+                return 0
+        exit_ns = exit_time.to_numpy("datetime64[ns]").view(np.int64)
+        entry_ns = pd.to_datetime(df["Entry Time"], utc=True, format="ISO8601", errors="coerce") \
+            .to_numpy("datetime64[ns]").view(np.int64)
+        kind = df["Type"].astype(str).str.lower()
+        side = np.where(kind.str.startswith("long"), 1, np.where(kind.str.startswith("short"), -1, 0)).astype(np.int8)
+        pnl = pd.to_numeric(df["PnL"], errors="coerce").fillna(0.0).to_numpy(float)
+        net = pd.to_numeric(df["Net PnL"], errors="coerce").fillna(0.0).to_numpy(float)
+        entry_price = pd.to_numeric(df["Entry Price"], errors="coerce").to_numpy(float) \
+            if "Entry Price" in df else np.full(len(df), np.nan)
+
+        codes, uniques = pd.factorize(df["Reason"].fillna("").astype(str))
+        for name in uniques:
+            if name not in self._reason_index:
+                self._reason_index[name] = len(self.reasons)
+                self.reasons.append(name)
+        remap = np.array([self._reason_index[n] for n in uniques], dtype=np.int32)
+        reason = remap[codes] if len(remap) else np.zeros(len(df), np.int32)
+
+        # Missing / unknown sessions fall back to the exit-time bucket
+        session = session_codes(exit_ns)
+        if "Session" in df:
+            given = df["Session"].map({s: i for i, s in enumerate(SESSIONS)}).to_numpy()
+            known = ~pd.isna(given)
+            session[known] = given[known].astype(np.int8)
+
+        self._extend(exit_ns, entry_ns, side, entry_price, pnl, net, reason, session)
+        return len(df)
+
+    def append_arrays(self, exit_ns, net_pnl, pnl=None, entry_ns=None, side=None, reason=None, session=None,
+                      entry_price=None) -> int:
+        """Fast path for backtests and shadow runs that already hold arrays. `reason` is a list of strings or codes."""
+        exit_ns = np.asarray(exit_ns, np.int64)
+        n = len(exit_ns)
+        if reason is not None and len(reason) and isinstance(reason[0], str):
+            codes, uniques = pd.factorize(np.asarray(reason))
+            for name in uniques:
+                if name not in self._reason_index:
+                    self._reason_index[name] = len(self.reasons)
+                    self.reasons.append(name)
+            reason = np.array([self._reason_index[u] for u in uniques], np.int32)[codes]
+        if not self.reasons:
+            self._reason_index[""] = 0
+            self.reasons.append("")
+        self._extend(
+            exit_ns,
+            np.asarray(entry_ns, np.int64) if entry_ns is not None else np.full(n, np.iinfo(np.int64).min),
+            np.asarray(side, np.int8) if side is not None else np.zeros(n, np.int8),
+            np.asarray(entry_price, float) if entry_price is not None else np.full(n, np.nan),
+            np.asarray(pnl if pnl is not None else net_pnl, float),
+            np.asarray(net_pnl, float),
+            np.asarray(reason, np.int32) if reason is not None else np.zeros(n, np.int32),
+            np.asarray(session, np.int8) if session is not None else session_codes(exit_ns),
+        )
+        return n
+
+    def _extend(self, exit_ns, entry_ns, side, entry_price, pnl, net, reason, session) -> None:
+        needs_sort = len(self.exit_ns) and len(exit_ns) and exit_ns.min() < self.exit_ns[-1]
+        self.exit_ns = np.concatenate((self.exit_ns, exit_ns))
+        self.entry_ns = np.concatenate((self.entry_ns, entry_ns))
+        self.side = np.concatenate((self.side, side))
+        self.entry_price = np.concatenate((self.entry_price, entry_price))
+        self.pnl = np.concatenate((self.pnl, pnl))
+        self.net_pnl = np.concatenate((self.net_pnl, net))
+        self.reason_code = np.concatenate((self.reason_code, reason))
+        self.session_code = np.concatenate((self.session_code, session))
+        if needs_sort or not np.all(exit_ns[1:] >= exit_ns[:-1]):
+            order = np.argsort(self.exit_ns, kind="stable")
+            for name in ("exit_ns", "entry_ns", "side", "entry_price", "pnl", "net_pnl", "reason_code", "session_code"):
+                setattr(self, name, getattr(self, name)[order])
+
+
+class TradeLedgerReader:
+    """
+    Incrementally loads the CSV trade ledger (trade_log.csv and its daily rotations)
+    into a TradeArrays. Each refresh() parses only bytes appended since the last one,
+    up to the last complete line, so polling a growing ledger stays cheap.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.arrays = TradeArrays()
+        self._offsets: Dict[str, int] = {}
+
+    def _files(self) -> List[str]:
+        stem, ext = os.path.splitext(self.path)
+        files = glob.glob(f"{stem}_*{ext or '.csv'}")
+        if os.path.exists(self.path):
+            files.append(self.path)
+        return sorted(files)
+
+    def refresh(self) -> int:
+        added = 0
+        for path in self._files():
+            offset = self._offsets.get(path, 0)
+            size = os.path.getsize(path)
+            if size <= offset:
+                continue
+            with open(path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read(size - offset)
+            end = chunk.rfind(b"\n") + 1      # leave a partially written line for next time
+            if end == 0:
+                continue
+            chunk = chunk[:end]
+            if offset == 0:
+                chunk = chunk[chunk.find(b"\n") + 1:]   # header
+            self._offsets[path] = offset + end
+            if chunk:
+                df = pd.read_csv(io.BytesIO(chunk), names=list(TRADE_LOG_COLUMNS), header=None)
+                added += self.arrays.append_frame(df)
+        return added
+
+
+def _grouped(codes: np.ndarray, n_groups: int, net: np.ndarray) -> Dict[str, np.ndarray]:
+    count = np.bincount(codes, minlength=n_groups)
+    total = np.bincount(codes, weights=net, minlength=n_groups)
+    wins = np.bincount(codes, weights=net > 0, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {"trades": count, "net_pnl": total, "win_rate": np.where(count > 0, wins / count, np.nan),
+                "expectancy": np.where(count > 0, total / count, np.nan)}
+
+
+def compute_metrics(t: TradeArrays, initial_equity: float = 0.0, periods_per_year: int = 365) -> dict:
+    """
+    Equity curve and summary statistics. Sharpe / Sortino are on daily net PnL (days
+    with trades between the first and last exit, idle days counted as 0), annualized
+    with `periods_per_year` (365: crypto trades every day).
+    """
+    net = t.net_pnl
+    n = len(net)
+    if n == 0:
+        return {"trades": 0}
+
+    equity = initial_equity + np.cumsum(net)
+    peak = np.maximum.accumulate(np.concatenate(([initial_equity], equity)))[1:]
+    drawdown = equity - peak
+    dd_end = int(np.argmin(drawdown))
+    dd_start = int(np.argmax(equity[:dd_end + 1])) if dd_end > 0 else 0
+
+    day = t.exit_ns // _NS_PER_DAY
+    daily = np.bincount(day - day[0], weights=net)
+    mean, std = daily.mean(), daily.std(ddof=1) if len(daily) > 1 else np.nan
+    downside = np.sqrt(np.mean(np.minimum(daily, 0.0) ** 2))
+    ann = np.sqrt(periods_per_year)
+
+    wins, losses = net[net > 0], net[net < 0]
+    gross_win, gross_loss = wins.sum(), -losses.sum()
+
+    by_reason = _grouped(t.reason_code, len(t.reasons), net)
+    by_session = _grouped(t.session_code.astype(np.int64), len(SESSIONS), net)
+    return {
+        "trades": n,
+        "net_pnl": float(equity[-1] - initial_equity),
+        "gross_pnl": float(t.pnl.sum()),
+        "win_rate": len(wins) / n,
+        "expectancy": float(net.mean()),
+        "avg_win": float(wins.mean()) if len(wins) else 0.0,
+        "avg_loss": float(losses.mean()) if len(losses) else 0.0,
+        "profit_factor": float(gross_win / gross_loss) if gross_loss > 0 else np.inf,
+        "max_drawdown": float(-drawdown[dd_end]),
+        "max_drawdown_pct": float(-drawdown[dd_end] / peak[dd_end]) if peak[dd_end] > 0 else np.nan,
+        "max_drawdown_start": pd.Timestamp(t.exit_ns[dd_start], tz="UTC"),
+        "max_drawdown_end": pd.Timestamp(t.exit_ns[dd_end], tz="UTC"),
+        "sharpe": float(mean / std * ann) if std and std > 0 else np.nan,
+        "sortino": float(mean / downside * ann) if downside > 0 else np.nan,
+        "equity": equity,
+        "by_reason": pd.DataFrame(by_reason, index=pd.Index(t.reasons, name="reason")),
+        "by_session": pd.DataFrame(by_session, index=pd.Index(SESSIONS, name="session")),
+    }
+
+
+def print_report(m: dict) -> None:
+    if not m.get("trades"):
+        print("No trades in ledger.")
+        return
+    print(f"📈 {m['trades']} trades | net {m['net_pnl']:.2f} | win rate {m['win_rate']:.1%} | "
+          f"expectancy {m['expectancy']:.4f} | PF {m['profit_factor']:.2f}")
+    print(f"   max DD {m['max_drawdown']:.2f} ({m['max_drawdown_start']} → {m['max_drawdown_end']}) | "
+          f"Sharpe {m['sharpe']:.2f} | Sortino {m['sortino']:.2f}")
+    print("--- by exit reason ---")
+    print(m["by_reason"].to_string())
+    print("--- by session ---")
+    print(m["by_session"].to_string())
+
+
+if __name__ == "__main__":
+    # cd new && python -m utils.trade_analytics
+    from utils.trade_logger import TRADE_LOG_FILE
+
+    reader = TradeLedgerReader(TRADE_LOG_FILE)
+    reader.refresh()
+    print_report(compute_metrics(reader.arrays))
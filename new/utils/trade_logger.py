@@ -1,40 +1,55 @@
-import pandas as pd
+import atexit
 import os
+import threading
 from datetime import datetime, timedelta, timezone # Added timezone import
+
+import pandas as pd
+
 import config # Assuming config.py exists and is relevant
+from utils.ledger_writer import LedgerWriter, TRADE_LOG_COLUMNS
+from utils.sqlite_ledger import get_sqlite_ledger
+
+TRADE_LOG_FILE = os.path.join(config.TRADE_LEDGER_DIR, 'trade_log.csv')
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_trade_ledger() -> LedgerWriter:
+    """Process-wide background writer for the trade log, started on first use."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = LedgerWriter(
+                TRADE_LOG_FILE,
+                TRADE_LOG_COLUMNS,
+                fsync=config.TRADE_LEDGER_FSYNC,
+                fsync_interval=config.TRADE_LEDGER_FSYNC_INTERVAL,
+                rotate_daily=config.TRADE_LEDGER_ROTATE_DAILY,
+                parquet=config.TRADE_LEDGER_PARQUET,
+            )
+            atexit.register(_ledger.close)
+        return _ledger
 
-TRADE_LOG_FILE = 'trade_log.csv'
 
 def trade_log(trade_details: dict):
     """
-    Logs trade details to a CSV file. If the file does not exist, it creates it
-    with a header. If it exists, it appends the new trade without a header.
+    Queues trade details for the background ledger writer (see utils/ledger_writer.py),
+    which appends them to the (daily) trade log CSV with the TRADE_LOG_COLUMNS header,
+    and for the SQLite ledger's trades table when it is enabled.
+    Returns immediately; the caller never waits on disk.
 
     Args:
         trade_details (dict): A dictionary containing the details of the trade.
                               Expected keys include 'Type', 'Entry Time',
                               'Exit Time', 'Net PnL', etc.
-      (callable): A function (e.g., print, logging.info) to use for
-                             logging messages.
     """
     try:
-        # Convert the trade details dictionary to a pandas DataFrame.
-        # We wrap trade_details in a list to ensure it's treated as a single row.
-        df_new_trade = pd.DataFrame([trade_details])
-
-        # Check if the trade log file already exists.
-        file_exists = os.path.exists(TRADE_LOG_FILE)
-
-        # Append the new trade to the CSV file.
-        # 'mode="a"' ensures append mode.
-        # 'header=not file_exists' writes the header only if the file didn't exist.
-        # 'index=False' prevents pandas from writing the DataFrame index as a column.
-        df_new_trade.to_csv(TRADE_LOG_FILE, mode='a', header=not file_exists, index=False)
-
-        # Log a success message using the provided log_func.
-        # Using .get() for dictionary access to prevent KeyError if a key is missing.
-        # Formatting Net PnL to two decimal places for readability.
-        print(f"📊 Trade logged to {TRADE_LOG_FILE}: "
+        get_trade_ledger().log(trade_details)
+        sqlite_ledger = get_sqlite_ledger()
+        if sqlite_ledger:
+            sqlite_ledger.record_trade(trade_details)
+        print(f"📊 Trade queued for {TRADE_LOG_FILE}: "
                  f"Type: {trade_details.get('Type', 'N/A')}, "
                  f"Entry: {trade_details.get('Entry Time', 'N/A')}, "
                  f"Exit: {trade_details.get('Exit Time', 'N/A')}, "
@@ -42,14 +57,16 @@ def trade_log(trade_details: dict):
 
     except Exception as e:
         # Log an error message if trade logging fails.
-        print(f"❌ Error: Could not log trade to CSV: {e}")
+        print(f"❌ Error: Could not log trade: {e}")
 
 # Example usage (for testing trade_logger.py independently)
 if __name__ == "__main__":
     # Ensure a clean start for testing by removing the existing log file if it exists.
-    if os.path.exists(TRADE_LOG_FILE):
-        os.remove(TRADE_LOG_FILE)
-        print(f"Removed existing {TRADE_LOG_FILE} for a clean test run.")
+    ledger = get_trade_ledger()
+    log_path = ledger._current_path()
+    if os.path.exists(log_path):
+        os.remove(log_path)
+        print(f"Removed existing {log_path} for a clean test run.")
 
     # Use the built-in 'print' function for logging during independent testing.
     
@@ -91,13 +108,14 @@ if __name__ == "__main__":
     # Call the trade_log function (corrected name)
     trade_log(trade2)
 
-    # Verify the content of the CSV file after logging.
-    print("\n--- Content of trade_log.csv ---")
+    # Wait for the writer thread, then verify the content of the CSV file.
+    ledger.flush()
+    print(f"\n--- Content of {log_path} ---")
     try:
-        df_logged = pd.read_csv(TRADE_LOG_FILE)
+        df_logged = pd.read_csv(log_path)
         # Use to_string() to ensure the entire DataFrame is printed, especially for wide tables.
         print(df_logged.to_string())
     except FileNotFoundError:
-        print(f"Error: {TRADE_LOG_FILE} not found after logging.")
+        print(f"Error: {log_path} not found after logging.")
     except Exception as e:
-        print(f"Error reading {TRADE_LOG_FILE}: {e}")
+        print(f"Error reading {log_path}: {e}")
@@ -9,25 +9,39 @@ import pandas as pd # You need pandas for to_datetime
 from datetime import datetime, timezone
 
 import time
+from time import perf_counter_ns
 
 # IMPORTANT: Adjust this import based on your config file's location.
 # If config.py is in the parent directory of 'websocket', use:
 import config
+from utils.metrics import METRICS
+from utils.profiler import PROFILER
 
 # --- WebSocket Client for Real-time Candles ---
 class WebSocketCandleClient:
-    def __init__(self, ws_url, symbol, resolution, candle_queue: queue.Queue):
+    def __init__(self, ws_url, symbol, resolution, candle_queue: queue.Queue, recorder=None, on_update=None):
+        """
+        symbol may be a single symbol or a list; all symbols share one connection
+        and one subscription. Completed candles carry a 'symbol' key and go to
+        candle_queue.put() (a queue, or a utils.candle_aggregator.CandleAggregator).
+        on_update(symbol, payload) is called with every candle update, in-progress ones
+        included (e.g. PaperTradingClient.on_candle).
+        """
         self.ws_url = ws_url
-        self.symbol = symbol
+        self.symbols = [symbol] if isinstance(symbol, str) else list(symbol)
+        self.symbol = self.symbols[0]
         self.resolution = resolution
         self.candle_queue = candle_queue
         self.ws = None
         self.thread = None
         self.running = False
+        self.recorder = recorder  # Optional utils.session_recorder.SessionRecorder
+        self.on_update = on_update
 
         # --- ADD THESE TWO LINES ---
-        self.current_websocket_candle_data = {} # Initialize this dictionary
-        self.last_completed_candle_timestamp = None # Initialize this variable
+        self.current_websocket_candle_data = {} # symbol -> in-progress candle payload
+        self.last_completed_candle_timestamp = {} # symbol -> start time of the last queued candle
+        self.last_close_ns = {} # symbol -> perf_counter_ns() when its last candle was queued (bar-close latency origin)
         # ---------------------------
 
         # Remove these lines as they are redundant with the ones above and cause confusion
@@ -35,6 +49,12 @@ class WebSocketCandleClient:
         # self.last_candle_timestamp_processed = None
 
         self._resolution_seconds = self._get_resolution_seconds(resolution)
+        # Channel and message type carry the resolution as-is: candlestick_1m, candlestick_1h, candlestick_1d
+        self.channel = f"candlestick_{resolution}"
+
+        self._msg_latency = METRICS.histogram("ws_message", "WS on_message handling time", stream="candle")
+        self._msg_count = METRICS.counter("ws_messages", "WS messages received", stream="candle")
+        self._reconnects = METRICS.counter("ws_reconnects", "WS reconnect attempts", stream="candle")
 
     def _get_resolution_seconds(self, res: str) -> int:
         if res.endswith('m'):
@@ -62,6 +82,17 @@ class WebSocketCandleClient:
         print(f"Sent subscription message: {json.dumps(payload)}")
 
     def on_message(self, ws, message):
+        t0 = perf_counter_ns()
+        self._msg_count.inc()
+        try:
+            with PROFILER.scope("ws"):
+                self._handle_message(message)
+        finally:
+            self._msg_latency.record(perf_counter_ns() - t0)
+
+    def _handle_message(self, message):
+        if self.recorder is not None:
+            self.recorder.record("candle", message)
         try:
             data = json.loads(message)
 
@@ -70,10 +101,13 @@ class WebSocketCandleClient:
                 return
 
             # Check if this is a candlestick message for the expected resolution
-            expected_type = f'candlestick_{self.resolution.replace("m", "").replace("h", "").replace("d", "")}m'
-            if data.get('type') != expected_type:
+            if data.get('type') != self.channel:
                 return # Not a candle message we care about
 
+            symbol = data.get('symbol') or self.symbol
+            if symbol not in self.symbols:
+                return
+
             candle_start_time_raw = data.get('candle_start_time') # Use candle_start_time from docs
             is_closed = data.get('is_closed', False) # Indicates if the candle is complete
 
@@ -88,21 +122,26 @@ class WebSocketCandleClient:
                 print(f"Could not parse 'candle_start_time' {candle_start_time_raw}. Error: {e}. Skipping candle.")
                 return
 
+            # In-progress candle and last queued bar are tracked per symbol
+            current = self.current_websocket_candle_data.get(symbol, {})
+            last_completed = self.last_completed_candle_timestamp.get(symbol)
+
             # If this is the first candle data or a new candle interval has started
-            if not self.current_websocket_candle_data or candle_start_dt_utc > pd.to_datetime(self.current_websocket_candle_data.get('candle_start_time', 0), unit='us', utc=True):
+            if not current or candle_start_dt_utc > pd.to_datetime(current.get('candle_start_time', 0), unit='us', utc=True):
                 # A new candle interval has begun.
                 # If we were tracking a previous candle, and it should now be considered complete,
                 # then process it and put it into the queue.
-                if self.current_websocket_candle_data:
+                if current:
                     # Only queue the previous candle if it was different and not already processed
-                    prev_candle_start_dt = pd.to_datetime(self.current_websocket_candle_data['candle_start_time'], unit='us', utc=True)
-                    if self.last_completed_candle_timestamp is None or prev_candle_start_dt > self.last_completed_candle_timestamp:
+                    prev_candle_start_dt = pd.to_datetime(current['candle_start_time'], unit='us', utc=True)
+                    if last_completed is None or prev_candle_start_dt > last_completed:
                         # Ensure the previous candle was actually for a full interval
                         # This implicitly handles `is_closed` if the new candle starts
                         # because it means the previous one must have ended.
 
-                        completed_candle = self.current_websocket_candle_data.copy()
+                        completed_candle = current.copy()
                         final_candle = {
+                            'symbol': symbol,
                             'time': prev_candle_start_dt, # Use the start time as the candle's index
                             'Open': float(completed_candle.get('open', 0)),
                             'High': float(completed_candle.get('high', 0)),
@@ -110,27 +149,30 @@ class WebSocketCandleClient:
                             'Close': float(completed_candle.get('close', 0)),
                             'Volume': float(completed_candle.get('volume', 0)) # Will be 0 for MARK: symbols
                         }
+                        self.last_close_ns[symbol] = perf_counter_ns()
                         self.candle_queue.put(final_candle)
                         print(f"PUT to queue: Completed candle {final_candle['time']} (due to new candle start)")
-                        self.last_completed_candle_timestamp = final_candle['time']
+                        self.last_completed_candle_timestamp[symbol] = final_candle['time']
 
                 # Start tracking the new candle
-                self.current_websocket_candle_data = data
-                print(f"WS: Tracking new candle for {candle_start_dt_utc}")
+                current = dict(data)
+                print(f"WS: Tracking new {symbol} candle for {candle_start_dt_utc}")
 
             # Always update the current in-progress candle with the latest data
             # This handles price updates within the same 15-minute interval
             else:
-                self.current_websocket_candle_data.update(data)
+                current.update(data)
                 # print(f"WS: Updated in-progress candle for {candle_start_dt_utc} with close {data.get('close')}") # Optional: too verbose
 
             # If the current candle is explicitly marked as closed by the feed,
             # process it and queue it (if not already queued by new candle start)
             if is_closed:
-                current_tracking_start_dt = pd.to_datetime(self.current_websocket_candle_data['candle_start_time'], unit='us', utc=True)
-                if self.last_completed_candle_timestamp is None or current_tracking_start_dt > self.last_completed_candle_timestamp:
-                    completed_candle = self.current_websocket_candle_data.copy()
+                current_tracking_start_dt = pd.to_datetime(current['candle_start_time'], unit='us', utc=True)
+                last_completed = self.last_completed_candle_timestamp.get(symbol)
+                if last_completed is None or current_tracking_start_dt > last_completed:
+                    completed_candle = current.copy()
                     final_candle = {
+                        'symbol': symbol,
                         'time': current_tracking_start_dt,
                         'Open': float(completed_candle.get('open', 0)),
                         'High': float(completed_candle.get('high', 0)),
@@ -138,10 +180,15 @@ class WebSocketCandleClient:
                         'Close': float(completed_candle.get('close', 0)),
                         'Volume': float(completed_candle.get('volume', 0))
                     }
+                    self.last_close_ns[symbol] = perf_counter_ns()
                     self.candle_queue.put(final_candle)
                     print(f"PUT to queue: Completed candle {final_candle['time']} (explicitly closed by feed)")
-                    self.last_completed_candle_timestamp = final_candle['time']
-                    self.current_websocket_candle_data = {} # Reset as this candle is now closed and processed
+                    self.last_completed_candle_timestamp[symbol] = final_candle['time']
+                    current = {} # Reset as this candle is now closed and processed
+
+            self.current_websocket_candle_data[symbol] = current
+            if self.on_update is not None:
+                self.on_update(symbol, data)
 
         except json.JSONDecodeError as e:
             print(f"WebSocket on_message JSON decoding error: {e}, Message: {message}")
@@ -157,17 +204,16 @@ class WebSocketCandleClient:
     def on_close(self, ws, close_status_code, close_msg):
         print(f"WebSocket Closed: {close_status_code} - {close_msg}")
         if self.running:
+            self._reconnects.inc()
             print("Attempting to reconnect WebSocket in 5 seconds...")
             time.sleep(5)
             self.start()
 
     def on_open(self, ws):
-        print(f"WebSocket Opened for {self.symbol} {self.resolution}")
-        clean_resolution = self.resolution.replace('m', '').replace('h', '').replace('d', '')
-        candle_channel_name = f"candlestick_{clean_resolution}m"
-        candle_symbols = [self.symbol]
+        print(f"WebSocket Opened for {self.symbols} {self.resolution}")
+        candle_symbols = list(self.symbols)
 
-        self._send_subscribe_message(ws, candle_channel_name, candle_symbols)
+        self._send_subscribe_message(ws, self.channel, candle_symbols)
 
     def _run_websocket(self):
         while self.running:
@@ -190,7 +236,7 @@ class WebSocketCandleClient:
 
     def start(self):
         self.running = True
-        self.thread = threading.Thread(target=self._run_websocket)
+        self.thread = threading.Thread(target=self._run_websocket, name="ws-candle")
         self.thread.daemon = True
         self.thread.start()
         print("WebSocket client started in a separate thread.")
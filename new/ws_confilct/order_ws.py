@@ -6,8 +6,15 @@ import json
 import traceback
 from typing import Any, Dict, Optional, Callable
 from datetime import datetime, timezone
+from time import perf_counter_ns
 
 from utils.bot_state_manager import manager as bot_state
+from utils.order_manager import OrderManager, TrackedOrder, manager as order_manager
+from utils.metrics import METRICS
+from utils.profiler import PROFILER
+
+_MSG_LATENCY = METRICS.histogram("ws_message", "WS on_message handling time", stream="order")
+_MSG_COUNT = METRICS.counter("ws_messages", "WS messages received", stream="order")
 
 
 class OrderWebSocketRouter:
@@ -24,20 +31,45 @@ class OrderWebSocketRouter:
         on_log: Optional[Callable[[str], None]] = None,
         on_error: Optional[Callable[[str], None]] = None,
         on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        recorder=None,
+        state_for: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        orders: Optional[OrderManager] = None,
     ):
         """
         on_log(msg):     optional logger (e.g., print or custom logger)
         on_error(msg):   optional error logger
         on_event(name, payload): optional hook for UI/metrics ("order_filled", {...})
+        recorder:        optional SessionRecorder capturing every raw frame
+        state_for(data): optional resolver returning the BotStateManager for an
+                         order/position payload (multi-symbol runs); None skips it.
+                         Defaults to the global singleton.
+        orders:          OrderManager fed every order frame. Defaults to the global
+                         singleton. Register `on_order_change` with it once (where the
+                         router and manager are wired) so its SL/TP transitions, from WS,
+                         REST replies or reconciliation, keep the state's order ids current.
         """
         self.on_log = on_log or (lambda m: print(f"[ORDER_WS] {m}"))
         self.on_error = on_error or (lambda m: print(f"[ORDER_WS][ERROR] {m}"))
         self.on_event = on_event or (lambda name, payload: None)
+        self.recorder = recorder
+        self.state_for = state_for or (lambda data: bot_state)
+        self.orders = order_manager if orders is None else orders
 
     # ---------------------------------------------------------------------
     # Public entrypoint: call this from your WS client when a message arrives
     # ---------------------------------------------------------------------
     def handle_raw_message(self, raw_message: str) -> None:
+        t0 = perf_counter_ns()
+        _MSG_COUNT.inc()
+        try:
+            with PROFILER.scope("ws"):
+                self._route(raw_message)
+        finally:
+            _MSG_LATENCY.record(perf_counter_ns() - t0)
+
+    def _route(self, raw_message: str) -> None:
+        if self.recorder is not None and raw_message:
+            self.recorder.record("order", raw_message)
         try:
             if not raw_message:
                 return
@@ -113,34 +145,40 @@ class OrderWebSocketRouter:
         # Inform app hooks
         self.on_event("order_update", data)
 
-        # Update SL/TP IDs if these are reduce-only orders we placed
-        if order_id and reduce_only:
-            # Heuristic: a stop reduce-only is SL, a limit reduce-only is TP
-            if order_type == "stop":
-                # If it filled/canceled/expired -> clear
-                if status in ("filled", "cancelled", "canceled", "rejected", "expired"):
-                    bot_state.clear_sl_if_order(order_id)
-                else:
-                    # Register SL order ID (active)
-                    current = bot_state.get_state()
-                    if current.get("sl_order_id") != order_id:
-                        bot_state.set_sl_tp_order_ids(order_id, current.get("tp_order_id"))
-            elif order_type == "limit":
-                if status in ("filled", "cancelled", "canceled", "rejected", "expired"):
-                    bot_state.clear_tp_if_order(order_id)
-                else:
-                    current = bot_state.get_state()
-                    if current.get("tp_order_id") != order_id:
-                        bot_state.set_sl_tp_order_ids(current.get("sl_order_id"), order_id)
+        # Indexed by exchange / client order id; SL/TP id changes arrive via on_order_change
+        self.orders.on_order_update(data)
+
+        state = self.state_for(data)
+        if state is None:
+            return
 
         # If order filled, let state know (useful analytics)
         if status in ("filled", "partially_filled"):
-            bot_state.on_order_filled(side=side, avg_fill_price=avg_fill_price, filled_size=filled_size)
+            state.on_order_filled(side=side, avg_fill_price=avg_fill_price, filled_size=filled_size)
 
         # Optional: If this is an opening order (reduce_only==False) and status==filled,
         # you could infer mark_entry/mark_exit here; typically you'd do this using
         # position updates instead to avoid edge cases.
 
+    def on_order_change(self, order: TrackedOrder, prev_state: Optional[str]) -> None:
+        """OrderManager listener: mirrors the current SL/TP bracket into the bot state."""
+        if order.role not in ("sl", "tp") or order.exchange_id is None:
+            return
+        state = self.state_for({"product_symbol": order.symbol, "product_id": order.product_id})
+        if state is None:
+            return
+        if order.is_terminal:
+            if order.role == "sl":
+                state.clear_sl_if_order(order.exchange_id)
+            else:
+                state.clear_tp_if_order(order.exchange_id)
+        elif self.orders.is_bracket(order):
+            current = state.snapshot()
+            if order.role == "sl" and current.get("sl_order_id") != order.exchange_id:
+                state.set_sl_tp_order_ids(order.exchange_id, current.get("tp_order_id"))
+            elif order.role == "tp" and current.get("tp_order_id") != order.exchange_id:
+                state.set_sl_tp_order_ids(current.get("sl_order_id"), order.exchange_id)
+
     # ---------------------------------------------------------------------
     # Position updates
     # ---------------------------------------------------------------------
@@ -184,8 +222,12 @@ class OrderWebSocketRouter:
 
         self.on_event("position_update", data)
 
+        state = self.state_for(data)
+        if state is None:
+            return
+
         # Sync shared bot state (this is the robust way to stay aligned with the exchange)
-        bot_state.sync_position_snapshot(
+        state.sync_position_snapshot(
             current_position_type=direction,
             size=size,
             avg_entry_price=aep,
@@ -195,9 +237,9 @@ class OrderWebSocketRouter:
 
         # If now flat, ensure SL/TP IDs are cleared (exchange may auto-cancel on close)
         if not size or abs(size) == 0:
-            st = bot_state.get_state()
+            st = state.snapshot()
             if st.get("sl_order_id") or st.get("tp_order_id"):
-                bot_state.set_sl_tp_order_ids(None, None)
+                state.set_sl_tp_order_ids(None, None)
 
     # ---------------------------------------------------------------------
     # Helpers
@@ -0,0 +1,159 @@
+# your_trading_bot/ws_confilct/orderbook_ws.py
+
+import websocket
+
+import threading
+import json
+import time
+from time import perf_counter_ns
+
+from utils.metrics import METRICS
+from utils.profiler import PROFILER
+from utils.order_book import OrderBook, OrderBookSequenceError
+
+
+class WebSocketOrderBookClient:
+    """
+    Keeps one local OrderBook per symbol in sync with the `l2_updates` channel.
+    The exchange sends an initial `snapshot` followed by incremental `update`
+    messages carrying a sequence number; on a gap we resubscribe to get a fresh snapshot.
+    """
+
+    CHANNEL = "l2_updates"
+    RESYNC_RETRY_SECONDS = 10.0   # resend the resubscribe if no snapshot arrived by then
+
+    def __init__(self, ws_url, symbols, recorder=None):
+        self.ws_url = ws_url
+        self.symbols = list(symbols)
+        self.books = {symbol: OrderBook(symbol) for symbol in self.symbols}
+        self.recorder = recorder
+        self.ws = None
+        self.thread = None
+        self.running = False
+        self.resyncs = 0
+        self._resync_pending = {}   # symbol -> monotonic time the resubscribe was sent
+        self._msg_latency = METRICS.histogram("ws_message", "WS on_message handling time", stream="book")
+        self._msg_count = METRICS.counter("ws_messages", "WS messages received", stream="book")
+        self._reconnects = METRICS.counter("ws_reconnects", "WS reconnect attempts", stream="book")
+
+    def get_book(self, symbol) -> OrderBook:
+        return self.books[symbol]
+
+    def _send_subscribe_message(self, ws, symbols_list, unsubscribe=False):
+        payload = {
+            "type": "unsubscribe" if unsubscribe else "subscribe",
+            "payload": {"channels": [{"name": self.CHANNEL, "symbols": symbols_list}]},
+        }
+        ws.send(json.dumps(payload))
+        print(f"Sent {payload['type']} message: {json.dumps(payload)}")
+
+    def _resync(self, symbol):
+        """
+        Drop the book and ask for a new snapshot, once per symbol: while a resync is pending
+        (until the snapshot arrives, or RESYNC_RETRY_SECONDS pass) further calls do nothing.
+        """
+        self.books[symbol].invalidate()
+        sent = self._resync_pending.get(symbol)
+        now = time.monotonic()
+        if sent is not None and now - sent < self.RESYNC_RETRY_SECONDS:
+            return
+        self._resync_pending[symbol] = now
+        self.resyncs += 1
+        if self.ws:
+            try:
+                self._send_subscribe_message(self.ws, [symbol], unsubscribe=True)
+                self._send_subscribe_message(self.ws, [symbol])
+            except Exception as e:
+                print(f"Order book resync for {symbol} failed: {e}")
+
+    def on_message(self, ws, message):
+        t0 = perf_counter_ns()
+        self._msg_count.inc()
+        try:
+            with PROFILER.scope("ws"):
+                self._handle_message(message)
+        finally:
+            self._msg_latency.record(perf_counter_ns() - t0)
+
+    def _handle_message(self, message):
+        if self.recorder is not None:
+            self.recorder.record("book", message)
+        try:
+            data = json.loads(message)
+            if data.get("type") != self.CHANNEL:
+                if data.get("type") == "error":
+                    print(f"Order book WS error message: {data}")
+                return
+
+            symbol = data.get("symbol")
+            book = self.books.get(symbol)
+            if book is None:
+                return
+
+            action = data.get("action")
+            sequence_no = data.get("sequence_no")
+            if action == "snapshot":
+                book.apply_snapshot(data.get("bids") or [], data.get("asks") or [], sequence_no)
+                self._resync_pending.pop(symbol, None)
+            elif action == "update":
+                try:
+                    # Updates still in flight while the book waits for a snapshot are dropped quietly
+                    book.apply_update(data.get("bids") or [], data.get("asks") or [], sequence_no)
+                except OrderBookSequenceError as e:
+                    print(f"⚠️ Order book out of sync: {e}. Resubscribing.")
+                    self._resync(symbol)
+            elif action == "error":
+                print(f"⚠️ Order book error for {symbol}: {data}. Resubscribing.")
+                self._resync(symbol)
+
+        except json.JSONDecodeError as e:
+            print(f"Order book on_message JSON decoding error: {e}")
+        except Exception as e:
+            print(f"Order book on_message generic error: {e}")
+
+    def on_error(self, ws, error):
+        print(f"Order book WebSocket Error: {error}")
+
+    def on_close(self, ws, close_status_code, close_msg):
+        print(f"Order book WebSocket Closed: {close_status_code} - {close_msg}")
+        for book in self.books.values():
+            book.invalidate()
+        # The reconnect's on_open subscribes every symbol afresh
+        self._resync_pending.clear()
+        if self.running:
+            self._reconnects.inc()
+
+    def on_open(self, ws):
+        print(f"Order book WebSocket Opened for {self.symbols}")
+        self._send_subscribe_message(ws, self.symbols)
+
+    def _run_websocket(self):
+        while self.running:
+            try:
+                self.ws = websocket.WebSocketApp(
+                    f"{self.ws_url}",
+                    on_message=self.on_message,
+                    on_error=self.on_error,
+                    on_close=self.on_close,
+                    on_open=self.on_open
+                )
+                self.ws.run_forever(ping_interval=30, ping_timeout=10)
+            except Exception as e:
+                print(f"Order book run_forever error: {e}. Retrying in 5 seconds...")
+            if not self.running:
+                break
+            time.sleep(5)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run_websocket, name="ws-book")
+        self.thread.daemon = True
+        self.thread.start()
+        print("Order book WebSocket client started in a separate thread.")
+
+    def stop(self):
+        self.running = False
+        if self.ws:
+            self.ws.close()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5)
@@ -0,0 +1,48 @@
+# your_trading_bot/ws_confilct/private_ws.py
+
+import hashlib
+import hmac
+import json
+import threading
+import time
+
+from websocket import WebSocketApp
+
+import config
+
+PRIVATE_CHANNELS = ["user.orders", "user.positions"]
+
+
+def generate_signature(secret: str, message: str) -> str:
+    return hmac.new(bytes(secret, 'utf-8'), bytes(message, 'utf-8'), hashlib.sha256).hexdigest()
+
+
+def start_private_ws(router, api_key: str, api_secret: str, ws_url: str = None) -> threading.Thread:
+    """
+    Authenticates on the private WS, subscribes to order/position updates and feeds every
+    frame to `router` (an OrderWebSocketRouter) on a daemon `ws-order` thread.
+    Importing this module has no side effects; credentials come from the caller.
+    """
+    ws_url = ws_url or config.WS_URL
+
+    def on_open(ws):
+        timestamp = str(int(time.time()))
+        signature = generate_signature(api_secret, "GET" + timestamp + "/live")
+        ws.send(json.dumps({"type": "auth", "payload": {"api-key": api_key, "signature": signature, "timestamp": timestamp}}))
+        print("✅ Auth message sent")
+        ws.send(json.dumps({"type": "subscribe", "payload": {"channels": PRIVATE_CHANNELS}}))
+        print("✅ Subscription message sent")
+
+    def on_error(ws, error):
+        print("[WS ERROR]", error)
+
+    def on_close(ws, close_status_code, close_msg):
+        print("[WS CLOSED]", close_status_code, close_msg)
+
+    print("🔹 WebSocket client starting in a separate thread...")
+    ws_app = WebSocketApp(ws_url, on_open=on_open, on_message=lambda ws, message: router.handle_raw_message(message),
+                          on_error=on_error, on_close=on_close)
+    ws_thread = threading.Thread(target=ws_app.run_forever, name="ws-order", daemon=True)
+    ws_thread.start()
+    print("✅ WebSocket thread started!")
+    return ws_thread